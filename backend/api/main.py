@@ -9,12 +9,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import os
+import time
 import logging
 import json
 from datetime import datetime
 
 # 导入路由
-from api.routers import agents, market, portfolio, orders, signals, strategies, auto_trading, backtest, rl_training, memorybank_training
+from api.routers import agents, market, portfolio, orders, signals, strategies, auto_trading, backtest, rl_training, memorybank_training, monitoring
 from api.routes import memory
 
 # 导入WebSocket管理器
@@ -23,6 +24,12 @@ from api.websocket import ConnectionManager
 # 导入任务管理器
 from api.services.task_manager import task_manager
 
+# 导入行情后台轮询器
+from api.services.quote_poller import QuotePoller
+
+# 导入监控指标收集器
+from tradingagents.utils.monitoring_metrics import get_metrics_collector
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -33,6 +40,9 @@ logger = logging.getLogger(__name__)
 # 创建WebSocket连接管理器
 ws_manager = ConnectionManager()
 
+# 行情后台轮询器（启动时创建）
+quote_poller = None
+
 
 # 应用生命周期管理
 @asynccontextmanager
@@ -46,10 +56,29 @@ async def lifespan(app: FastAPI):
     task_manager.set_ws_manager(ws_manager)
     logger.info("[STARTUP] Injected WebSocket manager into TaskManager")
 
+    # 启动行情后台轮询：每个周期刷新一次全市场快照，增量推送给订阅者
+    global quote_poller
+    if os.getenv("QUOTE_POLLER_ENABLED", "true").lower() == "true":
+        try:
+            from api.services.realtime_data_service import realtime_data_service
+            quote_poller = QuotePoller(
+                fetch_snapshot=realtime_data_service.refresh_snapshot,
+                ws_manager=ws_manager,
+                interval=float(os.getenv("QUOTE_POLL_INTERVAL", realtime_data_service.cache_ttl)),
+                is_market_open=realtime_data_service.is_trading_hours
+            )
+            quote_poller.start()
+            logger.info("[STARTUP] Quote poller started")
+        except Exception as e:
+            logger.warning(f"[STARTUP] Quote poller disabled: {e}")
+
     yield
 
     # 关闭
     logger.info("[SHUTDOWN] HiddenGem API shutting down...")
+    if quote_poller is not None:
+        await quote_poller.stop()
+    task_manager.shutdown()
 
 
 # 创建FastAPI应用
@@ -75,6 +104,21 @@ app.add_middleware(
 )
 
 
+# 请求耗时指标：按路由模板（而非原始路径）统计，避免路径参数撑大标签基数
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start_time = time.time()
+    success = False
+    try:
+        response = await call_next(request)
+        success = response.status_code < 500
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = f"{request.method} {getattr(route, 'path', 'unmatched')}"
+        get_metrics_collector().record_api_request(success, time.time() - start_time, endpoint=endpoint)
+
+
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -126,6 +170,7 @@ app.include_router(auto_trading.router, prefix="/api/v1/auto-trading", tags=["au
 app.include_router(backtest.router)  # backtest路由已包含prefix
 app.include_router(rl_training.router)  # RL训练路由已包含prefix
 app.include_router(memorybank_training.router)  # MemoryBank训练路由已包含prefix
+app.include_router(monitoring.router)  # 监控指标路由已包含prefix
 app.include_router(memory.router, prefix="/api/v1")
 
 
@@ -171,6 +216,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 symbol = message.get("symbol")
                 if symbol:
                     await ws_manager.subscribe(websocket, symbol)
+                    if quote_poller is not None:
+                        await quote_poller.send_latest(websocket, symbol)
 
             elif msg_type == "unsubscribe":
                 # 取消订阅股票
@@ -206,6 +253,8 @@ async def websocket_endpoint(websocket: WebSocket):
             elif msg_type == "get_stats":
                 # 获取统计信息
                 stats = ws_manager.get_stats()
+                if quote_poller is not None:
+                    stats["quote_poller"] = quote_poller.get_stats()
                 await ws_manager.send_personal_message({
                     "type": "stats",
                     "data": stats
@@ -19,7 +19,7 @@ from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
 
 # 导入任务管理器
-from api.services.task_manager import task_manager, Task, TaskStatus
+from api.services.task_manager import task_manager, Task, TaskStatus, TaskPriority, TaskQueueFull
 
 # 导入异常处理工具
 from api.utils.exception_handlers import handle_memory_exception
@@ -77,6 +77,20 @@ router = APIRouter()
 # 全局TradingGraph实例（应用启动时初始化）
 trading_graph: Optional[TradingAgentsGraph] = None
 
+# 异步分析是否在进程池中执行图分析（进程内无法回调Agent级进度，仅使用模拟进度）
+ANALYSIS_USE_PROCESS_POOL = os.getenv("ANALYSIS_USE_PROCESS_POOL", "false").lower() == "true"
+
+# 进程池工作进程内的TradingGraph实例（每个进程首次使用时创建）
+_process_trading_graph: Optional[TradingAgentsGraph] = None
+
+
+def _propagate_in_process(symbol: str, trade_date: str):
+    """在进程池工作进程中执行图分析"""
+    global _process_trading_graph
+    if _process_trading_graph is None:
+        _process_trading_graph = TradingAgentsGraph(config=_build_config_from_env())
+    return _process_trading_graph.propagate(symbol, trade_date)
+
 
 def _build_config_from_env() -> Dict[str, Any]:
     """
@@ -232,16 +246,22 @@ async def analyze_all_agents(symbol: str, trade_date: Optional[str] = None):
 
 
 @router.post("/analyze-all-async/{symbol}")
-async def analyze_all_agents_async(symbol: str, trade_date: Optional[str] = None):
+async def analyze_all_agents_async(
+    symbol: str,
+    trade_date: Optional[str] = None,
+    priority: str = Query("normal", description="Task priority: high, normal, low")
+):
     """
     异步分析所有Agent对某只股票的看法（推荐）
 
-    此接口立即返回task_id，不会阻塞。
+    此接口立即返回task_id，不会阻塞。任务进入优先级队列，排队位置变化通过
+    WebSocket task_queued 消息推送；同一股票同一日期的分析在进行中时直接返回已有任务。
     使用 GET /tasks/{task_id} 查询分析进度和结果
 
     Args:
         symbol: 股票代码 (e.g., 600519.SH, 000001.SZ)
         trade_date: 交易日期，默认为今天
+        priority: 任务优先级
 
     Returns:
         {
@@ -249,7 +269,9 @@ async def analyze_all_agents_async(symbol: str, trade_date: Optional[str] = None
             "task_id": "uuid",
             "symbol": "600519.SH",
             "message": "Analysis task created",
-            "status_url": "/api/v1/agents/tasks/{task_id}"
+            "status_url": "/api/v1/agents/tasks/{task_id}",
+            "queue_position": 1,
+            "deduplicated": false
         }
     """
     global trading_graph
@@ -260,23 +282,46 @@ async def analyze_all_agents_async(symbol: str, trade_date: Optional[str] = None
     if trade_date is None:
         trade_date = datetime.now().strftime('%Y-%m-%d')
 
+    try:
+        task_priority = TaskPriority[priority.upper()]
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Invalid priority: {priority}. Must be one of: high, normal, low")
+
+    # 相同股票、相同日期的分析正在排队或执行时，复用已有任务
+    dedup_key = f"analyze_all:{symbol}:{trade_date}"
+    existing = task_manager.find_inflight(dedup_key)
+    if existing is not None:
+        logger.info(f"[ASYNC] Reusing in-flight analysis task {existing.task_id} for {symbol}")
+        return {
+            "success": True,
+            "task_id": existing.task_id,
+            "symbol": symbol,
+            "message": "Identical analysis already in progress",
+            "status_url": f"/api/v1/agents/tasks/{existing.task_id}",
+            "queue_position": existing.queue_position,
+            "deduplicated": True,
+            "timestamp": datetime.now().isoformat()
+        }
+
     try:
         # 创建任务
         task_id = task_manager.create_task(
             task_type="analyze_all",
             symbol=symbol,
-            metadata={"trade_date": trade_date}
+            metadata={"trade_date": trade_date},
+            priority=task_priority,
+            dedup_key=dedup_key
         )
 
-        # 在后台运行分析
-        task_manager.run_task_in_background(
+        # 放入任务队列
+        queue_position = task_manager.run_task_in_background(
             task_id=task_id,
             func=_run_analysis_task,
             symbol=symbol,
             trade_date=trade_date
         )
 
-        logger.info(f"[ASYNC] Created analysis task {task_id} for {symbol}")
+        logger.info(f"[ASYNC] Created analysis task {task_id} for {symbol} (queue position {queue_position})")
 
         return {
             "success": True,
@@ -284,9 +329,17 @@ async def analyze_all_agents_async(symbol: str, trade_date: Optional[str] = None
             "symbol": symbol,
             "message": "Analysis task created successfully",
             "status_url": f"/api/v1/agents/tasks/{task_id}",
+            "queue_position": queue_position,
+            "deduplicated": False,
             "timestamp": datetime.now().isoformat()
         }
 
+    except TaskQueueFull as e:
+        logger.warning(f"[ASYNC] Rejected analysis task for {symbol}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Analysis queue is full ({e.queued}/{e.limit}), please retry later"
+        )
     except Exception as e:
         logger.error(f"[ERROR] Failed to create analysis task for {symbol}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -355,7 +408,13 @@ async def _run_analysis_task(task: Task, symbol: str, trade_date: str):
             return final_state, processed_signal
 
         try:
-            final_state, processed_signal = await loop.run_in_executor(None, sync_propagate)
+            if ANALYSIS_USE_PROCESS_POOL:
+                task_manager.update_progress(task.task_id, 20, "初始化分析系统...")
+                final_state, processed_signal = await task_manager.run_in_process(
+                    _propagate_in_process, symbol, trade_date
+                )
+            else:
+                final_state, processed_signal = await task_manager.run_in_thread(sync_propagate)
         finally:
             # 停止进度模拟
             progress_cancel.set()
@@ -12,6 +12,8 @@ from enum import Enum
 import logging
 import os
 import asyncio
+import multiprocessing
+import threading
 from pathlib import Path
 
 router = APIRouter(prefix="/api/v1/rl", tags=["rl-training"])
@@ -64,6 +66,9 @@ class TrainingConfigRequest(BaseModel):
     n_epochs: int = Field(5, description="PPO epoch数")
     gamma: float = Field(0.995, description="折扣因子")
 
+    # 并行配置
+    n_envs: int = Field(1, ge=1, le=64, description="并行环境进程数（>1时在独立进程中训练，环境运行于SubprocVecEnv，行情数据通过共享内存共享）")
+
     # 系统配置
     use_gpu: bool = Field(False, description="使用GPU加速")
     model_name: Optional[str] = Field(None, description="模型名称")
@@ -80,6 +85,7 @@ class TrainingConfigRequest(BaseModel):
                 "initial_cash": 100000.0,
                 "enable_t1": True,
                 "total_timesteps": 500000,
+                "n_envs": 8,
                 "use_gpu": True,
                 "model_name": "hs300_ppo_v1"
             }
@@ -98,6 +104,8 @@ class TrainingProgress(BaseModel):
     ep_rew_mean: Optional[float] = Field(None, description="平均episode奖励")
     ep_len_mean: Optional[float] = Field(None, description="平均episode长度")
     fps: Optional[float] = Field(None, description="训练速度(帧/秒)")
+    env_steps_per_sec: Optional[float] = Field(None, description="环境步吞吐(所有并行环境合计, 步/秒)")
+    n_envs: Optional[int] = Field(None, description="并行环境数")
 
     # 训练loss
     policy_loss: Optional[float] = Field(None, description="策略损失")
@@ -166,6 +174,12 @@ training_tasks: Dict[str, TrainingInfo] = {}
 # 存储后台任务
 background_tasks_registry: Dict[str, asyncio.Task] = {}
 
+# 多进程训练模式下的训练进程
+training_processes: Dict[str, multiprocessing.Process] = {}
+
+# 线程训练模式下的停止信号（训练循环中的 StopTrainingCallback 检查）
+training_stop_events: Dict[str, threading.Event] = {}
+
 
 # ==================== Helper Functions ====================
 
@@ -181,6 +195,40 @@ def get_models_directory() -> Path:
     return backend_dir / "models" / "production"
 
 
+def run_training_in_process(training_id: str, training_config: Dict) -> Dict:
+    """在独立进程中运行训练并等待结果（阻塞，需在线程池中调用）
+
+    训练进程不与API进程共享GIL，其内部再以SubprocVecEnv启动 n_envs 个环境进程
+    """
+    from scripts.train_rl_production import run_training_subprocess
+
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=run_training_subprocess,
+        args=(training_config, child_conn),
+        name=f"rl-training-{training_id}"
+    )
+    process.start()
+    child_conn.close()
+    training_processes[training_id] = process
+
+    try:
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join()
+            raise RuntimeError(f"Training process exited unexpectedly (exit code {process.exitcode})")
+    finally:
+        parent_conn.close()
+        process.join()
+        training_processes.pop(training_id, None)
+
+    if status != 'ok':
+        raise RuntimeError(payload)
+    return payload
+
+
 async def run_training_async(training_id: str, config: TrainingConfigRequest):
     """异步运行训练任务"""
     try:
@@ -219,15 +267,30 @@ async def run_training_async(training_id: str, config: TrainingConfigRequest):
             'batch_size': config.batch_size,
             'n_epochs': config.n_epochs,
             'gamma': config.gamma,
+            'n_envs': config.n_envs,
 
             'use_gpu': config.use_gpu,
             'model_name': config.model_name or training_id,
             'model_dir': str(get_models_directory() / training_id),
         }
 
-        # 在线程池中运行训练（避免阻塞事件循环）
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, run_training, training_config)
+        if config.n_envs > 1:
+            # 多进程模式：训练在独立进程中运行，环境分布在 n_envs 个worker进程
+            result = await loop.run_in_executor(None, run_training_in_process, training_id, training_config)
+        else:
+            # 在线程池中运行训练（避免阻塞事件循环），stop_event 用于优雅停止
+            stop_event = threading.Event()
+            training_stop_events[training_id] = stop_event
+            if training_tasks[training_id].status == TrainingStatus.STOPPED:
+                stop_event.set()
+            try:
+                result = await loop.run_in_executor(None, run_training, training_config, stop_event)
+            finally:
+                training_stop_events.pop(training_id, None)
+
+        if training_tasks[training_id].status == TrainingStatus.STOPPED:
+            return
 
         # 更新状态为完成
         training_tasks[training_id].status = TrainingStatus.COMPLETED
@@ -236,6 +299,9 @@ async def run_training_async(training_id: str, config: TrainingConfigRequest):
         logger.info(f" Training completed: {training_id}")
 
     except Exception as e:
+        if training_tasks[training_id].status == TrainingStatus.STOPPED:
+            logger.info(f" Training process terminated: {training_id}")
+            return
         logger.error(f" Training failed: {training_id} - {e}")
         training_tasks[training_id].status = TrainingStatus.FAILED
         training_tasks[training_id].error_message = str(e)
@@ -281,7 +347,8 @@ async def start_training(
             data={
                 "training_id": training_id,
                 "status": training_info.status,
-                "estimated_time": config.total_timesteps / 300  # 假设300 FPS
+                "n_envs": config.n_envs,
+                "estimated_time": config.total_timesteps / (300 * config.n_envs)  # 假设每个环境300 FPS
             }
         )
 
@@ -326,6 +393,7 @@ async def get_all_training_status():
                     "stock_pool": training_info.config.stock_pool,
                     "max_stocks": training_info.config.max_stocks,
                     "total_timesteps": training_info.config.total_timesteps,
+                    "n_envs": training_info.config.n_envs,
                     "model_name": training_info.config.model_name
                 }
             })
@@ -424,6 +492,8 @@ async def get_training_progress(training_id: str):
                     "progress_pct": 0.0,
                     "ep_rew_mean": None,
                     "fps": None,
+                    "env_steps_per_sec": None,
+                    "n_envs": training_info.config.n_envs,
                     "elapsed_time": 0,
                     "estimated_remaining": None
                 }
@@ -436,6 +506,8 @@ async def get_training_progress(training_id: str):
                 "progress_pct": 0.0,
                 "ep_rew_mean": None,
                 "fps": None,
+                "env_steps_per_sec": None,
+                "n_envs": training_info.config.n_envs,
                 "elapsed_time": 0,
                 "estimated_remaining": None,
                 "error": str(e)
@@ -483,12 +555,19 @@ async def stop_training(training_id: str):
                 message=f"Training is not running: {training_info.status}"
             )
 
-        # TODO: 实现优雅停止逻辑
-        # 发送停止信号到训练进程
-
         training_info.status = TrainingStatus.STOPPED
         training_info.completed_at = datetime.now()
 
+        # 线程模式：通知训练循环在下一个环境步结束
+        stop_event = training_stop_events.get(training_id)
+        if stop_event is not None:
+            stop_event.set()
+
+        # 多进程模式下终止训练进程（其SubprocVecEnv worker随之退出）
+        process = training_processes.get(training_id)
+        if process is not None and process.is_alive():
+            process.terminate()
+
         logger.info(f" Training stopped: {training_id}")
 
         return TrainingResponse(
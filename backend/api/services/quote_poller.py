@@ -0,0 +1,166 @@
+"""
+Quote Poller
+
+后台行情轮询 - 单个 asyncio 任务按数据源更新周期刷新全市场行情快照，
+与上一快照比较后只向订阅了变化股票的 WebSocket 客户端推送。
+无论多少客户端订阅，每个周期只访问一次上游行情接口。
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+
+from fastapi import WebSocket
+
+from api.services.quote_snapshot import CHANGE_FIELDS, QuoteSnapshot
+
+if TYPE_CHECKING:
+    from api.websocket.manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+class QuotePoller:
+    """全市场行情后台轮询与增量推送"""
+
+    def __init__(
+        self,
+        fetch_snapshot: Callable[[], Optional[QuoteSnapshot]],
+        ws_manager: 'ConnectionManager',
+        interval: float = 30.0,
+        is_market_open: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Args:
+            fetch_snapshot: 强制刷新并返回全市场快照的函数（阻塞调用，在线程池中执行）
+            ws_manager: WebSocket连接管理器
+            interval: 轮询周期（秒），与数据源更新周期一致
+            is_market_open: 是否在交易时间；非交易时间只在没有快照时刷新一次
+        """
+        self.fetch_snapshot = fetch_snapshot
+        self.ws_manager = ws_manager
+        self.interval = interval
+        self.is_market_open = is_market_open
+
+        self.snapshot: Optional[QuoteSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "polls": 0,
+            "idle_skips": 0,
+            "closed_skips": 0,
+            "errors": 0,
+            "pushed_symbols": 0,
+            "last_poll_at": None,
+            "last_poll_ms": None,
+            "last_changed": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """启动后台轮询任务（需在事件循环中调用）"""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self.run(), name="quote-poller")
+        logger.info(f"[QuotePoller] Started, interval={self.interval}s")
+
+    async def stop(self):
+        """停止后台轮询任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("[QuotePoller] Stopped")
+
+    async def run(self):
+        """轮询主循环：每个周期刷新一次，周期从上次刷新开始计时"""
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"[QuotePoller] Poll failed: {e}")
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0.0))
+
+    async def poll_once(self) -> int:
+        """
+        刷新一次快照并推送变化
+
+        Returns:
+            推送的股票数量
+        """
+        symbols = self.ws_manager.get_subscribed_symbols()
+        if not symbols:
+            # 无订阅者时不访问上游，REST 调用仍按需刷新
+            self.stats["idle_skips"] += 1
+            return 0
+
+        if self.snapshot is not None and self.is_market_open is not None and not self.is_market_open():
+            self.stats["closed_skips"] += 1
+            return 0
+
+        started = time.perf_counter()
+        snapshot = await asyncio.to_thread(self.fetch_snapshot)
+        self.stats["polls"] += 1
+        self.stats["last_poll_at"] = datetime.now().isoformat()
+        self.stats["last_poll_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if snapshot is None or snapshot is self.snapshot:
+            return 0
+
+        previous, self.snapshot = self.snapshot, snapshot
+        # 订阅列表可能在刷新期间变化，以刷新后的为准
+        symbols = self.ws_manager.get_subscribed_symbols()
+        changed = snapshot.changed_symbols(previous, symbols, CHANGE_FIELDS)
+
+        for symbol in changed:
+            await self.ws_manager.send_to_symbol_subscribers(symbol, self._quote_message(snapshot, symbol))
+
+        self.stats["last_changed"] = len(changed)
+        self.stats["pushed_symbols"] += len(changed)
+        logger.debug(f"[QuotePoller] {len(changed)}/{len(symbols)} subscribed symbols changed")
+        return len(changed)
+
+    async def send_latest(self, websocket: WebSocket, symbol: str):
+        """
+        向新订阅者发送最新快照中的行情（增量推送只在变化时发生）
+
+        Args:
+            websocket: WebSocket连接
+            symbol: 股票代码
+        """
+        if self.snapshot is None or symbol not in self.snapshot:
+            return
+        await self.ws_manager.send_personal_message(self._quote_message(self.snapshot, symbol), websocket)
+
+    @staticmethod
+    def _quote_message(snapshot: QuoteSnapshot, symbol: str) -> Dict:
+        message = snapshot.get(symbol)
+        message["type"] = "market_data"
+        return message
+
+    def get_stats(self) -> Dict:
+        """
+        获取轮询统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            **self.stats,
+            "running": self.running,
+            "interval": self.interval,
+            "snapshot_size": len(self.snapshot) if self.snapshot is not None else 0,
+            "snapshot_age_seconds": round(self.snapshot.age_seconds, 1) if self.snapshot is not None else None,
+        }
@@ -0,0 +1,163 @@
+"""
+Quote Snapshot
+
+全市场实时行情快照 - 每次刷新时将 MiniShare 全量行情表一次性转换为
+按纯代码索引的只读行情字典，单只查询 O(1)，多个调用方并发读取无需重复转换。
+"""
+
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 判断行情是否变化时比较的字段（盘中会变动的字段）
+CHANGE_FIELDS = ("price", "change", "change_amount", "volume", "turnover", "high", "low", "open")
+
+
+def clean_symbol(symbol: str) -> str:
+    """去掉交易所后缀，如 000001.SZ -> 000001"""
+    return symbol.split('.')[0]
+
+
+def _float_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """取浮点列，列不存在时为0"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.float64)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _same_value(a, b) -> bool:
+    """值相等（NaN 与 NaN 视为相等）"""
+    return a == b or (a != a and b != b)
+
+
+def _int_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """取整数列（截断取整，缺失值为0）"""
+    return np.nan_to_num(_float_column(df, column), nan=0.0).astype(np.int64)
+
+
+class QuoteSnapshot:
+    """某一时刻的全市场行情快照（构建后不可变）"""
+
+    __slots__ = ('_quotes', 'fetched_at')
+
+    def __init__(self, quotes: Mapping[str, Dict], fetched_at: Optional[datetime] = None):
+        """
+        Args:
+            quotes: {纯代码: 标准格式行情字典}
+            fetched_at: 行情获取时间
+        """
+        self._quotes = MappingProxyType(dict(quotes))
+        self.fetched_at = fetched_at or datetime.now()
+
+    @classmethod
+    def from_minishare(cls, df: pd.DataFrame, fetched_at: Optional[datetime] = None) -> 'QuoteSnapshot':
+        """由 MiniShare rt_k_ms 全量行情表构建快照（按列向量化转换，同一代码取首行）
+
+        字段含义与单行转换一致：close 为当前价，pct_chg 为涨跌幅(%)，vol 为成交量(手)
+        """
+        fetched_at = fetched_at or datetime.now()
+        if df is None or df.empty:
+            return cls({}, fetched_at)
+
+        df = df.drop_duplicates(subset='symbol', keep='first')
+
+        close = _float_column(df, 'close')
+        high = _float_column(df, 'high')
+        low = _float_column(df, 'low')
+        pre_close = _float_column(df, 'pre_close')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amplitude = np.where(pre_close > 0, (high - low) / pre_close * 100, 0.0)
+
+        timestamp = fetched_at.isoformat()
+        columns = {
+            "name": df['name'].tolist(),
+            "price": close.tolist(),  # MiniShare 用 close 表示当前价
+            "change": _float_column(df, 'pct_chg').tolist(),  # 涨跌幅（%）
+            "change_amount": _float_column(df, 'change').tolist(),  # 涨跌额
+            "volume": _int_column(df, 'vol').tolist(),  # 成交量（手）
+            "turnover": _int_column(df, 'amount').tolist(),  # 成交额（元）
+            "amplitude": amplitude.tolist(),  # 振幅
+            "high": high.tolist(),
+            "low": low.tolist(),
+            "open": _float_column(df, 'open').tolist(),
+            "prev_close": pre_close.tolist(),
+            "volume_ratio": _float_column(df, 'volume_ratio').tolist(),
+            "turnover_rate": _float_column(df, 'turnover_rate').tolist(),
+            "pe_ratio": _float_column(df, 'pe_ttm').tolist(),  # 市盈率
+            "pb_ratio": _float_column(df, 'pb').tolist(),  # 市净率
+        }
+        names = list(columns)
+
+        quotes = {}
+        for code, values in zip(df['symbol'].astype(str).tolist(), zip(*columns.values())):
+            quote = {"symbol": code}
+            quote.update(zip(names, values))
+            quote["total_market_cap"] = 0  # MiniShare 不提供，设为0
+            quote["circulation_market_cap"] = 0  # MiniShare 不提供，设为0
+            quote["timestamp"] = timestamp
+            quotes[code] = quote
+
+        return cls(quotes, fetched_at)
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def __contains__(self, symbol: str) -> bool:
+        return clean_symbol(symbol) in self._quotes
+
+    @property
+    def age_seconds(self) -> float:
+        """快照已存在的秒数"""
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """查询单只股票行情，返回副本（symbol 字段为调用方传入的代码）
+
+        Args:
+            symbol: 股票代码，如 "000001" 或 "000001.SZ"
+        """
+        quote = self._quotes.get(clean_symbol(symbol))
+        if quote is None:
+            return None
+        result = dict(quote)
+        result["symbol"] = symbol
+        return result
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """批量查询，未找到的代码不出现在结果中"""
+        results = {}
+        for symbol in symbols:
+            quote = self.get(symbol)
+            if quote is not None:
+                results[symbol] = quote
+        return results
+
+    def changed_symbols(
+        self,
+        previous: Optional['QuoteSnapshot'],
+        symbols: Iterable[str],
+        fields: Sequence[str] = CHANGE_FIELDS
+    ) -> List[str]:
+        """与上一快照相比行情发生变化的代码
+
+        Args:
+            previous: 上一快照，None 时视为全部变化
+            symbols: 待比较的代码（可带交易所后缀），本快照中不存在的代码被忽略
+            fields: 参与比较的字段
+
+        Returns:
+            发生变化（或上一快照中不存在）的代码，保持传入顺序
+        """
+        changed = []
+        for symbol in symbols:
+            code = clean_symbol(symbol)
+            quote = self._quotes.get(code)
+            if quote is None:
+                continue
+            old = previous._quotes.get(code) if previous is not None else None
+            if old is None or not all(_same_value(quote[f], old[f]) for f in fields):
+                changed.append(symbol)
+        return changed
@@ -13,6 +13,8 @@ import logging
 import os
 import time
 
+from api.services.quote_snapshot import QuoteSnapshot, clean_symbol as _clean_symbol
+
 logger = logging.getLogger(__name__)
 
 # MiniShare Token
@@ -57,24 +59,27 @@ class RealtimeDataService:
     """实时数据服务（基于 MiniShare SDK）"""
 
     def __init__(self):
-        self.cache = {}  # 简单的内存缓存
         self.cache_ttl = 30  # 缓存30秒（MiniShare官方：30秒更新一次）
         self.api = ms.pro_api(MINISHARE_TOKEN)
         self._full_data_cache = None  # 全量数据缓存
         self._full_data_cache_time = None  # 全量数据缓存时间
+        self._snapshot = QuoteSnapshot({})  # 按代码索引的行情快照（随全量数据一起刷新）
         logger.info("MiniShare 实时数据服务已初始化")
 
     @retry_on_connection_error(max_retries=3, delay=1, backoff=2)
-    def _fetch_all_stocks_data(self) -> Optional[pd.DataFrame]:
+    def _fetch_all_stocks_data(self, force: bool = False) -> Optional[pd.DataFrame]:
         """
         获取所有A股实时行情（使用 MiniShare SDK）
         带缓存，避免频繁调用API
 
+        Args:
+            force: 忽略缓存，强制从 MiniShare 刷新（后台轮询使用）
+
         Returns:
             DataFrame 或 None
         """
         # 检查缓存
-        if self._full_data_cache is not None and self._full_data_cache_time is not None:
+        if not force and self._full_data_cache is not None and self._full_data_cache_time is not None:
             elapsed = (datetime.now() - self._full_data_cache_time).seconds
             if elapsed < self.cache_ttl:
                 logger.debug(f"使用全量数据缓存（已缓存 {elapsed} 秒）")
@@ -94,9 +99,11 @@ class RealtimeDataService:
 
             logger.info(f"✅ 成功获取 {len(df)} 只股票的实时行情（深圳：{len(df_sz)}，上海：{len(df_sh)}）")
 
-            # 更新缓存
+            # 更新缓存（快照每次刷新只构建一次，之后所有查询共享）
+            fetched_at = datetime.now()
+            self._snapshot = QuoteSnapshot.from_minishare(df, fetched_at)
             self._full_data_cache = df
-            self._full_data_cache_time = datetime.now()
+            self._full_data_cache_time = fetched_at
 
             return df
 
@@ -104,42 +111,33 @@ class RealtimeDataService:
             logger.error(f"❌ MiniShare API 调用失败: {e}")
             raise  # 让重试装饰器处理
 
-    def _convert_minishare_to_standard_format(self, row: pd.Series, symbol: str) -> Dict:
+    def get_snapshot(self) -> Optional[QuoteSnapshot]:
         """
-        将 MiniShare 数据格式转换为标准格式
+        获取当前行情快照（过期时先刷新全量数据）
 
-        Args:
-            row: MiniShare 返回的数据行
-            symbol: 原始股票代码（可能包含后缀）
+        快照构建后不可变，可被多个调用方并发读取
 
         Returns:
-            标准格式的行情字典
+            QuoteSnapshot，获取失败时为 None
         """
-        try:
-            return {
-                "symbol": symbol,
-                "name": row['name'],
-                "price": float(row['close']),  # MiniShare 用 close 表示当前价
-                "change": float(row['pct_chg']),  # 涨跌幅（%）
-                "change_amount": float(row['change']),  # 涨跌额
-                "volume": int(row['vol']),  # 成交量（手）
-                "turnover": int(row['amount']),  # 成交额（元）
-                "amplitude": float(row['high'] - row['low']) / float(row['pre_close']) * 100 if row['pre_close'] > 0 else 0,  # 振幅
-                "high": float(row['high']),
-                "low": float(row['low']),
-                "open": float(row['open']),
-                "prev_close": float(row['pre_close']),
-                "volume_ratio": float(row.get('volume_ratio', 0)),
-                "turnover_rate": float(row.get('turnover_rate', 0)),
-                "pe_ratio": float(row.get('pe_ttm', 0)),  # 市盈率
-                "pb_ratio": float(row.get('pb', 0)),  # 市净率
-                "total_market_cap": 0,  # MiniShare 不提供，设为0
-                "circulation_market_cap": 0,  # MiniShare 不提供，设为0
-                "timestamp": datetime.now().isoformat(),
-            }
-        except Exception as e:
-            logger.error(f"数据转换失败: {e}, row={row.to_dict()}")
-            raise
+        df = self._fetch_all_stocks_data()
+        if df is None:
+            return None
+        return self._snapshot
+
+    def refresh_snapshot(self) -> Optional[QuoteSnapshot]:
+        """
+        强制刷新全量行情并返回新快照（供后台轮询器按数据源更新周期调用）
+
+        刷新后 REST 调用在缓存有效期内直接复用该快照，不再访问 MiniShare
+
+        Returns:
+            QuoteSnapshot，获取失败时为 None
+        """
+        df = self._fetch_all_stocks_data(force=True)
+        if df is None:
+            return None
+        return self._snapshot
 
     def get_realtime_quote(self, symbol: str) -> Optional[Dict]:
         """
@@ -153,38 +151,19 @@ class RealtimeDataService:
             实时行情数据字典
         """
         try:
-            # 移除后缀（如果有），获取纯代码
-            clean_symbol = symbol.split('.')[0]
-
-            # 检查单只股票缓存
-            cache_key = f"quote_{clean_symbol}"
-            if cache_key in self.cache:
-                cached_data, cached_time = self.cache[cache_key]
-                if (datetime.now() - cached_time).seconds < self.cache_ttl:
-                    logger.debug(f"✓ 使用缓存数据: {symbol}")
-                    return cached_data
+            snapshot = self.get_snapshot()
 
-            # 获取实时行情（会使用全量数据缓存）
-            df = self._fetch_all_stocks_data()
-
-            if df is None or df.empty:
+            if snapshot is None or len(snapshot) == 0:
                 logger.warning(f"❌ 无法获取实时行情数据")
                 return None
 
-            # 查找对应股票（MiniShare 用 symbol 字段存储纯代码）
-            stock_data = df[df['symbol'] == clean_symbol]
+            # 按纯代码直接查找（MiniShare 用 symbol 字段存储纯代码）
+            quote = snapshot.get(symbol)
 
-            if stock_data.empty:
+            if quote is None:
                 logger.warning(f"⚠️ 股票 {symbol} 未找到行情数据")
                 return None
 
-            row = stock_data.iloc[0]
-
-            # 转换为标准格式
-            quote = self._convert_minishare_to_standard_format(row, symbol)
-
-            # 更新缓存
-            self.cache[cache_key] = (quote, datetime.now())
             logger.debug(f"✓ 成功获取 {symbol} 实时行情: 价格={quote['price']}, 涨跌幅={quote['change']}%")
 
             return quote
@@ -207,31 +186,18 @@ class RealtimeDataService:
 
         try:
             # 一次性获取所有股票数据（会使用缓存）
-            df = self._fetch_all_stocks_data()
+            snapshot = self.get_snapshot()
 
-            if df is None or df.empty:
+            if snapshot is None or len(snapshot) == 0:
                 logger.warning("❌ 批量获取失败：无法获取实时行情数据")
                 return results
 
-            # 为每个股票代码提取数据
-            for symbol in symbols:
-                clean_symbol = symbol.split('.')[0]
-
-                # 从DataFrame中查找（MiniShare 用 symbol 字段）
-                stock_data = df[df['symbol'] == clean_symbol]
-
-                if not stock_data.empty:
-                    row = stock_data.iloc[0]
-
-                    # 转换为标准格式
-                    quote = self._convert_minishare_to_standard_format(row, symbol)
+            # 快照按代码索引，每只股票 O(1) 查找
+            results = snapshot.get_many(symbols)
 
-                    # 更新单只股票缓存（用于直接调用 get_realtime_quote 的场景）
-                    cache_key = f"quote_{clean_symbol}"
-                    self.cache[cache_key] = (quote, datetime.now())
-                    results[symbol] = quote
-                else:
-                    logger.warning(f"⚠️ 股票 {symbol} 未找到行情数据")
+            missing = [symbol for symbol in symbols if symbol not in results]
+            if missing:
+                logger.warning(f"⚠️ {len(missing)} 只股票未找到行情数据: {', '.join(missing[:10])}")
 
             logger.info(f"✅ 批量获取成功：{len(results)}/{len(symbols)} 只股票")
 
@@ -276,7 +242,7 @@ class RealtimeDataService:
             股票基本信息
         """
         try:
-            clean_symbol = symbol.split('.')[0]
+            clean_symbol = _clean_symbol(symbol)
 
             # 使用 akshare 获取股票信息
             info_df = ak.stock_individual_info_em(symbol=clean_symbol)
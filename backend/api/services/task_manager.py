@@ -2,13 +2,24 @@
 异步任务管理器
 
 支持并发执行AI分析任务，每个任务独立运行互不干扰
+
+任务进入优先级队列，由固定数量的工作协程取出执行（并发上限真实生效）：
+- 准入控制：排队任务数达到上限时拒绝新任务（TaskQueueFull）
+- 排队位置变化通过WebSocket推送给任务订阅者
+- 相同分析（dedup_key 相同）在排队/执行期间只保留一个任务
+- 同步函数在专用线程池中执行，重计算可选进程池
 """
 
 import uuid
 import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional, Any, Callable, TYPE_CHECKING
-from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Tuple, TYPE_CHECKING
+from enum import Enum, IntEnum
 import logging
 from dataclasses import dataclass, field
 
@@ -27,6 +38,22 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"  # 已取消
 
 
+class TaskPriority(IntEnum):
+    """任务优先级（数值越小越先执行）"""
+    HIGH = 0
+    NORMAL = 5
+    LOW = 10
+
+
+class TaskQueueFull(Exception):
+    """排队任务数已达上限"""
+
+    def __init__(self, queued: int, limit: int):
+        self.queued = queued
+        self.limit = limit
+        super().__init__(f"Task queue is full ({queued}/{limit})")
+
+
 @dataclass
 class Task:
     """任务数据结构"""
@@ -42,6 +69,26 @@ class Task:
     completed_at: Optional[datetime] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     progress_messages: list = field(default_factory=list)  # 进度消息列表
+    priority: int = TaskPriority.NORMAL  # 优先级
+    dedup_key: Optional[str] = None  # 去重键（相同键的任务排队/执行期间只保留一个）
+    queued_at: Optional[datetime] = None  # 入队时间
+    queue_position: Optional[int] = None  # 排队位置（1开始，开始执行后为None）
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """排队等待时间（秒）"""
+        if self.queued_at is None:
+            return None
+        end = self.started_at or self.completed_at or datetime.now()
+        return (end - self.queued_at).total_seconds()
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        """执行时间（秒）"""
+        if self.started_at is None:
+            return None
+        end = self.completed_at or datetime.now()
+        return (end - self.started_at).total_seconds()
 
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -57,7 +104,12 @@ class Task:
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "metadata": self.metadata,
-            "progress_messages": self.progress_messages
+            "progress_messages": self.progress_messages,
+            "priority": int(self.priority),
+            "queued_at": self.queued_at.isoformat() if self.queued_at else None,
+            "queue_position": self.queue_position,
+            "wait_seconds": self.wait_seconds,
+            "run_seconds": self.run_seconds
         }
 
 
@@ -66,7 +118,7 @@ class TaskManager:
     任务管理器 - 单例模式
 
     管理所有异步分析任务，支持：
-    1. 创建和执行任务
+    1. 创建和执行任务（优先级队列 + 工作协程池）
     2. 查询任务状态
     3. 取消任务
     4. 清理过期任务
@@ -86,9 +138,22 @@ class TaskManager:
 
         self.tasks: Dict[str, Task] = {}  # task_id -> Task
         self.running_tasks: Dict[str, asyncio.Task] = {}  # task_id -> asyncio.Task
-        self.max_concurrent_tasks = 10  # 最大并发任务数
+        self.max_concurrent_tasks = int(os.getenv("TASK_MAX_CONCURRENT", "10"))  # 最大并发任务数（工作协程数）
+        self.max_queue_size = int(os.getenv("TASK_MAX_QUEUE", "100"))  # 最大排队任务数
+        self.process_pool_workers = int(os.getenv("TASK_PROCESS_WORKERS", "2"))  # 进程池大小
         self.task_ttl = 3600  # 任务结果保留时间（秒），默认1小时
         self.ws_manager: Optional['ConnectionManager'] = None  # WebSocket管理器（延迟注入）
+
+        # 优先级队列与工作协程（绑定到首次提交任务时的事件循环）
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = itertools.count()
+        self._pending: Dict[str, Tuple[int, int]] = {}  # 排队中的任务 task_id -> (优先级, 序号)
+        self._inflight: Dict[str, str] = {}  # 排队/执行中的去重键 dedup_key -> task_id
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         self._initialized = True
 
         logger.info("[TaskManager] Initialized")
@@ -103,11 +168,26 @@ class TaskManager:
         self.ws_manager = ws_manager
         logger.info("[TaskManager] WebSocket manager injected")
 
+    def find_inflight(self, dedup_key: str) -> Optional[Task]:
+        """
+        查找排队或执行中的相同任务
+
+        Args:
+            dedup_key: 去重键
+
+        Returns:
+            Task对象，不存在时返回None
+        """
+        task_id = self._inflight.get(dedup_key)
+        return self.tasks.get(task_id) if task_id else None
+
     def create_task(
         self,
         task_type: str,
         symbol: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        priority: int = TaskPriority.NORMAL,
+        dedup_key: Optional[str] = None
     ) -> str:
         """
         创建新任务
@@ -116,16 +196,26 @@ class TaskManager:
             task_type: 任务类型
             symbol: 股票代码
             metadata: 任务元数据
+            priority: 优先级（TaskPriority，数值越小越先执行）
+            dedup_key: 去重键，调用方可先用 find_inflight 复用已有任务（入队后生效）
 
         Returns:
             task_id: 任务ID
+
+        Raises:
+            TaskQueueFull: 排队任务数已达上限
         """
+        if len(self._pending) >= self.max_queue_size:
+            raise TaskQueueFull(len(self._pending), self.max_queue_size)
+
         task_id = str(uuid.uuid4())
         task = Task(
             task_id=task_id,
             task_type=task_type,
             symbol=symbol,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            priority=priority,
+            dedup_key=dedup_key
         )
         self.tasks[task_id] = task
 
@@ -153,24 +243,18 @@ class TaskManager:
 
         task = self.tasks[task_id]
 
-        # 检查并发限制
-        if len(self.running_tasks) >= self.max_concurrent_tasks:
-            logger.warning(f"[TaskManager] Max concurrent tasks reached, queuing task {task_id}")
-            # 可以实现队列机制，这里简单等待
-            await asyncio.sleep(1)
-
         try:
             # 更新任务状态
             task.status = TaskStatus.RUNNING
             task.started_at = datetime.now()
-            logger.info(f"[TaskManager] Starting task {task_id}")
+            task.queue_position = None
+            logger.info(f"[TaskManager] Starting task {task_id} (waited {task.wait_seconds or 0:.1f}s)")
 
-            # 如果是async函数，直接await；否则在executor中运行
+            # 如果是async函数，直接await；否则在任务线程池中运行
             if asyncio.iscoroutinefunction(func):
                 result = await func(task, *args, **kwargs)
             else:
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, func, task, *args, **kwargs)
+                result = await self.run_in_thread(func, task, *args, **kwargs)
 
             # 任务完成
             task.status = TaskStatus.COMPLETED
@@ -215,6 +299,11 @@ class TaskManager:
             # 从运行列表中移除
             if task_id in self.running_tasks:
                 del self.running_tasks[task_id]
+            self._release_dedup(task)
+            logger.info(
+                f"[TaskManager] Task {task_id} finished: {task.status.value}, "
+                f"wait={task.wait_seconds or 0:.1f}s, run={task.run_seconds or 0:.1f}s"
+            )
 
     def run_task_in_background(
         self,
@@ -222,21 +311,142 @@ class TaskManager:
         func: Callable,
         *args,
         **kwargs
-    ):
+    ) -> int:
         """
-        在后台运行任务
+        将任务放入优先级队列，由工作协程按优先级、先进先出执行
 
         Args:
             task_id: 任务ID
-            func: 要执行的函数
+            func: 要执行的函数（第一个参数为Task）
             *args, **kwargs: 函数参数
+
+        Returns:
+            排队位置（1开始）
         """
-        asyncio_task = asyncio.create_task(
-            self.execute_task(task_id, func, *args, **kwargs)
+        task = self.tasks[task_id]
+        self._ensure_workers()
+
+        seq = next(self._seq)
+        task.queued_at = datetime.now()
+        self._pending[task_id] = (int(task.priority), seq)
+        if task.dedup_key:
+            self._inflight[task.dedup_key] = task_id
+        self._queue.put_nowait((int(task.priority), seq, task_id, func, args, kwargs))
+        self._publish_queue_positions()
+
+        logger.info(
+            f"[TaskManager] Task {task_id} queued (priority={int(task.priority)}, "
+            f"position={task.queue_position}/{len(self._pending)})"
         )
-        self.running_tasks[task_id] = asyncio_task
+        return task.queue_position
+
+    def _ensure_workers(self):
+        """在当前事件循环中启动工作协程（事件循环变化时重建队列，旧队列中的任务标记为失败）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._queue is not None:
+            return
+
+        self._fail_orphaned_tasks()
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            loop.create_task(self._worker(i), name=f"task-worker-{i}")
+            for i in range(max(1, self.max_concurrent_tasks))
+        ]
+        logger.info(f"[TaskManager] Started {len(self._workers)} task workers")
+
+    async def _worker(self, index: int):
+        """工作协程：按优先级取出任务执行"""
+        while True:
+            _, _, task_id, func, args, kwargs = await self._queue.get()
+            try:
+                # 排队期间已取消或已被清理的任务直接跳过
+                if self._pending.pop(task_id, None) is None or task_id not in self.tasks:
+                    continue
+                self._publish_queue_positions()
+
+                asyncio_task = asyncio.create_task(self.execute_task(task_id, func, *args, **kwargs))
+                self.running_tasks[task_id] = asyncio_task
+                # 使用 wait 而不是直接 await：任务被取消时工作协程继续运行
+                await asyncio.wait([asyncio_task])
+            except Exception as e:
+                logger.error(f"[TaskManager] Worker {index} error on task {task_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _publish_queue_positions(self):
+        """更新排队任务的位置，位置变化时推送给任务订阅者"""
+        ordered = sorted(self._pending.items(), key=lambda item: item[1])
+        for position, (task_id, _) in enumerate(ordered, 1):
+            task = self.tasks.get(task_id)
+            if task is None or task.queue_position == position:
+                continue
+            task.queue_position = position
+            if self.ws_manager:
+                asyncio.create_task(
+                    self.ws_manager.send_task_queued(task_id, position, len(ordered))
+                )
 
-        logger.info(f"[TaskManager] Task {task_id} scheduled in background")
+    def _fail_orphaned_tasks(self):
+        """旧队列丢弃时，其中排队的任务不会再被执行：标记为失败并释放去重键"""
+        for task_id in list(self._pending):
+            task = self.tasks.get(task_id)
+            if task is None or task.status != TaskStatus.PENDING:
+                continue
+            task.status = TaskStatus.FAILED
+            task.error = "Task queue was reset before the task started"
+            task.completed_at = datetime.now()
+            task.queue_position = None
+            self._release_dedup(task)
+            logger.warning(f"[TaskManager] Task {task_id} dropped with its queue")
+        self._pending.clear()
+
+    def _release_dedup(self, task: Task):
+        if task.dedup_key and self._inflight.get(task.dedup_key) == task.task_id:
+            del self._inflight[task.dedup_key]
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.max_concurrent_tasks),
+                thread_name_prefix="task-worker"
+            )
+        return self._thread_pool
+
+    async def run_in_thread(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在任务线程池中运行同步函数（线程数与并发任务数一致，不占用默认executor）
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_thread_pool(), functools.partial(func, *args, **kwargs))
+
+    async def run_in_process(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在进程池中运行同步函数（用于重计算，函数与参数需可pickle，进度回调不可用）
+        """
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=max(1, self.process_pool_workers),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"[TaskManager] Process pool started with {self.process_pool_workers} workers")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._process_pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """停止工作协程并关闭线程池/进程池"""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        self._queue = None
+        self._loop = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        logger.info("[TaskManager] Shut down")
 
     def get_task(self, task_id: str) -> Optional[Task]:
         """
@@ -285,6 +495,10 @@ class TaskManager:
         if task and task.status == TaskStatus.PENDING:
             task.status = TaskStatus.CANCELLED
             task.completed_at = datetime.now()
+            task.queue_position = None
+            self._release_dedup(task)
+            if self._pending.pop(task_id, None) is not None:
+                self._publish_queue_positions()
             logger.info(f"[TaskManager] Cancelled pending task {task_id}")
             return True
 
@@ -359,6 +573,9 @@ class TaskManager:
         Returns:
             统计信息字典
         """
+        wait_times = [t.wait_seconds for t in self.tasks.values() if t.started_at and t.wait_seconds is not None]
+        run_times = [t.run_seconds for t in self.tasks.values() if t.completed_at and t.run_seconds is not None]
+
         stats = {
             "total_tasks": len(self.tasks),
             "running_tasks": len(self.running_tasks),
@@ -366,6 +583,13 @@ class TaskManager:
             "completed_tasks": sum(1 for t in self.tasks.values() if t.status == TaskStatus.COMPLETED),
             "failed_tasks": sum(1 for t in self.tasks.values() if t.status == TaskStatus.FAILED),
             "cancelled_tasks": sum(1 for t in self.tasks.values() if t.status == TaskStatus.CANCELLED),
+            "queued_tasks": len(self._pending),
+            "max_concurrent_tasks": self.max_concurrent_tasks,
+            "max_queue_size": self.max_queue_size,
+            "avg_wait_seconds": round(sum(wait_times) / len(wait_times), 3) if wait_times else 0.0,
+            "max_wait_seconds": round(max(wait_times), 3) if wait_times else 0.0,
+            "avg_run_seconds": round(sum(run_times) / len(run_times), 3) if run_times else 0.0,
+            "process_pool_enabled": self._process_pool is not None,
         }
         return stats
 
@@ -0,0 +1,149 @@
+"""
+WebSocket Outbound Channel
+
+每个连接一个发送通道：有界待发队列 + 独立发送任务。
+广播只负责把已编码的文本放入各连接的队列，慢客户端不会阻塞其他连接。
+
+- 带合并键的消息（行情、任务进度）若仍在队列中未发出，新消息直接覆盖旧消息
+- 队列满时优先丢弃最旧的可合并消息；若全是不可丢弃的消息则判定为慢消费者
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class ClientChannel:
+    """单个WebSocket连接的发送通道"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 100,
+        on_error: Optional[Callable[[WebSocket], None]] = None
+    ):
+        """
+        Args:
+            websocket: WebSocket连接
+            max_queue: 待发队列上限
+            on_error: 发送失败时的回调（通常为断开连接）
+        """
+        self.websocket = websocket
+        self.max_queue = max(1, max_queue)
+        self.on_error = on_error
+
+        # 待发条目: [合并键, 文本, 入队时间]
+        self._pending: Deque[List[Any]] = deque()
+        self._by_key: Dict[str, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._sending = False
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.send_seconds = 0.0
+        self.max_send_seconds = 0.0
+        self.delivery_seconds = 0.0
+
+        self._task = asyncio.create_task(self._writer())
+
+    @property
+    def depth(self) -> int:
+        """当前待发消息数"""
+        return len(self._pending)
+
+    @property
+    def idle(self) -> bool:
+        """队列为空且没有正在发送的消息"""
+        return not self._pending and not self._sending
+
+    def put(self, text: str, key: Optional[str] = None) -> bool:
+        """
+        放入一条已编码的消息（不等待发送）
+
+        Args:
+            text: 已编码的消息文本
+            key: 合并键，相同键的未发消息只保留最新一条；None 表示不可合并/丢弃
+
+        Returns:
+            False 表示队列已满且无可丢弃消息（慢消费者）
+        """
+        if self.closed:
+            return False
+
+        if key is not None:
+            entry = self._by_key.get(key)
+            if entry is not None:
+                entry[1] = text
+                self.coalesced += 1
+                return True
+
+        if len(self._pending) >= self.max_queue and not self._drop_oldest_droppable():
+            return False
+
+        entry = [key, text, time.perf_counter()]
+        self._pending.append(entry)
+        if key is not None:
+            self._by_key[key] = entry
+        self._wakeup.set()
+        return True
+
+    def _drop_oldest_droppable(self) -> bool:
+        for i, entry in enumerate(self._pending):
+            if entry[0] is not None:
+                del self._pending[i]
+                del self._by_key[entry[0]]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _writer(self):
+        while True:
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            entry = self._pending.popleft()
+            if entry[0] is not None:
+                self._by_key.pop(entry[0], None)
+
+            self._sending = True
+            started = time.perf_counter()
+            try:
+                await self.websocket.send_text(entry[1])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"[WS] Send failed, closing channel: {e}")
+                self._sending = False
+                self.closed = True
+                if self.on_error is not None:
+                    self.on_error(self.websocket)
+                return
+            finished = time.perf_counter()
+            self._sending = False
+
+            elapsed = finished - started
+            self.sent += 1
+            self.send_seconds += elapsed
+            self.max_send_seconds = max(self.max_send_seconds, elapsed)
+            self.delivery_seconds += finished - entry[2]
+
+    def close(self):
+        """停止发送任务并丢弃未发消息"""
+        self.closed = True
+        self._pending.clear()
+        self._by_key.clear()
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        if self._task is not current:
+            self._task.cancel()
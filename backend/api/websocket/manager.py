@@ -2,21 +2,41 @@
 WebSocket Connection Manager
 
 管理WebSocket连接和消息推送
+
+消息只编码一次，放入各连接的有界发送队列后由各自的发送任务并发发出，
+慢客户端只影响自己的队列（过期行情被合并/丢弃，积压过多时断开）。
 """
 
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio
 import json
 import logging
+import os
 from datetime import datetime
 
+from .channel import ClientChannel
+
 logger = logging.getLogger(__name__)
 
+# 每个连接的待发队列上限
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "100"))
+
+
+def _coalesce_key(message: dict) -> Optional[str]:
+    """可合并消息的键：同一股票的行情、同一任务的进度只需保留最新一条"""
+    msg_type = message.get("type")
+    if msg_type == "market_data":
+        return f"market_data:{message.get('symbol')}"
+    if msg_type in ("task_progress", "task_queued"):
+        return f"{msg_type}:{message.get('task_id')}"
+    return None
+
 
 class ConnectionManager:
     """WebSocket连接管理器"""
 
-    def __init__(self):
+    def __init__(self, send_queue_size: int = WS_SEND_QUEUE_SIZE):
         # 所有活跃连接
         self.active_connections: Set[WebSocket] = set()
 
@@ -26,6 +46,16 @@ class ConnectionManager:
         # 任务订阅映射 {task_id: Set[WebSocket]}
         self.task_subscriptions: Dict[str, Set[WebSocket]] = {}
 
+        # 发送通道 {WebSocket: ClientChannel}
+        self.send_queue_size = send_queue_size
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+
+        # 已关闭通道的累计统计
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0, "send_seconds": 0.0, "delivery_seconds": 0.0}
+        self._closed_max_send_seconds = 0.0
+        self.slow_consumer_disconnects = 0
+        self.messages_encoded = 0
+
     async def connect(self, websocket: WebSocket):
         """
         接受新连接
@@ -35,6 +65,7 @@ class ConnectionManager:
         """
         await websocket.accept()
         self.active_connections.add(websocket)
+        self._channel(websocket)
         logger.info(f"[WS] New connection. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
@@ -52,10 +83,94 @@ class ConnectionManager:
         for task_id, subscribers in self.task_subscriptions.items():
             subscribers.discard(websocket)
 
+        # 关闭发送通道
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            channel.close()
+            for name in self._closed_totals:
+                self._closed_totals[name] += getattr(channel, name)
+            self._closed_max_send_seconds = max(self._closed_max_send_seconds, channel.max_send_seconds)
+
         # 移除连接
         self.active_connections.discard(websocket)
         logger.info(f"[WS] Connection closed. Total: {len(self.active_connections)}")
 
+    def _channel(self, websocket: WebSocket) -> ClientChannel:
+        channel = self.channels.get(websocket)
+        if channel is None:
+            channel = self.channels[websocket] = ClientChannel(
+                websocket, max_queue=self.send_queue_size, on_error=self.disconnect
+            )
+        return channel
+
+    def _encode(self, message: dict) -> str:
+        self.messages_encoded += 1
+        return json.dumps(message)
+
+    def _fan_out(self, connections: Iterable[WebSocket], message: dict) -> int:
+        """
+        编码一次后放入各连接的发送队列（不等待发送完成）
+
+        Args:
+            connections: 目标连接
+            message: 消息字典
+
+        Returns:
+            成功入队的连接数
+        """
+        connections = list(connections)
+        if not connections:
+            return 0
+
+        text = self._encode(message)
+        key = _coalesce_key(message)
+        queued = 0
+        slow = []
+        for connection in connections:
+            if self._channel(connection).put(text, key):
+                queued += 1
+            else:
+                slow.append(connection)
+
+        # 清理慢消费者（队列积压且无可丢弃消息）
+        for connection in slow:
+            self._drop_slow_consumer(connection)
+        return queued
+
+    def _drop_slow_consumer(self, websocket: WebSocket):
+        self.slow_consumer_disconnects += 1
+        logger.warning(f"[WS] Slow consumer disconnected (send queue full: {self.send_queue_size})")
+        self.disconnect(websocket)
+        try:
+            asyncio.get_running_loop().create_task(self._close_quietly(websocket))
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def flush(self, timeout: float = 5.0) -> bool:
+        """
+        等待所有发送队列清空
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            是否在超时前全部发送完成
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while any(not channel.idle and not channel.closed for channel in self.channels.values()):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.001)
+        return True
+
     async def subscribe(self, websocket: WebSocket, symbol: str):
         """
         订阅股票
@@ -158,19 +273,30 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
 
-        disconnected = []
-        for connection in self.task_subscriptions[task_id]:
-            try:
-                await connection.send_text(json.dumps(progress_message))
-            except Exception:
-                disconnected.append(connection)
-
-        # 清理断开的连接
-        for connection in disconnected:
-            self.disconnect(connection)
+        self._fan_out(self.task_subscriptions[task_id], progress_message)
 
         logger.debug(f"[WS] Sent task progress for {task_id}: {progress}% - {message}")
 
+    async def send_task_queued(self, task_id: str, position: int, queue_length: int):
+        """
+        发送任务排队位置给订阅者
+
+        Args:
+            task_id: 任务ID
+            position: 排队位置（1开始）
+            queue_length: 当前排队任务总数
+        """
+        if task_id not in self.task_subscriptions:
+            return
+
+        self._fan_out(self.task_subscriptions[task_id], {
+            "type": "task_queued",
+            "task_id": task_id,
+            "position": position,
+            "queue_length": queue_length,
+            "timestamp": datetime.now().isoformat()
+        })
+
     async def send_task_complete(self, task_id: str, result: dict = None, error: str = None):
         """
         发送任务完成消息给订阅者
@@ -191,16 +317,7 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
 
-        disconnected = []
-        for connection in self.task_subscriptions[task_id]:
-            try:
-                await connection.send_text(json.dumps(complete_message))
-            except Exception:
-                disconnected.append(connection)
-
-        # 清理断开的连接
-        for connection in disconnected:
-            self.disconnect(connection)
+        self._fan_out(self.task_subscriptions[task_id], complete_message)
 
         # 清理任务订阅（任务完成后不再需要）
         if task_id in self.task_subscriptions:
@@ -216,11 +333,15 @@ class ConnectionManager:
             message: 消息字典
             websocket: 目标连接
         """
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.error(f"[WS] Failed to send message: {e}")
-            self.disconnect(websocket)
+        if websocket not in self.active_connections:
+            # 未经 connect 注册的连接直接发送
+            try:
+                await websocket.send_text(self._encode(message))
+            except Exception as e:
+                logger.error(f"[WS] Failed to send message: {e}")
+            return
+
+        self._fan_out([websocket], message)
 
     async def broadcast(self, message: dict):
         """
@@ -229,16 +350,7 @@ class ConnectionManager:
         Args:
             message: 消息字典
         """
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                disconnected.append(connection)
-
-        # 清理断开的连接
-        for connection in disconnected:
-            self.disconnect(connection)
+        self._fan_out(self.active_connections, message)
 
     async def send_to_symbol_subscribers(self, symbol: str, message: dict):
         """
@@ -251,16 +363,16 @@ class ConnectionManager:
         if symbol not in self.subscriptions:
             return
 
-        disconnected = []
-        for connection in self.subscriptions[symbol]:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                disconnected.append(connection)
+        self._fan_out(self.subscriptions[symbol], message)
+
+    def get_subscribed_symbols(self) -> List[str]:
+        """
+        当前至少有一个订阅者的股票代码
 
-        # 清理断开的连接
-        for connection in disconnected:
-            self.disconnect(connection)
+        Returns:
+            股票代码列表
+        """
+        return [symbol for symbol, subscribers in self.subscriptions.items() if subscribers]
 
     def get_stats(self) -> dict:
         """
@@ -275,5 +387,37 @@ class ConnectionManager:
             "total_task_subscriptions": sum(len(subs) for subs in self.task_subscriptions.values()),
             "subscribed_symbols": list(self.subscriptions.keys()),
             "subscribed_tasks": list(self.task_subscriptions.keys()),
+            "send_queues": self.get_send_stats(),
             "timestamp": datetime.now().isoformat()
         }
+
+    def get_send_stats(self) -> dict:
+        """
+        发送队列统计（队列深度、发送延迟、合并/丢弃数量）
+
+        send_ms 为 send_text 本身的耗时，delivery_ms 为入队到发送完成的耗时
+
+        Returns:
+            统计信息字典
+        """
+        channels = list(self.channels.values())
+        totals = dict(self._closed_totals)
+        for channel in channels:
+            for name in totals:
+                totals[name] += getattr(channel, name)
+
+        depths = [channel.depth for channel in channels]
+        sent = totals["sent"]
+        return {
+            "queue_limit": self.send_queue_size,
+            "total_depth": sum(depths),
+            "max_depth": max(depths, default=0),
+            "messages_encoded": self.messages_encoded,
+            "sent": sent,
+            "coalesced": totals["coalesced"],
+            "dropped": totals["dropped"],
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "avg_send_ms": round(totals["send_seconds"] / sent * 1000, 3) if sent else 0.0,
+            "max_send_ms": round(max([c.max_send_seconds for c in channels] + [self._closed_max_send_seconds]) * 1000, 3),
+            "avg_delivery_ms": round(totals["delivery_seconds"] / sent * 1000, 3) if sent else 0.0,
+        }
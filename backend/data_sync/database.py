@@ -6,14 +6,35 @@
 """
 
 import sqlite3
+import threading
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence, Union
 import logging
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
+def _next_day(date_str: str) -> str:
+    """YYYYMMDD 的下一天"""
+    return (datetime.strptime(date_str, '%Y%m%d') + timedelta(days=1)).strftime('%Y%m%d')
+
+
+def _column_values(series: pd.Series) -> list:
+    """DataFrame列转为sqlite3可绑定的Python值（numpy标量转原生类型，缺失值转None）"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime('%Y%m%d')
+    elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'fiu':
+        # 浮点NaN由SQLite存为NULL，无需逐个替换
+        return series.tolist()
+    elif isinstance(series.dtype, np.dtype) and series.dtype.kind == 'b':
+        return series.astype(int).tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
 class TushareDatabase:
     """Tushare本地数据库管理器"""
 
@@ -27,17 +48,30 @@ class TushareDatabase:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.conn = None
+        # 连接跨线程共享（check_same_thread=False），所有使用 self.conn 的操作都需持有该锁
+        self._lock = threading.RLock()
         self.connect()
         self.create_tables()
 
     def connect(self):
         """连接数据库"""
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # 返回字典格式
+        with self._lock:
+            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row  # 返回字典格式
+            # WAL模式：同步写入时分析/回测进程仍可并发读取
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            # 面板查询会顺序扫描大量页，使用内存映射读取
+            self.conn.execute("PRAGMA mmap_size=268435456")
         logger.info(f"✅ 已连接到数据库: {self.db_path}")
 
     def create_tables(self):
         """创建所有必要的数据表"""
+        with self._lock:
+            self._create_tables()
+        logger.info("✅ 数据表创建完成")
+
+    def _create_tables(self):
         cursor = self.conn.cursor()
 
         # 1. 股票基本信息表
@@ -72,7 +106,9 @@ class TushareDatabase:
                 UNIQUE(ts_code, trade_date)
             )
         """)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_quotes_code ON daily_quotes(ts_code)")
+        # UNIQUE(ts_code, trade_date) 即 (ts_code, trade_date) 复合索引，按股票的区间查询直接走该索引；
+        # 单列 ts_code 索引是其前缀，冗余且拖慢写入
+        cursor.execute("DROP INDEX IF EXISTS idx_daily_quotes_code")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_quotes_date ON daily_quotes(trade_date)")
 
         # 3. 财务指标表
@@ -249,7 +285,7 @@ class TushareDatabase:
                 UNIQUE(ts_code, end_date)
             )
         """)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_financial_code ON financial_indicators(ts_code)")
+        cursor.execute("DROP INDEX IF EXISTS idx_financial_code")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_financial_date ON financial_indicators(end_date)")
 
         # 4. 实时行情表（用于缓存最新行情）
@@ -295,8 +331,28 @@ class TushareDatabase:
         """)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_trade_calendar_date ON trade_calendar(cal_date)")
 
+        # 7. 数据覆盖区间表（ts_code='*' 表示按交易日全市场同步的区间）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_coverage (
+                table_name TEXT NOT NULL,
+                ts_code TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                PRIMARY KEY(table_name, ts_code, start_date)
+            )
+        """)
+
+        # 8. 复权因子表（与 daily_quotes 同步写入，读取时用于计算前复权价格）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS adj_factor (
+                ts_code TEXT NOT NULL,
+                trade_date TEXT NOT NULL,
+                adj_factor REAL,
+                UNIQUE(ts_code, trade_date)
+            )
+        """)
+
         self.conn.commit()
-        logger.info("✅ 数据表创建完成")
 
     def insert_or_update(self, table: str, data: Dict[str, Any]):
         """插入或更新单条记录
@@ -305,36 +361,185 @@ class TushareDatabase:
             table: 表名
             data: 数据字典
         """
-        cursor = self.conn.cursor()
-
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['?' for _ in data])
         values = tuple(data.values())
 
         sql = f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})"
-        cursor.execute(sql, values)
-        self.conn.commit()
+        with self._lock, self.conn:
+            self.conn.execute(sql, values)
+
+    # 支持面板查询的表及其日期列
+    PANEL_DATE_COLUMNS = {
+        'daily_quotes': 'trade_date',
+        'financial_indicators': 'end_date',
+    }
+
+    def upsert_frame(self, table: str, frame: pd.DataFrame, chunk_size: int = 100000) -> int:
+        """批量写入DataFrame（INSERT OR REPLACE）
+
+        按列转换为Python值后用同一条预编译语句 executemany 写入，全部分块在一个事务内提交。
+        只写入表中存在的列，日期时间列转为 YYYYMMDD。
+
+        Args:
+            table: 表名
+            frame: 数据
+            chunk_size: 每次 executemany 的行数
+
+        Returns:
+            写入的记录数
+        """
+        if frame is None or frame.empty:
+            return 0
+
+        table_columns = set(self.get_table_columns(table))
+        columns = [c for c in frame.columns if c in table_columns]
+        if not columns:
+            raise ValueError(f"DataFrame中没有 {table} 表的列: {list(frame.columns)}")
+
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        with self._lock, self.conn:
+            for start in range(0, len(frame), chunk_size):
+                chunk = frame.iloc[start:start + chunk_size]
+                self.conn.executemany(sql, zip(*(_column_values(chunk[c]) for c in columns)))
+
+        logger.info(f"✅ 批量写入 {len(frame)} 条记录到 {table}")
+        return len(frame)
+
+    def load_panel(self, ts_codes: Optional[Sequence[str]] = None, start_date: str = None, end_date: str = None,
+                   fields: Union[str, Sequence[str]] = ('close',), table: str = 'daily_quotes',
+                   as_frame: bool = True, dtype=np.float64,
+                   batch_size: int = 200000) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """按列读取面板数据（日期 x 股票），不构造逐行字典
+
+        游标按批返回元组，每批直接转为 numpy 数组并按 (日期, 股票) 下标写入预分配的二维数组。
 
-    def bulk_insert(self, table: str, data_list: List[Dict[str, Any]]):
+        Args:
+            ts_codes: 股票代码列表，输出列按此顺序（无数据的股票为全NaN列）；None表示全部股票（按代码排序）
+            start_date: 开始日期（YYYYMMDD 或 YYYY-MM-DD），None表示不限
+            end_date: 结束日期，None表示不限
+            fields: 字段名或字段列表，如 'close' / ['close', 'vol']
+            table: 表名，daily_quotes 或 financial_indicators
+            as_frame: True返回透视后的DataFrame，False返回numpy数组字典
+            dtype: 数值数组类型，float32 可将内存减半
+            batch_size: 每批从游标读取的行数
+
+        Returns:
+            as_frame=True: 以日期为索引的DataFrame；单个字段时列为股票代码，多个字段时列为 (字段, 股票代码)
+            as_frame=False: {'dates': datetime64[D]数组, 'ts_codes': 代码数组, 字段: (日期数, 股票数) 数组}
+        """
+        if table not in self.PANEL_DATE_COLUMNS:
+            raise ValueError(f"不支持面板查询的表: {table}")
+        date_column = self.PANEL_DATE_COLUMNS[table]
+
+        fields = [fields] if isinstance(fields, str) else list(fields)
+        unknown = set(fields) - set(self.get_table_columns(table))
+        if not fields or unknown:
+            raise ValueError(f"{table} 表中不存在的字段: {sorted(unknown) or fields}")
+
+        start_date = str(start_date).replace('-', '') if start_date else '00000000'
+        end_date = str(end_date).replace('-', '') if end_date else '99999999'
+        select = ', '.join(f"d.{c}" for c in ['ts_code', date_column] + fields)
+
+        code_map: Dict[str, int] = {}
+        if ts_codes is not None:
+            for code in ts_codes:
+                code_map.setdefault(code, len(code_map))
+        date_map: Dict[str, int] = {}
+        code_idx, date_idx, values = [], [], [[] for _ in fields]
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None  # 元组行，避免 sqlite3.Row 开销
+            try:
+                if ts_codes is not None:
+                    # 代码写入临时表后JOIN，避免超出SQLite参数个数上限，并按 (ts_code, 日期) 索引逐股范围扫描
+                    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS panel_codes (ts_code TEXT PRIMARY KEY)")
+                    cursor.execute("DELETE FROM panel_codes")
+                    cursor.executemany("INSERT INTO panel_codes (ts_code) VALUES (?)", ((c,) for c in code_map))
+                    cursor.execute(
+                        f"SELECT {select} FROM panel_codes c JOIN {table} d "
+                        f"ON d.ts_code = c.ts_code AND d.{date_column} BETWEEN ? AND ?",
+                        (start_date, end_date)
+                    )
+                else:
+                    cursor.execute(
+                        f"SELECT {select} FROM {table} d WHERE d.{date_column} BETWEEN ? AND ?",
+                        (start_date, end_date)
+                    )
+
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    columns = list(zip(*batch))
+                    code_idx.append(np.fromiter((code_map.setdefault(c, len(code_map)) for c in columns[0]),
+                                                np.int64, len(batch)))
+                    date_idx.append(np.fromiter((date_map.setdefault(d, len(date_map)) for d in columns[1]),
+                                                np.int64, len(batch)))
+                    for k in range(len(fields)):
+                        # None（NULL）转为NaN
+                        values[k].append(np.array(columns[2 + k], dtype=dtype))
+            finally:
+                cursor.close()
+                # 结束临时表写入开启的事务，避免长期持有WAL读快照
+                self.conn.commit()
+
+        codes = np.array(list(code_map), dtype=object)
+        if ts_codes is None:
+            code_order = np.argsort(codes, kind='stable')
+            codes = codes[code_order]
+            code_rank = np.empty(len(code_order), dtype=np.int64)
+            code_rank[code_order] = np.arange(len(code_order))
+        else:
+            code_rank = np.arange(len(codes))
+
+        raw_dates = np.array(list(date_map), dtype=object)
+        date_order = np.argsort(raw_dates, kind='stable')
+        date_rank = np.empty(len(date_order), dtype=np.int64)
+        date_rank[date_order] = np.arange(len(date_order))
+        date_index = pd.to_datetime(raw_dates[date_order].astype(str), format='%Y%m%d')
+        dates = date_index.values.astype('datetime64[D]')
+
+        rows = date_rank[np.concatenate(date_idx)] if date_idx else np.empty(0, dtype=np.int64)
+        cols = code_rank[np.concatenate(code_idx)] if code_idx else np.empty(0, dtype=np.int64)
+        panel = {}
+        for field, chunks in zip(fields, values):
+            array = np.full((len(dates), len(codes)), np.nan, dtype=dtype)
+            if chunks:
+                array[rows, cols] = np.concatenate(chunks)
+            panel[field] = array
+
+        if not as_frame:
+            return {'dates': dates, 'ts_codes': codes, **panel}
+
+        index = date_index.rename(date_column)
+        if len(fields) == 1:
+            return pd.DataFrame(panel[fields[0]], index=index, columns=pd.Index(codes, name='ts_code'))
+        columns = pd.MultiIndex.from_product([fields, codes], names=['field', 'ts_code'])
+        return pd.DataFrame(np.hstack([panel[f] for f in fields]), index=index, columns=columns)
+
+    def bulk_insert(self, table: str, data_list: Union[List[Dict[str, Any]], pd.DataFrame]):
         """批量插入数据
 
         Args:
             table: 表名
-            data_list: 数据字典列表
+            data_list: 数据字典列表，或DataFrame（转给 upsert_frame 按列写入）
         """
+        if isinstance(data_list, pd.DataFrame):
+            self.upsert_frame(table, data_list)
+            return
         if not data_list:
             return
 
-        cursor = self.conn.cursor()
-
         columns = ', '.join(data_list[0].keys())
         placeholders = ', '.join(['?' for _ in data_list[0]])
 
         sql = f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})"
 
         values_list = [tuple(d.values()) for d in data_list]
-        cursor.executemany(sql, values_list)
-        self.conn.commit()
+        with self._lock, self.conn:
+            self.conn.executemany(sql, values_list)
 
         logger.info(f"✅ 批量插入 {len(data_list)} 条记录到 {table}")
 
@@ -348,9 +553,13 @@ class TushareDatabase:
         Returns:
             查询结果列表
         """
-        cursor = self.conn.cursor()
-        cursor.execute(sql, params)
-        return [dict(row) for row in cursor.fetchall()]
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
 
     def get_last_sync_date(self, table: str) -> Optional[str]:
         """获取表的最后同步日期
@@ -389,6 +598,84 @@ class TushareDatabase:
             'error_message': error
         })
 
+    def get_table_columns(self, table: str) -> List[str]:
+        """获取表的列名
+
+        Args:
+            table: 表名
+
+        Returns:
+            列名列表
+        """
+        return [r['name'] for r in self.query(f"PRAGMA table_info({table})")]
+
+    def add_coverage(self, table: str, ts_code: str, start_date: str, end_date: str):
+        """记录已同步的日期区间，与已有区间合并
+
+        Args:
+            table: 表名
+            ts_code: 股票代码，'*' 表示全市场
+            start_date: 开始日期（YYYYMMDD）
+            end_date: 结束日期（YYYYMMDD）
+        """
+        # 读取-合并-写回在同一把锁内完成，并发记录时不会丢失区间
+        with self._lock:
+            ranges = self.get_coverage(table, ts_code, include_market=False) + [(start_date, end_date)]
+            merged = []
+            for start, end in sorted(ranges):
+                if merged and start <= _next_day(merged[-1][1]):
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM data_coverage WHERE table_name = ? AND ts_code = ?", (table, ts_code)
+                )
+                self.conn.executemany(
+                    "INSERT INTO data_coverage (table_name, ts_code, start_date, end_date) VALUES (?, ?, ?, ?)",
+                    [(table, ts_code, start, end) for start, end in merged]
+                )
+
+    def get_coverage(self, table: str, ts_code: str, include_market: bool = True) -> List[tuple]:
+        """获取某股票已同步的日期区间
+
+        Args:
+            table: 表名
+            ts_code: 股票代码
+            include_market: 是否包含全市场同步的区间
+
+        Returns:
+            [(开始日期, 结束日期)] 列表（YYYYMMDD格式）
+        """
+        codes = (ts_code, '*') if include_market else (ts_code,)
+        placeholders = ', '.join('?' for _ in codes)
+        result = self.query(
+            f"SELECT start_date, end_date FROM data_coverage "
+            f"WHERE table_name = ? AND ts_code IN ({placeholders}) ORDER BY start_date",
+            (table, *codes)
+        )
+        return [(r['start_date'], r['end_date']) for r in result]
+
+    def get_daily_quotes(self, ts_code: str, start_date: str, end_date: str) -> List[Dict]:
+        """按 (ts_code, trade_date) 索引读取日线区间（未复权价格及当日复权因子）
+
+        Args:
+            ts_code: 股票代码
+            start_date: 开始日期（YYYYMMDD）
+            end_date: 结束日期（YYYYMMDD）
+
+        Returns:
+            按交易日升序的日线记录，未同步复权因子的交易日 adj_factor 为 None
+        """
+        return self.query(
+            "SELECT d.ts_code, d.trade_date, d.open, d.high, d.low, d.close, d.pre_close, d.change, "
+            "d.pct_chg, d.vol, d.amount, a.adj_factor "
+            "FROM daily_quotes d LEFT JOIN adj_factor a ON a.ts_code = d.ts_code AND a.trade_date = d.trade_date "
+            "WHERE d.ts_code = ? AND d.trade_date BETWEEN ? AND ? ORDER BY d.trade_date",
+            (ts_code, start_date, end_date)
+        )
+
     def get_stock_list(self) -> List[str]:
         """获取所有股票代码列表
 
@@ -419,9 +706,10 @@ class TushareDatabase:
 
     def close(self):
         """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
-            logger.info("✅ 数据库连接已关闭")
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                logger.info("✅ 数据库连接已关闭")
 
     def __enter__(self):
         return self
@@ -0,0 +1,87 @@
+"""
+同步调度器
+
+在后台线程中每个工作日收盘后执行一次增量同步
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_scheduler_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+_scheduler_lock = threading.Lock()
+
+
+def _next_run_time(now: datetime, hour: int, minute: int) -> datetime:
+    """下一个工作日的 hour:minute"""
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    while run_at.weekday() >= 5:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def _run_loop(db_path: Optional[str], hour: int, minute: int):
+    from .sync_engine import TushareDataSync
+
+    while not _stop_event.is_set():
+        run_at = _next_run_time(datetime.now(), hour, minute)
+        logger.info(f"⏰ 下次数据同步时间: {run_at.strftime('%Y-%m-%d %H:%M')}")
+        if _stop_event.wait((run_at - datetime.now()).total_seconds()):
+            break
+
+        try:
+            with TushareDataSync(db_path) as sync:
+                sync.sync_daily()
+        except Exception as e:
+            logger.error(f"❌ 定时数据同步失败: {e}")
+
+
+def start_scheduler(db_path: str = None, run_time: str = None) -> bool:
+    """启动每日同步调度
+
+    Args:
+        db_path: 数据库文件路径，默认读取 TUSHARE_LOCAL_DB_PATH
+        run_time: 每日执行时间（HH:MM），默认读取 DATA_SYNC_TIME，为 18:00
+
+    Returns:
+        是否新启动了调度线程（已在运行时返回 False）
+    """
+    global _scheduler_thread
+
+    run_time = run_time or os.getenv('DATA_SYNC_TIME', '18:00')
+    hour, minute = (int(part) for part in run_time.split(':'))
+
+    with _scheduler_lock:
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            logger.info("数据同步调度已在运行")
+            return False
+
+        _stop_event.clear()
+        _scheduler_thread = threading.Thread(
+            target=_run_loop, args=(db_path, hour, minute), name="tushare-data-sync", daemon=True
+        )
+        _scheduler_thread.start()
+
+    logger.info(f"✅ 数据同步调度已启动，每个工作日 {run_time} 执行增量同步")
+    return True
+
+
+def stop_scheduler(timeout: float = 5.0):
+    """停止每日同步调度"""
+    global _scheduler_thread
+
+    with _scheduler_lock:
+        thread, _scheduler_thread = _scheduler_thread, None
+
+    if thread is None:
+        return
+    _stop_event.set()
+    thread.join(timeout)
+    logger.info("✅ 数据同步调度已停止")
@@ -0,0 +1,262 @@
+"""
+同步引擎
+
+将Tushare数据增量同步到本地SQLite数据库
+- 日线行情按交易日拉取全市场（每个交易日一次API调用），断点续传
+- 单只股票的缺失区间可按需补齐（供本地数据源读穿使用）
+- 复权因子（adj_factor）与日线一起同步，供读取时计算前复权价格
+- 已同步的日期区间记录在 data_coverage 表中
+"""
+
+import logging
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pandas as pd
+
+from .database import TushareDatabase
+
+logger = logging.getLogger(__name__)
+
+# 默认数据库路径与首次全量同步的起始日期
+DEFAULT_DB_PATH = os.getenv('TUSHARE_LOCAL_DB_PATH', 'data/tushare_local.db')
+DEFAULT_START_DATE = os.getenv('DATA_SYNC_START_DATE', '20150101')
+
+
+def normalize_ts_code(symbol: str) -> str:
+    """将 000001 / sh.600000 / 600000.SH 等格式统一为Tushare的 ts_code"""
+    symbol = str(symbol).strip().upper().replace('SH.', '').replace('SZ.', '').replace('BJ.', '')
+    if '.' in symbol:
+        return symbol
+    if symbol.startswith(('6', '9')):
+        return f"{symbol}.SH"
+    if symbol.startswith(('4', '8')):
+        return f"{symbol}.BJ"
+    return f"{symbol}.SZ"
+
+
+def to_tushare_date(value) -> str:
+    """YYYY-MM-DD / YYYYMMDD / datetime 统一为 YYYYMMDD"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y%m%d')
+    return pd.Timestamp(str(value)).strftime('%Y%m%d')
+
+
+class TushareDataSync:
+    """Tushare本地同步引擎"""
+
+    def __init__(self, db_path: str = None, api=None, min_interval: float = None):
+        """初始化同步引擎
+
+        Args:
+            db_path: 数据库文件路径，默认读取 TUSHARE_LOCAL_DB_PATH
+            api: Tushare pro_api 对象，默认使用全局 TushareProvider 的连接
+            min_interval: 两次API调用的最小间隔（秒），默认读取 DATA_SYNC_MIN_INTERVAL
+        """
+        self.db = TushareDatabase(db_path or DEFAULT_DB_PATH)
+        self._api = api
+        self.min_interval = float(os.getenv('DATA_SYNC_MIN_INTERVAL', '0.15')) \
+            if min_interval is None else min_interval
+        self._last_call = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def api(self):
+        """Tushare pro_api，未配置 TUSHARE_TOKEN 时为 None"""
+        if self._api is None:
+            from tradingagents.dataflows.tushare_utils import get_tushare_provider
+            provider = get_tushare_provider()
+            self._api = provider.api if provider.connected else None
+        return self._api
+
+    def _call(self, method: str, **kwargs) -> pd.DataFrame:
+        """限频调用Tushare接口"""
+        if self.api is None:
+            raise RuntimeError("Tushare API不可用，请设置TUSHARE_TOKEN")
+
+        with self._lock:
+            wait = self.min_interval - (time.monotonic() - self._last_call)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+
+        data = getattr(self.api, method)(**kwargs)
+        return data if data is not None else pd.DataFrame()
+
+    def _write(self, table: str, frame: pd.DataFrame) -> int:
+        return self.db.upsert_frame(table, frame)
+
+    # ==================== 基础数据 ====================
+
+    def sync_stock_basic(self) -> int:
+        """同步股票列表"""
+        data = self._call('stock_basic', exchange='', list_status='L',
+                          fields='ts_code,symbol,name,area,industry,market,list_date')
+        if not data.empty:
+            data = data.assign(updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        count = self._write('stock_basic', data)
+        self.db.update_sync_status('stock_basic', datetime.now().strftime('%Y%m%d'), count)
+        return count
+
+    def sync_trade_calendar(self, start_date: str = None, end_date: str = None) -> int:
+        """同步交易日历（上交所）"""
+        start_date = to_tushare_date(start_date or DEFAULT_START_DATE)
+        end_date = to_tushare_date(end_date or f"{datetime.now().year}1231")
+        data = self._call('trade_cal', exchange='SSE', start_date=start_date, end_date=end_date,
+                          fields='exchange,cal_date,is_open,pretrade_date')
+        count = self._write('trade_calendar', data)
+        self.db.update_sync_status('trade_calendar', end_date, count)
+        return count
+
+    def get_open_dates(self, start_date: str, end_date: str) -> List[str]:
+        """本地交易日历中 [start_date, end_date] 的交易日，日历缺失时先同步"""
+        start_date, end_date = to_tushare_date(start_date), to_tushare_date(end_date)
+        sql = ("SELECT cal_date FROM trade_calendar WHERE exchange = 'SSE' AND is_open = 1 "
+               "AND cal_date BETWEEN ? AND ? ORDER BY cal_date")
+        last_calendar_date = self.db.get_last_sync_date('trade_calendar')
+        if not last_calendar_date or last_calendar_date < end_date:
+            self.sync_trade_calendar(min(start_date, DEFAULT_START_DATE), max(end_date, f"{datetime.now().year}1231"))
+        return [r['cal_date'] for r in self.db.query(sql, (start_date, end_date))]
+
+    # ==================== 日线行情 ====================
+
+    def sync_daily_quotes(self, start_date: str = None, end_date: str = None) -> int:
+        """按交易日增量同步全市场日线
+
+        从上次同步日期的下一天开始，每个交易日各调用一次日线和复权因子接口；每个交易日写入后立即
+        更新同步状态，中断后重新运行会从断点继续。
+
+        Args:
+            start_date: 开始日期，默认为上次同步日期的下一天（从未同步时为 DATA_SYNC_START_DATE）
+            end_date: 结束日期，默认为今天
+
+        Returns:
+            写入的记录数
+        """
+        last_sync = self.db.get_last_sync_date('daily_quotes')
+        if start_date is None:
+            start_date = (datetime.strptime(last_sync, '%Y%m%d') + timedelta(days=1)).strftime('%Y%m%d') \
+                if last_sync else DEFAULT_START_DATE
+        start_date = to_tushare_date(start_date)
+        end_date = to_tushare_date(end_date or datetime.now())
+        if start_date > end_date:
+            logger.info("✅ 日线行情已是最新")
+            return 0
+
+        open_dates = self.get_open_dates(start_date, end_date)
+        logger.info(f"📥 同步日线行情: {start_date} ~ {end_date}, 共 {len(open_dates)} 个交易日")
+
+        total = 0
+        synced_until = None
+        for trade_date in open_dates:
+            try:
+                count = self._write('daily_quotes', self._call('daily', trade_date=trade_date))
+                self._write('adj_factor', self._call('adj_factor', trade_date=trade_date))
+            except Exception as e:
+                logger.error(f"❌ 同步 {trade_date} 日线失败: {e}")
+                self.db.update_sync_status('daily_quotes', last_sync, total, 'failed', str(e))
+                break
+            if count == 0 and trade_date >= datetime.now().strftime('%Y%m%d'):
+                # 当日收盘数据尚未发布，下次再同步
+                break
+            total += count
+            synced_until = last_sync = trade_date
+            self.db.update_sync_status('daily_quotes', trade_date, total)
+
+        if synced_until:
+            self.db.add_coverage('daily_quotes', '*', start_date, synced_until)
+        logger.info(f"✅ 日线行情同步完成: {total} 条记录")
+        return total
+
+    def sync_daily_range(self, ts_code: str, start_date: str, end_date: str) -> int:
+        """同步单只股票指定区间的日线及复权因子（本地数据源补齐缺口用）
+
+        Args:
+            ts_code: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            写入的记录数
+        """
+        ts_code = normalize_ts_code(ts_code)
+        start_date, end_date = to_tushare_date(start_date), to_tushare_date(end_date)
+        data = self._call('daily', ts_code=ts_code, start_date=start_date, end_date=end_date)
+        count = self._write('daily_quotes', data)
+        self._write('adj_factor', self._call('adj_factor', ts_code=ts_code,
+                                             start_date=start_date, end_date=end_date))
+
+        # 当天数据尚未发布时不记为已覆盖；日线接口收盘后才返回当天数据，已返回的交易日均为最终数据
+        last_final_day = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+        if not data.empty and 'trade_date' in data.columns:
+            last_final_day = max(last_final_day, str(data['trade_date'].max()))
+        covered_end = min(end_date, last_final_day)
+        if start_date <= covered_end:
+            self.db.add_coverage('daily_quotes', ts_code, start_date, covered_end)
+        return count
+
+    # ==================== 财务指标 ====================
+
+    def sync_financial_indicators(self, ts_codes: List[str] = None, start_date: str = None) -> int:
+        """同步财务指标
+
+        Args:
+            ts_codes: 股票代码列表，默认为 stock_basic 中的全部股票
+            start_date: 报告期起始日期，默认为 DATA_SYNC_START_DATE
+
+        Returns:
+            写入的记录数
+        """
+        ts_codes = [normalize_ts_code(c) for c in (ts_codes or self.db.get_stock_list())]
+        start_date = to_tushare_date(start_date or DEFAULT_START_DATE)
+
+        total = 0
+        for ts_code in ts_codes:
+            try:
+                data = self._call('fina_indicator', ts_code=ts_code, start_date=start_date)
+            except Exception as e:
+                logger.error(f"❌ 同步 {ts_code} 财务指标失败: {e}")
+                continue
+            if not data.empty:
+                # 同一报告期可能有多次披露，保留最新一条
+                data = data.sort_values('ann_date').drop_duplicates('end_date', keep='last')
+            total += self._write('financial_indicators', data)
+
+        self.db.update_sync_status('financial_indicators', datetime.now().strftime('%Y%m%d'), total)
+        return total
+
+    # ==================== 组合任务 ====================
+
+    def sync_all(self, start_date: str = None) -> Dict[str, int]:
+        """首次全量同步：股票列表、交易日历、日线行情、财务指标"""
+        logger.info("🚀 开始全量同步")
+        results = {
+            'stock_basic': self.sync_stock_basic(),
+            'trade_calendar': self.sync_trade_calendar(start_date),
+            'daily_quotes': self.sync_daily_quotes(start_date),
+            'financial_indicators': self.sync_financial_indicators(start_date=start_date),
+        }
+        logger.info(f"✅ 全量同步完成: {results}")
+        return results
+
+    def sync_daily(self) -> Dict[str, int]:
+        """每日增量同步：刷新股票列表并补齐上次同步以来的日线"""
+        results = {
+            'stock_basic': self.sync_stock_basic(),
+            'daily_quotes': self.sync_daily_quotes(),
+        }
+        logger.info(f"✅ 每日增量同步完成: {results}")
+        return results
+
+    def close(self):
+        """关闭数据库连接"""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -10,6 +10,7 @@ HiddenGem Memory System
 
 from .episodic_memory import (
     EpisodicMemoryBank,
+    EpisodeHandle,
     TradingEpisode,
     MarketState,
     AgentAnalysis,
@@ -32,4 +33,5 @@ __all__ = [
     'AgentAnalysis',
     'DecisionChain',
     'TradeOutcome',
+    'EpisodeHandle',
 ]
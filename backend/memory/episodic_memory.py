@@ -11,18 +11,30 @@ Episodic Memory Bank - 细粒度案例库
 用于深度学习、模式识别、可复现分析。
 """
 
-import chromadb
 import os
-import json
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Union
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
+
+try:
+    import chromadb
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    chromadb = None
+    CHROMADB_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 # 导入统一日志系统
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.agents.utils.vector_store import get_local_collection, get_vector_backend
 logger = get_logger("memory.episodic")
 
 
@@ -130,6 +142,72 @@ class TradingEpisode(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class EpisodeHandle:
+    """检索结果的轻量句柄
+
+    只持有检索时返回的metadata和未解析的JSON文档，访问 episode 或
+    其他 TradingEpisode 字段（如 outcome、market_state）时才解析完整对象。
+    """
+
+    __slots__ = (
+        'episode_id', 'date', 'symbol', 'market_regime', 'action',
+        'success', 'similarity_score', '_metadata', '_document', '_episode'
+    )
+
+    def __init__(
+        self,
+        episode_id: str,
+        document: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        similarity_score: Optional[float] = None
+    ):
+        metadata = metadata or {}
+        self.episode_id = episode_id
+        self.date = metadata.get('date')
+        self.symbol = metadata.get('symbol')
+        self.market_regime = metadata.get('market_regime')
+        self.action = metadata.get('action')
+        self.success = {'True': True, 'False': False}.get(metadata.get('success'))
+        self.similarity_score = similarity_score
+        self._metadata = metadata
+        self._document = document
+        self._episode: Optional[TradingEpisode] = None
+
+    @property
+    def hydrated(self) -> bool:
+        """是否已解析完整episode"""
+        return self._episode is not None
+
+    @property
+    def episode(self) -> TradingEpisode:
+        """完整的TradingEpisode（首次访问时解析）"""
+        if self._episode is None:
+            episode = TradingEpisode.model_validate_json(self._document)
+            if self.similarity_score is not None:
+                if episode.metadata is None:
+                    episode.metadata = {}
+                episode.metadata['similarity_score'] = self.similarity_score
+            self._episode = episode
+        return self._episode
+
+    @property
+    def percentage_return(self) -> Optional[float]:
+        """收益率（优先使用metadata，旧数据没有该字段时解析完整episode）"""
+        if 'percentage_return' in self._metadata:
+            return self._metadata['percentage_return']
+        outcome = self.episode.outcome
+        return outcome.percentage_return if outcome else None
+
+    def __getattr__(self, name: str):
+        # 其余字段委托给完整episode
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.episode, name)
+
+    def __repr__(self) -> str:
+        return f"EpisodeHandle({self.episode_id!r}, similarity={self.similarity_score})"
+
+
 # ==================== Episodic Memory Bank ====================
 
 class EpisodicMemoryBank:
@@ -144,13 +222,15 @@ class EpisodicMemoryBank:
     def __init__(
         self,
         persist_directory: str = None,
-        embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
+        embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2",
+        vector_backend: Optional[str] = None
     ):
         """初始化Episode记忆库
 
         Args:
             persist_directory: 持久化目录，默认 ./memory_db/episodes
             embedding_model: Sentence-BERT模型名称
+            vector_backend: 向量存储后端 chromadb / local，默认读取 MEMORY_VECTOR_BACKEND
         """
         if persist_directory is None:
             persist_directory = os.getenv(
@@ -159,19 +239,33 @@ class EpisodicMemoryBank:
             )
 
         self.persist_directory = persist_directory
+        self.vector_backend = vector_backend or get_vector_backend()
 
         try:
-            self.client = chromadb.PersistentClient(path=persist_directory)
-            self.collection = self.client.get_or_create_collection(
-                name="trading_episodes",
-                metadata={"description": "Complete trading episodes with full context"}
-            )
-            logger.info(f" [EpisodicMemory] 初始化完成: {persist_directory}")
+            if self.vector_backend == 'local':
+                self.client = None
+                self.collection = get_local_collection("trading_episodes", persist_directory)
+            else:
+                if not CHROMADB_AVAILABLE:
+                    raise ImportError("chromadb未安装，可设置 MEMORY_VECTOR_BACKEND=local 使用嵌入式向量存储")
+                self.client = chromadb.PersistentClient(path=persist_directory)
+                self.collection = self.client.get_or_create_collection(
+                    name="trading_episodes",
+                    metadata={"description": "Complete trading episodes with full context"}
+                )
+            logger.info(f" [EpisodicMemory] 初始化完成: {persist_directory} ({self.vector_backend})")
         except Exception as e:
             logger.error(f" [EpisodicMemory] 初始化失败: {e}")
             raise
 
+        # 批量编码/写入的批大小
+        self.batch_size = int(os.getenv('EPISODE_BATCH_SIZE', '64'))
+
         # 初始化embedding模型
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning(" [EpisodicMemory] sentence_transformers未安装，Embedding模型不可用")
+            self.encoder = None
+            return
         try:
             self.encoder = SentenceTransformer(embedding_model)
             logger.info(f" [EpisodicMemory] Embedding模型加载完成: {embedding_model}")
@@ -179,29 +273,26 @@ class EpisodicMemoryBank:
             logger.warning(f" [EpisodicMemory] Embedding模型加载失败: {e}")
             self.encoder = None
 
-    def add_episode(self, episode: TradingEpisode) -> None:
-        """添加一个完整的episode
-
-        Args:
-            episode: TradingEpisode对象
+    @staticmethod
+    def _embedding_text(episode: TradingEpisode) -> str:
+        """生成用于embedding的文本
 
-        Note:
-            为了避免future leakage，embedding只基于当前时刻的信息：
-            - 市场状态
-            - Agent分析
-            - 决策理由
-            outcome（未来结果）会被存储但不参与embedding
+        为了避免future leakage，embedding只基于当前时刻的信息：
+        - 市场状态
+        - Agent分析
+        - 决策理由
+        outcome（未来结果）会被存储但不参与embedding
         """
-        try:
-            # ========== 关键改进：只使用当前时刻的信息生成embedding ==========
-            # 不包含outcome，避免future leakage
-            if episode.key_lesson:
-                # 如果提供了key_lesson，确保它不包含未来信息
-                # key_lesson应该只描述"当时的决策逻辑"，不包含"事后结果"
-                text_for_embedding = episode.key_lesson
-            else:
-                # 组合关键信息 - 只使用当前可知的信息
-                text_for_embedding = f"""
+        # ========== 关键改进：只使用当前时刻的信息生成embedding ==========
+        # 不包含outcome，避免future leakage
+        if episode.key_lesson:
+            # 如果提供了key_lesson，确保它不包含未来信息
+            # key_lesson应该只描述"当时的决策逻辑"，不包含"事后结果"
+            return episode.key_lesson
+
+        # 组合关键信息 - 只使用当前可知的信息
+        # 注意：不包含outcome，不包含absolute_return等未来信息
+        return f"""
                 日期: {episode.date}
                 股票: {episode.symbol}
                 市场状态: {episode.market_state.market_regime or '未知'}
@@ -210,40 +301,89 @@ class EpisodicMemoryBank:
                 决策: {episode.decision_chain.final_decision}
                 决策信心: {episode.decision_chain.final_confidence}
                 """
-                # 注意：不包含outcome，不包含absolute_return等未来信息
 
-            if self.encoder:
-                embedding = self.encoder.encode(text_for_embedding).tolist()
-            else:
-                logger.warning(" Encoder未初始化，使用空向量")
-                embedding = [0.0] * 384  # MiniLM的维度
-
-            # 序列化为JSON（完整episode，包含outcome，但outcome不参与embedding）
-            episode_json = episode.model_dump_json()
-
-            # 准备metadata（用于快速过滤）
-            # outcome信息可以在metadata中，方便事后分析，但不影响相似度计算
-            metadata = {
-                'date': episode.date,
-                'symbol': episode.symbol,
-                'market_regime': episode.market_state.market_regime or 'unknown',
-                'action': episode.outcome.action if episode.outcome else 'unknown',
-                'mode': episode.mode,
-                'success': str(episode.success) if episode.success is not None else 'unknown',
-                # 标记：outcome仅供事后分析，不参与检索匹配
-                '_outcome_for_analysis_only': 'true'
-            }
+    @staticmethod
+    def _episode_metadata(episode: TradingEpisode) -> Dict[str, Any]:
+        """生成metadata（用于快速过滤和检索结果的轻量句柄）
 
-            # 存入ChromaDB
-            self.collection.add(
-                ids=[episode.episode_id],
-                embeddings=[embedding],
-                documents=[episode_json],
-                metadatas=[metadata]
-            )
+        outcome信息可以在metadata中，方便事后分析，但不影响相似度计算
+        """
+        metadata = {
+            'date': episode.date,
+            'symbol': episode.symbol,
+            'market_regime': episode.market_state.market_regime or 'unknown',
+            'action': episode.outcome.action if episode.outcome else 'unknown',
+            'mode': episode.mode,
+            'success': str(episode.success) if episode.success is not None else 'unknown',
+            # 标记：outcome仅供事后分析，不参与检索匹配
+            '_outcome_for_analysis_only': 'true'
+        }
+        if episode.outcome and episode.outcome.percentage_return is not None:
+            metadata['percentage_return'] = float(episode.outcome.percentage_return)
+        return metadata
+
+    def _encode(self, texts: Sequence[str]) -> List[List[float]]:
+        """批量编码文本"""
+        if not self.encoder:
+            logger.warning(" Encoder未初始化，使用空向量")
+            return [[0.0] * 384 for _ in texts]  # MiniLM的维度
+        embeddings = self.encoder.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [list(map(float, embedding)) for embedding in embeddings]
 
-            logger.info(f" [EpisodicMemory] Episode已存储: {episode.episode_id} "
-                       f"({episode.symbol} @ {episode.date}) - outcome已隔离")
+    def add_episode(self, episode: TradingEpisode) -> None:
+        """添加一个完整的episode
+
+        Args:
+            episode: TradingEpisode对象
+
+        Note:
+            为了避免future leakage，embedding只基于当前时刻的信息，
+            outcome（未来结果）会被存储但不参与embedding
+        """
+        self.add_episodes([episode])
+
+    def add_episodes(self, episodes: Sequence[TradingEpisode]) -> int:
+        """批量添加episodes：按批编码，按批写入向量存储
+
+        Args:
+            episodes: TradingEpisode列表（同一ID出现多次时保留最后一个）
+
+        Returns:
+            写入的episode数量
+        """
+        try:
+            unique = list({episode.episode_id: episode for episode in episodes}.values())
+            if not unique:
+                return 0
+
+            max_batch = self.batch_size
+            get_max_batch_size = getattr(self.client, 'get_max_batch_size', None)
+            if get_max_batch_size is not None:
+                max_batch = min(max_batch * 16, get_max_batch_size())
+
+            for start in range(0, len(unique), max_batch):
+                batch = unique[start:start + max_batch]
+                embeddings = self._encode([self._embedding_text(episode) for episode in batch])
+
+                # 存入向量存储（完整episode序列化为JSON，包含outcome，但outcome不参与embedding）
+                self.collection.add(
+                    ids=[episode.episode_id for episode in batch],
+                    embeddings=embeddings,
+                    documents=[episode.model_dump_json() for episode in batch],
+                    metadatas=[self._episode_metadata(episode) for episode in batch]
+                )
+
+            if len(unique) == 1:
+                episode = unique[0]
+                logger.info(f" [EpisodicMemory] Episode已存储: {episode.episode_id} "
+                           f"({episode.symbol} @ {episode.date}) - outcome已隔离")
+            else:
+                logger.info(f" [EpisodicMemory] 批量存储{len(unique)}个Episode - outcome已隔离")
+            return len(unique)
 
         except Exception as e:
             logger.error(f" [EpisodicMemory] 存储Episode失败: {e}")
@@ -253,8 +393,9 @@ class EpisodicMemoryBank:
         self,
         query_context: Dict[str, Any],
         top_k: int = 5,
-        filter_criteria: Optional[Dict[str, Any]] = None
-    ) -> List[TradingEpisode]:
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        hydrate: bool = False
+    ) -> List[Union[EpisodeHandle, TradingEpisode]]:
         """检索相似的历史episodes
 
         Args:
@@ -267,58 +408,89 @@ class EpisodicMemoryBank:
                 }
             top_k: 返回最相似的k个episodes
             filter_criteria: 过滤条件，例如 {'symbol': '600519.SH'}
+            hydrate: True时返回完整TradingEpisode，否则返回按需解析的EpisodeHandle
 
         Returns:
-            List[TradingEpisode]: 相似的episodes列表
+            相似的episodes列表
         """
-        try:
-            # 构建查询文本
-            query_text = self._build_query_text(query_context)
+        return self.retrieve_similar_batch([query_context], top_k, filter_criteria, hydrate)[0]
+
+    def retrieve_similar_batch(
+        self,
+        query_contexts: Sequence[Dict[str, Any]],
+        top_k: int = 5,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        hydrate: bool = False
+    ) -> List[List[Union[EpisodeHandle, TradingEpisode]]]:
+        """批量检索：所有查询一次编码、一次查询
 
+        Args:
+            query_contexts: 查询上下文列表（格式同 retrieve_similar）
+            top_k: 每个查询返回最相似的k个episodes
+            filter_criteria: 过滤条件
+            hydrate: True时返回完整TradingEpisode
+
+        Returns:
+            与 query_contexts 顺序一致的结果列表
+        """
+        empty = [[] for _ in query_contexts]
+        if not query_contexts:
+            return empty
+
+        try:
             if not self.encoder:
                 logger.warning(" Encoder未初始化，返回空列表")
-                return []
+                return empty
+
+            n_results = min(top_k, self.collection.count())
+            if n_results <= 0:
+                logger.info(" [EpisodicMemory] 没有找到相似的episode")
+                return empty
 
             # 生成query embedding
-            query_embedding = self.encoder.encode(query_text).tolist()
+            query_embeddings = self._encode([self._build_query_text(c) for c in query_contexts])
 
             # 检索
             results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=min(top_k, self.collection.count()),
-                where=filter_criteria  # 可选的元数据过滤
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=filter_criteria,  # 可选的元数据过滤
+                include=['documents', 'metadatas', 'distances']
             )
 
-            # 解析结果
-            episodes = []
-            if results and results['documents'] and len(results['documents'][0]) > 0:
-                for i, doc_json in enumerate(results['documents'][0]):
-                    try:
-                        episode_dict = json.loads(doc_json)
-                        episode = TradingEpisode(**episode_dict)
-
-                        # 添加相似度分数
-                        if results['distances'] and len(results['distances'][0]) > i:
-                            distance = results['distances'][0][i]
-                            similarity = 1.0 - distance
-                            if episode.metadata is None:
-                                episode.metadata = {}
-                            episode.metadata['similarity_score'] = similarity
-
-                        episodes.append(episode)
-                    except Exception as parse_error:
-                        logger.warning(f" 解析Episode失败: {parse_error}")
-                        continue
-
-                logger.info(f" [EpisodicMemory] 检索完成: 找到{len(episodes)}个相似episode")
-            else:
-                logger.info(" [EpisodicMemory] 没有找到相似的episode")
-
-            return episodes
+            # 解析结果（只构建轻量句柄，完整episode按需解析）
+            batches = []
+            for q in range(len(query_contexts)):
+                ids = results['ids'][q] if results.get('ids') else []
+                documents = results['documents'][q] if results.get('documents') else []
+                metadatas = results['metadatas'][q] if results.get('metadatas') else []
+                distances = results['distances'][q] if results.get('distances') else []
+
+                handles = []
+                for i, document in enumerate(documents):
+                    similarity = 1.0 - distances[i] if i < len(distances) else None
+                    handles.append(EpisodeHandle(
+                        ids[i], document, metadatas[i] if i < len(metadatas) else None, similarity
+                    ))
+
+                if hydrate:
+                    episodes = []
+                    for handle in handles:
+                        try:
+                            episodes.append(handle.episode)
+                        except Exception as parse_error:
+                            logger.warning(f" 解析Episode失败: {parse_error}")
+                    batches.append(episodes)
+                else:
+                    batches.append(handles)
+
+            found = sum(len(batch) for batch in batches)
+            logger.info(f" [EpisodicMemory] 检索完成: {len(query_contexts)}个查询，找到{found}个相似episode")
+            return batches
 
         except Exception as e:
             logger.error(f" [EpisodicMemory] 检索失败: {e}")
-            return []
+            return empty
 
     def get_episode_by_id(self, episode_id: str) -> Optional[TradingEpisode]:
         """根据ID获取特定episode
@@ -333,9 +505,7 @@ class EpisodicMemoryBank:
             results = self.collection.get(ids=[episode_id])
 
             if results and results['documents'] and len(results['documents']) > 0:
-                doc_json = results['documents'][0]
-                episode_dict = json.loads(doc_json)
-                episode = TradingEpisode(**episode_dict)
+                episode = TradingEpisode.model_validate_json(results['documents'][0])
                 logger.info(f" [EpisodicMemory] 获取Episode: {episode_id}")
                 return episode
             else:
@@ -356,7 +526,8 @@ class EpisodicMemoryBank:
 
             stats = {
                 'total_episodes': total_count,
-                'persist_directory': self.persist_directory
+                'persist_directory': self.persist_directory,
+                'vector_backend': self.vector_backend
             }
 
             if all_data and all_data['metadatas']:
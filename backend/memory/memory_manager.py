@@ -12,7 +12,7 @@
 """
 
 import os
-from typing import Dict, Any, List, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal, Union
 from datetime import datetime
 from enum import Enum
 
@@ -20,6 +20,7 @@ from enum import Enum
 from tradingagents.agents.utils.memory import FinancialSituationMemory
 from .episodic_memory import (
     EpisodicMemoryBank,
+    EpisodeHandle,
     TradingEpisode,
     MarketState,
     AgentAnalysis,
@@ -144,8 +145,9 @@ class MemoryManager:
         self,
         query_context: Dict[str, Any],
         top_k: int = 5,
-        filter_criteria: Optional[Dict[str, Any]] = None
-    ) -> List[TradingEpisode]:
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        hydrate: bool = False
+    ) -> List[Union[EpisodeHandle, TradingEpisode]]:
         """检索相似的历史交易案例
 
         Args:
@@ -158,6 +160,8 @@ class MemoryManager:
                 }
             top_k: 返回数量
             filter_criteria: 过滤条件，例如 {'symbol': '600519.SH'}
+            hydrate: True时返回完整TradingEpisode（跳过无法解析的文档），
+                否则返回按需解析的EpisodeHandle
 
         Returns:
             相似的交易案例列表
@@ -166,7 +170,8 @@ class MemoryManager:
             episodes = self.episode_memory.retrieve_similar(
                 query_context=query_context,
                 top_k=top_k,
-                filter_criteria=filter_criteria
+                filter_criteria=filter_criteria,
+                hydrate=hydrate
             )
 
             logger.info(f" [MemoryManager] 检索案例: 找到{len(episodes)}个相似episode")
@@ -176,6 +181,39 @@ class MemoryManager:
             logger.error(f" [MemoryManager] 检索案例失败: {e}")
             return []
 
+    def retrieve_episodes_batch(
+        self,
+        query_contexts: List[Dict[str, Any]],
+        top_k: int = 5,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        hydrate: bool = False
+    ) -> List[List[Union[EpisodeHandle, TradingEpisode]]]:
+        """批量检索相似案例（一次编码、一次查询）
+
+        Args:
+            query_contexts: 查询上下文列表
+            top_k: 每个查询的返回数量
+            filter_criteria: 过滤条件
+            hydrate: 同 retrieve_episodes
+
+        Returns:
+            与 query_contexts 顺序一致的案例列表
+        """
+        try:
+            batches = self.episode_memory.retrieve_similar_batch(
+                query_contexts,
+                top_k=top_k,
+                filter_criteria=filter_criteria,
+                hydrate=hydrate
+            )
+
+            logger.info(f" [MemoryManager] 批量检索案例: {len(query_contexts)}个查询")
+            return batches
+
+        except Exception as e:
+            logger.error(f" [MemoryManager] 批量检索案例失败: {e}")
+            return [[] for _ in query_contexts]
+
     def retrieve_hybrid(
         self,
         agent_name: str,
@@ -266,6 +304,27 @@ class MemoryManager:
             logger.error(f" [MemoryManager] 添加案例失败: {e}")
             return False
 
+    def add_episodes(self, episodes: List[TradingEpisode]) -> int:
+        """批量添加交易案例（仅训练模式）
+
+        Args:
+            episodes: 交易案例列表
+
+        Returns:
+            写入的案例数量（失败或无写入权限时为0）
+        """
+        if not self._check_write_permission("add_episodes"):
+            return 0
+
+        try:
+            added = self.episode_memory.add_episodes(episodes)
+            logger.info(f" [MemoryManager] 批量添加案例: {added}个")
+            return added
+
+        except Exception as e:
+            logger.error(f" [MemoryManager] 批量添加案例失败: {e}")
+            return 0
+
     def batch_add_maxims(
         self,
         agent_name: str,
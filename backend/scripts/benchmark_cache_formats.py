@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache Format Benchmark
+
+对比 CSV / Feather / Parquet 三种DataFrame缓存格式的加载延迟与磁盘占用。
+默认模拟沪深300成分股10年日线数据（300只 x 约2430个交易日）。
+
+Usage:
+    python scripts/benchmark_cache_formats.py
+    python scripts/benchmark_cache_formats.py --symbols 300 --years 10
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows.cache_manager import StockDataCache
+from tradingagents.dataflows.frame_storage import PYARROW_AVAILABLE
+
+
+def make_ohlcv(days: int, seed: int) -> pd.DataFrame:
+    """生成一只股票的模拟日线数据"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2015-01-05", periods=days, name="date")
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.005, days)),
+        "high": close * (1 + np.abs(rng.normal(0, 0.01, days))),
+        "low": close * (1 - np.abs(rng.normal(0, 0.01, days))),
+        "close": close,
+        "volume": rng.integers(100_000, 10_000_000, days),
+        "amount": close * rng.integers(100_000, 10_000_000, days),
+    }, index=index)
+
+
+def run(format_name: str, frames: dict) -> dict:
+    cache_dir = Path(tempfile.mkdtemp(prefix=f"cache_bench_{format_name}_"))
+    try:
+        cache = StockDataCache(cache_dir=str(cache_dir), frame_format=format_name)
+        keys = [cache.save_stock_data(symbol, df, "2015-01-01", "2024-12-31", "benchmark")
+                for symbol, df in frames.items()]
+
+        start = time.perf_counter()
+        for key in keys:
+            cache.load_stock_data(key)
+        elapsed = time.perf_counter() - start
+
+        size = sum(p.stat().st_size for p in cache.china_stock_dir.iterdir())
+        return {
+            "format": format_name,
+            "load_total_s": elapsed,
+            "load_per_symbol_ms": elapsed / len(keys) * 1000,
+            "disk_mb": size / (1024 * 1024),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataFrame缓存格式基准测试")
+    parser.add_argument("--symbols", type=int, default=300, help="股票数量")
+    parser.add_argument("--years", type=int, default=10, help="年数")
+    args = parser.parse_args()
+
+    days = args.years * 243
+    frames = {f"{600000 + i:06d}": make_ohlcv(days, i) for i in range(args.symbols)}
+
+    formats = ["csv"] + (["feather", "parquet"] if PYARROW_AVAILABLE else [])
+    if not PYARROW_AVAILABLE:
+        print("pyarrow未安装，仅测试CSV")
+
+    print(f"{args.symbols} 只股票 x {days} 个交易日")
+    print(f"{'format':<10}{'load total(s)':>15}{'per symbol(ms)':>16}{'disk(MB)':>12}")
+    for format_name in formats:
+        r = run(format_name, frames)
+        print(f"{r['format']:<10}{r['load_total_s']:>15.3f}{r['load_per_symbol_ms']:>16.2f}{r['disk_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
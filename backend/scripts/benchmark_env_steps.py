@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Trading Environment Step Benchmark
+
+测量 SimpleTradingEnv / EnhancedTradingEnv 的 steps/sec。
+观察特征在构造时预计算，每步开销应与 episode 长度无关。
+
+Usage:
+    python scripts/benchmark_env_steps.py
+    python scripts/benchmark_env_steps.py --days 2430 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from trading.enhanced_trading_env import EnhancedTradingEnv
+from trading.simple_trading_env import SimpleTradingEnv
+
+
+def make_ohlcv(days: int, seed: int = 0) -> pd.DataFrame:
+    """生成模拟日线数据"""
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.005, days)),
+        "high": close * (1 + np.abs(rng.normal(0, 0.01, days))),
+        "low": close * (1 - np.abs(rng.normal(0, 0.01, days))),
+        "close": close,
+        "volume": rng.integers(1_000_000, 10_000_000, days),
+    })
+
+
+def run_episode(env, n_actions: int) -> tuple:
+    """运行一个随机动作 episode，返回 (构造+reset耗时, 步数, step耗时)"""
+    rng = np.random.default_rng(0)
+    env.reset()
+    steps = 0
+    start = time.perf_counter()
+    done = False
+    while not done:
+        _, _, done, _, _ = env.step(int(rng.integers(0, n_actions)))
+        steps += 1
+    return steps, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trading env steps/sec benchmark")
+    parser.add_argument("--days", type=int, nargs="+", default=[500, 2430, 5000])
+    args = parser.parse_args()
+
+    print(f"{'env':<22}{'days':>8}{'init(ms)':>12}{'steps/sec':>14}")
+    for days in args.days:
+        df = make_ohlcv(days)
+        for name, env_cls, n_actions in (
+            ("SimpleTradingEnv", SimpleTradingEnv, 3),
+            ("EnhancedTradingEnv", EnhancedTradingEnv, 5),
+        ):
+            start = time.perf_counter()
+            env = env_cls(df)
+            init_ms = (time.perf_counter() - start) * 1000
+            steps, elapsed = run_episode(env, n_actions)
+            print(f"{name:<22}{days:>8}{init_ms:>12.1f}{steps / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
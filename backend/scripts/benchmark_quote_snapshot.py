@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Realtime Quote Lookup Benchmark
+
+对比 get_batch_quotes 原实现（每只股票对全市场行情表做一次布尔扫描 + 逐行转换）
+与按代码索引的 QuoteSnapshot（每次刷新构建一次，查询 O(1)）。
+
+Usage:
+    python scripts/benchmark_quote_snapshot.py
+    python scripts/benchmark_quote_snapshot.py --batch 300 5000 --market 5500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.services.quote_snapshot import QuoteSnapshot
+
+
+def make_market_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """生成 MiniShare rt_k_ms 格式的全市场行情"""
+    rng = np.random.default_rng(seed)
+    pre_close = rng.uniform(5, 100, n)
+    close = pre_close * (1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame({
+        "symbol": [f"{i:06d}" for i in range(n)],
+        "name": [f"股票{i}" for i in range(n)],
+        "pre_close": pre_close,
+        "open": pre_close,
+        "high": np.maximum(close, pre_close) * 1.01,
+        "low": np.minimum(close, pre_close) * 0.99,
+        "close": close,
+        "change": close - pre_close,
+        "pct_chg": (close / pre_close - 1) * 100,
+        "vol": rng.integers(1_000, 1_000_000, n).astype(float),
+        "amount": rng.uniform(1e6, 1e9, n),
+    })
+
+
+def legacy_batch(df: pd.DataFrame, symbols) -> dict:
+    """原 get_batch_quotes 的查找与转换"""
+    results = {}
+    for symbol in symbols:
+        stock_data = df[df['symbol'] == symbol.split('.')[0]]
+        if not stock_data.empty:
+            row = stock_data.iloc[0]
+            results[symbol] = {
+                "symbol": symbol,
+                "name": row['name'],
+                "price": float(row['close']),
+                "change": float(row['pct_chg']),
+                "change_amount": float(row['change']),
+                "volume": int(row['vol']),
+                "turnover": int(row['amount']),
+                "amplitude": float(row['high'] - row['low']) / float(row['pre_close']) * 100 if row['pre_close'] > 0 else 0,
+                "high": float(row['high']),
+                "low": float(row['low']),
+                "open": float(row['open']),
+                "prev_close": float(row['pre_close']),
+                "volume_ratio": float(row.get('volume_ratio', 0)),
+                "turnover_rate": float(row.get('turnover_rate', 0)),
+                "pe_ratio": float(row.get('pe_ttm', 0)),
+                "pb_ratio": float(row.get('pb', 0)),
+            }
+    return results
+
+
+def timed(func, repeat: int) -> float:
+    """返回最佳单次耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Realtime quote lookup benchmark")
+    parser.add_argument("--batch", type=int, nargs="+", default=[300, 5000])
+    parser.add_argument("--market", type=int, default=5500, help="全市场股票数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_market_frame(args.market)
+    build_ms = timed(lambda: QuoteSnapshot.from_minishare(df), args.repeat)
+    snapshot = QuoteSnapshot.from_minishare(df)
+    print(f"market rows: {len(df)}, snapshot build (once per refresh): {build_ms:.1f} ms")
+
+    print(f"{'batch':>8}{'legacy(ms)':>14}{'snapshot(ms)':>15}{'speedup':>10}")
+    rng = np.random.default_rng(1)
+    for batch in args.batch:
+        symbols = [f"{i:06d}.SZ" for i in rng.choice(args.market, size=min(batch, args.market), replace=False)]
+        legacy_ms = timed(lambda: legacy_batch(df, symbols), 1 if batch > 1000 else args.repeat)
+        snapshot_ms = timed(lambda: snapshot.get_many(symbols), args.repeat)
+        print(f"{batch:>8}{legacy_ms:>14.1f}{snapshot_ms:>15.2f}{legacy_ms / snapshot_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tushare Local Panel Benchmark
+
+对比本地Tushare镜像的两种读写路径：
+- 写入：逐行字典 bulk_insert vs 按列 upsert_frame（单事务 + 预编译语句）
+- 读取：query() 逐行字典再透视 vs load_panel() 直接按列生成 numpy 数组 / 透视DataFrame
+
+默认分别模拟沪深300（300只）与全A股（5000只）10年日线。
+逐行字典路径在股票数较多时内存占用很大，超过 --legacy-max-symbols 时跳过。
+
+Usage:
+    python scripts/benchmark_tushare_panel.py
+    python scripts/benchmark_tushare_panel.py --symbols 300 --years 10 --fields close vol
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from data_sync.database import TushareDatabase
+
+
+def make_daily_quotes(codes, dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    """生成一批股票的模拟日线（daily_quotes 表结构）"""
+    rng = np.random.default_rng(seed)
+    n_days, n_codes = len(dates), len(codes)
+    pct = rng.normal(0, 0.02, (n_days, n_codes))
+    close = 10 * np.exp(np.cumsum(pct, axis=0))
+    pre_close = np.vstack([close[:1], close[:-1]])
+    return pd.DataFrame({
+        "ts_code": np.tile(np.asarray(codes), n_days),
+        "trade_date": np.repeat(dates.strftime("%Y%m%d").values, n_codes),
+        "open": (pre_close * (1 + rng.normal(0, 0.005, (n_days, n_codes)))).ravel(),
+        "high": (close * (1 + np.abs(rng.normal(0, 0.01, (n_days, n_codes))))).ravel(),
+        "low": (close * (1 - np.abs(rng.normal(0, 0.01, (n_days, n_codes))))).ravel(),
+        "close": close.ravel(),
+        "pre_close": pre_close.ravel(),
+        "change": (close - pre_close).ravel(),
+        "pct_chg": (pct * 100).ravel(),
+        "vol": rng.integers(1_000, 1_000_000, n_days * n_codes).astype(float),
+        "amount": (close * 1e5).ravel(),
+    })
+
+
+def timed(func, *args, trace_memory: bool = False, **kwargs):
+    """返回 (结果, 耗时秒, 峰值内存MB)；tracemalloc 会拖慢Python循环，计时与内存分两次测量"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        del result
+        tracemalloc.start()
+        result = func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def legacy_panel(db: TushareDatabase, codes, start: str, end: str, fields) -> pd.DataFrame:
+    """原有路径：query() 返回逐行字典，再由pandas透视"""
+    placeholders = ", ".join("?" for _ in codes)
+    rows = db.query(
+        f"SELECT ts_code, trade_date, {', '.join(fields)} FROM daily_quotes "
+        f"WHERE ts_code IN ({placeholders}) AND trade_date BETWEEN ? AND ?",
+        (*codes, start, end),
+    )
+    return pd.DataFrame(rows).pivot(index="trade_date", columns="ts_code", values=list(fields))
+
+
+def run(n_symbols: int, years: int, fields, legacy_max: int, trace_memory: bool,
+        chunk_symbols: int = 500) -> list:
+    dates = pd.bdate_range("2015-01-05", periods=years * 243)
+    codes = [f"{600000 + i:06d}.SH" for i in range(n_symbols)]
+    start, end = dates[0].strftime("%Y%m%d"), dates[-1].strftime("%Y%m%d")
+    run_legacy = n_symbols <= legacy_max
+    results = []
+
+    work_dir = Path(tempfile.mkdtemp(prefix="tushare_panel_bench_"))
+    try:
+        db = TushareDatabase(str(work_dir / "panel.db"))
+        legacy_db = TushareDatabase(str(work_dir / "legacy.db")) if run_legacy else None
+
+        write_s, legacy_write_s = 0.0, 0.0
+        for i in range(0, n_symbols, chunk_symbols):
+            frame = make_daily_quotes(codes[i:i + chunk_symbols], dates, seed=i)
+            write_s += timed(db.upsert_frame, "daily_quotes", frame)[1]
+            if legacy_db is not None:
+                records = frame.to_dict("records")
+                legacy_write_s += timed(legacy_db.bulk_insert, "daily_quotes", records)[1]
+        n_rows = n_symbols * len(dates)
+        results.append(("write", "upsert_frame", write_s, None, n_rows))
+        if legacy_db is not None:
+            results.append(("write", "bulk_insert(dicts)", legacy_write_s, None, n_rows))
+            legacy_db.close()
+
+        _, elapsed, peak = timed(db.load_panel, codes, start, end, fields, as_frame=False,
+                                 trace_memory=trace_memory)
+        results.append(("read", "load_panel(numpy)", elapsed, peak, n_rows))
+        _, elapsed, peak = timed(db.load_panel, codes, start, end, fields, as_frame=True,
+                                 trace_memory=trace_memory)
+        results.append(("read", "load_panel(DataFrame)", elapsed, peak, n_rows))
+        _, elapsed, peak = timed(db.load_panel, codes, start, end, fields, as_frame=False, dtype=np.float32,
+                                 trace_memory=trace_memory)
+        results.append(("read", "load_panel(float32)", elapsed, peak, n_rows))
+        if run_legacy:
+            _, elapsed, peak = timed(legacy_panel, db, codes, start, end, fields, trace_memory=trace_memory)
+            results.append(("read", "query+pivot(dicts)", elapsed, peak, n_rows))
+        db.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tushare本地镜像面板读写基准测试")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[300, 5000], help="股票数量，可多个")
+    parser.add_argument("--years", type=int, default=10, help="年数")
+    parser.add_argument("--fields", nargs="+", default=["close"], help="读取的字段")
+    parser.add_argument("--legacy-max-symbols", type=int, default=500,
+                        help="超过该股票数时跳过逐行字典路径")
+    parser.add_argument("--memory", action="store_true", help="额外测量读取路径的峰值内存（tracemalloc）")
+    args = parser.parse_args()
+
+    for n_symbols in args.symbols:
+        print(f"\n{n_symbols} 只股票 x {args.years * 243} 个交易日, 字段: {args.fields}")
+        print(f"{'op':<7}{'path':<24}{'time(s)':>10}{'rows/s':>14}{'peak(MB)':>12}")
+        for op, path, elapsed, peak, n_rows in run(n_symbols, args.years, args.fields,
+                                                       args.legacy_max_symbols, args.memory):
+            peak_text = f"{peak:>12.1f}" if peak is not None else f"{'-':>12}"
+            print(f"{op:<7}{path:<24}{elapsed:>10.3f}{n_rows / elapsed:>14,.0f}{peak_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,23 @@ Key Features:
 3. LLM multi-agent decision system using TradingAgentsGraph
 4. Memory Bank integration for trading experience
 5. Trading summaries after each decision
+6. Parallel day/symbol-sharded training with date-ordered Memory Bank commits
 
 Usage:
     python scripts/enhanced_time_travel_training.py --symbol 000001.SZ --start 2025-07-01 --end 2025-11-10
+    python scripts/enhanced_time_travel_training.py --symbols 000001.SZ 600519.SH --start 2025-01-01 --end 2025-11-10 --workers 8
 """
 
 import os
 import sys
+import hashlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 import argparse
 import json
 import logging
@@ -54,6 +61,7 @@ from tradingagents.dataflows.tushare_utils import get_china_stock_data_tushare
 
 # Import TaskMonitor for checkpoint support
 from tradingagents.utils.task_monitor import get_task_monitor
+from tradingagents.utils.rate_limiter import TokenBucketRateLimiter
 
 # Setup logging
 logging.basicConfig(
@@ -64,6 +72,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DayResult:
+    """Analysis result of one (symbol, date) shard, not yet committed to Memory Bank"""
+    date: datetime
+    symbol: str
+    episode: 'TradingEpisode'
+    maxim_agent: str
+    situation: str
+    export_record: Optional[Dict[str, Any]] = None
+
+
 class EnhancedTimeTravelTrainer:
     """Enhanced Time Travel Trainer with strict no-future-function and Memory Bank"""
 
@@ -73,7 +92,9 @@ class EnhancedTimeTravelTrainer:
         start_date: str,
         end_date: str,
         holding_days: int = 5,
-        config: Dict[str, Any] = None
+        config: Dict[str, Any] = None,
+        trading_graph: Optional[TradingAgentsGraph] = None,
+        memory_manager: Optional['MemoryManager'] = None
     ):
         """
         Initialize Enhanced Trainer
@@ -84,6 +105,8 @@ class EnhancedTimeTravelTrainer:
             end_date: Training end date (YYYY-MM-DD)
             holding_days: Holding period (days)
             config: TradingAgents configuration
+            trading_graph: Shared TradingAgentsGraph (created if None)
+            memory_manager: Shared MemoryManager (created if None and memory is available)
         """
         self.symbol = symbol
         self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
@@ -92,12 +115,14 @@ class EnhancedTimeTravelTrainer:
         self.config = config or DEFAULT_CONFIG.copy()
 
         # Initialize TradingAgentsGraph
-        logger.info("Initializing TradingAgents system...")
-        self.trading_graph = TradingAgentsGraph(config=self.config)
+        if trading_graph is None:
+            logger.info("Initializing TradingAgents system...")
+            trading_graph = TradingAgentsGraph(config=self.config)
+        self.trading_graph = trading_graph
 
         # Initialize Memory Bank (if available)
-        self.memory_manager = None
-        if MEMORY_AVAILABLE:
+        self.memory_manager = memory_manager
+        if self.memory_manager is None and MEMORY_AVAILABLE:
             logger.info("Initializing Memory Bank (TRAINING mode: read/write)...")
             self.memory_manager = MemoryManager(
                 mode=MemoryMode.TRAINING,  # Allow writes
@@ -680,8 +705,33 @@ class EnhancedTimeTravelTrainer:
 
     def train_one_day(self, current_date: datetime) -> bool:
         """Train single trading day"""
+        result = self.analyze_day(current_date)
+        if result is None:
+            return False
+
+        self.commit_day_result(result)
+        return True
+
+    def analyze_day(
+        self,
+        current_date: datetime,
+        trading_graph: Optional[TradingAgentsGraph] = None
+    ) -> Optional[DayResult]:
+        """
+        Analyze a single trading day without writing Memory Bank, statistics or export data
+
+        Args:
+            current_date: Simulated "current" date
+            trading_graph: Graph to run (defaults to self.trading_graph; parallel
+                workers pass their own instance since propagate keeps per-run state)
+
+        Returns:
+            DayResult to be passed to commit_day_result(), or None if the day is skipped
+        """
+        trading_graph = trading_graph or self.trading_graph
+
         logger.info(f"\n{'='*60}")
-        logger.info(f"Time Travel to: {current_date.strftime('%Y-%m-%d')}")
+        logger.info(f"Time Travel to: {current_date.strftime('%Y-%m-%d')} ({self.symbol})")
         logger.info(f"{'='*60}")
 
         try:
@@ -706,7 +756,7 @@ class EnhancedTimeTravelTrainer:
             logger.info(f"[NO-FUTURE-FUNCTION] Agents will ONLY see data up to {current_date.strftime('%Y-%m-%d')}")
 
             # CRITICAL: Pass metadata to LLM to inform about no-future-function constraint
-            final_state, processed_signal = self.trading_graph.propagate(
+            final_state, processed_signal = trading_graph.propagate(
                 self.symbol,
                 current_date.strftime("%Y-%m-%d")
             )
@@ -754,11 +804,11 @@ class EnhancedTimeTravelTrainer:
                     else:
                         # Not enough future data, skip this day
                         logger.info("   No trade occurred, and insufficient future data, skipping")
-                        return False
+                        return None
                 else:
                     # Memory not available, skip
                     logger.info("   No trade occurred, skipping")
-                    return False
+                    return None
 
             # 4. Abstract lesson from outcome
             logger.info("Abstracting lesson...")
@@ -769,7 +819,7 @@ class EnhancedTimeTravelTrainer:
 
             if not market_state or not decision_chain:
                 logger.warning("Failed to extract lesson components")
-                return False
+                return None
 
             lesson, key_lesson, success = self.abstract_lesson(
                 outcome, market_state, decision_chain
@@ -777,81 +827,94 @@ class EnhancedTimeTravelTrainer:
 
             logger.info(f"   {lesson[:100]}...")
 
-            # 5. Store Episode to Memory Bank
-            if self.memory_manager:
-                logger.info("Storing Episode to Memory Bank...")
+            episode = TradingEpisode(
+                episode_id=f"{current_date.strftime('%Y-%m-%d')}_{self.symbol}",
+                date=current_date.strftime("%Y-%m-%d"),
+                symbol=self.symbol,
+                market_state=market_state,
+                agent_analyses=agent_analyses,
+                decision_chain=decision_chain,
+                outcome=outcome,
+                lesson=lesson,
+                key_lesson=key_lesson,
+                success=success,
+                created_at=datetime.now().isoformat(),
+                mode='training'
+            )
 
-                episode = TradingEpisode(
-                    episode_id=f"{current_date.strftime('%Y-%m-%d')}_{self.symbol}",
-                    date=current_date.strftime("%Y-%m-%d"),
-                    symbol=self.symbol,
+            # Store to appropriate agent memory based on decision type
+            if 'bull' in decision_chain.final_decision.lower() or outcome.action == 'buy':
+                maxim_agent = 'bull'
+            elif 'bear' in decision_chain.final_decision.lower() or outcome.action == 'sell':
+                maxim_agent = 'bear'
+            else:
+                maxim_agent = 'trader'
+
+            return DayResult(
+                date=current_date,
+                symbol=self.symbol,
+                episode=episode,
+                maxim_agent=maxim_agent,
+                situation=f"{self.symbol} @ {current_date.strftime('%Y-%m-%d')}",
+                export_record=self._build_export_record(
+                    current_date=current_date,
                     market_state=market_state,
                     agent_analyses=agent_analyses,
                     decision_chain=decision_chain,
                     outcome=outcome,
-                    lesson=lesson,
-                    key_lesson=key_lesson,
-                    success=success,
-                    created_at=datetime.now().isoformat(),
-                    mode='training'
+                    success=success
                 )
+            )
 
-                self.memory_manager.add_episode(episode)
-
-                # 6. Abstract to maxim (coarse-grained memory)
-                logger.info("Abstracting to maxim...")
+        except Exception as e:
+            logger.error(f"Training failed: {e}", exc_info=True)
+            return None
 
-                situation = f"{self.symbol} @ {current_date.strftime('%Y-%m-%d')}"
-                recommendation = key_lesson
+    def commit_day_result(self, result: DayResult, write_memory: bool = True):
+        """
+        Commit an analyzed day: Memory Bank, statistics and JSONL export buffer
 
-                # Store to appropriate agent memory based on decision type
-                if 'bull' in decision_chain.final_decision.lower() or outcome.action == 'buy':
-                    self.memory_manager.add_maxim('bull', situation, recommendation)
-                elif 'bear' in decision_chain.final_decision.lower() or outcome.action == 'sell':
-                    self.memory_manager.add_maxim('bear', situation, recommendation)
-                else:
-                    self.memory_manager.add_maxim('trader', situation, recommendation)
+        Args:
+            result: Output of analyze_day()
+            write_memory: False when the caller has already written the episode and
+                maxim in a batch (ParallelTimeTravelTrainer)
+        """
+        episode = result.episode
 
-            # 7. Update statistics
-            self.total_episodes += 1
-            self.total_return += outcome.percentage_return
+        # 5. Store Episode to Memory Bank
+        if self.memory_manager and write_memory:
+            logger.info(f"Storing Episode to Memory Bank: {episode.episode_id}")
+            self.memory_manager.add_episode(episode)
 
-            if success:
-                self.successful_episodes += 1
-                logger.info("Episode stored successfully (profitable)")
-            else:
-                self.failed_episodes += 1
-                logger.info("Episode stored successfully (loss)")
+            # 6. Abstract to maxim (coarse-grained memory)
+            self.memory_manager.add_maxim(result.maxim_agent, result.situation, episode.key_lesson)
 
-            # 🆕 8. Store episode for JSONL export (small model training)
-            self._store_episode_for_export(
-                current_date=current_date,
-                final_state=final_state,
-                market_state=market_state,
-                agent_analyses=agent_analyses,
-                decision_chain=decision_chain,
-                outcome=outcome,
-                success=success
-            )
+        # 7. Update statistics
+        self.total_episodes += 1
+        self.total_return += episode.outcome.percentage_return
 
-            return True
+        if episode.success:
+            self.successful_episodes += 1
+            logger.info("Episode stored successfully (profitable)")
+        else:
+            self.failed_episodes += 1
+            logger.info("Episode stored successfully (loss)")
 
-        except Exception as e:
-            logger.error(f"Training failed: {e}", exc_info=True)
-            return False
+        # 🆕 8. Store episode for JSONL export (small model training)
+        if result.export_record is not None:
+            self.episodes_for_export.append(result.export_record)
 
-    def _store_episode_for_export(
+    def _build_export_record(
         self,
         current_date: datetime,
-        final_state: Dict[str, Any],
         market_state: 'MarketState',
         agent_analyses: Dict[str, 'AgentAnalysis'],
         decision_chain: 'DecisionChain',
         outcome: 'TradeOutcome',
         success: bool
-    ):
+    ) -> Optional[Dict[str, Any]]:
         """
-        存储episode用于JSONL导出（小模型训练）
+        构建JSONL导出记录（小模型训练）
 
         格式化为instruction-following格式，适用于SFT/LoRA训练：
         {
@@ -941,12 +1004,12 @@ class EnhancedTimeTravelTrainer:
                 "metadata": metadata
             }
 
-            self.episodes_for_export.append(episode_data)
-
-            logger.debug(f"✓ Episode stored for export: {current_date.strftime('%Y-%m-%d')}")
+            logger.debug(f"✓ Episode prepared for export: {current_date.strftime('%Y-%m-%d')}")
+            return episode_data
 
         except Exception as e:
             logger.error(f"Failed to store episode for export: {e}", exc_info=True)
+            return None
 
     def export_jsonl(self):
         """
@@ -1171,17 +1234,394 @@ class EnhancedTimeTravelTrainer:
         logger.info(f"Training results saved: {output_file}")
 
 
+@dataclass
+class TrainingShard:
+    """One (symbol, date) unit of parallel training"""
+    shard_id: str
+    symbol: str
+    date: datetime
+    available_from: datetime  # First trading day on which this shard's outcome is known
+
+
+class ParallelTimeTravelTrainer:
+    """
+    Parallel Time Travel Trainer sharded by (symbol, date)
+
+    Trading dates are grouped into waves of `wave_days` consecutive dates. All shards of
+    a wave run concurrently on a bounded worker pool (each worker borrows its own
+    TradingAgentsGraph since propagate keeps per-run state), while the Memory Bank is
+    only read. Between waves the buffered results whose outcome is already known
+    (available_from <= first date of the next wave) are committed in (date, symbol)
+    order. Every shard therefore sees the same memory for a given wave size regardless
+    of thread scheduling, and never an episode whose outcome lies in its own future.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        holding_days: int = 5,
+        config: Dict[str, Any] = None,
+        max_workers: int = 4,
+        wave_days: Optional[int] = None,
+        propagate_rate: Optional[float] = None,
+        graph_factory: Optional[Callable[[], TradingAgentsGraph]] = None,
+        memory_manager: Optional['MemoryManager'] = None
+    ):
+        """
+        Initialize Parallel Trainer
+
+        Args:
+            symbols: Stock codes (e.g., ['000001.SZ', '600519.SH'])
+            start_date: Training start date (YYYY-MM-DD)
+            end_date: Training end date (YYYY-MM-DD)
+            holding_days: Holding period (days)
+            config: TradingAgents configuration
+            max_workers: Maximum concurrent propagate() calls
+            wave_days: Trading dates per wave (default: enough to keep all workers busy)
+            propagate_rate: Maximum propagate() starts per second (None = unlimited)
+            graph_factory: Creates a TradingAgentsGraph for a worker
+            memory_manager: Shared MemoryManager (created if None and memory is available)
+        """
+        self.symbols = list(dict.fromkeys(symbols))
+        if not self.symbols:
+            raise ValueError("At least one symbol is required")
+
+        self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        self.end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        self.holding_days = holding_days
+        self.config = config or DEFAULT_CONFIG.copy()
+        self.max_workers = max(1, max_workers)
+        self.wave_days = wave_days or max(1, -(-self.max_workers // len(self.symbols)))
+
+        # Bounded graph pool: at most max_workers graphs are ever created
+        self.graph_factory = graph_factory or (lambda: TradingAgentsGraph(config=self.config))
+        self._graph_pool: queue.SimpleQueue = queue.SimpleQueue()
+        self._graph_lock = threading.Lock()
+        self._graphs_created = 0
+        # One state log for all pooled graphs: each propagate() rewrites the per-ticker log file
+        self._state_log: Dict[str, Dict[str, Any]] = {}
+        self._state_log_lock = threading.Lock()
+
+        # Analyzed shards left out of the checkpoint after a failed Memory Bank write
+        self.unwritten_shards: List[str] = []
+
+        # Throttle propagate() starts on top of the provider-level LLM rate limiters
+        self.rate_limiter = None
+        if propagate_rate:
+            self.rate_limiter = TokenBucketRateLimiter(
+                rate=propagate_rate,
+                burst=max(1, int(propagate_rate)),
+                name="time_travel"
+            )
+
+        self.memory_manager = memory_manager
+        if self.memory_manager is None and MEMORY_AVAILABLE:
+            logger.info("Initializing shared Memory Bank (TRAINING mode: read/write)...")
+            self.memory_manager = MemoryManager(
+                mode=MemoryMode.TRAINING,
+                config=self.config
+            )
+
+        # Per-symbol trainers hold data cache, statistics and export buffer
+        shared_graph = self._acquire_graph()
+        self._release_graph(shared_graph)
+        self.trainers: Dict[str, EnhancedTimeTravelTrainer] = {
+            symbol: EnhancedTimeTravelTrainer(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                holding_days=holding_days,
+                config=self.config,
+                trading_graph=shared_graph,
+                memory_manager=self.memory_manager
+            )
+            for symbol in self.symbols
+        }
+
+        # TaskMonitor: wave size is part of the task ID since it defines memory visibility
+        self.task_monitor = get_task_monitor()
+        symbol_key = '_'.join(symbol.replace('.', '_') for symbol in self.symbols)
+        if len(self.symbols) > 3:
+            digest = hashlib.md5(symbol_key.encode('utf-8')).hexdigest()[:8]
+            symbol_key = f"{len(self.symbols)}symbols_{digest}"
+        self.task_id = f"timetravel_parallel_{symbol_key}_{start_date}_{end_date}_w{self.wave_days}"
+
+        logger.info("Parallel Time Travel Trainer initialized")
+        logger.info(f"   Symbols: {', '.join(self.symbols)}")
+        logger.info(f"   Time range: {start_date} to {end_date}")
+        logger.info(f"   Workers: {self.max_workers}, wave size: {self.wave_days} days")
+        logger.info(f"   Propagate rate limit: {propagate_rate or 'unlimited'} /s")
+        logger.info(f"   Task ID: {self.task_id}")
+
+    def _acquire_graph(self) -> TradingAgentsGraph:
+        """Borrow a graph from the pool, creating one if all are in use"""
+        try:
+            return self._graph_pool.get_nowait()
+        except queue.Empty:
+            with self._graph_lock:
+                self._graphs_created += 1
+                graph_no = self._graphs_created
+            logger.info(f"Creating TradingAgentsGraph #{graph_no}...")
+            graph = self.graph_factory()
+            share_state_log = getattr(graph, 'share_state_log', None)
+            if share_state_log is not None:
+                share_state_log(self._state_log, self._state_log_lock)
+            return graph
+
+    def _release_graph(self, graph: TradingAgentsGraph):
+        self._graph_pool.put(graph)
+
+    def build_shards(self) -> List[TrainingShard]:
+        """Build (symbol, date) shards sorted by (date, symbol)"""
+        shards = []
+        for symbol, trainer in self.trainers.items():
+            trading_days = trainer.get_trading_days()
+
+            # Same buffer as the sequential run(): last N days need future data for evaluation
+            training_days = trading_days[:-(self.holding_days + 5)]
+            for i, day in enumerate(training_days):
+                shards.append(TrainingShard(
+                    shard_id=f"{symbol}@{day.strftime('%Y-%m-%d')}",
+                    symbol=symbol,
+                    date=day,
+                    available_from=trading_days[i + self.holding_days]
+                ))
+
+        shards.sort(key=lambda shard: (shard.date, shard.symbol))
+        return shards
+
+    def _analyze_shard(self, shard: TrainingShard) -> Optional[DayResult]:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        graph = self._acquire_graph()
+        try:
+            return self.trainers[shard.symbol].analyze_day(shard.date, trading_graph=graph)
+        finally:
+            self._release_graph(graph)
+
+    def _commit_ready(
+        self,
+        pending: List[tuple],
+        before: Optional[datetime]
+    ) -> List[tuple]:
+        """
+        Commit buffered shards whose outcome is known on `before` (all if None)
+
+        Returns:
+            Shards still waiting for their outcome to become known
+        """
+        ready = [item for item in pending if before is None or item[0].available_from <= before]
+        if not ready:
+            return pending
+
+        ready.sort(key=lambda item: (item[0].date, item[0].symbol))
+        results = [result for _, result in ready if result is not None]
+        remaining = [item for item in pending if before is not None and item[0].available_from > before]
+
+        if self.unwritten_shards or not self._write_memory(results):
+            # Once a write fails nothing later is committed either: the checkpoint stays a
+            # date-ordered prefix, so resumed shards never see episodes from their future
+            self.unwritten_shards.extend(shard.shard_id for shard, _ in ready)
+            return remaining
+
+        for result in results:
+            self.trainers[result.symbol].commit_day_result(result, write_memory=False)
+
+        self.task_monitor.mark_shards_completed(
+            task_id=self.task_id,
+            shard_ids=[shard.shard_id for shard, _ in ready],
+            current_step=f"Committed up to {ready[-1][0].date.strftime('%Y-%m-%d')}",
+            metadata_update={'symbol_statistics': self._symbol_statistics()}
+        )
+
+        logger.info(f"Committed {len(results)} episodes ({len(ready)} shards) in date order")
+        return remaining
+
+    def _write_memory(self, results: List[DayResult]) -> bool:
+        """Batch-write episodes and maxims; False if the Memory Bank did not store every episode"""
+        if not self.memory_manager or not results:
+            return True
+
+        # Batched writes keep (date, symbol) order within each store
+        added = self.memory_manager.add_episodes([result.episode for result in results])
+        if added < len(results):
+            logger.error(
+                f"Memory Bank stored {added}/{len(results)} episodes from "
+                f"{results[0].date.strftime('%Y-%m-%d')}, stopping for resume"
+            )
+            return False
+
+        maxims: Dict[str, List[tuple]] = {}
+        for result in results:
+            maxims.setdefault(result.maxim_agent, []).append(
+                (result.situation, result.episode.key_lesson)
+            )
+        for agent_name, situations in maxims.items():
+            self.memory_manager.batch_add_maxims(agent_name, situations)
+        return True
+
+    def _symbol_statistics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            symbol: {
+                'total_episodes': trainer.total_episodes,
+                'successful_episodes': trainer.successful_episodes,
+                'failed_episodes': trainer.failed_episodes,
+                'total_return': trainer.total_return,
+            }
+            for symbol, trainer in self.trainers.items()
+        }
+
+    def _restore_or_start_task(self, total_shards: int) -> set:
+        """Resume from checkpoint or start a new task; returns completed shard IDs"""
+        checkpoint = self.task_monitor.get_checkpoint(self.task_id)
+
+        if checkpoint and checkpoint.status != "COMPLETED":
+            completed = self.task_monitor.get_completed_shards(self.task_id)
+            logger.info(f"🔄 Resuming from checkpoint: {len(completed)}/{total_shards} shards completed")
+            logger.info(f"   Last step: {checkpoint.current_step}\n")
+
+            symbol_statistics = checkpoint.metadata.get('symbol_statistics', {})
+            for symbol, trainer in self.trainers.items():
+                stats = symbol_statistics.get(symbol, {})
+                trainer.total_episodes = stats.get('total_episodes', 0)
+                trainer.successful_episodes = stats.get('successful_episodes', 0)
+                trainer.failed_episodes = stats.get('failed_episodes', 0)
+                trainer.total_return = stats.get('total_return', 0.0)
+            return completed
+
+        self.task_monitor.start_task(
+            task_id=self.task_id,
+            task_type="TIME_TRAVEL_TRAINING",
+            total_steps=total_shards,
+            metadata={
+                'symbols': self.symbols,
+                'start_date': self.start_date.strftime("%Y-%m-%d"),
+                'end_date': self.end_date.strftime("%Y-%m-%d"),
+                'holding_days': self.holding_days,
+                'max_workers': self.max_workers,
+                'wave_days': self.wave_days
+            }
+        )
+        logger.info("✓ New parallel training task created\n")
+        return set()
+
+    def run(self):
+        """Execute parallel Time Travel training with per-shard checkpoint support"""
+        logger.info(f"\n{'='*60}")
+        logger.info("Starting Parallel Time Travel Training")
+        logger.info(f"{'='*60}\n")
+
+        shards = self.build_shards()
+        if not shards:
+            logger.error("No trading days found, training terminated")
+            return
+
+        completed = self._restore_or_start_task(len(shards))
+        self.unwritten_shards = []
+
+        shards_by_date: Dict[datetime, List[TrainingShard]] = {}
+        for shard in shards:
+            shards_by_date.setdefault(shard.date, []).append(shard)
+        dates = sorted(shards_by_date)
+        waves = [dates[i:i + self.wave_days] for i in range(0, len(dates), self.wave_days)]
+
+        logger.info("Training statistics:")
+        logger.info(f"   Shards: {len(shards)} ({len(self.symbols)} symbols x {len(dates)} dates)")
+        logger.info(f"   Waves: {len(waves)}")
+        logger.info(f"   Remaining shards: {len(shards) - len(completed & {s.shard_id for s in shards})}\n")
+
+        pending: List[tuple] = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="time-travel") as executor:
+                for wave_no, wave_dates in enumerate(waves, 1):
+                    # Memory is frozen while a wave runs: commit only outcomes known before it starts
+                    pending = self._commit_ready(pending, before=wave_dates[0])
+                    if self.unwritten_shards:
+                        break
+
+                    wave_shards = [
+                        shard for date in wave_dates for shard in shards_by_date[date]
+                        if shard.shard_id not in completed
+                    ]
+                    if not wave_shards:
+                        continue
+
+                    logger.info(
+                        f"[Wave {wave_no}/{len(waves)}] {wave_dates[0].strftime('%Y-%m-%d')} ~ "
+                        f"{wave_dates[-1].strftime('%Y-%m-%d')}: {len(wave_shards)} shards"
+                    )
+
+                    futures = {executor.submit(self._analyze_shard, shard): shard for shard in wave_shards}
+                    for future in as_completed(futures):
+                        pending.append((futures[future], future.result()))
+
+            self._commit_ready(pending, before=None)
+        except Exception as e:
+            # Graph construction or a shard analysis failed: the committed prefix stays resumable
+            self.task_monitor.fail_task(
+                task_id=self.task_id,
+                error=f"Parallel training aborted: {e}; rerun to resume"
+            )
+            raise
+
+        total_episodes = sum(trainer.total_episodes for trainer in self.trainers.values())
+        successful_episodes = sum(trainer.successful_episodes for trainer in self.trainers.values())
+        total_return = sum(trainer.total_return for trainer in self.trainers.values())
+
+        if self.unwritten_shards:
+            # Keep the checkpoint resumable: the next run continues from the first unwritten shard
+            self.task_monitor.fail_task(
+                task_id=self.task_id,
+                error=f"Memory Bank write failed, {len(self.unwritten_shards)} analyzed shards not committed; "
+                      f"rerun to resume"
+            )
+        else:
+            self.task_monitor.complete_task(
+                task_id=self.task_id,
+                final_metadata={
+                    'total_episodes': total_episodes,
+                    'successful_episodes': successful_episodes,
+                    'success_rate': successful_episodes / total_episodes if total_episodes > 0 else 0,
+                    'average_return': total_return / total_episodes if total_episodes > 0 else 0,
+                    'graphs_created': self._graphs_created
+                }
+            )
+
+        logger.info(f"\n{'='*60}")
+        if self.unwritten_shards:
+            logger.info("Parallel training stopped after a Memory Bank write failure")
+        else:
+            logger.info("Parallel training completed!")
+        logger.info(f"{'='*60}\n")
+
+        for trainer in self.trainers.values():
+            logger.info(f"[{trainer.symbol}]")
+            trainer.print_statistics()
+            trainer.save_results()
+            trainer.export_jsonl()
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description='Enhanced Time Travel Training')
 
-    parser.add_argument(
+    symbol_group = parser.add_mutually_exclusive_group(required=True)
+    symbol_group.add_argument(
         '--symbol',
         type=str,
-        required=True,
         help='Stock code (e.g., 000001.SZ for A-shares)'
     )
 
+    symbol_group.add_argument(
+        '--symbols',
+        type=str,
+        nargs='+',
+        help='Multiple stock codes, trained in parallel shards'
+    )
+
     parser.add_argument(
         '--start',
         type=str,
@@ -1203,15 +1643,47 @@ def main():
         help='Holding period (default: 5 days)'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Concurrent propagate() workers; >1 enables parallel training (default: 1)'
+    )
+
+    parser.add_argument(
+        '--wave-days',
+        type=int,
+        default=None,
+        help='Trading dates analyzed concurrently per wave (default: workers / symbols)'
+    )
+
+    parser.add_argument(
+        '--propagate-rate',
+        type=float,
+        default=None,
+        help='Maximum propagate() starts per second across workers (default: unlimited)'
+    )
+
     args = parser.parse_args()
 
     # Create trainer
-    trainer = EnhancedTimeTravelTrainer(
-        symbol=args.symbol,
-        start_date=args.start,
-        end_date=args.end,
-        holding_days=args.holding_days
-    )
+    if args.symbols or args.workers > 1:
+        trainer = ParallelTimeTravelTrainer(
+            symbols=args.symbols or [args.symbol],
+            start_date=args.start,
+            end_date=args.end,
+            holding_days=args.holding_days,
+            max_workers=args.workers,
+            wave_days=args.wave_days,
+            propagate_rate=args.propagate_rate
+        )
+    else:
+        trainer = EnhancedTimeTravelTrainer(
+            symbol=args.symbol,
+            start_date=args.start,
+            end_date=args.end,
+            holding_days=args.holding_days
+        )
 
     # Execute training
     trainer.run()
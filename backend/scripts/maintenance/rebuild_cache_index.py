@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+缓存元数据索引迁移工具
+从已有的 *_meta.json 文件重建 StockDataCache 的SQLite元数据索引
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('scripts')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建文件缓存的元数据索引")
+    parser.add_argument("--cache-dir", default=None,
+                        help="缓存目录，默认为 tradingagents/dataflows/data_cache")
+    args = parser.parse_args()
+
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    cache = StockDataCache(cache_dir=args.cache_dir)
+    count = cache.rebuild_metadata_index()
+    logger.info(f" 元数据索引已重建: {count} 条 ({cache.cache_dir / 'metadata_index.db'})")
+
+
+if __name__ == "__main__":
+    main()
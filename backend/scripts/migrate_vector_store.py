@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Vector Store Migration
+
+在 ChromaDB 与嵌入式向量存储（MEMORY_VECTOR_BACKEND=local）之间迁移记忆库，
+向量、文档和metadata原样复制，不重新计算embedding。
+
+Usage:
+    # 格言库和案例库从ChromaDB迁移到嵌入式存储
+    python scripts/migrate_vector_store.py --to local --path ./memory_db/maxims
+    python scripts/migrate_vector_store.py --to local --path ./memory_db/episodes
+
+    # 反向迁移，只迁移指定集合
+    python scripts/migrate_vector_store.py --to chromadb --path ./memory_db/episodes \
+        --collection trading_episodes
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.agents.utils.vector_store import LocalVectorCollection, migrate_collection
+
+
+def list_local_collections(path: str):
+    root = Path(path) / "vector_store"
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / "records.db").exists())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB <-> 嵌入式向量存储迁移")
+    parser.add_argument("--to", choices=["local", "chromadb"], required=True, help="目标后端")
+    parser.add_argument("--path", required=True, help="持久化目录（两种后端共用同一目录）")
+    parser.add_argument("--collection", action="append", help="要迁移的集合名，可重复；默认迁移全部")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    import chromadb
+    client = chromadb.PersistentClient(path=args.path)
+
+    if args.collection:
+        names = args.collection
+    elif args.to == "local":
+        names = [getattr(c, "name", c) for c in client.list_collections()]
+    else:
+        names = list_local_collections(args.path)
+
+    if not names:
+        print(f"{args.path} 下没有可迁移的集合")
+        return
+
+    for name in names:
+        local = LocalVectorCollection(name, os.path.join(args.path, "vector_store", name))
+        if args.to == "local":
+            source, target = client.get_collection(name=name), local
+        else:
+            source, target = local, client.get_or_create_collection(name=name)
+
+        start = time.perf_counter()
+        copied = migrate_collection(source, target, batch_size=args.batch_size)
+        local.close()
+        print(f"{name}: {copied} 条 -> {args.to} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Precompute LLM Signals for RL Training
+
+批量预计算 LLMEnhancedTradingEnv 使用的 LLM/Memory 信号，写入离线信号表。
+训练时使用 signal_mode='offline' 直接查表，不再每步调用 trading_graph.propagate。
+
+- 支持断点续跑：已成功计算的 (symbol, date) 自动跳过
+- 支持多线程并行：每个线程持有独立的 TradingAgentsGraph
+
+Usage:
+    python scripts/precompute_llm_signals.py --symbols 600519.SH 000001.SZ --start 2023-01-01 --end 2023-12-31
+    python scripts/precompute_llm_signals.py --symbols-file hs300.txt --start 2020-01-01 --end 2024-12-31 --workers 8
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.dataflows.interface import get_stock_data_dataframe
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.rl.signal_store import LLMSignalPrecomputer, LLMSignalStore
+from tradingagents.utils.logging_init import get_logger
+
+logger = get_logger("precompute_llm_signals")
+
+DEFAULT_DB_PATH = project_root / "data" / "rl" / "llm_signals.db"
+
+
+def load_symbols(args) -> list:
+    symbols = list(args.symbols or [])
+    if args.symbols_file:
+        with open(args.symbols_file, 'r', encoding='utf-8') as f:
+            symbols.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return list(dict.fromkeys(symbols))
+
+
+def build_tasks(symbols: list, start_date: str, end_date: str) -> list:
+    """按各股票实际交易日生成 (symbol, date, close) 任务"""
+    tasks = []
+    for symbol in symbols:
+        df = get_stock_data_dataframe(symbol, start_date, end_date)
+        if df is None or df.empty:
+            logger.warning(f" {symbol} 无行情数据，跳过")
+            continue
+        dates = df['date'] if 'date' in df.columns else df.index
+        closes = df['close'] if 'close' in df.columns else [None] * len(df)
+        tasks.extend((symbol, d, c) for d, c in zip(dates, closes))
+        logger.info(f" {symbol}: {len(df)} 个交易日")
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute LLM/Memory signals for LLMEnhancedTradingEnv")
+    parser.add_argument("--symbols", nargs="*", help="股票代码")
+    parser.add_argument("--symbols-file", help="股票代码文件（每行一个）")
+    parser.add_argument("--start", required=True, help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="结束日期 YYYY-MM-DD")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="信号表路径")
+    parser.add_argument("--workers", type=int, default=4, help="并行线程数")
+    parser.add_argument("--with-memory", action="store_true", help="同时计算Memory历史案例信号")
+    parser.add_argument("--no-resume", action="store_true", help="忽略已有结果，全部重新计算")
+    parser.add_argument("--skip-failed", action="store_true", help="续跑时不重试之前失败的条目")
+    args = parser.parse_args()
+
+    symbols = load_symbols(args)
+    if not symbols:
+        parser.error("请通过 --symbols 或 --symbols-file 指定股票")
+
+    memory_manager = None
+    if args.with_memory:
+        from memory import MemoryManager, MemoryMode
+        memory_manager = MemoryManager(mode=MemoryMode.ANALYSIS, config=DEFAULT_CONFIG.copy())
+
+    store = LLMSignalStore(args.db)
+    precomputer = LLMSignalPrecomputer(
+        store=store,
+        graph_factory=lambda: TradingAgentsGraph(config=DEFAULT_CONFIG.copy()),
+        memory_manager=memory_manager,
+        max_workers=args.workers,
+    )
+
+    try:
+        stats = precomputer.run(
+            build_tasks(symbols, args.start, args.end),
+            resume=not args.no_resume,
+            retry_failed=not args.skip_failed,
+        )
+    finally:
+        store.close()
+
+    logger.info(
+        f" 完成: 共{stats['total']}条，跳过{stats['skipped']}条，"
+        f"成功{stats['computed']}条，失败{stats['failed']}条 -> {args.db}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -32,12 +32,13 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from trading.enhanced_trading_env import EnhancedTradingEnv
+from trading.shared_env_pool import SharedMarketData, make_shared_env_factories
 from tradingagents.dataflows.interface import get_stock_data_dataframe
 
 # Import stable-baselines3
 try:
     from stable_baselines3 import PPO
-    from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+    from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecNormalize
     from stable_baselines3.common.monitor import Monitor
     from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback, BaseCallback
     SB3_AVAILABLE = True
@@ -89,6 +90,7 @@ CONFIG = {
     'n_epochs': 5,
     'learning_rate': 0.0003,
     'gamma': 0.995,
+    'n_envs': 1,  # 并行环境进程数（>1时使用SubprocVecEnv + 共享内存行情数据）
 
     # 保存路径
     'model_dir': 'models/production',
@@ -104,13 +106,15 @@ CONFIG = {
 class ProgressCallback(BaseCallback):
     """Callback to save training progress to JSON file for API consumption"""
 
-    def __init__(self, progress_file: str, total_timesteps: int, update_freq: int = 1000, verbose=0):
+    def __init__(self, progress_file: str, total_timesteps: int, update_freq: int = 1000, n_envs: int = 1, verbose=0):
         super().__init__(verbose)
         self.progress_file = progress_file
         self.metrics_history_file = progress_file.replace('training_progress.json', 'metrics_history.json')
         self.total_timesteps = total_timesteps
         self.update_freq = update_freq
+        self.n_envs = n_envs
         self.start_time = None
+        self._last_saved_timesteps = 0
         self.metrics_history = []  # 保存历史指标
 
     def _on_training_start(self) -> None:
@@ -121,7 +125,9 @@ class ProgressCallback(BaseCallback):
 
     def _on_step(self) -> bool:
         """Called after each step"""
-        if self.num_timesteps % self.update_freq == 0:
+        # 多环境时 num_timesteps 每步增加 n_envs，按间隔而非整除判断
+        if self.num_timesteps - self._last_saved_timesteps >= self.update_freq:
+            self._last_saved_timesteps = self.num_timesteps
             self._save_progress()
         return True
 
@@ -154,6 +160,9 @@ class ProgressCallback(BaseCallback):
         if hasattr(self, 'locals') and 'fps' in self.locals:
             fps = self.locals.get('fps')
 
+        # 环境步吞吐（所有并行环境合计）
+        env_steps_per_sec = self.num_timesteps / elapsed if elapsed > 0 else None
+
         # PPO特定的loss指标
         if hasattr(self.model, 'logger') and hasattr(self.model.logger, 'name_to_value'):
             log_data = self.model.logger.name_to_value
@@ -170,6 +179,8 @@ class ProgressCallback(BaseCallback):
             'ep_rew_mean': round(float(ep_rew_mean), 4) if ep_rew_mean is not None else None,
             'ep_len_mean': round(float(ep_len_mean), 2) if ep_len_mean is not None else None,
             'fps': round(float(fps), 2) if fps is not None else None,
+            'env_steps_per_sec': round(float(env_steps_per_sec), 2) if env_steps_per_sec is not None else None,
+            'n_envs': self.n_envs,
             'policy_loss': round(float(policy_loss), 6) if policy_loss is not None else None,
             'value_loss': round(float(value_loss), 6) if value_loss is not None else None,
             'explained_variance': round(float(explained_variance), 4) if explained_variance is not None else None,
@@ -190,6 +201,7 @@ class ProgressCallback(BaseCallback):
                 'value_loss': progress_data['value_loss'],
                 'explained_variance': progress_data['explained_variance'],
                 'fps': progress_data['fps'],
+                'env_steps_per_sec': progress_data['env_steps_per_sec'],
                 'timestamp': progress_data['last_update']
             }
             self.metrics_history.append(metrics_point)
@@ -203,6 +215,20 @@ class ProgressCallback(BaseCallback):
             logger.warning(f"Failed to save progress file: {e}")
 
 
+class StopTrainingCallback(BaseCallback):
+    """Callback to end model.learn() early once stop_event is set (API thread-mode stop)"""
+
+    def __init__(self, stop_event, verbose=0):
+        super().__init__(verbose)
+        self.stop_event = stop_event
+
+    def _on_step(self) -> bool:
+        if self.stop_event.is_set():
+            logger.info(f"收到停止请求，在 {self.num_timesteps:,} steps 处结束训练")
+            return False
+        return True
+
+
 # ====================================================================================
 # 辅助函数
 # ====================================================================================
@@ -360,9 +386,13 @@ def create_combined_env(stock_data: List[Tuple[str, pd.DataFrame]], **env_kwargs
 def train_model(
     train_data: List[Tuple[str, pd.DataFrame]],
     val_data: List[Tuple[str, pd.DataFrame]],
-    config: Dict
+    config: Dict,
+    stop_event=None
 ) -> Tuple[PPO, VecNormalize]:
-    """训练RL模型"""
+    """训练RL模型
+
+    stop_event: 可选的 threading.Event，置位后在下一个环境步结束训练（模型照常保存）
+    """
     logger.info("\n" + "="*80)
     logger.info("开始训练RL模型")
     logger.info("="*80)
@@ -376,10 +406,20 @@ def train_model(
     }
 
     # 创建训练环境
-    logger.info(f"创建训练环境 (T+1={'启用' if config['enable_t1'] else '禁用'})...")
-    train_env = DummyVecEnv([
-        lambda: create_combined_env(train_data, **env_kwargs)
-    ])
+    n_envs = max(1, int(config.get('n_envs', 1)))
+    logger.info(f"创建训练环境 (T+1={'启用' if config['enable_t1'] else '禁用'}, 并行环境={n_envs})...")
+    shared_data = None
+    if n_envs > 1:
+        # 行情与特征矩阵放入共享内存，各worker进程只读挂载
+        shared_data = SharedMarketData.create(train_data)
+        train_env = SubprocVecEnv(
+            make_shared_env_factories(shared_data.spec, n_envs, env_kwargs),
+            start_method='spawn'
+        )
+    else:
+        train_env = DummyVecEnv([
+            lambda: create_combined_env(train_data, **env_kwargs)
+        ])
     train_env = VecNormalize(train_env, norm_obs=True, norm_reward=True)
 
     # 创建验证环境
@@ -414,8 +454,12 @@ def train_model(
     progress_callback = ProgressCallback(
         progress_file=progress_file,
         total_timesteps=config['total_timesteps'],
-        update_freq=2000  # Update every 2000 steps
+        update_freq=2000,  # Update every 2000 steps
+        n_envs=n_envs
     )
+    callbacks = [eval_callback, checkpoint_callback, progress_callback]
+    if stop_event is not None:
+        callbacks.append(StopTrainingCallback(stop_event))
 
     # 创建PPO模型
     logger.info("初始化PPO模型...")
@@ -448,19 +492,26 @@ def train_model(
 
     start_time = datetime.now()
 
-    model.learn(
-        total_timesteps=config['total_timesteps'],
-        callback=[eval_callback, checkpoint_callback, progress_callback],
-        progress_bar=True
-    )
+    try:
+        model.learn(
+            total_timesteps=config['total_timesteps'],
+            callback=callbacks,
+            progress_bar=True
+        )
 
-    elapsed = datetime.now() - start_time
-    logger.info(f"\n 训练完成！耗时: {elapsed}")
+        elapsed = datetime.now() - start_time
+        logger.info(f"\n 训练完成！耗时: {elapsed}")
+        logger.info(f"环境吞吐: {config['total_timesteps'] / max(elapsed.total_seconds(), 1e-9):,.0f} steps/sec")
 
-    # 保存最终模型
-    final_model_path = f"{config['model_dir']}/final_model.zip"
-    model.save(final_model_path)
-    train_env.save(f"{config['model_dir']}/final_vecnormalize.pkl")
+        # 保存最终模型
+        final_model_path = f"{config['model_dir']}/final_model.zip"
+        model.save(final_model_path)
+        train_env.save(f"{config['model_dir']}/final_vecnormalize.pkl")
+    finally:
+        if shared_data is not None:
+            train_env.close()
+            shared_data.close()
+            shared_data.unlink()
 
     logger.info(f"模型已保存: {final_model_path}")
 
@@ -642,7 +693,7 @@ def main():
     return 0
 
 
-def run_training(config: Dict) -> Dict:
+def run_training(config: Dict, stop_event=None) -> Dict:
     """
     运行RL训练（可被API调用）
 
@@ -653,11 +704,13 @@ def run_training(config: Dict) -> Dict:
             - use_hs300, custom_symbols, max_stocks: 股票池配置
             - initial_cash, commission_rate, stamp_duty, enable_t1: 环境参数
             - total_timesteps, learning_rate, n_steps, batch_size: 训练参数
+            - n_envs: 并行环境进程数
             - use_gpu: 是否使用GPU
             - model_name, model_dir: 模型保存路径
+        stop_event: 可选的 threading.Event，API线程模式下用于停止训练
 
     Returns:
-        训练结果字典
+        训练结果字典（提前停止时 stopped=True）
     """
     # 合并配置
     final_config = CONFIG.copy()
@@ -714,13 +767,20 @@ def run_training(config: Dict) -> Dict:
         cache_file=val_cache
     )
 
+    if stop_event is not None and stop_event.is_set():
+        logger.info("收到停止请求，跳过训练")
+        return {'model_dir': final_config['model_dir'], 'config': final_config, 'summary': {}, 'success': False, 'stopped': True}
+
     # Step 4: 训练模型
     logger.info("\n[Step 4/5] 训练模型...")
-    model, vec_normalize = train_model(train_data, val_data, final_config)
+    model, vec_normalize = train_model(train_data, val_data, final_config, stop_event=stop_event)
+    stopped = stop_event is not None and stop_event.is_set()
 
     # Step 5: 评估（如果提供测试集）
     summary = {}
-    if final_config.get('test_start') and final_config.get('test_end'):
+    if stopped:
+        logger.info("\n[Step 5/5] 训练已提前停止，跳过评估")
+    elif final_config.get('test_start') and final_config.get('test_end'):
         logger.info("\n[Step 5/5] 准备测试数据并评估...")
         test_cache = os.path.join(final_config.get('data_cache_dir', 'data_cache'), 'test_data.json')
         test_data = prepare_training_data(
@@ -741,9 +801,26 @@ def run_training(config: Dict) -> Dict:
         'model_dir': final_config['model_dir'],
         'config': final_config,
         'summary': summary,
-        'success': True
+        'success': True,
+        'stopped': stopped
     }
 
 
+def run_training_subprocess(config: Dict, conn) -> None:
+    """在独立进程中运行训练，结果通过管道返回（API多进程训练模式的入口）
+
+    Args:
+        config: 同 run_training
+        conn: multiprocessing Connection，发送 ('ok', result) 或 ('error', message)
+    """
+    try:
+        conn.send(('ok', run_training(config)))
+    except Exception as e:
+        logger.exception("训练进程失败")
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -277,6 +277,71 @@ def test_backtester_with_mock_data():
     assert metrics['total_return'] > 0
 
 
+def test_backtester_window_matches_history():
+    """测试策略看到的窗口与逐K线的历史切片一致（兼容 generate_signal）"""
+
+    class RecordingStrategy(BaseStrategy):
+        def __init__(self):
+            super().__init__("Recording")
+            self.seen = []
+
+        def generate_signal(self, symbol, current_data, portfolio_state):
+            self.seen.append((len(current_data), current_data['close'].iloc[-1]))
+            return {'action': 'hold'}
+
+        def on_trade(self, trade_info):
+            pass
+
+    dates = pd.date_range(start='2024-01-01', periods=50, freq='D')
+    closes = 100 + np.arange(50, dtype=float)
+    mock_data = pd.DataFrame({'date': dates, 'close': closes})
+
+    strategy = RecordingStrategy()
+    Backtester(strategy).run("600519.SH", "2024-01-01", "2024-02-19", data=mock_data)
+
+    assert strategy.seen == [(i + 1, closes[i]) for i in range(50)]
+
+
+def test_backtester_on_bar_array_strategy_is_fast():
+    """测试数组策略的20年日线回测耗时"""
+
+    class ArrayMAStrategy(BaseStrategy):
+        def __init__(self):
+            super().__init__("ArrayMA")
+
+        def on_bar(self, symbol, window, portfolio_state):
+            if len(window) < 20:
+                return {'action': 'hold'}
+            closes = window.close
+            ma = closes[-20:].mean()
+            if closes[-1] > ma and not portfolio_state['has_position']:
+                return {'action': 'buy'}
+            if closes[-1] < ma and portfolio_state['has_position']:
+                return {'action': 'sell'}
+            return {'action': 'hold'}
+
+        def generate_signal(self, symbol, current_data, portfolio_state):
+            raise AssertionError("on_bar should be used")
+
+        def on_trade(self, trade_info):
+            pass
+
+    n = 20 * 252
+    rng = np.random.default_rng(0)
+    mock_data = pd.DataFrame({
+        'date': pd.bdate_range(start='2004-01-01', periods=n),
+        'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+    })
+
+    import time
+    start = time.perf_counter()
+    result = Backtester(ArrayMAStrategy()).run("600519.SH", "2004-01-01", "2024-01-01", data=mock_data)
+    elapsed = time.perf_counter() - start
+
+    assert len(result['equity_curve']) == n
+    assert elapsed < 5.0
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
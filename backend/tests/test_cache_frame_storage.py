@@ -0,0 +1,58 @@
+"""
+DataFrame缓存序列化测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache_manager import StockDataCache
+
+
+def _make_frame():
+    index = pd.date_range("2024-01-02", periods=5, freq="B", name="date")
+    return pd.DataFrame({
+        "close": np.linspace(10.0, 11.0, 5),
+        "volume": np.arange(5, dtype=np.int64) * 100,
+    }, index=index)
+
+
+@pytest.mark.parametrize("frame_format", ["feather", "parquet"])
+def test_columnar_round_trip_preserves_dtypes(tmp_path, frame_format):
+    """列式格式保留dtype与DatetimeIndex"""
+    pytest.importorskip("pyarrow")
+    cache = StockDataCache(cache_dir=str(tmp_path), frame_format=frame_format)
+    df = _make_frame()
+
+    key = cache.save_stock_data("000001", df, "2024-01-01", "2024-01-31", "tushare")
+    loaded = cache.load_stock_data(key)
+
+    assert cache._load_metadata(key)['file_format'] == frame_format
+    assert isinstance(loaded.index, pd.DatetimeIndex)
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+
+def test_csv_fallback_still_loads(tmp_path):
+    """CSV格式仍可读写"""
+    cache = StockDataCache(cache_dir=str(tmp_path), frame_format="csv")
+    key = cache.save_stock_data("000001", _make_frame(), "2024-01-01", "2024-01-31", "tushare")
+
+    loaded = cache.load_stock_data(key)
+    assert cache._load_metadata(key)['file_format'] == "csv"
+    assert list(loaded.columns) == ["close", "volume"]
+    assert len(loaded) == 5
+
+
+def test_columnar_entry_without_pyarrow_is_cache_miss(tmp_path, monkeypatch):
+    """缺少pyarrow时不能用CSV解析Arrow/Parquet文件，按未命中处理"""
+    pytest.importorskip("pyarrow")
+    from tradingagents.dataflows import frame_storage
+
+    cache = StockDataCache(cache_dir=str(tmp_path), frame_format="feather")
+    key = cache.save_stock_data("000001", _make_frame(), "2024-01-01", "2024-01-31", "tushare")
+
+    monkeypatch.setattr(frame_storage, "PYARROW_AVAILABLE", False)
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **k: pytest.fail("read_csv on a feather file"))
+    assert cache.load_stock_data(key) is None
+    # 写入端仍回退为CSV
+    assert frame_storage.get_frame_serializer("feather").format_name == "csv"
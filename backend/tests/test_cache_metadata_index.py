@@ -0,0 +1,62 @@
+"""
+缓存元数据索引测试
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tradingagents.dataflows.cache_manager import StockDataCache
+
+
+def _make_frame():
+    return pd.DataFrame({'close': [1.0, 2.0]}, index=['2024-01-02', '2024-01-03'])
+
+
+def test_partial_match_uses_index(tmp_path):
+    """不同日期范围的请求通过索引命中同一股票的缓存"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("AAPL", _make_frame(), "2024-01-01", "2024-01-31", "yfinance")
+
+    assert cache.metadata_index.count() == 1
+    found = cache.find_cached_stock_data("AAPL", "2024-01-01", "2024-01-15", max_age_hours=1)
+    assert found == key
+    assert cache.find_cached_stock_data("MSFT", "2024-01-01", "2024-01-15", max_age_hours=1) is None
+
+
+def test_fundamentals_lookup(tmp_path):
+    """基本面缓存查找"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_fundamentals_data("000001", "report", data_source="tushare")
+
+    assert cache.find_cached_fundamentals_data("000001", data_source="tushare") == key
+    assert cache.find_cached_fundamentals_data("000001", data_source="akshare") is None
+
+
+def test_migration_from_existing_metadata(tmp_path):
+    """已有元数据文件在首次初始化时迁移到索引"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("AAPL", _make_frame(), "2024-01-01", "2024-01-31", "yfinance")
+    cache.metadata_index.close()
+    (tmp_path / "metadata_index.db").unlink()
+
+    migrated = StockDataCache(cache_dir=str(tmp_path))
+    assert migrated.metadata_index.count() == 1
+    assert migrated.find_cached_stock_data("AAPL", "2023-01-01", "2023-12-31", max_age_hours=1) == key
+
+
+def test_clear_old_cache_updates_index(tmp_path):
+    """清理过期缓存时同步删除索引条目"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("AAPL", _make_frame(), "2024-01-01", "2024-01-31", "yfinance")
+
+    meta_path = cache._get_metadata_path(key)
+    metadata = json.loads(meta_path.read_text(encoding='utf-8'))
+    metadata['cached_at'] = (datetime.now() - timedelta(days=30)).isoformat()
+    meta_path.write_text(json.dumps(metadata), encoding='utf-8')
+    cache.metadata_index.upsert(key, metadata)
+
+    cache.clear_old_cache(max_age_days=7)
+    assert cache.metadata_index.count() == 0
+    assert not meta_path.exists()
@@ -0,0 +1,118 @@
+"""
+Embedding 持久化缓存与批量请求测试
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from tradingagents.agents.utils import embedding_cache
+from tradingagents.agents.utils.embedding_cache import EmbeddingStore
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+
+
+class FakeEmbeddings:
+    """OpenAI兼容的embeddings接口，记录每次请求的文本"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        if self.fail:
+            raise RuntimeError("connection reset")
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(sum(map(ord, text)) % 97), 1.0])
+            for i, text in enumerate(input)
+        ]
+        # 服务端不保证顺序
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = EmbeddingStore(str(tmp_path / "embeddings.db"))
+    monkeypatch.setattr(embedding_cache, "_global_store", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def make_memory(store, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("MEMORY_PERSIST_PATH", str(tmp_path / "maxims"))
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "4")
+
+    def make(fake):
+        config = {"llm_provider": "openai", "backend_url": "http://127.0.0.1:9/v1"}
+        memory = FinancialSituationMemory(f"test_{uuid.uuid4().hex[:8]}", config)
+        memory.client = SimpleNamespace(embeddings=fake)
+        return memory
+
+    return make
+
+
+def test_store_roundtrip_is_shared_and_persistent(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    first = EmbeddingStore(path)
+    first.put_many("m", ["a", "b", "zero"], [[1.0, 2.0], [3.0, 4.0], [0.0, 0.0]])
+    first.close()
+
+    second = EmbeddingStore(path)
+    assert second.get_many("m", ["b", "a", "c", "zero"]) == [[3.0, 4.0], [1.0, 2.0], None, None]
+    assert second.get("other-model", "a") is None
+    assert second.count() == 2
+
+
+def test_add_situations_batches_requests(make_memory, store):
+    fake = FakeEmbeddings()
+    memory = make_memory(fake)
+    situations = [(f"市场情况 {i}", f"建议 {i}") for i in range(10)] + [("市场情况 3", "重复")]
+
+    memory.add_situations(situations)
+
+    # 10 条不同文本，每批4条 -> 3 次请求（原实现为11次）
+    assert [len(call) for call in fake.calls] == [4, 4, 2]
+    assert memory.situation_collection.count() == 11
+
+    # 另一个记忆库实例（如 bull/bear）复用同一缓存，不再请求
+    other_fake = FakeEmbeddings()
+    other = make_memory(other_fake)
+    other.add_situations(situations[:5])
+    assert other_fake.calls == []
+    assert other.get_embedding("市场情况 2") == memory.get_embedding("市场情况 2")
+
+
+def test_batch_failure_falls_back_per_text(make_memory):
+    fake = FakeEmbeddings(fail=True)
+    memory = make_memory(fake)
+
+    embeddings = memory.get_embeddings(["a", "b"])
+
+    assert embeddings == [[0.0] * 1024, [0.0] * 1024]
+    # 一次批量 + 两次逐条重试；降级的零向量不写入缓存
+    assert len(fake.calls) == 3
+    assert memory._embedding_store.get(memory.embedding, "a") is None
+
+
+def test_chunked_text_embeds_chunks_in_batches(make_memory, monkeypatch):
+    fake = FakeEmbeddings()
+    memory = make_memory(fake)
+    memory.max_embedding_length = 300
+    text = "。".join(f"第{i}段内容" * 5 for i in range(60))
+
+    embedding = memory.get_embedding(text)
+
+    info = memory.get_last_text_info()
+    assert info["was_chunked"]
+    assert sum(len(call) for call in fake.calls) == info["num_chunks"]
+    assert len(fake.calls) == -(-info["num_chunks"] // 4)
+    assert len(embedding) == 3
+    assert np.isfinite(embedding).all()
+
+    fake.calls.clear()
+    assert memory.get_embedding(text) == pytest.approx(embedding, rel=1e-6)
+    assert fake.calls == []
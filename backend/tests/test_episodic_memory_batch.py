@@ -0,0 +1,129 @@
+"""
+EpisodicMemoryBank 批量写入、批量检索与按需解析测试
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from memory.episodic_memory import (
+    DecisionChain,
+    EpisodeHandle,
+    EpisodicMemoryBank,
+    MarketState,
+    TradeOutcome,
+    TradingEpisode,
+)
+from memory.memory_manager import MemoryManager
+from tradingagents.rl.signal_store import summarize_memory_episodes
+
+
+class FakeEncoder:
+    """按字符统计的确定性编码器，记录每次调用的批大小"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append(len(texts))
+        vectors = np.zeros((len(texts), 32), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for ch in text:
+                vectors[row, ord(ch) % 32] += 1
+        return vectors
+
+
+def make_episode(i, regime, ret):
+    date = f"2024-01-{i + 1:02d}"
+    return TradingEpisode(
+        episode_id=f"{date}_600519.SH",
+        date=date,
+        symbol="600519.SH",
+        market_state=MarketState(date=date, symbol="600519.SH", price=1700.0 + i, market_regime=regime),
+        agent_analyses={},
+        decision_chain=DecisionChain(final_decision="买入" if ret > 0 else "观望"),
+        outcome=TradeOutcome(action="BUY", percentage_return=ret),
+        key_lesson=f"{regime} 市场状态 决策",
+        success=ret > 0,
+        created_at=datetime(2024, 2, 1).isoformat(),
+        mode="training",
+    )
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = EpisodicMemoryBank(persist_directory=str(tmp_path / "episodes"))
+    bank.encoder = FakeEncoder()
+    bank.batch_size = 8
+    return bank
+
+
+def test_add_episodes_encodes_in_batches(bank):
+    episodes = [make_episode(i, "bull" if i % 2 else "panic_selloff", 0.01 * (i - 5)) for i in range(20)]
+
+    assert bank.add_episodes(episodes + [episodes[0]]) == 20
+
+    assert bank.collection.count() == 20
+    # 一次编码调用处理一个写入批次，而不是每个episode一次
+    assert len(bank.encoder.calls) < 20
+    assert sum(bank.encoder.calls) == 20
+    assert bank.get_episode_by_id(episodes[3].episode_id) == episodes[3]
+
+
+def test_retrieve_similar_batch_returns_lazy_handles(bank):
+    bank.add_episodes([make_episode(i, "bull" if i % 2 else "panic_selloff", 0.02) for i in range(10)])
+    bank.encoder.calls.clear()
+
+    results = bank.retrieve_similar_batch(
+        [{"description": "bull 市场状态 决策"}, {"description": "panic_selloff 市场状态 决策"}],
+        top_k=3,
+    )
+
+    assert bank.encoder.calls == [2]
+    assert [len(r) for r in results] == [3, 3]
+    handle = results[0][0]
+    assert isinstance(handle, EpisodeHandle)
+    assert handle.market_regime == "bull"
+    assert handle.percentage_return == pytest.approx(0.02)
+    assert handle.success is True
+    assert not handle.hydrated
+
+    # 访问完整字段时才解析
+    assert handle.outcome.action == "BUY"
+    assert handle.hydrated
+    assert handle.episode.metadata["similarity_score"] == pytest.approx(handle.similarity_score)
+
+    assert summarize_memory_episodes(results[1]) == pytest.approx(np.array([0.02, 1.0], dtype=np.float32))
+
+
+def test_retrieve_similar_hydrate_and_empty_bank(bank):
+    assert bank.retrieve_similar({"description": "bull"}) == []
+
+    bank.add_episode(make_episode(0, "bull", -0.03))
+    episodes = bank.retrieve_similar({"description": "bull"}, top_k=5, hydrate=True)
+
+    assert len(episodes) == 1
+    assert isinstance(episodes[0], TradingEpisode)
+    assert episodes[0].success is False
+    assert "similarity_score" in episodes[0].metadata
+
+
+def test_memory_manager_hydrate_skips_malformed_documents(bank):
+    bank.add_episode(make_episode(0, "bull", 0.01))
+    bank.collection.add(
+        ids=["broken"],
+        embeddings=bank._encode(["bull 市场状态 决策"]),
+        documents=["{not json"],
+        metadatas=[{"market_regime": "bull"}],
+    )
+    manager = MemoryManager.__new__(MemoryManager)
+    manager.episode_memory = bank
+
+    handles = manager.retrieve_episodes({"description": "bull"}, top_k=5)
+    assert {handle.episode_id for handle in handles} == {"broken", "2024-01-01_600519.SH"}
+    assert all(isinstance(handle, EpisodeHandle) for handle in handles)
+
+    episodes = manager.retrieve_episodes({"description": "bull"}, top_k=5, hydrate=True)
+    assert [episode.episode_id for episode in episodes] == ["2024-01-01_600519.SH"]
+    assert isinstance(episodes[0], TradingEpisode)
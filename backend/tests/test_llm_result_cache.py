@@ -0,0 +1,167 @@
+"""
+LLM结果缓存（归一化、持久层、语义层、节省统计）测试
+"""
+
+import numpy as np
+import pytest
+
+from tradingagents.utils.llm_optimization import LLMResultCache, normalize_prompt
+
+
+def test_normalize_prompt_ignores_time_of_day_and_whitespace():
+    """只去掉时分秒和多余空白，日期保留"""
+    a = "分析 000001  在 2024-05-10 09:31:02 的走势\n当前时间 10:15:00"
+    b = "分析 000001 在 2024-05-10T14:00:59.123+08:00 的走势 当前时间 14:59:59"
+    assert normalize_prompt(a) == normalize_prompt(b)
+    assert normalize_prompt(a) != normalize_prompt(a.replace("2024-05-10", "2024-05-11"))
+
+
+def test_exact_hit_survives_restart_and_tracks_savings(tmp_path):
+    """持久层在新实例（新进程/重启）中仍可命中，并统计节省的token和成本"""
+    db_path = str(tmp_path / "llm_cache.db")
+    first = LLMResultCache(db_path=db_path)
+    first.set("分析000001  2024-05-10 09:30:00", "qwen-plus", "买入", tokens=1200, cost=0.05)
+    first.close()
+
+    second = LLMResultCache(db_path=db_path)
+    assert second.get("分析000001 2024-05-10 15:00:00", "qwen-plus") == "买入"
+    assert second.get("分析000001 2024-05-10", "qwen-plus") == "买入"
+    assert second.get("分析000001 2024-05-10", "qwen-max") is None
+
+    stats = second.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["tokens_saved"] == 2400
+    assert stats["cost_saved"] == pytest.approx(0.10)
+    assert stats["disk_size"] == 1
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = LLMResultCache(ttl_seconds=0, db_path=str(tmp_path / "llm_cache.db"))
+    cache.set("prompt", "model", "result")
+    assert cache.get("prompt", "model") is None
+
+
+def _bag_of_chars(text):
+    vector = np.zeros(64, dtype=np.float32)
+    for ch in text:
+        vector[ord(ch) % 64] += 1
+    return vector
+
+
+def test_semantic_tier_is_scoped(tmp_path):
+    """语义层只在同一模型和 scope 内匹配近似prompt"""
+    cache = LLMResultCache(db_path=str(tmp_path / "llm_cache.db"), embed_fn=_bag_of_chars,
+                           similarity_threshold=0.95)
+    prompt = "请分析 000001 的技术面，收盘价 10.52，成交量放大，MACD 金叉，RSI 为 61"
+    near = "请分析 000001 的技术面：收盘价 10.52，成交量放大，MACD 金叉，RSI 为 61。"
+    scope = "000001|2024-05-10|market"
+    cache.set(prompt, "qwen-plus", "看多", scope=scope)
+
+    assert cache.get(near, "qwen-plus") is None
+    assert cache.get(near, "qwen-plus", scope="000002|2024-05-10|market") is None
+    assert cache.get(near, "qwen-plus", scope=scope) == "看多"
+    assert cache.get("完全不同的基本面分析问题", "qwen-plus", scope=scope) is None
+
+    # 语义向量随持久层一起保存
+    reopened = LLMResultCache(db_path=str(tmp_path / "llm_cache.db"), embed_fn=_bag_of_chars,
+                              similarity_threshold=0.95)
+    assert reopened.get(near, "qwen-plus", scope=scope) == "看多"
+    assert reopened.stats()["semantic_hits"] == 1
+
+
+def test_langchain_adapter_roundtrip(tmp_path):
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration
+
+    from tradingagents.utils.llm_optimization import LangChainResultCache
+
+    adapter = LangChainResultCache(LLMResultCache(db_path=str(tmp_path / "llm_cache.db")))
+    message = AIMessage(content="持有", usage_metadata={"input_tokens": 90, "output_tokens": 10, "total_tokens": 100})
+    adapter.update("[prompt]", "qwen-plus", [ChatGeneration(message=message)])
+
+    cached = adapter.lookup("[prompt]", "qwen-plus")
+    assert cached[0].message.content == "持有"
+    assert adapter.lookup("[prompt]", "qwen-max") is None
+    assert adapter.cache.tokens_saved == 100
+
+
+def test_exact_hit_is_limited_to_scope(tmp_path):
+    cache = LLMResultCache(db_path=str(tmp_path / "llm_cache.db"))
+    cache.set("prompt", "qwen-plus", "买入", scope="000001|2024-05-10|Market Analyst")
+    assert cache.get("prompt", "qwen-plus", scope="000001|2024-05-10|Market Analyst") == "买入"
+    assert cache.get("prompt", "qwen-plus", scope="000002|2024-05-10|Market Analyst") is None
+    assert cache.get("prompt", "qwen-plus", scope="000001|2024-05-10|News Analyst") is None
+
+
+def test_get_llm_cache_rebuilds_when_settings_change(tmp_path, monkeypatch):
+    from tradingagents.utils import llm_optimization
+
+    monkeypatch.delenv("LLM_CACHE_TTL_SECONDS", raising=False)
+    monkeypatch.setattr(llm_optimization, "_global_cache", None)
+    first = llm_optimization.get_llm_cache(db_path=str(tmp_path / "a.db"), ttl_seconds=60)
+    assert llm_optimization.get_llm_cache() is first
+    assert llm_optimization.get_llm_cache(ttl_seconds=60) is first
+
+    second = llm_optimization.get_llm_cache(db_path=str(tmp_path / "b.db"))
+    assert second is not first
+    assert second.db_path == str(tmp_path / "b.db")
+    assert second.ttl_seconds == 60
+
+    third = llm_optimization.get_llm_cache(embed_fn=_bag_of_chars)
+    assert third.embed_fn is _bag_of_chars
+    assert third.db_path == second.db_path
+
+
+def test_langchain_adapter_scopes_by_symbol_date_and_node(tmp_path):
+    from typing import TypedDict
+
+    from langgraph.graph import END, START, StateGraph
+
+    from tradingagents.utils.llm_optimization import current_cache_scope, llm_cache_scope
+
+    class State(TypedDict):
+        scope: str
+
+    def node(state):
+        return {"scope": current_cache_scope()}
+
+    builder = StateGraph(State)
+    builder.add_node("Market Analyst", node)
+    builder.add_edge(START, "Market Analyst")
+    builder.add_edge("Market Analyst", END)
+    graph = builder.compile()
+
+    assert current_cache_scope() is None
+    with llm_cache_scope("000001", "2024-05-10"):
+        assert graph.invoke({"scope": ""})["scope"] == "000001|2024-05-10|Market Analyst"
+
+
+def test_tool_loop_steps_never_semantic_hit(tmp_path):
+    """工具循环中追加一条工具结果后的prompt不会语义命中上一步的回复"""
+    from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+    from tradingagents.utils.llm_optimization import LangChainResultCache, llm_cache_scope
+
+    cache = LLMResultCache(db_path=str(tmp_path / "llm_cache.db"), embed_fn=_bag_of_chars,
+                           similarity_threshold=0.5)
+    tool_call = AIMessage(content="", tool_calls=[{"name": "get_stock_data", "args": {"ticker": "000001"},
+                                                   "id": "call_1"}])
+    answer = AIMessage(content="技术面偏多")
+    llm = FakeMessagesListChatModel(responses=[tool_call, answer], cache=LangChainResultCache(cache))
+
+    conversation = [SystemMessage(content="你是市场分析师"), HumanMessage(content="请分析 000001 的技术面")]
+    with llm_cache_scope("000001", "2024-05-10"):
+        first = llm.invoke(conversation)
+        conversation += [first, ToolMessage(content="收盘价 10.52，MACD 金叉", tool_call_id="call_1")]
+        second = llm.invoke(conversation)
+
+    assert first.tool_calls and second.content == "技术面偏多"
+    assert cache.semantic_hits == 0
+
+    # 不含工具消息的近似prompt仍可语义命中
+    with llm_cache_scope("000001", "2024-05-10"):
+        again = llm.invoke([SystemMessage(content="你是市场分析师"), HumanMessage(content="请分析000001的技术面。")])
+    assert again.tool_calls and cache.semantic_hits == 1
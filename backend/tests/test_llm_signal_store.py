@@ -0,0 +1,138 @@
+"""
+Unit tests for offline LLM signal store
+
+测试LLM信号离线预计算、断点续跑与环境离线查询模式。
+"""
+
+import threading
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.rl.llm_enhanced_env import LLMEnhancedTradingEnv
+from tradingagents.rl.signal_store import (
+    DEFAULT_SIGNALS,
+    LLMSignalPrecomputer,
+    LLMSignalStore,
+    SignalMissingError,
+    STATUS_ERROR,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = LLMSignalStore(tmp_path / "signals.db")
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def sample_data():
+    dates = pd.date_range('2024-01-01', periods=30, freq='D')
+    return pd.DataFrame({
+        'date': dates,
+        'open': np.linspace(100, 110, 30),
+        'high': np.linspace(101, 111, 30),
+        'low': np.linspace(99, 109, 30),
+        'close': np.linspace(100, 110, 30),
+        'volume': np.full(30, 1_000_000),
+        'tic': ['600519.SH'] * 30,
+    })
+
+
+def _graph_factory(calls):
+    def factory():
+        graph = Mock()
+
+        def propagate(symbol, date):
+            calls.append((symbol, date, threading.get_ident()))
+            if date == '2024-01-03':
+                raise RuntimeError("LLM timeout")
+            return {
+                'llm_analysis': {'recommended_direction': 'long', 'confidence': 0.8, 'risk_score': 0.2},
+                'agent_results': {'a': {'direction': 'long'}, 'b': {'direction': 'short'}},
+            }, {}
+
+        graph.propagate.side_effect = propagate
+        return graph
+    return factory
+
+
+def test_store_roundtrip_normalizes_dates(store):
+    """测试信号写入/读取，日期格式统一"""
+    store.put('600519.SH', pd.Timestamp('2024-01-02'), [1, 0.8, 0.2, 1.0, 0.03, 0.6])
+    signals = store.get('600519.SH', '20240102')
+    np.testing.assert_allclose(signals, [1, 0.8, 0.2, 1.0, 0.03, 0.6], rtol=1e-6)
+    assert store.get('600519.SH', '2024-01-03') is None
+    assert set(store.load_symbol('600519.SH')) == {'2024-01-02'}
+
+
+def test_precompute_parallel_and_resume(store):
+    """测试并行预计算、失败记录与断点续跑"""
+    calls = []
+    tasks = [('600519.SH', d, 100.0) for d in pd.date_range('2024-01-01', periods=6, freq='D')]
+    precomputer = LLMSignalPrecomputer(store, _graph_factory(calls), max_workers=3)
+
+    stats = precomputer.run(tasks)
+    assert stats == {'total': 6, 'skipped': 0, 'computed': 5, 'failed': 1}
+    assert store.count(STATUS_ERROR) == 1
+    np.testing.assert_allclose(store.get('600519.SH', '2024-01-01'), [1.0, 0.8, 0.2, 0.5, 0.0, 0.5], rtol=1e-6)
+
+    # 续跑只重试失败的条目
+    calls.clear()
+    stats = precomputer.run(tasks)
+    assert stats['skipped'] == 5
+    assert [c[1] for c in calls] == ['2024-01-03']
+
+    # 不重试失败条目时全部跳过
+    calls.clear()
+    stats = precomputer.run(tasks, retry_failed=False)
+    assert stats['skipped'] == 6
+    assert calls == []
+
+
+def test_offline_env_reads_table_without_llm_calls(store, sample_data):
+    """测试离线模式从信号表查询，不调用 propagate / retrieve_episodes"""
+    for i, d in enumerate(sample_data['date']):
+        store.put('600519.SH', d, [1.0, 0.9, 0.1, 1.0, 0.01 * i, 0.7])
+
+    graph, memory = Mock(), Mock()
+    env = LLMEnhancedTradingEnv(sample_data, graph, memory, signal_mode='offline', signal_store=store)
+    obs, _ = env.reset()
+    done = False
+    while not done:
+        obs, _, done, _, info = env.step(1)
+
+    graph.propagate.assert_not_called()
+    memory.retrieve_episodes.assert_not_called()
+    assert info['signal_misses'] == 0
+    # 市场特征(5列，无技术指标) 之后依次为 LLM信号(4) + 记忆信号(2)
+    n_market = 5
+    np.testing.assert_allclose(obs[n_market:n_market + 6], [1.0, 0.9, 0.1, 1.0, 0.29, 0.7], rtol=1e-5)
+
+
+def test_offline_env_missing_signal_policies(store, sample_data):
+    """测试离线信号缺失时的处理策略"""
+    store.put('600519.SH', sample_data['date'][0], [1.0, 0.9, 0.1, 1.0, 0.0, 0.7])
+
+    env = LLMEnhancedTradingEnv(sample_data, None, None, signal_mode='offline', signal_store=store)
+    env.reset()
+    obs, _, _, _, _ = env.step(0)
+    np.testing.assert_allclose(obs[5:11], DEFAULT_SIGNALS)
+    assert env.signal_misses == 1
+    assert env.missing_signal_dates == ['2024-01-02']
+
+    strict = LLMEnhancedTradingEnv(
+        sample_data, None, None, signal_mode='offline', signal_store=store, missing_signal_policy='raise'
+    )
+    strict.reset()
+    with pytest.raises(SignalMissingError):
+        strict.step(0)
+
+
+def test_offline_mode_requires_store(sample_data):
+    """测试离线模式必须提供信号表"""
+    with pytest.raises(ValueError):
+        LLMEnhancedTradingEnv(sample_data, None, None, signal_mode='offline')
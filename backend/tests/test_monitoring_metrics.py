@@ -0,0 +1,149 @@
+"""
+监控指标（直方图、分位数草图、标签指标族）测试
+"""
+
+import random
+
+import pytest
+
+from tradingagents.utils.monitoring_metrics import (
+    Counter,
+    Histogram,
+    MetricFamily,
+    MetricsCollector,
+    QuantileSketch,
+)
+
+
+def test_histogram_memory_is_bounded():
+    """直方图不保存原始观测值，草图桶数有上限"""
+    histogram = Histogram(name="latency_seconds", help="test")
+    sketch_limit = QuantileSketch(max_bins=64)
+    histogram.sketch = sketch_limit
+
+    rng = random.Random(1)
+    for _ in range(50_000):
+        histogram.observe(rng.lognormvariate(0, 3))
+
+    assert histogram.count == 50_000
+    assert len(histogram.bucket_counts) == len(histogram.buckets) + 1
+    assert len(sketch_limit.bins) <= 64
+
+
+def test_cumulative_buckets_and_summary():
+    """桶计数为累计值，+Inf 桶等于总数，摘要保留原有字段"""
+    histogram = Histogram(name="latency_seconds", help="test", buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 2.0, 30.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative_buckets() == [(0.1, 2), (1.0, 3), (float("inf"), 5)]
+    summary = histogram.get_summary()
+    assert summary["count"] == 5
+    assert summary["sum"] == pytest.approx(32.65)
+    assert summary["min"] == 0.05
+    assert summary["max"] == 30.0
+    assert summary["avg"] == pytest.approx(6.53)
+    assert set(summary) >= {"p50", "p90", "p99"}
+
+    histogram.reset()
+    assert histogram.get_summary()["count"] == 0
+    assert histogram.cumulative_buckets()[-1] == (float("inf"), 0)
+
+
+def test_quantile_sketch_relative_accuracy():
+    """分位数估计的相对误差在设定精度内"""
+    rng = random.Random(7)
+    values = [rng.expovariate(2.0) for _ in range(20_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_metric_family_labels_and_cardinality_cap():
+    """同一标签值复用子指标，超出标签组合上限后归入 other"""
+    family = MetricFamily(Counter, "requests_total", "test", ("provider",), max_label_sets=2)
+    family.labels("tushare").inc()
+    family.labels(provider="tushare").inc()
+    family.labels("akshare").inc()
+    family.labels("baostock").inc()
+    family.labels("yfinance").inc()
+
+    values = {key: counter.value for key, counter in family.items()}
+    assert values == {("tushare",): 2, ("akshare",): 1, ("other",): 2}
+    assert family.labels("tushare").labels == {"provider": "tushare"}
+
+    with pytest.raises(ValueError):
+        family.labels("a", "b")
+
+
+def test_collector_prometheus_histogram_series():
+    """Prometheus 输出包含带标签的 _bucket/_sum/_count 序列"""
+    collector = MetricsCollector()
+    collector.record_api_request(success=True, duration=0.2, endpoint="/api/v1/agents")
+    collector.record_api_request(success=False, duration=3.0)
+    collector.record_data_source_request("tushare", success=False, duration=0.04)
+    collector.record_llm_usage(tokens=500, cost=0.02, tier="small",
+                               provider="dashscope", agent='market "analyst"', duration=1.5)
+
+    text = collector.get_prometheus_format()
+
+    assert text.count("# TYPE api_request_duration_seconds histogram") == 1
+    assert 'api_request_duration_seconds_bucket{le="0.25"} 1' in text
+    assert 'api_request_duration_seconds_bucket{le="+Inf"} 2' in text
+    assert "api_request_duration_seconds_count 2" in text
+    assert ('api_endpoint_request_duration_seconds_bucket'
+            '{endpoint="/api/v1/agents",status="success",le="+Inf"} 1') in text
+    assert 'data_source_failures_total{provider="tushare"} 1' in text
+    assert 'data_source_request_duration_seconds_sum{provider="tushare"} 0.04' in text
+    assert 'llm_tokens_by_agent_total{provider="dashscope",agent="market \\"analyst\\""} 500' in text
+    assert 'llm_requests_by_tier_total{tier="small"} 1' in text
+    assert 'llm_request_duration_seconds_count{provider="dashscope"} 1' in text
+
+    metrics = collector.get_metrics()
+    assert metrics["api_statistics"]["duration_stats"]["count"] == 2
+    assert metrics["data_sources"]["tushare"]["failed_requests"] == 1
+    assert metrics["llm_usage"]["requests_by_tier"] == {"small": 1}
+
+    collector.reset()
+    assert collector.get_metrics()["api_statistics"]["duration_stats"]["count"] == 0
+    assert "data_source_requests_total" not in collector.get_prometheus_format()
+
+
+def test_get_metrics_does_not_create_label_series():
+    """读取指标不创建空的子序列；未知档位的LLM调用不计入档位统计"""
+    collector = MetricsCollector()
+    collector.record_data_source_request("akshare", success=True)
+    collector.record_llm_usage(tokens=100, cost=0.0, tier=None, provider="deepseek", agent="stock_analysis")
+
+    metrics = collector.get_metrics()
+    assert metrics["data_sources"]["akshare"]["failed_requests"] == 0
+    assert metrics["data_sources"]["akshare"]["duration_stats"]["count"] == 0
+    assert metrics["llm_usage"]["by_agent"][0]["tokens"] == 100
+    assert metrics["llm_usage"]["requests_by_tier"] == {}
+
+    assert collector.data_source_failures.items() == []
+    assert collector.data_source_duration.items() == []
+    assert "data_source_failures_total" not in collector.get_prometheus_format()
+
+
+def test_non_finite_observations_are_dropped():
+    """NaN/Inf 不抛异常，也不改变计数、总和和分位数"""
+    histogram = Histogram(name="latency_seconds", help="test")
+    histogram.observe(0.5)
+    for value in (float("inf"), float("-inf"), float("nan")):
+        histogram.observe(value)
+
+    assert histogram.dropped == 3
+    assert histogram.count == histogram.sketch.count == 1
+    assert histogram.sum == 0.5
+    assert sum(histogram.bucket_counts) == 1
+    assert histogram.quantile(0.99) == pytest.approx(0.5)
+
+    collector = MetricsCollector()
+    collector.record_api_request(success=True, duration=float("nan"), endpoint="/api/v1/analyze")
+    assert "NaN" not in collector.get_prometheus_format()
@@ -0,0 +1,164 @@
+"""
+RealtimeNewsAggregator 并发抓取、截止时间、来源统计与近似去重测试（不访问网络）
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from tradingagents.dataflows import realtime_news_utils
+from tradingagents.dataflows.realtime_news_utils import (
+    NewsItem,
+    RealtimeNewsAggregator,
+    news_source_stats,
+    title_simhash,
+)
+
+
+def make_item(title, source, minutes_ago=0):
+    return NewsItem(
+        title=title,
+        content=title,
+        source=source,
+        publish_time=datetime(2024, 6, 3, 14, 0).replace(minute=59 - minutes_ago),
+        url="",
+        urgency="low",
+        relevance_score=1.0,
+    )
+
+
+def slow_source(delay, items):
+    def fetch(ticker, hours_back):
+        time.sleep(delay)
+        return items
+    return fetch
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    news_source_stats.reset()
+    agg = RealtimeNewsAggregator()
+    agg.newsapi_key = None
+    agg.deadline = 1.0
+    monkeypatch.setattr(agg, "_get_finnhub_realtime_news",
+                        slow_source(0.3, [make_item("Apple shares jump after record iPhone sales", "FinnHub", 1)]))
+    monkeypatch.setattr(agg, "_get_alpha_vantage_news",
+                        slow_source(0.3, [make_item("Apple Shares Jump After Record iPhone Sales!", "AV", 2)]))
+    monkeypatch.setattr(agg, "_get_tushare_news",
+                        slow_source(0.3, [make_item("贵州茅台发布2024年年度报告，净利润同比增长15%", "Tushare", 3)]))
+    monkeypatch.setattr(agg, "_fetch_cls_news",
+                        slow_source(0.3, [make_item("贵州茅台发布2024年一季度报告，净利润同比增长8%", "财联社", 4)]))
+    monkeypatch.setattr(agg, "_fetch_wallstreet_news",
+                        slow_source(5.0, [make_item("This one never arrives in time", "华尔街见闻")]))
+    return agg
+
+
+def test_sources_fetched_concurrently_within_deadline(aggregator):
+    start = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", hours_back=6, max_news=10)
+    elapsed = time.perf_counter() - start
+
+    # 四个0.3秒的新闻源并发完成，5秒的新闻源在1秒截止时间后被放弃
+    assert elapsed < 1.5
+    assert [item.source for item in news] == ["FinnHub", "Tushare", "财联社"]
+
+    stats = aggregator.get_source_stats()
+    assert stats["华尔街见闻"]["timeouts"] == 1
+    assert stats["FinnHub"]["hits"] == 1
+    assert stats["FinnHub"]["avg_latency"] == pytest.approx(0.3, abs=0.2)
+    assert stats["财联社"]["items"] == 1
+
+
+def test_queued_sources_cancelled_at_deadline(aggregator, monkeypatch):
+    # 共享线程池被占满：只有第一个新闻源开始执行，其余在截止时间到达时仍在排队
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(realtime_news_utils, "_fetch_executor", executor)
+    started = []
+
+    def fetch(ticker, hours_back):
+        started.append(ticker)
+        time.sleep(3.0)
+        return []
+
+    monkeypatch.setattr(aggregator, "_get_finnhub_realtime_news", fetch)
+    monkeypatch.setattr(aggregator, "_get_tushare_news", fetch)
+
+    start = time.perf_counter()
+    assert aggregator.get_realtime_stock_news("AAPL", hours_back=6) == []
+    assert time.perf_counter() - start < 1.5
+    executor.shutdown(wait=True)
+
+    # 排队中的请求被取消，从未执行，也不计入新闻源的超时统计
+    assert started == ["AAPL"]
+    stats = aggregator.get_source_stats()
+    assert stats["FinnHub"]["timeouts"] == 1
+    assert "Tushare" not in stats and "财联社" not in stats
+
+
+def test_near_duplicate_titles_collapse():
+    aggregator = RealtimeNewsAggregator()
+    items = [
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns", "Reuters"),
+        make_item("TESLA recalls 2 million vehicles over autopilot concerns.", "Yahoo"),
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns", "MarketWatch"),
+        make_item("央行宣布降准0.5个百分点", "新浪财经"),
+        make_item("央行宣布降准0.5个百分点！", "东方财富"),
+        make_item("央行宣布降息0.25个百分点", "财联社"),
+        make_item("太短", "财联社"),
+    ]
+
+    unique = aggregator._deduplicate_news(items)
+
+    assert [item.source for item in unique] == ["Reuters", "新浪财经", "财联社"]
+
+
+
+def test_syndicated_copies_collapse():
+    """转载时附加来源前后缀的标题视为同一条新闻"""
+    aggregator = RealtimeNewsAggregator()
+    items = [
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns", "Reuters"),
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns - Reuters", "Yahoo"),
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns | Reuters", "MSN"),
+        make_item("Tesla recalls 2 million vehicles over Autopilot concerns (Bloomberg)", "Bloomberg"),
+        make_item("Fed holds rates steady, signals cuts later this year", "Fed"),
+        make_item("Fed holds rates steady, signals cuts later this year - CNBC", "CNBC"),
+        make_item("贵州茅台一季度净利润同比增长15%", "新浪财经"),
+        make_item("【财联社】贵州茅台一季度净利润同比增长15%", "财联社"),
+    ]
+
+    unique = aggregator._deduplicate_news(items)
+
+    assert [item.source for item in unique] == ["Reuters", "Fed", "新浪财经"]
+
+
+def test_distinct_headlines_are_kept():
+    """只差数字或关键字的标题是不同的新闻"""
+    aggregator = RealtimeNewsAggregator()
+    items = [
+        make_item("贵州茅台第一季度净利润同比增长15%", "新浪财经"),
+        make_item("贵州茅台第二季度净利润同比增长15%", "东方财富"),
+        make_item("央行宣布降准0.5个百分点 - 新华社", "新华社"),
+        make_item("央行宣布降准0.25个百分点 - 新华社", "财联社"),
+        make_item("财经 | 贵州茅台第三季度净利润同比增长15%", "证券时报"),
+    ]
+
+    unique = aggregator._deduplicate_news(items)
+
+    assert [item.source for item in unique] == ["新浪财经", "东方财富", "新华社", "财联社", "证券时报"]
+
+
+def test_strip_source_decorations():
+    assert realtime_news_utils.strip_source_decorations("【财联社】央行宣布降准") == "央行宣布降准"
+    assert realtime_news_utils.strip_source_decorations("(Reuters) - Apple shares jump") == "Apple shares jump"
+    assert realtime_news_utils.strip_source_decorations("Apple shares jump - Yahoo Finance") == "Apple shares jump"
+    # 栏目前缀后面的正文不会被当作来源去掉
+    assert realtime_news_utils.strip_source_decorations("财报 | 贵州茅台一季度营收增长") == "财报 | 贵州茅台一季度营收增长"
+
+
+def test_title_simhash_ignores_case_and_punctuation():
+    assert title_simhash("Apple shares jump, again!") == title_simhash("apple SHARES jump again")
+    assert bin(title_simhash("贵州茅台股价创历史新高") ^ title_simhash("宁德时代签署海外合作协议")).count("1") \
+        > realtime_news_utils.SIMHASH_MAX_DISTANCE
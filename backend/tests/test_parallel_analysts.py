@@ -0,0 +1,126 @@
+"""
+GraphSetup 分析师并行模式测试（使用替身节点，不调用LLM）
+"""
+
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import tradingagents.graph.setup as graph_setup
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.setup import ANALYST_REPORT_KEYS, GraphSetup
+
+ANALYSTS = ["market", "social", "news", "fundamentals"]
+ANALYST_DELAY = 0.3
+
+
+@pytest.fixture
+def fake_nodes(monkeypatch):
+    """替换所有节点工厂，分析师节点会休眠并记录运行线程"""
+    threads = set()
+
+    def make_analyst(analyst_type):
+        def create(llm, toolkit):
+            def node(state):
+                threads.add(threading.get_ident())
+                time.sleep(ANALYST_DELAY)
+                report = f"{analyst_type} report for {state['company_of_interest']}"
+                return {"messages": [AIMessage(content=report)], ANALYST_REPORT_KEYS[analyst_type]: report}
+            return node
+        return create
+
+    def debater(prefix):
+        def create(llm, memory=None):
+            def node(state):
+                debate = dict(state["investment_debate_state"])
+                debate["count"] += 1
+                debate["current_response"] = f"{prefix}: ok"
+                return {"investment_debate_state": debate}
+            return node
+        return create
+
+    def risk_debater(prefix):
+        def create(llm):
+            def node(state):
+                debate = dict(state["risk_debate_state"])
+                debate["count"] += 1
+                debate["latest_speaker"] = prefix
+                return {"risk_debate_state": debate}
+            return node
+        return create
+
+    def reporter(key):
+        def create(llm, memory=None):
+            def node(state):
+                assert all(state[k] for k in ANALYST_REPORT_KEYS.values())
+                return {key: key}
+            return node
+        return create
+
+    monkeypatch.setattr(graph_setup, "create_market_analyst", make_analyst("market"))
+    monkeypatch.setattr(graph_setup, "create_social_media_analyst", make_analyst("social"))
+    monkeypatch.setattr(graph_setup, "create_news_analyst", make_analyst("news"))
+    monkeypatch.setattr(graph_setup, "create_fundamentals_analyst", make_analyst("fundamentals"))
+    monkeypatch.setattr(graph_setup, "create_bull_researcher", debater("Bull"))
+    monkeypatch.setattr(graph_setup, "create_bear_researcher", debater("Bear"))
+    monkeypatch.setattr(graph_setup, "create_research_manager", reporter("investment_plan"))
+    monkeypatch.setattr(graph_setup, "create_trader", reporter("trader_investment_plan"))
+    monkeypatch.setattr(graph_setup, "create_risky_debator", risk_debater("Risky"))
+    monkeypatch.setattr(graph_setup, "create_safe_debator", risk_debater("Safe"))
+    monkeypatch.setattr(graph_setup, "create_neutral_debator", risk_debater("Neutral"))
+    monkeypatch.setattr(graph_setup, "create_risk_manager", reporter("final_trade_decision"))
+    return threads
+
+
+def build_graph(parallel):
+    tool_nodes = {analyst: (lambda state: {"messages": []}) for analyst in ANALYSTS}
+    setup = GraphSetup(
+        None, None, None, tool_nodes, None, None, None, None, None,
+        ConditionalLogic(), {"parallel_analysts": parallel},
+    )
+    return setup.setup_graph(ANALYSTS)
+
+
+def initial_state():
+    return {
+        "messages": [("human", "600519.SH")],
+        "company_of_interest": "600519.SH",
+        "trade_date": "2024-06-03",
+        "investment_debate_state": {"history": "", "current_response": "", "count": 0},
+        "risk_debate_state": {"history": "", "latest_speaker": "", "count": 0},
+        "market_report": "",
+        "fundamentals_report": "",
+        "sentiment_report": "",
+        "news_report": "",
+    }
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_reports_match_sequential(fake_nodes, parallel):
+    final_state = build_graph(parallel).invoke(initial_state(), {"recursion_limit": 100})
+
+    for analyst, key in ANALYST_REPORT_KEYS.items():
+        assert final_state[key] == f"{analyst} report for 600519.SH"
+    assert final_state["final_trade_decision"] == "final_trade_decision"
+
+
+def test_parallel_latency_and_progress_updates(fake_nodes):
+    graph = build_graph(parallel=True)
+
+    start = time.perf_counter()
+    updates = list(graph.stream(initial_state(), {"recursion_limit": 100}, stream_mode="updates"))
+    elapsed = time.perf_counter() - start
+
+    # 总耗时接近单个分析师，而不是四个之和
+    assert elapsed < ANALYST_DELAY * len(ANALYSTS) * 0.75
+    assert len(fake_nodes) > 1
+
+    # 每个分析师节点产生一次只含自身报告的更新（进度回调依赖该字段）
+    analyst_updates = {
+        node: update for chunk in updates for node, update in chunk.items() if node.endswith("Analyst")
+        and any(key in (update or {}) for key in ANALYST_REPORT_KEYS.values())
+    }
+    assert sorted(analyst_updates) == sorted(f"{a.capitalize()} Analyst" for a in ANALYSTS)
+    assert analyst_updates["News Analyst"] == {"news_report": "news report for 600519.SH"}
@@ -0,0 +1,254 @@
+"""
+Parallel Time Travel training tests: bounded concurrency, date-ordered memory commits,
+no look-ahead memory reads and per-shard checkpoint resume (fake graph, no LLM/network)
+"""
+
+import json
+import random
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+training = pytest.importorskip("scripts.enhanced_time_travel_training")
+if not training.MEMORY_AVAILABLE:
+    pytest.skip("Memory system not available", allow_module_level=True)
+
+from tradingagents.utils.task_monitor import get_task_monitor
+
+SYMBOLS = ["600519.SH", "000001.SZ"]
+HOLDING_DAYS = 3
+TRADING_DAYS = pd.bdate_range("2024-01-01", "2024-04-30")
+
+
+class FakeGraph:
+    """propagate() with random latency; records calls and peak concurrency"""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    calls = []
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.log_states_dict = {}
+        self._log_lock = threading.Lock()
+
+    share_state_log = training.TradingAgentsGraph.share_state_log
+    _log_state = training.TradingAgentsGraph._log_state
+
+    @classmethod
+    def reset(cls):
+        cls.active, cls.peak, cls.calls = 0, 0, []
+
+    def propagate(self, symbol, trade_date):
+        with FakeGraph.lock:
+            FakeGraph.active += 1
+            FakeGraph.peak = max(FakeGraph.peak, FakeGraph.active)
+            FakeGraph.calls.append((symbol, trade_date))
+        time.sleep(self.rng.uniform(0.002, 0.01))
+        with FakeGraph.lock:
+            FakeGraph.active -= 1
+
+        action = "买入" if pd.Timestamp(trade_date).day % 2 else "卖出"
+        debate = {"bull_history": "", "bear_history": "", "history": "", "current_response": "",
+                  "judge_decision": action}
+        risk = {"risky_history": "", "safe_history": "", "neutral_history": "", "history": "",
+                "judge_decision": action}
+        final_state = {
+            "company_of_interest": symbol,
+            "trade_date": trade_date,
+            "market_report": f"{symbol} {trade_date}",
+            "sentiment_report": "", "news_report": "", "fundamentals_report": "",
+            "investment_debate_state": debate,
+            "trader_investment_plan": "", "investment_plan": "",
+            "risk_debate_state": risk,
+            "final_trade_decision": action,
+        }
+        self.ticker = symbol
+        self._log_state(trade_date, final_state)
+        return final_state, {"action": action}
+
+
+class FakeMemoryManager:
+    """Records committed episodes and what each retrieval could see"""
+
+    def __init__(self):
+        self.committed = []
+        self.maxims = []
+        self.visible = {}
+        self.failing_dates = set()
+
+    def retrieve_episodes(self, query_context, top_k=5, filter_criteria=None):
+        key = (query_context["symbol"], query_context["date"])
+        self.visible[key] = tuple(self.committed)
+        return []
+
+    def add_episodes(self, episodes):
+        if any(episode.date in self.failing_dates for episode in episodes):
+            return 0
+        self.committed.extend(episode.episode_id for episode in episodes)
+        return len(episodes)
+
+    def batch_add_maxims(self, agent_name, situations_and_advice):
+        self.maxims.extend((agent_name, situation) for situation, _ in situations_and_advice)
+        return True
+
+
+def fake_preload(self):
+    rng = random.Random(self.symbol)
+    close = [10 + rng.uniform(-1, 1) for _ in TRADING_DAYS]
+    self.data_cache = pd.DataFrame({
+        "trade_date": TRADING_DAYS,
+        "open": close, "high": [c * 1.01 for c in close], "low": [c * 0.99 for c in close],
+        "close": close, "vol": 1000.0,
+    })
+    self.date_index = {str(d)[:10]: i for i, d in enumerate(self.data_cache["trade_date"])}
+
+
+@pytest.fixture
+def make_trainer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(training.EnhancedTimeTravelTrainer, "_preload_data", fake_preload)
+    monkeypatch.setattr(get_task_monitor(), "checkpoint_dir", tmp_path)
+    FakeGraph.reset()
+
+    created = []
+
+    def factory(max_workers, wave_days=2, seed=0):
+        seeds = iter(range(seed, seed + 100))
+
+        def graph_factory():
+            graph = FakeGraph(next(seeds))
+            created.append(graph)
+            return graph
+
+        trainer = training.ParallelTimeTravelTrainer(
+            symbols=SYMBOLS, start_date="2024-01-02", end_date="2024-02-29",
+            holding_days=HOLDING_DAYS, config={}, max_workers=max_workers, wave_days=wave_days,
+            graph_factory=graph_factory, memory_manager=FakeMemoryManager(),
+        )
+        get_task_monitor().delete_checkpoint(trainer.task_id)
+        trainer.graphs = created
+        return trainer
+
+    return factory
+
+
+def day_index(date_str):
+    return TRADING_DAYS.get_loc(pd.Timestamp(date_str))
+
+
+def test_parallel_commits_in_date_order_without_lookahead(make_trainer):
+    trainer = make_trainer(max_workers=4)
+    trainer.run()
+    memory = trainer.memory_manager
+
+    assert 1 < FakeGraph.peak <= 4
+    assert len(trainer.graphs) <= 4
+    assert len(FakeGraph.calls) == len(trainer.build_shards())
+
+    committed = [tuple(episode_id.split("_")) for episode_id in memory.committed]
+    assert committed == sorted(committed)
+    assert len(memory.maxims) == len(committed)
+    assert sum(t.total_episodes for t in trainer.trainers.values()) == len(committed)
+
+    # Every episode seen on day D had its outcome known by D
+    for (_, date), visible in memory.visible.items():
+        for episode_id in visible:
+            assert day_index(episode_id.split("_")[0]) + HOLDING_DAYS <= day_index(date)
+
+    checkpoint = get_task_monitor().get_checkpoint(trainer.task_id)
+    assert checkpoint.status == "COMPLETED"
+    assert len(checkpoint.completed_shards) == len(trainer.build_shards())
+
+
+def test_parallel_results_independent_of_scheduling(make_trainer):
+    sequential = make_trainer(max_workers=1, wave_days=3, seed=1)
+    sequential.run()
+    parallel = make_trainer(max_workers=6, wave_days=3, seed=2)
+    parallel.run()
+
+    assert parallel.memory_manager.committed == sequential.memory_manager.committed
+    assert parallel.memory_manager.visible == sequential.memory_manager.visible
+    for symbol in SYMBOLS:
+        assert ([r["metadata"] for r in parallel.trainers[symbol].episodes_for_export]
+                == [r["metadata"] for r in sequential.trainers[symbol].episodes_for_export])
+
+
+def test_resume_skips_completed_shards(make_trainer):
+    trainer = make_trainer(max_workers=3)
+    shards = trainer.build_shards()
+    monitor = get_task_monitor()
+
+    monitor.start_task(trainer.task_id, "TIME_TRAVEL_TRAINING", total_steps=len(shards))
+    done = [shard.shard_id for shard in shards[:10]]
+    monitor.mark_shards_completed(trainer.task_id, done + done[:2])
+    checkpoint = monitor.get_checkpoint(trainer.task_id)
+    assert checkpoint.completed_steps == 10
+    assert checkpoint.progress == pytest.approx(10 / len(shards))
+
+    trainer.run()
+
+    called = {f"{symbol}@{date}" for symbol, date in FakeGraph.calls}
+    assert called.isdisjoint(done)
+    assert len(called) == len(shards) - 10
+    assert monitor.get_completed_shards(trainer.task_id) == {shard.shard_id for shard in shards}
+
+
+def test_failed_memory_write_is_not_checkpointed(make_trainer):
+    trainer = make_trainer(max_workers=3)
+    shards = trainer.build_shards()
+    memory = trainer.memory_manager
+    memory.failing_dates = {"2024-01-10"}
+    trainer.run()
+
+    monitor = get_task_monitor()
+    completed = monitor.get_completed_shards(trainer.task_id)
+    assert monitor.get_checkpoint(trainer.task_id).status == "FAILED"
+    assert trainer.unwritten_shards and completed.isdisjoint(trainer.unwritten_shards)
+    # Checkpoint is a date-ordered prefix that stops before the failed write
+    assert all(shard.date < pd.Timestamp("2024-01-10") for shard in shards if shard.shard_id in completed)
+    assert sum(t.total_episodes for t in trainer.trainers.values()) == len(memory.committed)
+
+    # Resume re-analyzes every uncommitted shard
+    memory.failing_dates = set()
+    FakeGraph.reset()
+    trainer.run()
+
+    called = {f"{symbol}@{date}" for symbol, date in FakeGraph.calls}
+    assert called == {shard.shard_id for shard in shards} - completed
+    assert monitor.get_checkpoint(trainer.task_id).status == "COMPLETED"
+    assert monitor.get_completed_shards(trainer.task_id) == {shard.shard_id for shard in shards}
+    assert sum(t.total_episodes for t in trainer.trainers.values()) == len(memory.committed)
+
+
+def test_graph_factory_failure_marks_task_failed(make_trainer):
+    trainer = make_trainer(max_workers=3)
+
+    def broken_factory():
+        raise RuntimeError("LLM provider unavailable")
+
+    # The constructor's graph is already pooled; the next worker needs a new one
+    trainer.graph_factory = broken_factory
+    with pytest.raises(RuntimeError, match="LLM provider unavailable"):
+        trainer.run()
+
+    checkpoint = get_task_monitor().get_checkpoint(trainer.task_id)
+    assert checkpoint.status == "FAILED"
+    assert "LLM provider unavailable" in checkpoint.error
+
+
+def test_pooled_graphs_share_one_state_log(make_trainer, tmp_path):
+    trainer = make_trainer(max_workers=4)
+    trainer.run()
+
+    assert len(trainer.graphs) > 1
+    assert all(graph.log_states_dict is trainer.graphs[0].log_states_dict for graph in trainer.graphs)
+    for symbol in SYMBOLS:
+        log_file = tmp_path / "eval_results" / symbol / "TradingAgentsStrategy_logs" / "full_states_log.json"
+        logged = json.loads(log_file.read_text())
+        expected = [s.date.strftime("%Y-%m-%d") for s in trainer.build_shards() if s.symbol == symbol]
+        assert list(logged) == expected
+        assert all(state["company_of_interest"] == symbol for state in logged.values())
@@ -0,0 +1,142 @@
+"""
+行情后台轮询与增量推送测试
+"""
+
+import asyncio
+import json
+
+import pandas as pd
+
+from api.services.quote_poller import QuotePoller
+from api.services.quote_snapshot import QuoteSnapshot
+from api.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """记录发送内容的WebSocket替身"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.messages.append(json.loads(text))
+
+
+def make_snapshot(prices: dict) -> QuoteSnapshot:
+    df = pd.DataFrame({
+        "symbol": list(prices),
+        "name": list(prices),
+        "close": list(prices.values()),
+        "pre_close": 10.0, "open": 10.0, "high": 12.0, "low": 9.0,
+        "change": 0.0, "pct_chg": 0.0, "vol": 100.0, "amount": 1000.0,
+    })
+    return QuoteSnapshot.from_minishare(df)
+
+
+class SnapshotSource:
+    """按顺序返回预设快照，记录上游调用次数"""
+
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.snapshots.pop(0)
+
+
+def _market_data(ws):
+    return [m for m in ws.messages if m["type"] == "market_data"]
+
+
+def test_pushes_only_changed_symbols():
+    """首次推送全部订阅股票，之后只推送价格变化的股票"""
+    async def main():
+        manager = ConnectionManager()
+        source = SnapshotSource([
+            make_snapshot({"000001": 10.0, "600519": 1500.0, "300750": 200.0}),
+            make_snapshot({"000001": 10.1, "600519": 1500.0, "300750": 200.0}),
+        ])
+        poller = QuotePoller(source, manager, interval=0.01)
+
+        ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+        for ws in (ws_a, ws_b):
+            await manager.connect(ws)
+        await manager.subscribe(ws_a, "000001.SZ")
+        await manager.subscribe(ws_b, "600519.SH")
+
+        assert await poller.poll_once() == 2
+        await manager.flush()
+        assert await poller.poll_once() == 1
+        await manager.flush()
+        return source, ws_a, ws_b
+
+    source, ws_a, ws_b = asyncio.run(main())
+
+    assert source.calls == 2
+    assert [m["price"] for m in _market_data(ws_a)] == [10.0, 10.1]
+    assert _market_data(ws_a)[0]["symbol"] == "000001.SZ"
+    assert [m["price"] for m in _market_data(ws_b)] == [1500.0]
+
+
+def test_no_upstream_call_without_subscribers_or_when_closed():
+    """无订阅者时不刷新；休市且已有快照时不刷新"""
+    async def main():
+        manager = ConnectionManager()
+        market_open = {"value": True}
+        source = SnapshotSource([make_snapshot({"000001": 10.0})])
+        poller = QuotePoller(source, manager, is_market_open=lambda: market_open["value"])
+
+        await poller.poll_once()
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.subscribe(ws, "000001")
+        await poller.poll_once()
+        market_open["value"] = False
+        await poller.poll_once()
+        return source, poller
+
+    source, poller = asyncio.run(main())
+
+    assert source.calls == 1
+    assert poller.stats["idle_skips"] == 1
+    assert poller.stats["closed_skips"] == 1
+
+
+def test_background_task_and_send_latest():
+    """后台任务按周期轮询，新订阅者可立即收到最新行情"""
+    async def main():
+        manager = ConnectionManager()
+        snapshot = make_snapshot({"000001": 10.0, "600519": 1500.0})
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return snapshot
+
+        poller = QuotePoller(fetch, manager, interval=0.01)
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.subscribe(ws, "000001")
+
+        poller.start()
+        await asyncio.sleep(0.1)
+        await poller.stop()
+
+        late = FakeWebSocket()
+        await manager.connect(late)
+        await manager.subscribe(late, "600519")
+        await poller.send_latest(late, "600519")
+        await manager.flush()
+        return calls, ws, late, poller
+
+    calls, ws, late, poller = asyncio.run(main())
+
+    assert len(calls) >= 3
+    # 同一快照对象不重复推送
+    assert len(_market_data(ws)) == 1
+    assert _market_data(late)[0]["price"] == 1500.0
+    assert not poller.running
@@ -0,0 +1,112 @@
+"""
+全市场行情快照测试
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.services.quote_snapshot import QuoteSnapshot
+
+
+def make_market_frame(n: int = 50, seed: int = 0) -> pd.DataFrame:
+    """生成 MiniShare rt_k_ms 格式的全量行情"""
+    rng = np.random.default_rng(seed)
+    pre_close = rng.uniform(5, 100, n)
+    close = pre_close * (1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame({
+        "ts_code": [f"{i:06d}.SZ" for i in range(n)],
+        "symbol": [f"{i:06d}" for i in range(n)],
+        "name": [f"股票{i}" for i in range(n)],
+        "pre_close": pre_close,
+        "open": pre_close * (1 + rng.normal(0, 0.01, n)),
+        "high": np.maximum(close, pre_close) * 1.01,
+        "low": np.minimum(close, pre_close) * 0.99,
+        "close": close,
+        "change": close - pre_close,
+        "pct_chg": (close / pre_close - 1) * 100,
+        "vol": rng.integers(1_000, 1_000_000, n).astype(float),
+        "amount": rng.uniform(1e6, 1e9, n),
+    })
+
+
+def legacy_convert(row: pd.Series, symbol: str) -> dict:
+    """原逐行转换逻辑（不含 timestamp）"""
+    return {
+        "symbol": symbol,
+        "name": row['name'],
+        "price": float(row['close']),
+        "change": float(row['pct_chg']),
+        "change_amount": float(row['change']),
+        "volume": int(row['vol']),
+        "turnover": int(row['amount']),
+        "amplitude": float(row['high'] - row['low']) / float(row['pre_close']) * 100 if row['pre_close'] > 0 else 0,
+        "high": float(row['high']),
+        "low": float(row['low']),
+        "open": float(row['open']),
+        "prev_close": float(row['pre_close']),
+        "volume_ratio": float(row.get('volume_ratio', 0)),
+        "turnover_rate": float(row.get('turnover_rate', 0)),
+        "pe_ratio": float(row.get('pe_ttm', 0)),
+        "pb_ratio": float(row.get('pb', 0)),
+        "total_market_cap": 0,
+        "circulation_market_cap": 0,
+    }
+
+
+def test_snapshot_matches_row_conversion():
+    """快照字段与逐行转换一致，代码可带交易所后缀"""
+    df = make_market_frame()
+    df.loc[3, "pre_close"] = 0.0
+    df["pe_ttm"] = np.linspace(5, 50, len(df))
+    snapshot = QuoteSnapshot.from_minishare(df)
+
+    for i in (0, 3, 17, 49):
+        row = df.iloc[i]
+        symbol = f"{row['symbol']}.SZ"
+        quote = snapshot.get(symbol)
+        timestamp = quote.pop("timestamp")
+        expected = legacy_convert(row, symbol)
+        assert quote.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, float):
+                assert math.isclose(quote[key], value, rel_tol=1e-12), key
+            else:
+                assert quote[key] == value, key
+        assert timestamp == snapshot.fetched_at.isoformat()
+
+
+def test_batch_lookup_and_missing_symbols():
+    """批量查询保留调用方传入的代码，未找到的代码被忽略"""
+    snapshot = QuoteSnapshot.from_minishare(make_market_frame())
+
+    quotes = snapshot.get_many(["000001", "000002.SZ", "999999"])
+
+    assert list(quotes) == ["000001", "000002.SZ"]
+    assert quotes["000002.SZ"]["symbol"] == "000002.SZ"
+    assert "000001.SH" in snapshot and "999999" not in snapshot
+
+
+def test_snapshot_is_immutable_and_keeps_first_duplicate():
+    """返回副本不影响快照；重复代码取首行（与原 iloc[0] 一致）"""
+    df = make_market_frame(5)
+    df = pd.concat([df, df.iloc[[1]].assign(close=-1.0)], ignore_index=True)
+    snapshot = QuoteSnapshot.from_minishare(df)
+
+    quote = snapshot.get("000001")
+    quote["price"] = 0.0
+
+    assert len(snapshot) == 5
+    assert snapshot.get("000001")["price"] == pytest.approx(df.loc[1, "close"])
+    with pytest.raises(TypeError):
+        snapshot._quotes["000001"] = {}
+
+
+def test_empty_snapshot():
+    """空行情表得到空快照"""
+    snapshot = QuoteSnapshot.from_minishare(pd.DataFrame())
+    assert len(snapshot) == 0
+    assert snapshot.get("000001") is None
+    assert snapshot.get_many(["000001"]) == {}
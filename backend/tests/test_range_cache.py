@@ -0,0 +1,148 @@
+"""
+区间感知日线缓存测试
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from tradingagents.dataflows.frame_storage import CsvFrameSerializer
+from tradingagents.dataflows.range_cache import OHLCVRangeStore, merge_ranges, subtract_ranges
+
+
+class FakeProvider:
+    """记录调用区间的模拟数据源"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        dates = pd.bdate_range(start_date, end_date)
+        return pd.DataFrame({
+            'date': dates.strftime('%Y-%m-%d'),
+            'close': [float(d.day) for d in dates],
+        })
+
+
+def test_subtract_and_merge_ranges():
+    covered = [(date(2024, 1, 1), date(2024, 1, 10)), (date(2024, 1, 20), date(2024, 1, 31))]
+    gaps = subtract_ranges(date(2023, 12, 25), date(2024, 2, 5), covered)
+    assert gaps == [
+        (date(2023, 12, 25), date(2023, 12, 31)),
+        (date(2024, 1, 11), date(2024, 1, 19)),
+        (date(2024, 2, 1), date(2024, 2, 5)),
+    ]
+    assert merge_ranges(covered + gaps) == [(date(2023, 12, 25), date(2024, 2, 5))]
+
+
+def test_sub_range_served_locally(tmp_path):
+    """已缓存区间的子区间不再请求数据源"""
+    store = OHLCVRangeStore(store_dir=str(tmp_path))
+    provider = FakeProvider()
+
+    full = store.get_range('tushare', '000001', '2023-01-01', '2023-12-31', provider)
+    sub = store.get_range('tushare', '000001', '2023-03-01', '2023-03-31', provider)
+
+    assert len(provider.calls) == 1
+    assert sub['date'].min() >= '2023-03-01' and sub['date'].max() <= '2023-03-31'
+    assert len(sub) == len(full[(full['date'] >= '2023-03-01') & (full['date'] <= '2023-03-31')])
+
+
+def test_only_gaps_are_fetched(tmp_path):
+    """重叠请求只补齐缺失区间，并与已有数据合并"""
+    store = OHLCVRangeStore(store_dir=str(tmp_path))
+    provider = FakeProvider()
+
+    store.get_range('akshare', '600519', '2023-02-01', '2023-02-28', provider)
+    result = store.get_range('akshare', '600519', '2023-01-01', '2023-03-31', provider)
+
+    assert provider.calls[1:] == [('2023-01-01', '2023-01-31'), ('2023-03-01', '2023-03-31')]
+    assert result['date'].is_monotonic_increasing
+    assert not result['date'].duplicated().any()
+    assert len(result) == len(pd.bdate_range('2023-01-01', '2023-03-31'))
+
+
+def test_failed_fetch_not_marked_covered(tmp_path):
+    """空结果不记为已覆盖，下次会重试"""
+    store = OHLCVRangeStore(store_dir=str(tmp_path))
+    calls = []
+
+    def failing(symbol, start_date, end_date):
+        calls.append((start_date, end_date))
+        return pd.DataFrame()
+
+    assert store.get_range('tushare', '000002', '2023-01-01', '2023-01-31', failing).empty
+    assert store.missing_ranges('tushare', '000002', '2023-01-01', '2023-01-31') == [
+        (date(2023, 1, 1), date(2023, 1, 31))
+    ]
+
+
+def test_only_returned_dates_marked_covered(tmp_path):
+    """数据源返回其它日期范围的数据（如适配器旧缓存）时，不把缺口记为已覆盖"""
+    store = OHLCVRangeStore(store_dir=str(tmp_path))
+    stale = FakeProvider()('000001', '2023-01-01', '2023-03-31')
+
+    result = store.get_range('tushare', '000001', '2023-04-01', '2023-06-30', lambda *args: stale)
+    assert result.empty
+    assert store.missing_ranges('tushare', '000001', '2023-04-01', '2023-06-30') == [
+        (date(2023, 4, 1), date(2023, 6, 30))
+    ]
+
+    # 部分返回时只覆盖实际返回的日期
+    partial = FakeProvider()('000001', '2023-04-03', '2023-05-31')
+    store.get_range('tushare', '000001', '2023-04-01', '2023-06-30', lambda *args: partial)
+    assert store.missing_ranges('tushare', '000001', '2023-04-01', '2023-06-30') == [
+        (date(2023, 6, 1), date(2023, 6, 30))
+    ]
+
+
+def test_non_trading_edges_marked_covered(tmp_path):
+    """区间边缘的周末/节假日返回空结果是合法的，记为已覆盖，不再重复请求"""
+    holidays = {date(2023, 1, 2)}
+
+    def checker(start, end):
+        return any(d.weekday() < 5 and d.date() not in holidays for d in pd.date_range(start, end))
+
+    store = OHLCVRangeStore(store_dir=str(tmp_path), trading_day_checker=checker)
+    provider = FakeProvider()
+
+    # 2023-01-01 周日, 01-02 元旦调休, 01-07/08 周末
+    store.get_range('tushare', '000001', '2022-12-31', '2023-01-08',
+                    lambda *args: provider('000001', '2023-01-03', '2023-01-06'))
+    store.get_range('tushare', '000001', '2022-12-31', '2023-01-08', provider)
+
+    assert len(provider.calls) == 1
+    assert store.missing_ranges('tushare', '000001', '2022-12-31', '2023-01-08') == []
+    assert store.get_stats() == {'provider_calls': 1, 'local_hits': 1}
+
+
+def test_format_change_loads_stored_format(tmp_path):
+    """切换存储格式后仍按覆盖文件记录的格式读取，不会返回空结果"""
+    provider = FakeProvider()
+    OHLCVRangeStore(store_dir=str(tmp_path), frame_format='csv').get_range(
+        'tushare', '000001', '2023-01-01', '2023-01-31', provider)
+
+    class OtherFormat(CsvFrameSerializer):
+        format_name = "other"
+        file_extension = "other"
+
+    store = OHLCVRangeStore(store_dir=str(tmp_path))
+    store.serializer = OtherFormat()
+    result = store.get_range('tushare', '000001', '2023-01-01', '2023-01-31', provider)
+
+    assert len(provider.calls) == 1
+    assert len(result) == len(pd.bdate_range('2023-01-01', '2023-01-31'))
+
+
+def test_missing_data_file_is_refetched(tmp_path):
+    """覆盖文件记录的数据文件丢失时按未覆盖处理，重新请求数据源"""
+    store = OHLCVRangeStore(store_dir=str(tmp_path), frame_format='csv')
+    provider = FakeProvider()
+    store.get_range('tushare', '000001', '2023-01-01', '2023-01-31', provider)
+    (tmp_path / 'tushare' / '000001.csv').unlink()
+
+    result = store.get_range('tushare', '000001', '2023-01-01', '2023-01-31', provider)
+
+    assert len(provider.calls) == 2
+    assert len(result) == len(pd.bdate_range('2023-01-01', '2023-01-31'))
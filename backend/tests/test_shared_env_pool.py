@@ -0,0 +1,141 @@
+"""
+Unit Tests for Shared Environment Pool
+
+多进程RL训练共享行情数据与环境工厂单元测试
+"""
+
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gymnasium")
+
+from trading.enhanced_trading_env import EnhancedTradingEnv
+from trading.shared_env_pool import (
+    SharedMarketData,
+    SharedPoolTradingEnv,
+    make_shared_env_factories,
+    split_symbols,
+)
+
+
+def _make_ohlcv(days: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.005, days)),
+        'high': close * (1 + np.abs(rng.normal(0, 0.01, days))),
+        'low': close * (1 - np.abs(rng.normal(0, 0.01, days))),
+        'close': close,
+        'volume': rng.integers(1_000_000, 5_000_000, days).astype(float),
+    })
+
+
+@pytest.fixture
+def stock_data():
+    return [(f"60000{i}", _make_ohlcv(80 + 10 * i, seed=i)) for i in range(3)]
+
+
+@pytest.fixture
+def shared(stock_data):
+    data = SharedMarketData.create(stock_data)
+    yield data
+    data.close()
+    data.unlink()
+
+
+def _run_episode(env, seed=0):
+    rng = np.random.default_rng(seed)
+    observations = [env.reset(seed=seed)[0]]
+    done = False
+    while not done:
+        obs, _, done, _, _ = env.step(int(rng.integers(0, 5)))
+        observations.append(obs)
+    return np.array(observations)
+
+
+def _worker_episode_sum(factory, queue):
+    env = factory()
+    obs = _run_episode(env)
+    queue.put((env.current_symbol, float(obs.sum()), len(obs)))
+    env.close()
+
+
+def test_split_symbols():
+    """测试股票分配"""
+    assert split_symbols(5, 2) == [[0, 2, 4], [1, 3]]
+    assert split_symbols(2, 3) == [[0], [1], [0]]
+
+
+def test_pool_env_matches_regular_env(stock_data, shared):
+    """测试共享内存环境与普通环境观察一致，且不复制特征矩阵"""
+    env = SharedPoolTradingEnv(shared.spec, [1])
+    try:
+        expected = _run_episode(EnhancedTradingEnv(stock_data[1][1]))
+        np.testing.assert_array_equal(_run_episode(env), expected)
+        assert np.shares_memory(env._env._features, env._data.features(1))
+        assert env.current_symbol == "600001"
+    finally:
+        env.close()
+
+
+def test_worker_process_attaches_shared_memory(stock_data, shared):
+    """测试spawn的worker进程挂载共享内存运行环境"""
+    factories = make_shared_env_factories(shared.spec, n_envs=3, monitor=False)
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_worker_episode_sum, args=(factories[2], queue))
+    process.start()
+    symbol, total, length = queue.get(timeout=60)
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
+    assert symbol == "600002"
+    expected = _run_episode(EnhancedTradingEnv(stock_data[2][1]))
+    assert length == len(expected)
+    assert total == pytest.approx(float(expected.sum()), rel=1e-6)
+
+    # worker退出后主进程的共享内存仍然有效
+    assert shared.features(0).shape[0] == len(stock_data[0][1])
+
+
+def test_subproc_vec_env_smoke(shared):
+    """测试SubprocVecEnv以spawn方式启动共享内存环境并完成若干步"""
+    vec_env_module = pytest.importorskip("stable_baselines3.common.vec_env")
+
+    vec_env = vec_env_module.SubprocVecEnv(
+        make_shared_env_factories(shared.spec, n_envs=2), start_method='spawn'
+    )
+    try:
+        obs = vec_env.reset()
+        assert obs.shape[0] == 2
+        for _ in range(10):
+            obs, rewards, dones, infos = vec_env.step(np.zeros(2, dtype=np.int64))
+        assert obs.shape[0] == 2
+        assert rewards.shape == (2,)
+        assert np.isfinite(obs).all()
+    finally:
+        vec_env.close()
+
+
+def test_stop_event_ends_learning_early(shared):
+    """测试线程模式停止信号：置位后 model.learn 在下一步结束"""
+    import threading
+
+    training = pytest.importorskip("scripts.train_rl_production")
+    vec_env_module = pytest.importorskip("stable_baselines3.common.vec_env")
+    from stable_baselines3 import PPO
+
+    vec_env = vec_env_module.SubprocVecEnv(
+        make_shared_env_factories(shared.spec, n_envs=2), start_method='spawn'
+    )
+    try:
+        stop_event = threading.Event()
+        stop_event.set()
+        model = PPO("MlpPolicy", vec_env, n_steps=16, batch_size=16, n_epochs=1, device='cpu')
+        model.learn(total_timesteps=10_000, callback=training.StopTrainingCallback(stop_event))
+        assert model.num_timesteps <= 2
+    finally:
+        vec_env.close()
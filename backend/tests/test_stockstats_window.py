@@ -0,0 +1,96 @@
+"""
+stockstats 指标窗口计算测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from stockstats import wrap
+
+from tradingagents.dataflows import interface
+from tradingagents.dataflows.stockstats_utils import StockstatsUtils, NOT_TRADING_DAY
+
+SYMBOL = "TEST"
+
+
+@pytest.fixture
+def price_dir(tmp_path, monkeypatch):
+    """在临时目录生成离线YFin格式的行情CSV"""
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    close = 100 + np.cumsum(rng.normal(0, 1, len(dates)))
+    data = pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d 00:00:00-05:00"),
+        "Open": close + rng.normal(0, 0.5, len(dates)),
+        "High": close + 1.5,
+        "Low": close - 1.5,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, len(dates)).astype(float),
+    })
+    price_dir = tmp_path / "market_data" / "price_data"
+    price_dir.mkdir(parents=True)
+    data.to_csv(price_dir / f"{SYMBOL}-YFin-data-2015-01-01-2025-03-25.csv", index=False)
+
+    monkeypatch.setattr(interface, "DATA_DIR", str(tmp_path))
+    StockstatsUtils.clear_cache()
+    yield price_dir
+    StockstatsUtils.clear_cache()
+
+
+def _reference_window(price_dir, indicator, curr_date, look_back_days):
+    """原实现的结果：对完整行情计算指标后逐日取值"""
+    data = pd.read_csv(price_dir / f"{SYMBOL}-YFin-data-2015-01-01-2025-03-25.csv")
+    df = wrap(data)
+    values = dict(zip(df["Date"].str[:10], df[indicator].values))
+    end = pd.Timestamp(curr_date)
+    lines = []
+    day = end
+    while day >= end - pd.DateOffset(days=look_back_days):
+        key = day.strftime("%Y-%m-%d")
+        if key in values:
+            lines.append(f"{key}: {values[key]}")
+        day -= pd.DateOffset(days=1)
+    return lines
+
+
+@pytest.mark.parametrize("indicator", ["rsi", "macd", "close_50_sma", "boll_ub", "atr", "mfi"])
+def test_window_matches_per_day_lookup(price_dir, indicator):
+    """窗口结果与逐日重新加载计算的结果一致"""
+    report = interface.get_stock_stats_indicators_window(SYMBOL, indicator, "2023-10-13", 60, False)
+
+    body = report.split("\n\n")[1].strip().splitlines()
+    assert body == _reference_window(price_dir, indicator, "2023-10-13", 60)
+    assert report.startswith(f"## {indicator} values from 2023-08-14 to 2023-10-13:")
+
+
+def test_frame_memoized_per_symbol_and_date(price_dir):
+    """同一 (股票, 日期) 的多个指标只加载一次行情"""
+    for indicator in ("rsi", "macd", "boll", "close_10_ema"):
+        interface.get_stock_stats_indicators_window(SYMBOL, indicator, "2023-10-13", 30, False)
+    assert StockstatsUtils.frame_cache_misses == 1
+    assert StockstatsUtils.frame_cache_hits == 3
+
+    interface.get_stock_stats_indicators_window(SYMBOL, "rsi", "2023-10-16", 30, False)
+    assert StockstatsUtils.frame_cache_misses == 2
+
+
+def test_multi_indicator_window_excludes_future_rows(price_dir):
+    """多指标一次计算，窗口只包含截止日期及之前的交易日"""
+    window = StockstatsUtils.get_stock_stats_window(
+        SYMBOL, ["rsi", "macd", "macds"], "2023-10-15", 10, str(price_dir)
+    )
+
+    assert list(window.columns) == ["rsi", "macd", "macds"]
+    assert window.index.tolist() == [
+        "2023-10-05", "2023-10-06", "2023-10-09", "2023-10-10",
+        "2023-10-11", "2023-10-12", "2023-10-13",
+    ]
+    frame = StockstatsUtils.get_indicator_frame(SYMBOL, "2023-10-15", str(price_dir))
+    assert frame.df["Date"].str[:10].max() == "2023-10-13"
+
+
+def test_single_day_lookup_uses_cached_frame(price_dir):
+    """get_stockstats_indicator 复用同一行情表，非交易日返回提示"""
+    expected = _reference_window(price_dir, "rsi", "2023-10-13", 0)[0].split(": ")[1]
+    assert interface.get_stockstats_indicator(SYMBOL, "rsi", "2023-10-13", False) == expected
+    assert StockstatsUtils.get_stock_stats(SYMBOL, "rsi", "2023-10-14", str(price_dir)) == NOT_TRADING_DAY
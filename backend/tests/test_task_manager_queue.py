@@ -0,0 +1,248 @@
+"""
+任务管理器优先级队列与工作池测试
+"""
+
+import asyncio
+import json
+import operator
+import threading
+
+import pytest
+
+from api.services.task_manager import TaskManager, TaskPriority, TaskQueueFull, TaskStatus
+from api.websocket.manager import ConnectionManager
+
+
+def make_manager(max_concurrent: int = 2, max_queue: int = 100) -> TaskManager:
+    """创建独立的 TaskManager（不影响全局单例）"""
+    manager = object.__new__(TaskManager)
+    manager._initialized = False
+    manager.__init__()
+    manager.max_concurrent_tasks = max_concurrent
+    manager.max_queue_size = max_queue
+    return manager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.messages.append(json.loads(text))
+
+
+async def wait_done(manager: TaskManager, task_ids, timeout: float = 5.0):
+    finished = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not all(manager.tasks[t].status in finished for t in task_ids):
+        assert loop.time() < deadline, "tasks did not finish"
+        await asyncio.sleep(0.005)
+
+
+def test_worker_pool_limits_concurrency_and_records_times():
+    """同时运行的任务数不超过工作协程数，记录排队与执行时间"""
+    manager = make_manager(max_concurrent=2)
+    state = {"running": 0, "peak": 0}
+
+    async def job(task):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        return {"ok": task.task_id}
+
+    async def main():
+        ids = []
+        for i in range(6):
+            task_id = manager.create_task("analyze", f"00000{i}")
+            manager.run_task_in_background(task_id, job)
+            ids.append(task_id)
+        await wait_done(manager, ids)
+        manager.shutdown()
+        return ids
+
+    ids = asyncio.run(main())
+
+    assert state["peak"] == 2
+    tasks = [manager.tasks[t] for t in ids]
+    assert all(t.status == TaskStatus.COMPLETED for t in tasks)
+    assert all(t.run_seconds >= 0.04 for t in tasks)
+    assert tasks[-1].wait_seconds >= 0.1
+    stats = manager.get_stats()
+    assert stats["queued_tasks"] == 0 and stats["avg_run_seconds"] > 0
+
+
+def test_priority_order_and_queue_positions():
+    """高优先级先执行，同优先级先进先出；排队位置通过WebSocket推送"""
+    manager = make_manager(max_concurrent=1)
+    order = []
+
+    async def main():
+        release = asyncio.Event()
+        ws_manager = ConnectionManager()
+        manager.set_ws_manager(ws_manager)
+
+        async def blocker(task):
+            await release.wait()
+
+        async def job(task, name):
+            order.append(name)
+
+        first = manager.create_task("analyze", "BLOCK")
+        manager.run_task_in_background(first, blocker)
+        await asyncio.sleep(0.01)
+
+        ids = {}
+        for name, priority in [("low", TaskPriority.LOW), ("normal-1", TaskPriority.NORMAL),
+                               ("high", TaskPriority.HIGH), ("normal-2", TaskPriority.NORMAL)]:
+            ids[name] = manager.create_task("analyze", name, priority=priority)
+            manager.run_task_in_background(ids[name], job, name)
+
+        ws = FakeWebSocket()
+        await ws_manager.connect(ws)
+        await ws_manager.subscribe_task(ws, ids["low"])
+        positions = {name: manager.tasks[t].queue_position for name, t in ids.items()}
+
+        # 取消排队中的任务，后面的任务位置前移
+        assert manager.cancel_task(ids["normal-1"])
+        await asyncio.sleep(0)
+        release.set()
+        await wait_done(manager, [first, *ids.values()])
+        await ws_manager.flush()
+        manager.shutdown()
+        return positions, ws, ids
+
+    positions, ws, ids = asyncio.run(main())
+
+    assert positions == {"high": 1, "normal-1": 2, "normal-2": 3, "low": 4}
+    assert order == ["high", "normal-2", "low"]
+    assert manager.tasks[ids["normal-1"]].status == TaskStatus.CANCELLED
+    queued = [m["position"] for m in ws.messages if m["type"] == "task_queued"]
+    assert queued[-1] == 1 and 3 in queued
+
+
+def test_admission_control_rejects_when_queue_full():
+    """排队任务数达到上限时拒绝新任务"""
+    manager = make_manager(max_concurrent=1, max_queue=2)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def blocker(task):
+            await release.wait()
+
+        ids = []
+        for i in range(3):
+            task_id = manager.create_task("analyze", str(i))
+            manager.run_task_in_background(task_id, blocker)
+            ids.append(task_id)
+            await asyncio.sleep(0.01)
+
+        with pytest.raises(TaskQueueFull):
+            manager.create_task("analyze", "overflow")
+
+        release.set()
+        await wait_done(manager, ids)
+        manager.create_task("analyze", "accepted")
+        manager.shutdown()
+
+    asyncio.run(main())
+
+
+def test_dedup_key_tracks_inflight_task():
+    """相同去重键在排队/执行期间可查到已有任务，结束后释放"""
+    manager = make_manager(max_concurrent=1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def job(task):
+            await release.wait()
+            return {"symbol": task.symbol}
+
+        key = "analyze_all:600519.SH:2025-01-02"
+        task_id = manager.create_task("analyze_all", "600519.SH", dedup_key=key)
+        manager.run_task_in_background(task_id, job)
+
+        queued = manager.find_inflight(key)
+        await asyncio.sleep(0.01)
+        running = manager.find_inflight(key)
+        release.set()
+        await wait_done(manager, [task_id])
+        manager.shutdown()
+        return task_id, queued, running, manager.find_inflight(key)
+
+    task_id, queued, running, after = asyncio.run(main())
+
+    assert queued.task_id == task_id and running.task_id == task_id
+    assert after is None
+
+
+
+def test_dedup_key_registered_only_when_queued():
+    """创建但未入队的任务不占用去重键"""
+    manager = make_manager()
+    key = "analyze_all:000001.SZ:2025-01-02"
+    manager.create_task("analyze_all", "000001.SZ", dedup_key=key)
+    assert manager.find_inflight(key) is None
+
+
+def test_loop_change_fails_orphaned_pending_tasks():
+    """事件循环变化重建队列时，旧队列中的排队任务标记为失败并释放去重键"""
+    manager = make_manager(max_concurrent=1)
+    key = "analyze_all:600519.SH:2025-01-02"
+
+    async def enqueue():
+        async def job(task):
+            await asyncio.sleep(10)
+
+        blocker = manager.create_task("analyze", "blocker")
+        manager.run_task_in_background(blocker, job)
+        orphan = manager.create_task("analyze_all", "600519.SH", dedup_key=key)
+        manager.run_task_in_background(orphan, job)
+        return orphan
+
+    orphan = asyncio.run(enqueue())
+    assert manager.find_inflight(key).task_id == orphan
+
+    async def resubmit():
+        async def job(task):
+            return {"ok": True}
+
+        task_id = manager.create_task("analyze_all", "600519.SH", dedup_key=key)
+        manager.run_task_in_background(task_id, job)
+        await wait_done(manager, [task_id])
+        manager.shutdown()
+        return task_id
+
+    task_id = asyncio.run(resubmit())
+
+    assert manager.tasks[orphan].status == TaskStatus.FAILED
+    assert manager.tasks[orphan].queue_position is None
+    assert manager.tasks[task_id].status == TaskStatus.COMPLETED
+    assert manager.find_inflight(key) is None
+
+
+def test_sync_functions_use_task_thread_pool_and_process_pool():
+    """同步函数在任务线程池中执行；run_in_process 在独立进程中执行"""
+    manager = make_manager(max_concurrent=2)
+
+    def sync_job(task):
+        return {"thread": threading.current_thread().name}
+
+    async def main():
+        task_id = manager.create_task("backtest", "000001")
+        manager.run_task_in_background(task_id, sync_job)
+        await wait_done(manager, [task_id])
+        product = await manager.run_in_process(operator.mul, 6, 7)
+        manager.shutdown()
+        return manager.tasks[task_id], product
+
+    task, product = asyncio.run(main())
+
+    assert task.result["thread"].startswith("task-worker")
+    assert product == 42
@@ -0,0 +1,125 @@
+"""
+Unit Tests for Precomputed Trading Environment Features
+
+交易环境预计算特征矩阵单元测试
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gymnasium")
+
+from trading.enhanced_trading_env import EnhancedTradingEnv
+from trading.simple_trading_env import SimpleTradingEnv
+
+
+def _make_ohlcv(days: int = 300, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.DataFrame({
+        'date': pd.bdate_range('2020-01-01', periods=days).strftime('%Y-%m-%d'),
+        'open': close * (1 + rng.normal(0, 0.005, days)),
+        'high': close * (1 + np.abs(rng.normal(0, 0.01, days))),
+        'low': close * (1 - np.abs(rng.normal(0, 0.01, days))),
+        'close': close,
+        'volume': rng.integers(1_000_000, 5_000_000, days),
+    })
+
+
+def _simple_reference_obs(env: SimpleTradingEnv) -> np.ndarray:
+    """逐步截取历史数据重算指标（预计算之前的实现）"""
+    row = env.df.iloc[env.current_step]
+    close = row['close']
+    hist = env.df.iloc[:env.current_step + 1]['close']
+    rsi, macd, ma10 = env._calculate_rsi(hist), env._calculate_macd(hist), env._calculate_ma(hist, 10)
+    value = env._get_portfolio_value()
+    obs = np.concatenate([
+        np.array([row['close'] / 100.0, row['high'] / 100.0, row['low'] / 100.0, row['volume'] / 1e6,
+                  (row['close'] - row['open']) / row['open'] if row['open'] > 0 else 0], dtype=np.float32),
+        np.array([rsi / 100.0, np.tanh(macd / close) if close > 0 else 0,
+                  (close - ma10) / ma10 if ma10 > 0 else 0], dtype=np.float32),
+        np.array([env.cash / value if value > 0 else 1.0,
+                  (env.shares_held * close) / value if value > 0 else 0.0], dtype=np.float32),
+    ])
+    return np.clip(np.nan_to_num(obs, nan=0.0, posinf=1.0, neginf=-1.0), -10, 10)
+
+
+def _enhanced_reference_obs(env: EnhancedTradingEnv) -> np.ndarray:
+    """逐步截取历史数据重算指标（预计算之前的实现）"""
+    row = env.df.iloc[env.current_step]
+    close = row['close']
+    hist = env.df.iloc[:env.current_step + 1]
+    rsi = env._calculate_rsi(hist['close'])
+    macd = env._calculate_macd(hist['close'])
+    ma10 = env._calculate_ma(hist['close'], 10)
+    ma20 = env._calculate_ma(hist['close'], 20)
+    atr = env._calculate_atr(hist)
+    value = env._get_portfolio_value()
+    pnl = (close - env.cost_basis) / env.cost_basis if env.shares_held > 0 and env.cost_basis > 0 else 0
+    sellable = env._get_sellable_shares()
+    obs = np.concatenate([
+        np.array([row['close'] / 100.0, row['high'] / 100.0, row['low'] / 100.0, row['volume'] / 1e6,
+                  (row['close'] - row['open']) / row['open'] if row['open'] > 0 else 0], dtype=np.float32),
+        np.array([rsi / 100.0, np.tanh(macd / close) if close > 0 else 0,
+                  (close - ma10) / ma10 if ma10 > 0 else 0, (close - ma20) / ma20 if ma20 > 0 else 0,
+                  atr / close if close > 0 else 0], dtype=np.float32),
+        np.array([env.cash / value if value > 0 else 1.0,
+                  (env.shares_held * close) / value if value > 0 else 0.0, pnl], dtype=np.float32),
+        np.array([sellable / env.shares_held if env.shares_held > 0 else 1.0], dtype=np.float32),
+    ])
+    return np.clip(np.nan_to_num(obs, nan=0.0, posinf=1.0, neginf=-1.0), -10, 10)
+
+
+@pytest.mark.parametrize("lookback", [0, 10])
+def test_simple_env_matches_per_step_indicators(lookback):
+    """测试 SimpleTradingEnv 预计算观察与逐步计算一致"""
+    env = SimpleTradingEnv(_make_ohlcv(), lookback_window=lookback)
+    rng = np.random.default_rng(0)
+    obs, _ = env.reset()
+    done = False
+    while not done:
+        expected = _simple_reference_obs(env)
+        np.testing.assert_array_equal(obs, expected)
+        assert obs.dtype == np.float32
+        obs, _, done, _, _ = env.step(int(rng.integers(0, 3)))
+
+
+@pytest.mark.parametrize("lookback", [0, 20])
+def test_enhanced_env_matches_per_step_indicators(lookback):
+    """测试 EnhancedTradingEnv 预计算观察与逐步计算一致"""
+    env = EnhancedTradingEnv(_make_ohlcv(), lookback_window=lookback)
+    rng = np.random.default_rng(1)
+    obs, _ = env.reset()
+    done = False
+    while not done:
+        expected = _enhanced_reference_obs(env)
+        np.testing.assert_array_equal(obs, expected)
+        assert obs.shape == env.observation_space.shape
+        obs, _, done, _, _ = env.step(int(rng.integers(0, 5)))
+
+
+def test_feature_matrix_has_no_look_ahead():
+    """测试修改未来数据不影响当前及之前的特征"""
+    df = _make_ohlcv(200)
+    env = EnhancedTradingEnv(df)
+    changed = df.copy()
+    changed.loc[150:, ['open', 'high', 'low', 'close']] *= 2
+    env_changed = EnhancedTradingEnv(changed)
+    np.testing.assert_array_equal(env._features[:150], env_changed._features[:150])
+
+
+def test_enhanced_env_steps_per_second():
+    """测试长周期 episode 每步为常数时间"""
+    env = EnhancedTradingEnv(_make_ohlcv(2500))
+    env.reset()
+    start = time.perf_counter()
+    steps = 0
+    done = False
+    while not done:
+        _, _, done, _, _ = env.step(steps % 5)
+        steps += 1
+    elapsed = time.perf_counter() - start
+    assert steps / elapsed > 2000
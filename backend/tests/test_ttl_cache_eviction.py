@@ -0,0 +1,75 @@
+"""
+TTL缓存容量淘汰测试
+"""
+
+from tradingagents.dataflows.ttl_cache import TTLCache, DiskCache, HybridCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, eviction_policy='lru')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = TTLCache(max_entries=2, eviction_policy='lfu')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    for _ in range(3):
+        cache.get('b')
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+
+
+def test_max_bytes_limit():
+    cache = TTLCache(max_bytes=1000)
+    for i in range(10):
+        cache.set(f'k{i}', b'x' * 300)
+
+    stats = cache.get_stats()
+    assert stats['cache_bytes'] <= 1000
+    assert stats['cache_size'] == 3
+    assert stats['evictions'] == 7
+
+
+def test_disk_cache_size_cap(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_entries=3)
+    for i in range(5):
+        cache.set(f'k{i}', i)
+
+    assert len(list(tmp_path.glob('*.pkl'))) == 3
+    assert cache.get('k0') is None
+    assert cache.get('k4') == 4
+    assert cache.get_stats()['evictions'] == 2
+
+    # 重新打开时从目录恢复索引
+    reopened = DiskCache(cache_dir=str(tmp_path), max_entries=3)
+    assert reopened.get_stats()['cache_files'] == 3
+
+
+def test_hybrid_promotes_hot_and_demotes_evicted(tmp_path):
+    cache = HybridCache(cache_dir=str(tmp_path), memory_max_entries=1,
+                        disk_max_entries=10, promote_threshold=2)
+    cache.set('a', 'A')
+    cache.set('b', 'B')  # 'a' 被挤出内存，磁盘仍保留
+
+    assert cache.memory_cache.get_entry('a') is None
+    assert cache.get('a') == 'A'   # 第一次磁盘命中，不提升
+    assert cache.memory_cache.get_entry('a') is None
+    assert cache.get('a') == 'A'   # 第二次命中，提升到内存
+    assert cache.memory_cache.get_entry('a') is not None
+    assert cache.get_stats()['promotions'] == 1
+
+    cache.disk_cache.delete('a')
+    cache.set('c', 'C')  # 'a' 被挤出内存，且磁盘已没有 -> 降级写回磁盘
+    assert cache.disk_cache.contains('a')
+    assert cache.get_stats()['demotions'] == 1
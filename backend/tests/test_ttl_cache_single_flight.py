@@ -0,0 +1,119 @@
+"""
+TTL缓存并发合并测试
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tradingagents.dataflows.ttl_cache import ttl_cache, DiskCache, single_flight_stats
+
+
+def test_sync_single_flight_coalesces_concurrent_misses():
+    calls = []
+    token = uuid.uuid4().hex
+
+    @ttl_cache(ttl=60)
+    def slow(symbol, token):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return f"data-{symbol}"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: slow("000001", token), range(8)))
+
+    assert results == ["data-000001"] * 8
+    assert len(calls) == 1
+
+
+def test_sync_single_flight_propagates_errors():
+    token = uuid.uuid4().hex
+    barrier = threading.Barrier(4)
+
+    @ttl_cache(ttl=60)
+    def failing(token):
+        time.sleep(0.1)
+        raise ValueError("upstream down")
+
+    def call(_):
+        barrier.wait()
+        try:
+            failing(token)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(call, range(4))) == ["upstream down"] * 4
+
+
+def test_async_single_flight_coalesces_coroutines():
+    calls = []
+    token = uuid.uuid4().hex
+
+    @ttl_cache(ttl=60)
+    async def fetch(symbol, token):
+        calls.append(symbol)
+        await asyncio.sleep(0.1)
+        return {"symbol": symbol}
+
+    async def main():
+        return await asyncio.gather(*(fetch("600519", token) for _ in range(20)))
+
+    before = single_flight_stats()["async_coalesced"]
+    results = asyncio.run(main())
+    assert all(r == {"symbol": "600519"} for r in results)
+    assert len(calls) == 1
+    assert single_flight_stats()["async_coalesced"] - before == 19
+
+
+def test_async_waiter_counted_once_after_leader_cancelled():
+    token = uuid.uuid4().hex
+
+    @ttl_cache(ttl=60)
+    async def fetch(token):
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        leader = asyncio.ensure_future(fetch(token))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(fetch(token)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    before = single_flight_stats()["async_coalesced"]
+    assert asyncio.run(main()) == ["ok"] * 3
+    # 一个等待者接手重新执行，其余两个各计一次
+    assert single_flight_stats()["async_coalesced"] - before == 2
+
+
+def test_disk_cache_concurrent_keys(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), lock_stripes=8)
+
+    def work(i):
+        cache.set(f"k{i}", i)
+        return cache.get(f"k{i}")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        assert list(pool.map(work, range(200))) == list(range(200))
+    assert cache.get_stats()['cache_files'] == 200
+
+
+def test_disk_cache_concurrent_eviction_keeps_index_and_files_consistent(tmp_path):
+    cache = DiskCache(cache_dir=str(tmp_path), max_entries=10, lock_stripes=4)
+
+    def work(i):
+        cache.set(f"k{i % 30}", i)
+        cache.get(f"k{(i * 7) % 30}")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(work, range(600)))
+
+    files = {path.stem for path in tmp_path.glob("*.pkl")}
+    assert files == set(cache._sizes)
+    assert len(files) <= 10
@@ -0,0 +1,213 @@
+"""
+Tushare本地镜像测试：增量同步、缺失区间读穿、离线读取与数据源切换（不访问网络）
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from data_sync.sync_engine import TushareDataSync
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.tushare_local_mirror import TushareLocalMirror
+
+CODES = ["600519.SH", "000001.SZ"]
+
+
+class FakeTushareApi:
+    """按工作日生成行情的模拟 pro_api，记录每次调用"""
+
+    def __init__(self):
+        self.calls = []
+
+    @staticmethod
+    def _rows(ts_code, dates):
+        return [{
+            "ts_code": ts_code, "trade_date": d.strftime("%Y%m%d"),
+            "open": 10.0, "high": 11.0, "low": 9.0, "close": 10.0 + d.day / 100,
+            "pre_close": 10.0, "change": 0.0, "pct_chg": 0.0, "vol": 1000.0, "amount": 1e4,
+        } for d in dates]
+
+    def trade_cal(self, exchange, start_date, end_date, fields):
+        self.calls.append(("trade_cal", start_date, end_date))
+        days = pd.date_range(start_date, end_date)
+        return pd.DataFrame({
+            "exchange": exchange, "cal_date": days.strftime("%Y%m%d"),
+            "is_open": (days.weekday < 5).astype(int), "pretrade_date": None,
+        })
+
+    def daily(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        self.calls.append(("daily", ts_code, trade_date, start_date, end_date))
+        if trade_date:
+            return pd.DataFrame([r for code in CODES for r in self._rows(code, [pd.Timestamp(trade_date)])])
+        return pd.DataFrame(self._rows(ts_code, pd.bdate_range(start_date, end_date)))
+
+    def adj_factor(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        """20240115 除权：此前复权因子为 1.0，之后为 2.0"""
+        self.calls.append(("adj_factor", ts_code, trade_date, start_date, end_date))
+        if trade_date:
+            codes, dates = CODES, [pd.Timestamp(trade_date)]
+        else:
+            codes, dates = [ts_code], pd.bdate_range(start_date, end_date)
+        return pd.DataFrame([{"ts_code": code, "trade_date": d.strftime("%Y%m%d"),
+                              "adj_factor": 2.0 if d >= pd.Timestamp("20240115") else 1.0}
+                             for code in codes for d in dates])
+
+    def stock_basic(self, **kwargs):
+        self.calls.append(("stock_basic",))
+        return pd.DataFrame({"ts_code": CODES, "symbol": ["600519", "000001"], "name": ["贵州茅台", "平安银行"],
+                             "area": "", "industry": "", "market": "主板", "list_date": "20010827"})
+
+    def fina_indicator(self, ts_code, start_date):
+        self.calls.append(("fina_indicator", ts_code))
+        return pd.DataFrame({"ts_code": ts_code, "end_date": ["20231231", "20240331", "20240331"],
+                             "ann_date": ["20240401", "20240425", "20240426"],
+                             "eps": [59.5, 19.2, 19.3], "roe": [34.2, 9.1, 9.2], "not_a_column": 1})
+
+
+@pytest.fixture
+def sync(tmp_path):
+    engine = TushareDataSync(str(tmp_path / "tushare.db"), api=FakeTushareApi(), min_interval=0)
+    yield engine
+    engine.close()
+
+
+def test_database_uses_wal_and_composite_index(sync):
+    assert sync.db.query("PRAGMA journal_mode")[0]["journal_mode"] == "wal"
+
+    plan = sync.db.query(
+        "EXPLAIN QUERY PLAN SELECT * FROM daily_quotes WHERE ts_code = ? AND trade_date BETWEEN ? AND ?",
+        ("600519.SH", "20240101", "20240131"),
+    )
+    detail = " ".join(row["detail"] for row in plan)
+    assert "ts_code=? AND trade_date>? AND trade_date<?" in detail
+
+
+def test_incremental_daily_sync_resumes(sync):
+    assert sync.sync_daily_quotes("20240101", "20240110") == 2 * 8
+    daily_calls = [c for c in sync.api.calls if c[0] == "daily"]
+    assert [c[2] for c in daily_calls][:2] == ["20240101", "20240102"]
+
+    # 第二次只同步上次之后的交易日
+    sync.api.calls.clear()
+    assert sync.sync_daily_quotes(end_date="20240112") == 2 * 2
+    assert [c[2] for c in sync.api.calls if c[0] == "daily"] == ["20240111", "20240112"]
+    assert sync.db.get_last_sync_date("daily_quotes") == "20240112"
+    assert sync.db.get_coverage("daily_quotes", "600519.SH") == [("20240101", "20240112")]
+
+
+def test_mirror_reads_locally_and_fills_only_gaps(sync):
+    sync.sync_daily_quotes("20240101", "20240131")
+    mirror = TushareLocalMirror(sync=sync, network_fill=True)
+
+    sync.api.calls.clear()
+    data = mirror.get_stock_data("600519", "2024-01-08", "2024-01-19")
+    assert sync.api.calls == []
+    assert list(data["date"].dt.strftime("%Y%m%d")) == [d.strftime("%Y%m%d") for d in pd.bdate_range("20240108", "20240119")]
+    assert {"code", "close", "volume", "pct_change"} <= set(data.columns)
+
+    data = mirror.get_stock_data("600519", "2023-12-20", "2024-01-05")
+    assert sync.api.calls == [("daily", "600519.SH", None, "20231220", "20231231"),
+                              ("adj_factor", "600519.SH", None, "20231220", "20231231")]
+    assert data["date"].min() == pd.Timestamp("2023-12-20")
+    assert mirror.missing_ranges("600519", "2023-12-20", "2024-01-31") == []
+    # 补齐的区间只对该股票生效
+    assert mirror.missing_ranges("000001", "2023-12-20", "2024-01-31") == [(date(2023, 12, 20), date(2023, 12, 31))]
+
+
+def test_mirror_forward_adjusts_prices(sync):
+    sync.sync_daily_quotes("20240108", "20240119")
+    mirror = TushareLocalMirror(sync=sync, network_fill=False)
+
+    data = mirror.get_stock_data("600519", "2024-01-08", "2024-01-19").set_index("date")
+    assert (data["price_type"] == "forward_adjusted").all()
+    # 除权日之前按 当日因子/基准日因子 = 0.5 调整，之后保持原始价格
+    before, after = data.loc[:"2024-01-12"], data.loc["2024-01-15":]
+    assert before["close"].tolist() == pytest.approx((before["close_raw"] * 0.5).tolist())
+    assert before["high"].tolist() == pytest.approx([5.5] * len(before))
+    assert after["close"].tolist() == after["close_raw"].tolist()
+
+    # 没有复权因子时按 pct_chg 推算（模拟数据 pct_chg 为0，即全部等于基准日收盘价）
+    with sync.db.conn:
+        sync.db.conn.execute("DELETE FROM adj_factor")
+    data = mirror.get_stock_data("600519", "2024-01-08", "2024-01-19")
+    assert data["close"].tolist() == pytest.approx([data["close_raw"].iloc[-1]] * len(data))
+    assert (data["price_type"] == "forward_adjusted").all()
+
+
+
+def test_window_ending_today_is_served_locally(sync):
+    """当天已返回的交易日记为已覆盖，同一天重复读取不再请求Tushare"""
+    mirror = TushareLocalMirror(sync=sync, network_fill=True)
+    today = date.today()
+    start = (pd.Timestamp(today) - pd.Timedelta(days=10)).strftime("%Y-%m-%d")
+
+    first = mirror.get_stock_data("600519", start, today.strftime("%Y-%m-%d"))
+    sync.api.calls.clear()
+    second = mirror.get_stock_data("600519", start, today.strftime("%Y-%m-%d"))
+
+    assert sync.api.calls == []
+    assert second.equals(first)
+
+
+def test_unpublished_today_refetched_after_ttl(sync):
+    """当天数据尚未发布时，today_ttl 内由本地返回，过期后再请求"""
+    publishing = sync.api.daily
+
+    def daily_without_today(**kwargs):
+        data = publishing(**kwargs)
+        return data[data["trade_date"] < date.today().strftime("%Y%m%d")]
+
+    sync.api.daily = daily_without_today
+    today = date.today().strftime("%Y-%m-%d")
+    start = (pd.Timestamp(today) - pd.Timedelta(days=10)).strftime("%Y-%m-%d")
+
+    mirror = TushareLocalMirror(sync=sync, network_fill=True, today_ttl=300)
+    mirror.get_stock_data("600519", start, today)
+    sync.api.calls.clear()
+    mirror.get_stock_data("600519", start, today)
+    assert sync.api.calls == []
+
+    mirror.today_ttl = 0
+    mirror.get_stock_data("600519", start, today)
+    assert [c[0] for c in sync.api.calls] == ["daily", "adj_factor"]
+
+
+def test_offline_mirror_never_calls_network(sync):
+    sync.sync_daily_quotes("20240101", "20240105")
+    mirror = TushareLocalMirror(sync=sync, network_fill=False)
+
+    sync.api.calls.clear()
+    data = mirror.get_stock_data("000001.SZ", "2023-12-01", "2024-01-05")
+    assert sync.api.calls == []
+    assert len(data) == 5
+
+
+def test_fundamentals_from_mirror(sync):
+    sync.sync_stock_basic()
+    mirror = TushareLocalMirror(sync=sync)
+
+    report = mirror.get_fundamentals("600519")
+    assert [c[0] for c in sync.api.calls] == ["stock_basic", "fina_indicator"]
+    assert "贵州茅台" in report and "20240331" in report and "19.30" in report
+
+    # 第二次直接读本地
+    sync.api.calls.clear()
+    assert "19.30" in mirror.get_fundamentals("600519")
+    assert sync.api.calls == []
+
+
+def test_data_source_manager_serves_local(sync, monkeypatch):
+    sync.sync_stock_basic()
+    sync.sync_daily_quotes("20240101", "20240131")
+    mirror = TushareLocalMirror(sync=sync, network_fill=False)
+
+    monkeypatch.setenv("DEFAULT_CHINA_DATA_SOURCE", "local")
+    monkeypatch.setattr(DataSourceManager, "_get_local_adapter", lambda self: mirror)
+    manager = DataSourceManager()
+
+    assert manager.current_source == ChinaDataSource.LOCAL
+    assert ChinaDataSource.LOCAL in manager.available_sources
+    result = manager.get_stock_data("600519", "2024-01-02", "2024-01-31")
+    assert "贵州茅台(600519) - Tushare本地镜像数据" in result
+    assert "数据条数: 22条" in result
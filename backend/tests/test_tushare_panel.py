@@ -0,0 +1,110 @@
+"""
+TushareDatabase 按列面板读取与DataFrame批量写入测试
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_sync.database import TushareDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = TushareDatabase(str(tmp_path / "panel.db"))
+    yield database
+    database.close()
+
+
+def make_quotes(codes, dates, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(codes) * len(dates)
+    return pd.DataFrame({
+        "ts_code": np.tile(codes, len(dates)),
+        "trade_date": np.repeat(pd.to_datetime(dates).values, len(codes)),
+        "close": rng.normal(10, 1, n),
+        "vol": rng.integers(100, 1000, n),
+        "extra_column": 1,
+    })
+
+
+def test_upsert_frame_types_and_overwrite(db):
+    frame = make_quotes(["600519.SH", "000001.SZ"], ["2024-01-02", "2024-01-03"])
+    frame.loc[1, "close"] = np.nan
+    frame["pct_chg"] = pd.array([1.5, None, 0.5, -0.5], dtype="Float64")
+
+    assert db.upsert_frame("daily_quotes", frame) == 4
+    rows = db.query("SELECT * FROM daily_quotes ORDER BY trade_date, ts_code")
+    assert [(r["ts_code"], r["trade_date"]) for r in rows] == [
+        ("000001.SZ", "20240102"), ("600519.SH", "20240102"), ("000001.SZ", "20240103"), ("600519.SH", "20240103"),
+    ]
+    assert rows[0]["close"] is None and rows[0]["pct_chg"] is None
+    assert isinstance(rows[1]["vol"], float)
+
+    # 相同 (ts_code, trade_date) 覆盖而不是重复
+    db.upsert_frame("daily_quotes", frame.assign(close=1.0))
+    assert db.query("SELECT COUNT(*) AS n, SUM(close) AS s FROM daily_quotes")[0] == {"n": 4, "s": 4.0}
+
+    with pytest.raises(ValueError):
+        db.upsert_frame("daily_quotes", pd.DataFrame({"unknown": [1]}))
+
+
+def test_load_panel_matches_row_query(db):
+    codes = ["600519.SH", "000001.SZ", "300750.SZ"]
+    dates = pd.bdate_range("2024-01-01", "2024-03-29")
+    frame = make_quotes(codes, dates)
+    # 每只股票缺一部分交易日（停牌）
+    frame = frame.drop(frame.index[::7])
+    db.upsert_frame("daily_quotes", frame)
+
+    panel = db.load_panel(None, "2024-01-15", "20240315", "close", batch_size=17)
+
+    rows = db.query("SELECT ts_code, trade_date, close FROM daily_quotes "
+                    "WHERE trade_date BETWEEN '20240115' AND '20240315'")
+    expected = pd.DataFrame(rows).pivot(index="trade_date", columns="ts_code", values="close")
+    expected.index = pd.to_datetime(expected.index)
+
+    assert list(panel.columns) == sorted(codes)
+    assert panel.index.name == "trade_date"
+    pd.testing.assert_frame_equal(panel, expected, check_names=False, check_freq=False)
+
+
+def test_load_panel_code_order_fields_and_dtype(db):
+    db.upsert_frame("daily_quotes", make_quotes(["600519.SH", "000001.SZ"], ["2024-01-02", "2024-01-03"]))
+
+    arrays = db.load_panel(["000001.SZ", "688981.SH", "600519.SH"], fields=["close", "vol"],
+                           as_frame=False, dtype=np.float32)
+    assert list(arrays["ts_codes"]) == ["000001.SZ", "688981.SH", "600519.SH"]
+    assert arrays["dates"].dtype == np.dtype("datetime64[D]")
+    assert arrays["close"].shape == (2, 3) and arrays["close"].dtype == np.float32
+    assert np.isnan(arrays["vol"][:, 1]).all()
+    assert not np.isnan(arrays["vol"][:, [0, 2]]).any()
+
+    frame = db.load_panel(["600519.SH"], "20240103", "20240103", ["close", "vol"])
+    assert list(frame.columns) == [("close", "600519.SH"), ("vol", "600519.SH")]
+    assert len(frame) == 1
+
+    with pytest.raises(ValueError):
+        db.load_panel(fields=["close; DROP TABLE daily_quotes"])
+
+
+def test_shared_connection_is_thread_safe(db):
+    days = pd.date_range("2024-01-01", periods=80).strftime("%Y%m%d")
+    barrier = threading.Barrier(8)
+
+    def worker(offset):
+        barrier.wait()
+        for i in range(offset, len(days), 8):
+            db.add_coverage("daily_quotes", "600519.SH", days[i], days[i])
+            db.bulk_insert("daily_quotes", [{"ts_code": "600519.SH", "trade_date": days[i], "close": float(i)}])
+            db.query("SELECT COUNT(*) AS n FROM daily_quotes")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(worker, range(8)))
+
+    # 读取-合并-写回不交错：相邻日期全部合并为一个区间，没有丢失
+    assert db.get_coverage("daily_quotes", "600519.SH") == [(days[0], days[-1])]
+    assert db.query("SELECT COUNT(*) AS n FROM daily_quotes")[0]["n"] == len(days)
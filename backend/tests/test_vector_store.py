@@ -0,0 +1,149 @@
+"""
+嵌入式向量存储测试：精确k-NN、metadata过滤、持久化与迁移
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from memory.episodic_memory import EpisodicMemoryBank
+from tests.test_episodic_memory_batch import FakeEncoder, make_episode
+from tradingagents.agents.utils.vector_store import LocalVectorCollection, migrate_collection
+
+
+def make_records(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"id{i}" for i in range(n)]
+    documents = [f"doc{i}" for i in range(n)]
+    metadatas = [{"symbol": "600519.SH" if i % 2 else "000001.SZ", "rank": i} for i in range(n)]
+    return ids, vectors, documents, metadatas
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_query_matches_brute_force(space):
+    ids, vectors, documents, metadatas = make_records(200)
+    collection = LocalVectorCollection("test", space=space, hnsw_threshold=0)
+    collection.add(ids=ids, embeddings=vectors, documents=documents, metadatas=metadatas)
+
+    queries = vectors[:3] + 0.01
+    result = collection.query(query_embeddings=queries, n_results=5)
+
+    for q, query in enumerate(queries):
+        if space == "l2":
+            expected = ((vectors - query) ** 2).sum(axis=1)
+        elif space == "cosine":
+            expected = 1 - vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+        else:
+            expected = 1 - vectors @ query
+        order = np.argsort(expected)[:5]
+        assert result["ids"][q] == [ids[i] for i in order]
+        assert result["documents"][q] == [documents[i] for i in order]
+        assert result["distances"][q] == pytest.approx(expected[order], rel=1e-4, abs=1e-4)
+
+
+def test_where_filters_and_upsert():
+    ids, vectors, documents, metadatas = make_records(50)
+    collection = LocalVectorCollection("test", hnsw_threshold=0)
+    collection.add(ids=ids, embeddings=vectors, documents=documents, metadatas=metadatas)
+
+    result = collection.query(query_embeddings=[vectors[1]], n_results=100, where={"symbol": "600519.SH"})
+    assert len(result["ids"][0]) == 25
+    assert result["ids"][0][0] == "id1"
+    assert all(m["symbol"] == "600519.SH" for m in result["metadatas"][0])
+
+    where = {"$and": [{"rank": {"$gte": 10}}, {"$or": [{"rank": {"$lt": 12}}, {"rank": {"$in": [40, 41]}}]}]}
+    assert sorted(collection.get(where=where)["ids"]) == ["id10", "id11", "id40", "id41"]
+
+    # 相同id原地覆盖
+    collection.add(ids=["id3"], embeddings=[vectors[0]], documents=["new"], metadatas=[{"rank": -1}])
+    assert collection.count() == 50
+    assert collection.get(ids=["id3"]) == {
+        "ids": ["id3"], "documents": ["new"], "metadatas": [{"rank": -1}], "embeddings": None
+    }
+    top = collection.query(query_embeddings=[vectors[0]], n_results=2, include=["distances"])
+    assert sorted(top["ids"][0]) == ["id0", "id3"]
+
+    with pytest.raises(ValueError):
+        collection.add(ids=["bad"], embeddings=[[0.0] * 3])
+
+
+def test_persistence_and_migration(tmp_path):
+    ids, vectors, documents, metadatas = make_records(30)
+    source = LocalVectorCollection("source", str(tmp_path / "source"))
+    source.add(ids=ids[:20], embeddings=vectors[:20], documents=documents[:20], metadatas=metadatas[:20])
+    source.add(ids=ids[20:], embeddings=vectors[20:], documents=documents[20:], metadatas=metadatas[20:])
+    source.close()
+
+    reopened = LocalVectorCollection("source", str(tmp_path / "source"))
+    assert reopened.count() == 30
+    data = reopened.get(include=["embeddings", "documents", "metadatas"])
+    assert data["ids"] == ids
+    np.testing.assert_array_equal(data["embeddings"], vectors)
+
+    target = LocalVectorCollection("target", str(tmp_path / "target"))
+    assert migrate_collection(reopened, target, batch_size=7) == 30
+    assert target.get(limit=3, offset=5)["ids"] == ids[5:8]
+    assert target.query(query_embeddings=[vectors[17]], n_results=1)["ids"] == [["id17"]]
+
+
+def _write_worker(path, worker, n):
+    ids, vectors, documents, _ = make_records(n, seed=worker)
+    collection = LocalVectorCollection("shared", path)
+    for i in range(n):
+        collection.add(ids=[f"w{worker}_{ids[i]}"], embeddings=vectors[i:i + 1], documents=[documents[i]])
+    collection.close()
+
+
+def test_two_writers_on_same_collection(tmp_path):
+    """两个实例（各自连接，等同两个进程）交替写入同一集合，行号不冲突，读取方看到对方的写入"""
+    path = str(tmp_path / "shared")
+    first = LocalVectorCollection("shared", path)
+    second = LocalVectorCollection("shared", path)
+    ids, vectors, documents, _ = make_records(6)
+
+    first.add(ids=ids[:2], embeddings=vectors[:2], documents=documents[:2])
+    second.add(ids=ids[2:4], embeddings=vectors[2:4], documents=documents[2:4])
+    first.add(ids=ids[4:], embeddings=vectors[4:], documents=documents[4:])
+
+    for collection in (first, second):
+        assert collection.count() == 6
+        data = collection.get(include=["embeddings", "documents"])
+        assert data["ids"] == ids
+        np.testing.assert_array_equal(data["embeddings"], vectors)
+        assert collection.query(query_embeddings=[vectors[3]], n_results=1)["ids"] == [["id3"]]
+
+
+def test_concurrent_process_writers(tmp_path):
+    """spawn的多个进程同时写入，记录与向量一一对应"""
+    path = str(tmp_path / "shared")
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_write_worker, args=(path, worker, 20)) for worker in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    collection = LocalVectorCollection("shared", path)
+    assert collection.count() == 60
+    data = collection.get(include=["embeddings"])
+    for worker in range(3):
+        ids, vectors, _, _ = make_records(20, seed=worker)
+        for i, record_id in enumerate(ids):
+            row = data["ids"].index(f"w{worker}_{record_id}")
+            np.testing.assert_array_equal(data["embeddings"][row], vectors[i])
+
+
+def test_episodic_memory_on_local_backend(tmp_path):
+    bank = EpisodicMemoryBank(persist_directory=str(tmp_path / "episodes"), vector_backend="local")
+    bank.encoder = FakeEncoder()
+    bank.add_episodes([make_episode(i, "bull" if i % 2 else "panic_selloff", 0.01) for i in range(6)])
+
+    results = bank.retrieve_similar({"description": "bull 市场状态 决策"}, top_k=2,
+                                    filter_criteria={"market_regime": "bull"})
+
+    assert [h.market_regime for h in results] == ["bull", "bull"]
+    assert bank.get_episode_by_id(results[0].episode_id).market_state.market_regime == "bull"
+    assert bank.get_statistics()["regime_distribution"] == {"bull": 3, "panic_selloff": 3}
@@ -0,0 +1,156 @@
+"""
+Unit Tests for Vectorized Backtester
+
+向量化回测引擎单元测试
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.backtester import Backtester
+from trading.metrics import calculate_all_metrics, calculate_all_metrics_batch
+from trading.technical_strategy import TechnicalStrategy
+from trading.vectorized_backtester import (
+    VectorizedBacktester,
+    build_close_panel,
+    expand_param_grid,
+    technical_signals,
+)
+
+
+def _random_walk(n_days: int, n_symbols: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, size=(n_days, n_symbols))
+    close = 10 * np.exp(np.cumsum(returns, axis=0))
+    dates = pd.bdate_range('2020-01-01', periods=n_days)
+    return pd.DataFrame(close, index=dates, columns=[f"{600000 + i}.SH" for i in range(n_symbols)])
+
+
+def test_expand_param_grid():
+    """测试参数网格展开"""
+    grid = expand_param_grid({'ma_short': [5, 10], 'ma_long': [20, 30, 60]})
+    assert len(grid) == 6
+    assert {'ma_short': 10, 'ma_long': 60} in grid
+    assert expand_param_grid(None) == [{}]
+
+
+def test_batch_metrics_match_scalar_metrics():
+    """测试批量指标与 calculate_all_metrics 一致"""
+    rng = np.random.default_rng(1)
+    equity = 100000 * np.cumprod(1 + rng.normal(0, 0.01, size=(120, 3)), axis=0)
+    trades = [
+        {'side': 'buy'},
+        {'side': 'sell', 'realized_pnl': 500.0},
+        {'side': 'sell', 'realized_pnl': -200.0},
+    ]
+    stats = {
+        'total_trades': np.array([2, 2, 2]),
+        'winning_trades': np.array([1, 1, 1]),
+        'losing_trades': np.array([1, 1, 1]),
+        'gross_profit': np.array([500.0] * 3),
+        'gross_loss': np.array([-200.0] * 3),
+    }
+
+    batch = calculate_all_metrics_batch(100000, equity, stats, trading_days=120)
+    for col in range(3):
+        expected = calculate_all_metrics(100000, equity[:, col].tolist(), trades, trading_days=120)
+        for name, value in expected.items():
+            assert batch[name][col] == pytest.approx(value, rel=1e-9), name
+
+
+def test_matches_backtester_with_technical_strategy():
+    """测试无滑点/印花税/整手限制时，与 Backtester + TechnicalStrategy 结果一致"""
+    prices = _random_walk(300, 2)
+    params = {'ma_short': 5, 'ma_long': 20, 'rsi_period': 14}
+
+    engine = VectorizedBacktester(slippage_rate=0.0, stamp_duty_rate=0.0, lot_size=1)
+    result = engine.run(prices, [params])
+
+    for symbol in prices.columns:
+        df = pd.DataFrame({'date': prices.index, 'close': prices[symbol].values})
+        backtester = Backtester(TechnicalStrategy(**params), slippage_rate=0.0)
+        report = backtester.run(symbol, '2020-01-01', '2021-12-31', data=df)
+
+        expected = report['metrics']
+        actual = result.get_metrics(0, symbol)
+        assert actual['total_trades'] == expected['total_trades']
+        for name in ('final_value', 'total_return', 'sharpe_ratio', 'max_drawdown_pct', 'win_rate'):
+            assert actual[name] == pytest.approx(expected[name], rel=1e-6), name
+
+
+def test_a_share_rules():
+    """测试整手、印花税与T+1"""
+    dates = pd.bdate_range('2024-01-01', periods=4)
+    prices = pd.DataFrame({'000001.SZ': [10.0, 10.0, 11.0, 11.0]}, index=dates)
+
+    def buy_then_sell(close, cache, sell_day):
+        entries = np.zeros(close.shape, dtype=bool)
+        exits = np.zeros(close.shape, dtype=bool)
+        entries[0] = True
+        exits[sell_day] = True
+        return entries, exits
+
+    engine = VectorizedBacktester(initial_capital=10000.0)
+    result = engine.run(prices, [{'sell_day': 0}, {'sell_day': 2}], signal_func=buy_then_sell)
+
+    # 当日买入当日不可卖出
+    assert result.get_metrics(0, '000001.SZ')['total_trades'] == 0
+
+    # 买入: floor(10000 / 10.1 / 100) * 100 = 900 股，成交价 10.01，佣金最低5元
+    cash = 10000.0 - 900 * 10.01 - 5.0
+    # 卖出: 成交价 10.989，佣金最低5元，印花税千1
+    amount = 900 * 11.0 * 0.999
+    cash += amount - 5.0 - amount * 0.001
+    metrics = result.get_metrics(1, '000001.SZ')
+    assert metrics['total_trades'] == 1
+    assert metrics['winning_trades'] == 1
+    assert metrics['final_value'] == pytest.approx(cash)
+
+
+def test_suspended_symbol_is_marked_at_last_price():
+    """测试停牌（NaN）期间不交易且按最后价格估值"""
+    dates = pd.bdate_range('2024-01-01', periods=3)
+    prices = pd.DataFrame({'000002.SZ': [10.0, np.nan, 12.0]}, index=dates)
+
+    def always_buy(close, cache):
+        return np.ones(close.shape, dtype=bool), np.zeros(close.shape, dtype=bool)
+
+    result = VectorizedBacktester(initial_capital=10000.0).run(prices, signal_func=always_buy)
+    curve = result.get_equity_curve(0, '000002.SZ')
+    assert curve[0] == pytest.approx(curve[1])
+    assert curve[2] > curve[1]
+
+
+def test_build_close_panel_aligns_dates():
+    """测试多只股票按日期对齐"""
+    a = pd.DataFrame({'date': ['2024-01-02', '2024-01-03'], 'close': [1.0, 2.0]})
+    b = pd.DataFrame({'date': ['2024-01-03', '2024-01-04'], 'close': [3.0, 4.0]})
+    panel = build_close_panel({'A': a, 'B': b})
+    assert list(panel.columns) == ['A', 'B']
+    assert len(panel) == 3
+    assert np.isnan(panel.loc['2024-01-02', 'B'])
+
+
+def test_grid_sweep_is_fast():
+    """测试 300只股票 × 12组参数 × 5年 在数秒内完成"""
+    prices = _random_walk(1250, 300)
+    grid = {'ma_short': [5, 10], 'ma_long': [20, 30, 60], 'rsi_oversold': [25, 30]}
+
+    start = time.perf_counter()
+    result = VectorizedBacktester().run(prices, grid, keep_equity=False)
+    elapsed = time.perf_counter() - start
+
+    assert result.metrics['sharpe_ratio'].shape == (12, 300)
+    assert len(result.to_frame()) == 12 * 300
+    assert elapsed < 10.0
+
+
+def test_technical_signals_warmup():
+    """测试历史数据不足时不产生信号"""
+    close = _random_walk(60, 3).to_numpy()
+    entries, exits = technical_signals(close, ma_long=30)
+    assert not entries[:29].any()
+    assert not exits[:29].any()
@@ -0,0 +1,157 @@
+"""
+WebSocket 并发推送测试（一次编码、有界队列、慢消费者处理）
+"""
+
+import asyncio
+import json
+import time
+
+from api.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """记录发送内容的WebSocket替身，可通过 gate 阻塞发送模拟慢客户端"""
+
+    def __init__(self, gate: asyncio.Event = None, fail: bool = False):
+        self.messages = []
+        self.gate = gate
+        self.fail = fail
+        self.closed_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.fail:
+            raise ConnectionError("client gone")
+        if self.gate is not None:
+            await self.gate.wait()
+        self.messages.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.closed_code = code
+
+
+def quote(symbol: str, price: float) -> dict:
+    return {"type": "market_data", "symbol": symbol, "price": price}
+
+
+def test_broadcast_encodes_once_for_all_connections():
+    """广播只编码一次，所有连接都收到"""
+    async def main():
+        manager = ConnectionManager()
+        clients = [FakeWebSocket() for _ in range(50)]
+        for ws in clients:
+            await manager.connect(ws)
+        encoded = manager.messages_encoded
+        await manager.broadcast({"type": "notice", "message": "hello"})
+        await manager.flush()
+        return manager, clients, encoded
+
+    manager, clients, encoded = asyncio.run(main())
+
+    assert manager.messages_encoded == encoded + 1
+    assert all(ws.messages == [{"type": "notice", "message": "hello"}] for ws in clients)
+    assert manager.get_stats()["send_queues"]["sent"] == 50
+
+
+def test_slow_client_does_not_stall_others():
+    """慢客户端阻塞时，其他订阅者照常收到，推送调用不等待"""
+    async def main():
+        manager = ConnectionManager()
+        gate = asyncio.Event()
+        slow, fast = FakeWebSocket(gate=gate), FakeWebSocket()
+        for ws in (slow, fast):
+            await manager.connect(ws)
+            manager.subscriptions.setdefault("600519", set()).add(ws)
+
+        started = time.perf_counter()
+        await manager.send_to_symbol_subscribers("600519", quote("600519", 1500.0))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.01)
+        fast_received = list(fast.messages)
+        stats = manager.get_send_stats()
+        gate.set()
+        await manager.flush()
+        return elapsed, fast_received, stats, slow
+
+    elapsed, fast_received, stats, slow = asyncio.run(main())
+
+    assert elapsed < 0.05
+    assert [m["price"] for m in fast_received] == [1500.0]
+    # 慢客户端的消息已出队、正在发送
+    assert stats["total_depth"] == 0 and stats["sent"] == 1
+    assert [m["price"] for m in slow.messages] == [1500.0]
+
+
+def test_stale_quotes_coalesced_for_slow_consumer():
+    """慢客户端积压的同一股票行情只保留最新一条"""
+    async def main():
+        manager = ConnectionManager()
+        gate = asyncio.Event()
+        slow = FakeWebSocket(gate=gate)
+        await manager.connect(slow)
+        manager.subscriptions["000001"] = {slow}
+
+        for i in range(20):
+            await manager.send_to_symbol_subscribers("000001", quote("000001", 10.0 + i))
+            await asyncio.sleep(0)
+        gate.set()
+        await manager.flush()
+        return manager, slow
+
+    manager, slow = asyncio.run(main())
+
+    prices = [m["price"] for m in slow.messages]
+    # 第一条在发送中，其余合并为最新一条
+    assert prices == [10.0, 29.0]
+    assert manager.get_send_stats()["coalesced"] == 18
+
+
+def test_queue_overflow_drops_quotes_then_disconnects_slow_consumer():
+    """队列满时先丢弃最旧行情；只剩不可丢弃消息时断开慢消费者"""
+    async def main():
+        manager = ConnectionManager(send_queue_size=4)
+        gate = asyncio.Event()
+        slow, fast = FakeWebSocket(gate=gate), FakeWebSocket()
+        for ws in (slow, fast):
+            await manager.connect(ws)
+
+        await manager.broadcast({"type": "notice", "n": 0})
+        await asyncio.sleep(0)  # 第一条进入发送中
+        for i in range(6):
+            await manager.broadcast(quote(f"{i:06d}", float(i)))
+            await asyncio.sleep(0)
+        dropped = manager.get_send_stats()["dropped"]
+
+        for i in range(5):
+            await manager.broadcast({"type": "notice", "n": i + 1})
+            await asyncio.sleep(0)
+        await manager.flush()
+        return manager, slow, fast, dropped
+
+    manager, slow, fast, dropped = asyncio.run(main())
+
+    assert dropped == 2
+    assert slow not in manager.active_connections
+    assert slow.closed_code == 1013
+    assert manager.slow_consumer_disconnects == 1
+    assert fast in manager.active_connections
+    assert [m["n"] for m in fast.messages if m["type"] == "notice"] == [0, 1, 2, 3, 4, 5]
+
+
+def test_failed_send_disconnects_client():
+    """发送失败的连接被移除"""
+    async def main():
+        manager = ConnectionManager()
+        broken = FakeWebSocket(fail=True)
+        await manager.connect(broken)
+        await manager.subscribe(broken, "600519")
+        await manager.flush()
+        return manager, broken
+
+    manager, broken = asyncio.run(main())
+
+    assert broken not in manager.active_connections
+    assert broken not in manager.subscriptions["600519"]
+    assert manager.get_stats()["send_queues"]["total_depth"] == 0
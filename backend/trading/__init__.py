@@ -15,6 +15,7 @@ from .order import Order, OrderType, OrderSide, OrderStatus
 from .position import Position
 from .strategy import BaseStrategy, BuyAndHoldStrategy
 from .backtester import Backtester
+from .vectorized_backtester import VectorizedBacktester
 from .metrics import calculate_all_metrics
 from .report_generator import ReportGenerator
 
@@ -44,6 +45,7 @@ __all__ = [
     'BaseStrategy',
     'BuyAndHoldStrategy',
     'Backtester',
+    'VectorizedBacktester',
 
     # Metrics & Reporting (Task 2)
     'calculate_all_metrics',
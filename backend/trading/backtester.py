@@ -10,6 +10,7 @@ import pandas as pd
 import numpy as np
 
 from .strategy import BaseStrategy, BuyAndHoldStrategy
+from .bar_window import BarWindow
 from .portfolio_manager import PortfolioManager
 from .order_manager import OrderManager
 from .order import OrderSide, OrderType
@@ -138,16 +139,21 @@ class Backtester:
         # 回测循环
         self.trading_days = []
 
+        # 预先提取逐K线字段，循环内只做列表索引
+        dates = df['date'].tolist() if 'date' in df.columns else df.index.tolist()
+        closes = df['close'].tolist()
+        window = BarWindow(df)
+
         for idx in range(len(df)):
-            current_date = df.iloc[idx]['date'] if 'date' in df.columns else df.index[idx]
-            current_price = df.iloc[idx]['close']
+            current_date = dates[idx]
+            current_price = closes[idx]
 
             # 更新持仓价格
             if self.portfolio.has_position(symbol):
                 self.portfolio.update_prices({symbol: current_price})
 
-            # 准备当前数据（包含历史数据）
-            current_data = df.iloc[:idx+1].copy()
+            # 推进扩展窗口（零拷贝，包含历史数据）
+            window.advance(idx + 1)
 
             # 获取投资组合状态
             portfolio_state = {
@@ -158,7 +164,7 @@ class Backtester:
             }
 
             # 策略生成信号
-            signal = self.strategy.generate_signal(symbol, current_data, portfolio_state)
+            signal = self.strategy.on_bar(symbol, window, portfolio_state)
 
             # 执行交易
             action = signal.get('action', 'hold')
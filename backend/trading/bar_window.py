@@ -0,0 +1,65 @@
+"""
+Bar Window
+
+扩展窗口 - 回测时按K线推进的只读历史数据视图
+"""
+
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class BarWindow:
+    """扩展窗口
+
+    回测开始时将各列一次性提取为NumPy数组，之后每根K线只移动窗口末端，
+    列访问返回数组切片视图，不产生拷贝。窗口内容应视为只读。
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        """初始化扩展窗口
+
+        Args:
+            frame: 已按时间排序的完整行情数据
+        """
+        self._frame = frame
+        self._columns: Dict[Any, np.ndarray] = {}
+        for col in frame.columns:
+            arr = frame[col].to_numpy()
+            arr.flags.writeable = False
+            self._columns[col] = arr
+        self._end = 0
+        self._view: Optional[pd.DataFrame] = None
+
+    def advance(self, end: int):
+        """将窗口末端移动到第 end 根K线（不含）"""
+        self._end = end
+        self._view = None
+
+    def __len__(self) -> int:
+        return self._end
+
+    def __contains__(self, column) -> bool:
+        return column in self._columns
+
+    def __getitem__(self, column) -> np.ndarray:
+        """获取列在窗口内的数组视图"""
+        return self._columns[column][:self._end]
+
+    @property
+    def columns(self) -> List[Any]:
+        return list(self._columns)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self['close']
+
+    def latest(self, column) -> Any:
+        """获取列的最新值"""
+        return self._columns[column][self._end - 1]
+
+    def to_frame(self) -> pd.DataFrame:
+        """获取窗口对应的DataFrame视图（同一根K线内重复调用复用同一对象）"""
+        if self._view is None:
+            self._view = self._frame.iloc[:self._end]
+        return self._view
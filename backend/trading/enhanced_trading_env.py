@@ -8,12 +8,17 @@ import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 import pandas as pd
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 import logging
 from collections import deque
 
+from .env_features import build_feature_matrix
+
 logger = logging.getLogger(__name__)
 
+# 观察中使用的均线周期
+ENHANCED_MA_WINDOWS = (10, 20)
+
 
 class EnhancedTradingEnv(gym.Env):
     """增强版交易环境（支持T+1限制）
@@ -52,7 +57,8 @@ class EnhancedTradingEnv(gym.Env):
         stamp_duty: float = 0.001,  # 0.1%印花税（仅卖出）
         max_shares: int = 100000,
         lookback_window: int = 20,
-        enable_t1: bool = True  # 是否启用T+1限制
+        enable_t1: bool = True,  # 是否启用T+1限制
+        features: Optional[np.ndarray] = None
     ):
         """初始化环境
 
@@ -64,6 +70,7 @@ class EnhancedTradingEnv(gym.Env):
             max_shares: 最大持仓数量
             lookback_window: 回看窗口大小
             enable_t1: 是否启用T+1限制
+            features: 预计算的特征矩阵（build_feature_matrix 的结果，多进程训练时由共享内存传入）
         """
         super().__init__()
 
@@ -87,6 +94,12 @@ class EnhancedTradingEnv(gym.Env):
             dtype=np.float32
         )
 
+        # 预计算市场特征与技术指标（因果计算，step() 中只需按行索引）
+        if features is None:
+            features = build_feature_matrix(self.df, ma_windows=ENHANCED_MA_WINDOWS, include_atr=True)
+        self._features = features
+        self._close = self.df['close'].to_numpy(dtype=np.float64)
+
         # T+1持仓追踪：{买入日期: 持仓数量}
         self.t1_holdings: Dict[int, int] = {}
 
@@ -177,36 +190,11 @@ class EnhancedTradingEnv(gym.Env):
         return obs, reward, False, False, {}
 
     def _get_observation(self) -> np.ndarray:
-        """获取当前观察（动态计算技术指标）"""
-        row = self.df.iloc[self.current_step]
-        close = row['close']
-
-        # 获取历史数据
-        historical_data = self.df.iloc[:self.current_step + 1]
-
-        # ===== 市场特征 =====
-        market_features = np.array([
-            row['close'] / 100.0,
-            row['high'] / 100.0,
-            row['low'] / 100.0,
-            row['volume'] / 1e6,
-            (row['close'] - row['open']) / row['open'] if row['open'] > 0 else 0
-        ], dtype=np.float32)
+        """获取当前观察（市场特征与技术指标取自预计算矩阵）"""
+        close = self._close[self.current_step]
 
-        # ===== 技术指标 =====
-        rsi = self._calculate_rsi(historical_data['close'])
-        macd = self._calculate_macd(historical_data['close'])
-        ma10 = self._calculate_ma(historical_data['close'], 10)
-        ma20 = self._calculate_ma(historical_data['close'], 20)
-        atr = self._calculate_atr(historical_data)
-
-        technical_features = np.array([
-            rsi / 100.0,
-            np.tanh(macd / close) if close > 0 else 0,
-            (close - ma10) / ma10 if ma10 > 0 else 0,
-            (close - ma20) / ma20 if ma20 > 0 else 0,
-            atr / close if close > 0 else 0
-        ], dtype=np.float32)
+        # ===== 市场特征 + 技术指标 =====
+        features = self._features[self.current_step]
 
         # ===== 账户状态 =====
         portfolio_value = self._get_portfolio_value()
@@ -214,30 +202,26 @@ class EnhancedTradingEnv(gym.Env):
         if self.shares_held > 0 and self.cost_basis > 0:
             unrealized_pnl = (close - self.cost_basis) / self.cost_basis
 
-        account_features = np.array([
-            self.cash / portfolio_value if portfolio_value > 0 else 1.0,
-            (self.shares_held * close) / portfolio_value if portfolio_value > 0 else 0.0,
-            unrealized_pnl
-        ], dtype=np.float32)
-
         # ===== T+1状态 =====
         sellable_shares = self._get_sellable_shares()
         can_sell_ratio = sellable_shares / self.shares_held if self.shares_held > 0 else 1.0
 
-        t1_features = np.array([can_sell_ratio], dtype=np.float32)
-
-        # 合并所有特征
-        obs = np.concatenate([market_features, technical_features, account_features, t1_features])
+        state_features = np.array([
+            self.cash / portfolio_value if portfolio_value > 0 else 1.0,
+            (self.shares_held * close) / portfolio_value if portfolio_value > 0 else 0.0,
+            unrealized_pnl,
+            can_sell_ratio
+        ], dtype=np.float32)
 
         # 处理异常值
-        obs = np.nan_to_num(obs, nan=0.0, posinf=1.0, neginf=-1.0)
-        obs = np.clip(obs, -10, 10)
+        state_features = np.nan_to_num(state_features, nan=0.0, posinf=1.0, neginf=-1.0)
+        state_features = np.clip(state_features, -10, 10)
 
-        return obs
+        return np.concatenate([features, state_features])
 
     def _execute_action(self, action: int):
         """执行交易动作（考虑T+1限制）"""
-        price = self.df.iloc[self.current_step]['close']
+        price = self._close[self.current_step]
 
         if action == 1:  # BUY_25
             self._execute_buy(price, 0.25)
@@ -358,7 +342,7 @@ class EnhancedTradingEnv(gym.Env):
                 del self.t1_holdings[buy_date]
 
     def _calculate_rsi(self, close_prices: pd.Series, window: int = 14) -> float:
-        """计算RSI"""
+        """计算RSI（逐步计算的参考实现）"""
         if len(close_prices) < window + 1:
             return 50.0
 
@@ -414,7 +398,7 @@ class EnhancedTradingEnv(gym.Env):
 
     def _get_portfolio_value(self) -> float:
         """计算当前组合价值"""
-        price = self.df.iloc[self.current_step]['close']
+        price = self._close[self.current_step]
         return self.cash + self.shares_held * price
 
     def _calculate_reward(self, begin_value: float, end_value: float, action: int) -> float:
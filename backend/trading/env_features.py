@@ -0,0 +1,106 @@
+"""
+Environment Feature Matrix
+
+交易环境观察特征预计算 - 构造时一次性计算全部K线的市场特征与技术指标
+
+所有指标均为因果计算（rolling/ewm 第 i 行只依赖前 i 行数据），
+因此整段序列一次计算的结果与逐步截取 df.iloc[:i+1] 重算的结果一致，不引入未来信息。
+"""
+
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+# 市场特征列数: close, high, low, volume, 涨跌幅
+MARKET_FEATURE_DIM = 5
+
+
+def _rsi(close: pd.Series, window: int = 14) -> np.ndarray:
+    """RSI，数据不足或无法计算时为50"""
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    rsi = (100 - (100 / (1 + rs))).to_numpy(dtype=np.float64, copy=True)
+    rsi[:window] = 50.0
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def _macd(close: pd.Series, fast: int = 12, slow: int = 26) -> np.ndarray:
+    """MACD线，数据不足时为0"""
+    ema_fast = close.ewm(span=fast, adjust=False).mean()
+    ema_slow = close.ewm(span=slow, adjust=False).mean()
+    macd = (ema_fast - ema_slow).to_numpy(dtype=np.float64, copy=True)
+    macd[:slow - 1] = 0.0
+    return np.where(np.isnan(macd), 0.0, macd)
+
+
+def _ma(close: pd.Series, window: int) -> np.ndarray:
+    """移动平均，数据不足时使用已有数据均值，无法计算时使用收盘价"""
+    ma = close.rolling(window=window).mean().to_numpy(dtype=np.float64, copy=True)
+    values = close.to_numpy(dtype=np.float64, copy=True)
+    for i in range(min(window - 1, len(values))):
+        ma[i] = close.iloc[:i + 1].mean()
+    nan_mask = np.isnan(ma)
+    nan_mask[:window - 1] = False
+    ma[nan_mask] = values[nan_mask]
+    return ma
+
+
+def _atr(df: pd.DataFrame, window: int = 14) -> np.ndarray:
+    """ATR（平均真实波幅），数据不足时为0"""
+    high, low, close = df['high'], df['low'], df['close']
+    tr1 = high - low
+    tr2 = abs(high - close.shift())
+    tr3 = abs(low - close.shift())
+    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    atr = tr.rolling(window=window).mean().to_numpy(dtype=np.float64, copy=True)
+    atr[:1] = 0.0
+    return np.where(np.isnan(atr), 0.0, atr)
+
+
+def _deviation(close: np.ndarray, ma: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ma > 0, (close - ma) / ma, 0.0)
+
+
+def build_feature_matrix(
+    df: pd.DataFrame,
+    ma_windows: Sequence[int] = (10,),
+    include_atr: bool = False
+) -> np.ndarray:
+    """计算观察中与账户无关的部分（市场特征 + 技术指标）
+
+    列顺序: close/100, high/100, low/100, volume/1e6, 涨跌幅,
+            RSI/100, tanh(MACD/close), 各MA偏离度, [ATR/close]
+
+    Args:
+        df: 行情数据（open, high, low, close, volume），已按时间排序
+        ma_windows: 均线周期
+        include_atr: 是否包含ATR
+
+    Returns:
+        形状 (K线数, 特征数) 的 float32 连续数组，已做 nan_to_num 与 clip(-10, 10)
+    """
+    close_s = df['close']
+    close = close_s.to_numpy(dtype=np.float64)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns = [
+            close / 100.0,
+            df['high'].to_numpy(dtype=np.float64) / 100.0,
+            df['low'].to_numpy(dtype=np.float64) / 100.0,
+            df['volume'].to_numpy(dtype=np.float64) / 1e6,
+            np.where(open_ > 0, (close - open_) / open_, 0.0),
+            _rsi(close_s) / 100.0,
+            np.where(close > 0, np.tanh(_macd(close_s) / close), 0.0),
+        ]
+        columns.extend(_deviation(close, _ma(close_s, w)) for w in ma_windows)
+        if include_atr:
+            columns.append(np.where(close > 0, _atr(df) / close, 0.0))
+
+    # 与逐步计算一致：先按 float32 存储，再处理异常值
+    features = np.column_stack(columns).astype(np.float32)
+    features = np.nan_to_num(features, nan=0.0, posinf=1.0, neginf=-1.0)
+    return np.ascontiguousarray(np.clip(features, -10, 10))
@@ -381,3 +381,115 @@ def calculate_all_metrics(
         # 时间指标
         'trading_days': trading_days
     }
+
+
+def calculate_all_metrics_batch(
+    initial_capital: float,
+    equity_curves: np.ndarray,
+    trade_stats: Dict[str, np.ndarray],
+    trading_days: int,
+    risk_free_rate: float = 0.03,
+    trading_days_per_year: int = 252
+) -> Dict[str, np.ndarray]:
+    """批量计算多条权益曲线的性能指标
+
+    与 calculate_all_metrics 公式一致，按列向量化计算，用于参数扫描/多股票回测
+
+    Args:
+        initial_capital: 初始资金（各列相同）
+        equity_curves: 权益曲线矩阵，形状 (天数, 曲线数)
+        trade_stats: 卖出交易汇总，包含 total_trades/winning_trades/losing_trades/
+            gross_profit/gross_loss，每项形状 (曲线数,)
+        trading_days: 交易天数
+        risk_free_rate: 无风险利率
+        trading_days_per_year: 每年交易日数
+
+    Returns:
+        指标名 -> 形状 (曲线数,) 的数组，键与 calculate_all_metrics 相同
+    """
+    equity = np.asarray(equity_curves, dtype=np.float64)
+    if equity.ndim != 2 or equity.shape[0] < 2:
+        return {}
+
+    n_curves = equity.shape[1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(equity, axis=0) / equity[:-1]
+
+        # 收益指标
+        final_value = equity[-1]
+        if initial_capital == 0:
+            total_return = np.zeros(n_curves)
+        else:
+            total_return = (final_value - initial_capital) / initial_capital * 100
+        if trading_days == 0:
+            annualized_return = np.zeros(n_curves)
+        else:
+            years = trading_days / trading_days_per_year
+            annualized_return = ((1 + total_return / 100) ** (1 / years) - 1) * 100
+
+        # 风险指标
+        std = np.std(returns, axis=0, ddof=1)
+        volatility = std * np.sqrt(trading_days_per_year) * 100
+        mean_annual = np.mean(returns, axis=0) * trading_days_per_year
+        annual_std = std * np.sqrt(trading_days_per_year)
+        sharpe = np.where(annual_std == 0, 0.0, (mean_annual - risk_free_rate) / annual_std)
+
+        downside = returns < 0
+        n_down = downside.sum(axis=0)
+        down_mean = np.where(downside, returns, 0.0).sum(axis=0) / n_down
+        down_var = np.where(downside, (returns - down_mean) ** 2, 0.0).sum(axis=0) / (n_down - 1)
+        annual_down_std = np.sqrt(down_var) * np.sqrt(trading_days_per_year)
+        sortino = np.where(
+            (n_down == 0) | (annual_down_std == 0),
+            np.inf,
+            (mean_annual - risk_free_rate) / annual_down_std
+        )
+
+        # 回撤指标
+        cumulative_max = np.maximum.accumulate(equity, axis=0)
+        drawdowns = equity - cumulative_max
+        max_drawdown = np.abs(drawdowns.min(axis=0))
+        max_drawdown_pct = np.abs((drawdowns / cumulative_max * 100).min(axis=0))
+        calmar = np.where(max_drawdown_pct == 0, 0.0, annualized_return / max_drawdown_pct)
+
+        # 交易指标
+        total_trades = np.asarray(trade_stats['total_trades'])
+        winning_trades = np.asarray(trade_stats['winning_trades'])
+        losing_trades = np.asarray(trade_stats['losing_trades'])
+        gross_profit = np.asarray(trade_stats['gross_profit'], dtype=np.float64)
+        gross_loss = np.abs(np.asarray(trade_stats['gross_loss'], dtype=np.float64))
+        win_rate = np.where(total_trades > 0, winning_trades / total_trades * 100, 0.0)
+        profit_factor = np.where(
+            gross_loss == 0,
+            np.where(gross_profit > 0, np.inf, 0.0),
+            gross_profit / gross_loss
+        )
+
+    return {
+        # 收益指标
+        'initial_capital': np.full(n_curves, float(initial_capital)),
+        'final_value': final_value,
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+
+        # 风险指标
+        'volatility': volatility,
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+
+        # 回撤指标
+        'max_drawdown': max_drawdown,
+        'max_drawdown_pct': max_drawdown_pct,
+        'calmar_ratio': calmar,
+
+        # 交易指标
+        'win_rate': win_rate,
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'profit_factor': profit_factor,
+
+        # 时间指标
+        'trading_days': np.full(n_curves, trading_days)
+    }
@@ -0,0 +1,249 @@
+"""
+Shared Environment Pool
+
+多进程RL训练的共享行情数据与环境工厂
+
+主进程将股票池的 OHLCV 与预计算特征矩阵打包进一块 SharedMemory，
+各 worker 进程按名称挂载后直接以视图构造 EnhancedTradingEnv，不复制、不重算指标。
+每个 worker 负责股票池的一个子集，reset 时在子集内随机切换股票。
+"""
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import gymnasium as gym
+import numpy as np
+import pandas as pd
+
+from .enhanced_trading_env import EnhancedTradingEnv, ENHANCED_MA_WINDOWS
+from .env_features import build_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+MARKET_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+@dataclass(frozen=True)
+class SharedMarketDataSpec:
+    """共享行情数据描述（可pickle，传给worker进程）"""
+    shm_name: str
+    symbols: Tuple[str, ...]
+    offsets: Tuple[Tuple[int, int], ...]  # 每只股票的 (起始行, 行数)
+    total_rows: int
+    n_features: int
+
+    @property
+    def market_nbytes(self) -> int:
+        return self.total_rows * len(MARKET_COLUMNS) * np.dtype(np.float64).itemsize
+
+    @property
+    def features_nbytes(self) -> int:
+        return self.total_rows * self.n_features * np.dtype(np.float32).itemsize
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """挂载已存在的共享内存（worker不登记到resource_tracker，避免退出时被提前释放）"""
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        # Python < 3.13 没有 track 参数
+        return shared_memory.SharedMemory(name=name, create=False)
+
+
+class SharedMarketData:
+    """共享内存中的股票池行情与特征矩阵
+
+    布局: [OHLCV float64 (总行数, 5)] [特征 float32 (总行数, 特征数)]
+    """
+
+    def __init__(self, spec: SharedMarketDataSpec, shm: shared_memory.SharedMemory, owner: bool):
+        self.spec = spec
+        self._shm = shm
+        self._owner = owner
+        self._market = np.ndarray(
+            (spec.total_rows, len(MARKET_COLUMNS)), dtype=np.float64, buffer=shm.buf
+        )
+        self._features = np.ndarray(
+            (spec.total_rows, spec.n_features), dtype=np.float32, buffer=shm.buf, offset=spec.market_nbytes
+        )
+        if not owner:
+            self._market.flags.writeable = False
+            self._features.flags.writeable = False
+
+    @classmethod
+    def create(cls, stock_data: Sequence[Tuple[str, pd.DataFrame]]) -> 'SharedMarketData':
+        """由 [(symbol, df), ...] 创建共享数据（主进程调用，负责最终 unlink）"""
+        if not stock_data:
+            raise ValueError("stock_data is empty")
+
+        frames = []
+        features = []
+        offsets = []
+        row = 0
+        for symbol, df in stock_data:
+            df = df.reset_index(drop=True)
+            frames.append(df[list(MARKET_COLUMNS)].to_numpy(dtype=np.float64))
+            features.append(build_feature_matrix(df, ma_windows=ENHANCED_MA_WINDOWS, include_atr=True))
+            offsets.append((row, len(df)))
+            row += len(df)
+
+        n_features = features[0].shape[1]
+        spec_probe = SharedMarketDataSpec('', (), (), row, n_features)
+        shm = shared_memory.SharedMemory(create=True, size=max(spec_probe.market_nbytes + spec_probe.features_nbytes, 1))
+        spec = SharedMarketDataSpec(
+            shm_name=shm.name,
+            symbols=tuple(str(symbol) for symbol, _ in stock_data),
+            offsets=tuple(offsets),
+            total_rows=row,
+            n_features=n_features,
+        )
+
+        data = cls(spec, shm, owner=True)
+        for (start, length), market, feats in zip(offsets, frames, features):
+            data._market[start:start + length] = market
+            data._features[start:start + length] = feats
+
+        logger.info(
+            f"SharedMarketData created: {len(offsets)} symbols, {row} rows, "
+            f"{(spec.market_nbytes + spec.features_nbytes) / 1024 ** 2:.1f} MB"
+        )
+        return data
+
+    @classmethod
+    def attach(cls, spec: SharedMarketDataSpec) -> 'SharedMarketData':
+        """在worker进程中挂载共享数据（只读）"""
+        return cls(spec, _attach_shared_memory(spec.shm_name), owner=False)
+
+    def __len__(self) -> int:
+        return len(self.spec.offsets)
+
+    def market_frame(self, index: int) -> pd.DataFrame:
+        """第 index 只股票的 OHLCV（共享内存视图）"""
+        start, length = self.spec.offsets[index]
+        return pd.DataFrame(self._market[start:start + length], columns=list(MARKET_COLUMNS), copy=False)
+
+    def features(self, index: int) -> np.ndarray:
+        """第 index 只股票的特征矩阵（共享内存视图）"""
+        start, length = self.spec.offsets[index]
+        return self._features[start:start + length]
+
+    def close(self):
+        """释放本进程的映射"""
+        self._market = None
+        self._features = None
+        self._shm.close()
+
+    def unlink(self):
+        """删除共享内存（仅创建方调用）"""
+        if self._owner:
+            self._shm.unlink()
+
+
+def split_symbols(n_symbols: int, n_envs: int) -> List[List[int]]:
+    """将股票按轮询方式分配给各环境；环境数多于股票数时循环复用"""
+    if n_envs <= n_symbols:
+        return [list(range(i, n_symbols, n_envs)) for i in range(n_envs)]
+    return [[i % n_symbols] for i in range(n_envs)]
+
+
+class SharedPoolTradingEnv(gym.Env):
+    """在一组股票之间轮换的 EnhancedTradingEnv
+
+    每次 reset 在分配的股票中随机选择一只，环境对象按股票缓存复用
+    """
+
+    metadata = {'render.modes': ['human']}
+
+    def __init__(
+        self,
+        spec: SharedMarketDataSpec,
+        symbol_indices: Sequence[int],
+        env_kwargs: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__()
+        self._data = SharedMarketData.attach(spec)
+        self._indices = list(symbol_indices)
+        self._env_kwargs = dict(env_kwargs or {})
+        self._rng = np.random.default_rng(seed)
+        self._envs: Dict[int, EnhancedTradingEnv] = {}
+
+        self.current_index = self._indices[0]
+        self._env = self._get_env(self.current_index)
+        self.action_space = self._env.action_space
+        self.observation_space = self._env.observation_space
+
+    @property
+    def current_symbol(self) -> str:
+        return self._data.spec.symbols[self.current_index]
+
+    def _get_env(self, index: int) -> EnhancedTradingEnv:
+        env = self._envs.get(index)
+        if env is None:
+            env = self._envs[index] = EnhancedTradingEnv(
+                df=self._data.market_frame(index),
+                features=self._data.features(index),
+                **self._env_kwargs
+            )
+        return env
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self.current_index = int(self._rng.choice(self._indices))
+        self._env = self._get_env(self.current_index)
+        obs, info = self._env.reset(seed=seed, options=options)
+        info['symbol'] = self.current_symbol
+        return obs, info
+
+    def step(self, action):
+        return self._env.step(action)
+
+    def render(self, mode='human'):
+        return self._env.render(mode)
+
+    def close(self):
+        self._envs.clear()
+        self._env = None
+        self._data.close()
+
+
+class SharedEnvFactory:
+    """可pickle的环境工厂，供 SubprocVecEnv 在worker进程中构造环境"""
+
+    def __init__(
+        self,
+        spec: SharedMarketDataSpec,
+        symbol_indices: Sequence[int],
+        env_kwargs: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None,
+        monitor: bool = True
+    ):
+        self.spec = spec
+        self.symbol_indices = list(symbol_indices)
+        self.env_kwargs = dict(env_kwargs or {})
+        self.seed = seed
+        self.monitor = monitor
+
+    def __call__(self) -> gym.Env:
+        env = SharedPoolTradingEnv(self.spec, self.symbol_indices, self.env_kwargs, self.seed)
+        if self.monitor:
+            from stable_baselines3.common.monitor import Monitor
+            env = Monitor(env)
+        return env
+
+
+def make_shared_env_factories(
+    spec: SharedMarketDataSpec,
+    n_envs: int,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    seed: int = 0,
+    monitor: bool = True
+) -> List[SharedEnvFactory]:
+    """为 n_envs 个worker生成环境工厂，每个worker分配股票池的不同子集"""
+    return [
+        SharedEnvFactory(spec, indices, env_kwargs, seed=seed + i, monitor=monitor)
+        for i, indices in enumerate(split_symbols(len(spec.symbols), n_envs))
+    ]
@@ -11,6 +11,8 @@ import pandas as pd
 from typing import Tuple
 import logging
 
+from .env_features import build_feature_matrix
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,10 +90,13 @@ class SimpleTradingEnv(gym.Env):
         logger.info(f"SimpleTradingEnv initialized: {len(df)} days, initial_cash={initial_cash}")
 
     def _calculate_indicators(self):
-        """初始化技术指标列（不预计算，避免Look-Ahead Bias）"""
-        # 不再预计算指标，而是在_get_observation中动态计算
-        # 这样可以确保只使用截至当前时间点的历史数据
-        pass
+        """一次性预计算市场特征与技术指标矩阵
+
+        指标均为因果计算（第 i 行只使用截至第 i 根K线的数据），不存在Look-Ahead Bias，
+        step() 中只需按 current_step 取行
+        """
+        self._features = build_feature_matrix(self.df, ma_windows=(10,))
+        self._close = self.df['close'].to_numpy(dtype=np.float64)
 
     def reset(self, seed=None, options=None) -> Tuple[np.ndarray, dict]:
         """重置环境"""
@@ -153,38 +158,11 @@ class SimpleTradingEnv(gym.Env):
         return obs, reward, False, False, {}
 
     def _get_observation(self) -> np.ndarray:
-        """获取当前观察（动态计算技术指标，避免Look-Ahead Bias）"""
-        row = self.df.iloc[self.current_step]
-        close = row['close']
-
-        # ===== 动态计算技术指标（只使用历史数据） =====
-        # 获取截至当前时间点的历史数据
-        historical_data = self.df.iloc[:self.current_step + 1]
-
-        # 计算RSI（使用历史数据）
-        rsi_value = self._calculate_rsi(historical_data['close'])
-
-        # 计算MACD（使用历史数据）
-        macd_value = self._calculate_macd(historical_data['close'])
-
-        # 计算MA10（使用历史数据）
-        ma10_value = self._calculate_ma(historical_data['close'], window=10)
-
-        # ===== 市场特征 (标准化) =====
-        market_features = np.array([
-            row['close'] / 100.0,  # 标准化价格
-            row['high'] / 100.0,
-            row['low'] / 100.0,
-            row['volume'] / 1e6,  # 标准化成交量
-            (row['close'] - row['open']) / row['open'] if row['open'] > 0 else 0  # 涨跌幅
-        ], dtype=np.float32)
+        """获取当前观察（市场特征与技术指标取自预计算矩阵）"""
+        close = self._close[self.current_step]
 
-        # ===== 技术指标 (标准化) =====
-        technical_features = np.array([
-            rsi_value / 100.0,  # RSI 归一化到 0-1
-            np.tanh(macd_value / close) if close > 0 else 0,  # MACD 标准化
-            (close - ma10_value) / ma10_value if ma10_value > 0 else 0  # MA偏离度
-        ], dtype=np.float32)
+        # ===== 市场特征 + 技术指标 (已标准化) =====
+        features = self._features[self.current_step]
 
         # ===== 账户状态 =====
         portfolio_value = self._get_portfolio_value()
@@ -193,17 +171,14 @@ class SimpleTradingEnv(gym.Env):
             (self.shares_held * close) / portfolio_value if portfolio_value > 0 else 0.0  # 持仓比例
         ], dtype=np.float32)
 
-        # 合并
-        obs = np.concatenate([market_features, technical_features, account_features])
-
         # 处理异常值
-        obs = np.nan_to_num(obs, nan=0.0, posinf=1.0, neginf=-1.0)
-        obs = np.clip(obs, -10, 10)
+        account_features = np.nan_to_num(account_features, nan=0.0, posinf=1.0, neginf=-1.0)
+        account_features = np.clip(account_features, -10, 10)
 
-        return obs
+        return np.concatenate([features, account_features])
 
     def _calculate_rsi(self, close_prices: pd.Series, window: int = 14) -> float:
-        """动态计算RSI指标（只使用历史数据）
+        """动态计算RSI指标（只使用历史数据，逐步计算的参考实现）
 
         Args:
             close_prices: 截至当前时间点的收盘价序列
@@ -270,7 +245,7 @@ class SimpleTradingEnv(gym.Env):
 
     def _execute_action(self, action: int):
         """执行交易动作"""
-        price = self.df.iloc[self.current_step]['close']
+        price = self._close[self.current_step]
 
         if action == 1:  # BUY
             # 买入30%可用资金
@@ -310,7 +285,7 @@ class SimpleTradingEnv(gym.Env):
 
     def _get_portfolio_value(self) -> float:
         """计算当前组合价值"""
-        price = self.df.iloc[self.current_step]['close']
+        price = self._close[self.current_step]
         return self.cash + self.shares_held * price
 
     def _calculate_reward(self, begin_value: float, end_value: float, action: int) -> float:
@@ -5,9 +5,12 @@ Strategy Base Class
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, TYPE_CHECKING
 import pandas as pd
 
+if TYPE_CHECKING:
+    from .bar_window import BarWindow
+
 
 class BaseStrategy(ABC):
     """策略基类
@@ -48,6 +51,27 @@ class BaseStrategy(ABC):
         """
         pass
 
+    def on_bar(
+        self,
+        symbol: str,
+        window: 'BarWindow',
+        portfolio_state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """回测引擎每根K线调用的入口
+
+        默认实现将窗口转换为DataFrame视图后调用 generate_signal，
+        需要更快速度的策略可以重写此方法，直接使用窗口中的NumPy数组。
+
+        Args:
+            symbol: 股票代码
+            window: 截至当前K线的扩展窗口（只读）
+            portfolio_state: 当前投资组合状态
+
+        Returns:
+            交易信号字典，格式同 generate_signal
+        """
+        return self.generate_signal(symbol, window.to_frame(), portfolio_state)
+
     @abstractmethod
     def on_trade(self, trade_info: Dict[str, Any]):
         """交易执行后的回调
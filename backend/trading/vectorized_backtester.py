@@ -0,0 +1,405 @@
+"""
+Vectorized Backtester
+
+向量化回测引擎 - 一次性对整个股票池 × 参数网格进行回测
+
+信号以 (交易日, 股票) 的二维数组计算，账户状态以 (参数组合, 股票) 的二维数组
+逐日推进，每个 (参数组合, 股票) 对应一个独立账户，交易规则与 Backtester 一致：
+- 收盘价成交，买入全仓（按 position_size），卖出清仓
+- 佣金 max(成交额 × 费率, 最低佣金)，滑点买入上浮/卖出下浮（同 OrderManager）
+- 卖出收取印花税，买入数量按整手取整，T+1（当日买入的股份当日不可卖出）
+"""
+
+import time
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .metrics import calculate_all_metrics_batch
+
+# 信号函数: signal_func(close, cache, **params) -> (买入信号, 卖出信号)，形状均为 (交易日, 股票)
+SignalFunc = Callable[..., Tuple[np.ndarray, np.ndarray]]
+
+
+def expand_param_grid(param_grid: Union[Dict[str, Sequence], List[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+    """展开参数网格
+
+    Args:
+        param_grid: {参数名: 候选值列表} 或参数组合列表
+
+    Returns:
+        参数组合列表（笛卡尔积）
+    """
+    if not param_grid:
+        return [{}]
+    if isinstance(param_grid, list):
+        return [dict(p) for p in param_grid]
+
+    keys = list(param_grid.keys())
+    return [dict(zip(keys, values)) for values in product(*(param_grid[k] for k in keys))]
+
+
+def build_close_panel(data: Dict[str, pd.DataFrame], price_column: str = 'close') -> pd.DataFrame:
+    """将 {股票代码: 行情DataFrame} 对齐为收盘价面板
+
+    Args:
+        data: 各股票行情数据（包含 date 列或日期索引）
+        price_column: 价格列名
+
+    Returns:
+        行为交易日、列为股票代码的价格面板，停牌/未上市为 NaN
+    """
+    series = {}
+    for symbol, df in data.items():
+        if 'date' in df.columns:
+            s = df.set_index('date')[price_column]
+        else:
+            s = df[price_column]
+        s.index = pd.to_datetime(s.index)
+        series[symbol] = s[~s.index.duplicated(keep='last')]
+    return pd.DataFrame(series).sort_index()
+
+
+class IndicatorCache:
+    """指标缓存 - 参数网格中相同周期的指标只计算一次"""
+
+    def __init__(self, close: np.ndarray):
+        self.close = close
+        self._frame = pd.DataFrame(close)
+        self._cache: Dict[Tuple, np.ndarray] = {}
+
+    def get(self, key: Tuple, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+    def sma(self, window: int) -> np.ndarray:
+        """简单移动平均"""
+        return self.get(('sma', window), lambda: self._frame.rolling(window=window).mean().to_numpy())
+
+    def rsi(self, period: int) -> np.ndarray:
+        """RSI（算法同 TechnicalStrategy._calculate_rsi）"""
+        def compute():
+            delta = self._frame.diff()
+            gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            rs = gain / loss
+            return (100 - (100 / (1 + rs))).to_numpy()
+        return self.get(('rsi', period), compute)
+
+    def macd_histogram(self, fast: int = 12, slow: int = 26, signal: int = 9) -> np.ndarray:
+        """MACD柱状图（算法同 TechnicalStrategy._calculate_macd）"""
+        def compute():
+            ema_fast = self._frame.ewm(span=fast, adjust=False).mean()
+            ema_slow = self._frame.ewm(span=slow, adjust=False).mean()
+            macd_line = ema_fast - ema_slow
+            signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+            return (macd_line - signal_line).to_numpy()
+        return self.get(('macd', fast, slow, signal), compute)
+
+
+def technical_signals(
+    close: np.ndarray,
+    cache: Optional[IndicatorCache] = None,
+    rsi_period: int = 14,
+    rsi_overbought: float = 70,
+    rsi_oversold: float = 30,
+    ma_short: int = 5,
+    ma_long: int = 20,
+    use_macd: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """TechnicalStrategy 规则的向量化版本
+
+    RSI超卖/超买记2分，均线金叉/死叉、MACD柱正/负各记1分，
+    空仓时买入分≥2买入，持仓时卖出分≥2卖出
+
+    Args:
+        close: 收盘价矩阵 (交易日, 股票)
+        cache: 指标缓存
+        其余参数同 TechnicalStrategy
+
+    Returns:
+        (买入信号, 卖出信号) 布尔矩阵
+    """
+    if cache is None:
+        cache = IndicatorCache(close)
+
+    rsi = cache.rsi(rsi_period)
+    ma_cross = cache.sma(ma_short) - cache.sma(ma_long)
+
+    buy_score = np.where(rsi < rsi_oversold, 2, 0) + (ma_cross > 0)
+    sell_score = np.where(rsi > rsi_overbought, 2, 0) + (ma_cross < 0)
+    if use_macd:
+        histogram = cache.macd_histogram()
+        buy_score = buy_score + (histogram > 0)
+        sell_score = sell_score + (histogram < 0)
+
+    entries = buy_score >= 2
+    exits = sell_score >= 2
+
+    # 历史数据不足时不产生信号
+    warmup = max(ma_long, rsi_period) - 1
+    entries[:warmup] = False
+    exits[:warmup] = False
+    return entries, exits
+
+
+@dataclass
+class VectorizedBacktestResult:
+    """向量化回测结果
+
+    metrics 中每个指标为形状 (参数组合, 股票) 的数组
+    """
+    params: List[Dict[str, Any]]
+    symbols: List[str]
+    dates: List[Any]
+    metrics: Dict[str, np.ndarray]
+    equity_curves: Optional[np.ndarray] = None  # (交易日, 参数组合, 股票)
+    elapsed_seconds: float = 0.0
+
+    def get_metrics(self, param_index: int, symbol: str) -> Dict[str, Any]:
+        """获取单个 (参数组合, 股票) 的指标字典，格式同 calculate_all_metrics"""
+        col = self.symbols.index(symbol)
+        result = {}
+        for name, values in self.metrics.items():
+            value = values[param_index, col]
+            result[name] = int(value) if name in ('total_trades', 'winning_trades', 'losing_trades', 'trading_days') else float(value)
+        return result
+
+    def get_equity_curve(self, param_index: int, symbol: str) -> List[float]:
+        """获取单个 (参数组合, 股票) 的权益曲线"""
+        if self.equity_curves is None:
+            raise ValueError("Equity curves were not kept (keep_equity=False)")
+        return self.equity_curves[:, param_index, self.symbols.index(symbol)].tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        """展开为长表：每行一个 (参数组合, 股票)"""
+        n_params, n_symbols = len(self.params), len(self.symbols)
+        frame = pd.DataFrame({
+            'param_index': np.repeat(np.arange(n_params), n_symbols),
+            'symbol': np.tile(self.symbols, n_params),
+        })
+        param_frame = pd.DataFrame(self.params).reindex(np.repeat(np.arange(n_params), n_symbols)).reset_index(drop=True)
+        frame = pd.concat([frame, param_frame], axis=1)
+        for name, values in self.metrics.items():
+            frame[name] = values.reshape(-1)
+        return frame
+
+    def summary_by_params(self, metric: str = 'sharpe_ratio') -> pd.DataFrame:
+        """按参数组合汇总指标在股票池上的均值/中位数"""
+        values = np.where(np.isfinite(self.metrics[metric]), self.metrics[metric], np.nan)
+        summary = pd.DataFrame(self.params)
+        summary[f'{metric}_mean'] = np.nanmean(values, axis=1)
+        summary[f'{metric}_median'] = np.nanmedian(values, axis=1)
+        return summary.sort_values(f'{metric}_mean', ascending=False)
+
+
+class VectorizedBacktester:
+    """向量化回测引擎
+
+    支持对股票池和参数网格同时回测，适用于基于信号数组的规则策略
+    """
+
+    def __init__(
+        self,
+        initial_capital: float = 100000.0,
+        commission_rate: float = 0.0003,
+        slippage_rate: float = 0.001,
+        min_commission: float = 5.0,
+        stamp_duty_rate: float = 0.001,
+        lot_size: int = 100,
+        t_plus_one: bool = True,
+        position_size: float = 1.0,
+        cash_buffer: float = 0.01,
+        risk_free_rate: float = 0.03,
+        max_batch_cells: int = 25_000_000
+    ):
+        """初始化向量化回测引擎
+
+        Args:
+            initial_capital: 每个账户的初始资金
+            commission_rate: 手续费率（默认万3）
+            slippage_rate: 滑点率（默认千1）
+            min_commission: 最低手续费（默认5元）
+            stamp_duty_rate: 印花税率（仅卖出，默认千1）
+            lot_size: 每手股数（A股100股，设为1则不取整）
+            t_plus_one: 是否执行T+1（当日买入当日不可卖出）
+            position_size: 仓位大小（0-1）
+            cash_buffer: 计算买入数量时预留的资金比例（同 Backtester 的1%）
+            risk_free_rate: 无风险利率
+            max_batch_cells: 单批模拟的 交易日×账户数 上限，超出时按参数组合分批
+        """
+        self.initial_capital = initial_capital
+        self.commission_rate = commission_rate
+        self.slippage_rate = slippage_rate
+        self.min_commission = min_commission
+        self.stamp_duty_rate = stamp_duty_rate
+        self.lot_size = max(int(lot_size), 1)
+        self.t_plus_one = t_plus_one
+        self.position_size = position_size
+        self.cash_buffer = cash_buffer
+        self.risk_free_rate = risk_free_rate
+        self.max_batch_cells = max_batch_cells
+
+    def run(
+        self,
+        prices: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        param_grid: Union[Dict[str, Sequence], List[Dict[str, Any]], None] = None,
+        signal_func: SignalFunc = technical_signals,
+        keep_equity: bool = True
+    ) -> VectorizedBacktestResult:
+        """执行回测
+
+        Args:
+            prices: 收盘价面板（行=交易日，列=股票），或 {股票代码: 行情DataFrame}
+            param_grid: 参数网格，传给 signal_func
+            signal_func: 信号函数，默认 technical_signals
+            keep_equity: 是否保留全部权益曲线
+
+        Returns:
+            VectorizedBacktestResult
+        """
+        started = time.perf_counter()
+
+        if isinstance(prices, dict):
+            prices = build_close_panel(prices)
+        close = prices.to_numpy(dtype=np.float64)
+        symbols = [str(c) for c in prices.columns]
+        params = expand_param_grid(param_grid)
+        n_days, n_symbols = close.shape
+
+        cache = IndicatorCache(close)
+        batch_size = max(1, self.max_batch_cells // max(n_days * n_symbols, 1))
+
+        metrics_batches: List[Dict[str, np.ndarray]] = []
+        equity_batches: List[np.ndarray] = []
+        for start in range(0, len(params), batch_size):
+            batch_params = params[start:start + batch_size]
+            entries = np.empty((n_days, len(batch_params), n_symbols), dtype=bool)
+            exits = np.empty_like(entries)
+            for i, p in enumerate(batch_params):
+                entries[:, i, :], exits[:, i, :] = signal_func(close, cache, **p)
+
+            equity, trade_stats = self._simulate(close, entries, exits)
+            n_cols = len(batch_params) * n_symbols
+            batch_metrics = calculate_all_metrics_batch(
+                initial_capital=self.initial_capital,
+                equity_curves=equity.reshape(n_days, n_cols),
+                trade_stats={k: v.reshape(n_cols) for k, v in trade_stats.items()},
+                trading_days=n_days,
+                risk_free_rate=self.risk_free_rate
+            )
+            metrics_batches.append({k: v.reshape(len(batch_params), n_symbols) for k, v in batch_metrics.items()})
+            if keep_equity:
+                equity_batches.append(equity)
+
+        metrics = {
+            name: np.concatenate([b[name] for b in metrics_batches], axis=0)
+            for name in (metrics_batches[0] if metrics_batches else {})
+        }
+
+        return VectorizedBacktestResult(
+            params=params,
+            symbols=symbols,
+            dates=list(prices.index),
+            metrics=metrics,
+            equity_curves=np.concatenate(equity_batches, axis=1) if equity_batches else None,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    def _simulate(
+        self,
+        close: np.ndarray,
+        entries: np.ndarray,
+        exits: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """逐日推进所有账户（账户维度向量化）
+
+        Args:
+            close: 收盘价 (交易日, 股票)
+            entries: 买入信号 (交易日, 参数组合, 股票)
+            exits: 卖出信号 (交易日, 参数组合, 股票)
+
+        Returns:
+            (权益曲线 (交易日, 参数组合, 股票), 卖出交易汇总)
+        """
+        n_days, n_params, n_symbols = entries.shape
+        shape = (n_params, n_symbols)
+
+        cash = np.full(shape, float(self.initial_capital))
+        shares = np.zeros(shape, dtype=np.int64)
+        avg_price = np.zeros(shape)
+        entry_day = np.full(shape, -1, dtype=np.int64)
+        last_price = np.full(n_symbols, np.nan)
+        equity = np.empty((n_days,) + shape)
+
+        total_trades = np.zeros(shape, dtype=np.int64)
+        winning_trades = np.zeros(shape, dtype=np.int64)
+        losing_trades = np.zeros(shape, dtype=np.int64)
+        gross_profit = np.zeros(shape)
+        gross_loss = np.zeros(shape)
+
+        buy_factor = 1 + self.slippage_rate
+        sell_factor = 1 - self.slippage_rate
+        lot = self.lot_size
+
+        for t in range(n_days):
+            price = close[t]
+            tradable = ~np.isnan(price)
+            last_price = np.where(tradable, price, last_price)
+
+            holding = shares > 0
+
+            # 卖出：清仓，T+1 下只可卖出此前交易日买入的股份
+            sell = holding & exits[t] & tradable
+            if self.t_plus_one:
+                sell &= entry_day < t
+            if sell.any():
+                px = np.broadcast_to(price, shape)[sell]
+                qty = shares[sell]
+                amount = qty * px * sell_factor
+                commission = np.maximum(amount * self.commission_rate, self.min_commission)
+                cash[sell] += amount - commission - amount * self.stamp_duty_rate
+
+                # 实现盈亏口径同 PortfolioManager：(当前价 - 持仓均价) × 数量
+                pnl = qty * (px - avg_price[sell])
+                total_trades[sell] += 1
+                winning_trades[sell] += pnl > 0
+                losing_trades[sell] += pnl < 0
+                gross_profit[sell] += np.where(pnl > 0, pnl, 0.0)
+                gross_loss[sell] += np.where(pnl < 0, pnl, 0.0)
+
+                shares[sell] = 0
+                avg_price[sell] = 0.0
+                entry_day[sell] = -1
+
+            # 买入：空仓且有买入信号，按整手取整，资金不足（含佣金）则拒单
+            buy = ~holding & entries[t] & tradable
+            if buy.any():
+                px = np.broadcast_to(price, shape)[buy]
+                budget = cash[buy] * self.position_size
+                qty = (np.floor(budget / (px * (1 + self.cash_buffer)) / lot) * lot).astype(np.int64)
+                exec_px = px * buy_factor
+                amount = qty * exec_px
+                commission = np.maximum(amount * self.commission_rate, self.min_commission)
+                ok = (qty > 0) & (amount + commission <= cash[buy])
+
+                idx = tuple(i[ok] for i in np.nonzero(buy))
+                cash[idx] -= amount[ok] + commission[ok]
+                shares[idx] = qty[ok]
+                avg_price[idx] = exec_px[ok]
+                entry_day[idx] = t
+
+            equity[t] = cash + shares * np.nan_to_num(last_price)
+
+        trade_stats = {
+            'total_trades': total_trades,
+            'winning_trades': winning_trades,
+            'losing_trades': losing_trades,
+            'gross_profit': gross_profit,
+            'gross_loss': gross_loss,
+        }
+        return equity, trade_stats
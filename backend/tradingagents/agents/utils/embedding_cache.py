@@ -0,0 +1,211 @@
+"""
+Embedding 持久化缓存
+
+按内容寻址（文本SHA-256 + 模型名 -> float32向量）保存embedding，
+所有 FinancialSituationMemory 实例共享同一个存储，重启后仍然有效。
+SQLite（WAL）作为持久层，进程内LRU作为热点层。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 导入统一日志系统
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger("agents.utils.embedding_cache")
+
+# 单次 SQL 查询中 IN (...) 的最大参数数（低于SQLite默认上限999）
+_SQL_BATCH = 500
+
+
+def text_digest(text: str) -> str:
+    """文本内容哈希"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """内容寻址的embedding存储"""
+
+    def __init__(self, db_path: Optional[str] = None, memory_size: int = 4096):
+        """
+        Args:
+            db_path: SQLite文件路径，None时只使用进程内缓存
+            memory_size: 进程内LRU最多保留的向量数
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, digest)
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+
+    def _remember(self, key: tuple, vector: np.ndarray):
+        """放入进程内LRU（调用方持锁）"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        批量查询
+
+        Args:
+            model: embedding模型名
+            texts: 文本列表
+
+        Returns:
+            与 texts 等长的列表，未缓存的位置为None
+        """
+        digests = [text_digest(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            missing = []
+            for digest in dict.fromkeys(digests):
+                vector = self._memory.get((model, digest))
+                if vector is not None:
+                    self._memory.move_to_end((model, digest))
+                    found[digest] = vector
+                else:
+                    missing.append(digest)
+
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), _SQL_BATCH):
+                    chunk = missing[start:start + _SQL_BATCH]
+                    rows = self._conn.execute(
+                        f"SELECT digest, vector FROM embeddings WHERE model = ? "
+                        f"AND digest IN ({', '.join('?' for _ in chunk)})",
+                        [model, *chunk]
+                    ).fetchall()
+                    for digest, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[digest] = vector
+                        self._remember((model, digest), vector)
+
+            results = []
+            for digest in digests:
+                vector = found.get(digest)
+                if vector is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(vector.tolist())
+            return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """查询单条"""
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """
+        批量写入（全零向量表示服务降级，不写入）
+
+        Args:
+            model: embedding模型名
+            texts: 文本列表
+            vectors: 对应的向量
+        """
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                array = np.asarray(vector, dtype=np.float32)
+                if not array.any():
+                    continue
+                digest = text_digest(text)
+                self._remember((model, digest), array)
+                rows.append((model, digest, int(array.shape[0]), array.tobytes()))
+
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, digest, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            self.writes += len(rows)
+
+    def put(self, model: str, text: str, vector: Sequence[float]):
+        """写入单条"""
+        self.put_many(model, [text], [vector])
+
+    def count(self) -> int:
+        """持久层中的向量数"""
+        with self._lock:
+            if self._conn is None:
+                return len(self._memory)
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'db_path': self.db_path,
+            'memory_entries': len(self._memory),
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': self.hits / total if total > 0 else 0.0,
+        }
+
+    def close(self):
+        """关闭持久层连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_global_store: Optional[EmbeddingStore] = None
+_global_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """
+    获取全局embedding存储（单例）
+
+    环境变量:
+        EMBEDDING_CACHE_ENABLED: 是否持久化（默认true，false时只用进程内缓存）
+        EMBEDDING_CACHE_PATH: SQLite文件路径（默认 ./memory_db/embedding_cache.db）
+    """
+    global _global_store
+
+    if _global_store is None:
+        with _global_store_lock:
+            if _global_store is None:
+                db_path = None
+                if os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true':
+                    db_path = os.getenv('EMBEDDING_CACHE_PATH', './memory_db/embedding_cache.db')
+                try:
+                    _global_store = EmbeddingStore(db_path)
+                except sqlite3.Error as e:
+                    logger.warning(f" [Embedding缓存] 持久化存储初始化失败，仅使用进程内缓存: {e}")
+                    _global_store = EmbeddingStore(None)
+                logger.info(f" [Embedding缓存] 初始化完成: {db_path or '进程内'}")
+
+    return _global_store
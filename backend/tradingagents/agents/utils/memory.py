@@ -16,6 +16,8 @@ from .memory_exceptions import (
     EmbeddingInvalidInput,
     MemoryDisabled
 )
+from .embedding_cache import get_embedding_store
+from .vector_store import get_local_collection, get_vector_backend
 
 # 导入统一日志系统
 from tradingagents.utils.logging_manager import get_logger
@@ -189,9 +191,8 @@ class FinancialSituationMemory:
         # 对于8192 tokens的模型，会得到约14700字符
         self.chars_per_token = 2  # 从3改为2，更保守的估计
 
-        # Embedding结果缓存：避免短时间内重复调用
-        self._embedding_cache = {}
-        self._embedding_cache_ttl = 300  # 缓存5分钟
+        # Embedding结果缓存：按 (模型, 文本哈希) 持久化，所有记忆库实例共享
+        self._embedding_store = get_embedding_store()
 
         # 根据LLM提供商选择嵌入模型和客户端
         # 初始化降级选项标志
@@ -440,12 +441,25 @@ class FinancialSituationMemory:
                 self.client = "DISABLED"
                 logger.warning(f" 未找到OPENAI_API_KEY，记忆功能已禁用")
 
-        # 使用单例ChromaDB管理器
-        self.chroma_manager = ChromaDBManager()
-        self.situation_collection = self.chroma_manager.get_or_create_collection(
-            name=name,
-            persistent=persistent
-        )
+        # 批量embedding每次请求的文本数（DashScope text-embedding-v3 单次最多10条）
+        self.embedding_batch_size = int(os.getenv(
+            'EMBEDDING_BATCH_SIZE', '10' if self._uses_dashscope() else '32'
+        ))
+
+        # 向量存储：嵌入式后端（MEMORY_VECTOR_BACKEND=local）或单例ChromaDB管理器
+        self.vector_backend = get_vector_backend()
+        if self.vector_backend == 'local':
+            self.chroma_manager = None
+            self.situation_collection = get_local_collection(
+                name,
+                os.getenv('MEMORY_PERSIST_PATH', './memory_db/maxims') if persistent else None
+            )
+        else:
+            self.chroma_manager = ChromaDBManager()
+            self.situation_collection = self.chroma_manager.get_or_create_collection(
+                name=name,
+                persistent=persistent
+            )
 
         logger.info(f" [FinancialSituationMemory] 初始化完成: {name} "
                    f"({'持久化' if persistent else '会话级'}记忆)")
@@ -550,22 +564,17 @@ class FinancialSituationMemory:
 
         logger.info(f"📦 文本分块: {len(text)}字符 → {len(chunks)}个块（每块~{chunk_size}字符，重叠{overlap}字符）")
 
-        # 为每个chunk生成embedding
-        chunk_embeddings = []
-        for i, chunk in enumerate(chunks):
-            logger.debug(f"  处理第{i+1}/{len(chunks)}块...")
-
-            # 递归调用get_embedding（但这次chunk不会超过限制）
-            # 暂时禁用长度检查以避免无限递归
-            original_check = self.enable_embedding_length_check
-            self.enable_embedding_length_check = False
-
-            try:
-                processed_chunk, _ = self._smart_text_truncation(chunk, self.max_embedding_length)
-                embedding = self._generate_embedding_direct(processed_chunk)
-                chunk_embeddings.append(embedding)
-            finally:
-                self.enable_embedding_length_check = original_check
+        # 为每个chunk生成embedding：先查缓存，未命中的chunk按批请求
+        chunk_embeddings = self._embedding_store.get_many(self.embedding, chunks)
+        missing = [i for i, embedding in enumerate(chunk_embeddings) if embedding is None]
+        for start in range(0, len(missing), self.embedding_batch_size):
+            batch = missing[start:start + self.embedding_batch_size]
+            logger.debug(f"  处理第{batch[0] + 1}-{batch[-1] + 1}/{len(chunks)}块...")
+            processed = [self._smart_text_truncation(chunks[i])[0] for i in batch]
+            embeddings = self._request_embeddings(processed)
+            self._embedding_store.put_many(self.embedding, [chunks[i] for i in batch], embeddings)
+            for i, embedding in zip(batch, embeddings):
+                chunk_embeddings[i] = embedding
 
         # 合并所有chunk的embedding（简单平均）
         avg_embedding = np.mean(chunk_embeddings, axis=0)
@@ -587,42 +596,53 @@ class FinancialSituationMemory:
 
         return avg_embedding.tolist()
 
-    def _generate_embedding_direct(self, text):
+    def _uses_dashscope(self):
+        """当前配置是否使用阿里百炼嵌入服务"""
+        return (self.llm_provider in ("dashscope", "alibaba", "qianfan") or
+                (self.llm_provider in ("google", "deepseek", "openrouter") and self.client is None))
+
+    def _request_embeddings(self, texts):
         """
-        🆕 直接生成embedding（不经过长度检查和缓存）
+        🆕 一次请求为多条文本生成embedding（不经过长度检查和缓存）
+
+        Args:
+            texts: 已按模型限制处理过的文本列表（不超过 embedding_batch_size 条）
+
+        Returns:
+            与 texts 顺序一致的embedding列表
 
-        内部方法，仅供_chunk_and_embed使用
+        Raises:
+            EmbeddingServiceUnavailable: 服务不可用或返回错误
         """
         try:
-            # 根据provider选择实现
-            if self.llm_provider == "openai":
-                return self.client.embeddings.create(
-                    input=text,
-                    model="text-embedding-3-large"
-                ).data[0].embedding
-            elif self.llm_provider == "dashscope":
-                # Dashscope embedding实现
-                from http import HTTPStatus
+            if self._uses_dashscope():
                 import dashscope
+                from dashscope import TextEmbedding
 
-                dashscope.api_key = self.llm_api_key
-
-                resp = dashscope.TextEmbedding.call(
-                    model=dashscope.TextEmbedding.Models.text_embedding_v3,
-                    input=text
-                )
+                if not getattr(dashscope, 'api_key', None):
+                    raise EmbeddingServiceUnavailable(self.llm_provider, "DashScope API密钥未设置")
 
-                if resp.status_code == HTTPStatus.OK:
-                    return resp.output['embeddings'][0]['embedding']
-                else:
-                    raise EmbeddingServiceUnavailable(f"Dashscope错误: {resp.message}")
+                response = TextEmbedding.call(model=self.embedding, input=list(texts))
+                if response.status_code != 200:
+                    raise EmbeddingServiceUnavailable(self.llm_provider, f"{response.code} - {response.message}")
+                items = sorted(response.output['embeddings'], key=lambda item: item['text_index'])
+                embeddings = [item['embedding'] for item in items]
             else:
-                raise EmbeddingServiceUnavailable(f"不支持的provider: {self.llm_provider}")
-
+                if self.client is None or self.client == "DISABLED":
+                    raise EmbeddingServiceUnavailable(self.llm_provider, "嵌入客户端未初始化")
+                response = self.client.embeddings.create(model=self.embedding, input=list(texts))
+                embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except EmbeddingServiceUnavailable:
+            raise
         except Exception as e:
             logger.error(f"生成embedding失败: {e}")
-            raise EmbeddingServiceUnavailable(str(e))
+            raise EmbeddingServiceUnavailable(self.llm_provider, str(e))
 
+        if len(embeddings) != len(texts):
+            raise EmbeddingServiceUnavailable(
+                self.llm_provider, f"返回{len(embeddings)}个向量，期望{len(texts)}个"
+            )
+        return embeddings
 
     def get_embedding(self, text):
         """Get embedding for a text using the configured provider
@@ -634,9 +654,6 @@ class FinancialSituationMemory:
             EmbeddingTextTooLong: 当文本超过长度限制时
             EmbeddingServiceUnavailable: 当embedding服务不可用时
         """
-        import hashlib
-        import time
-
         # 检查记忆功能是否被禁用
         if self.client == "DISABLED":
             logger.error("记忆功能已禁用，无法生成embedding")
@@ -654,21 +671,19 @@ class FinancialSituationMemory:
             raise EmbeddingInvalidInput("文本长度为0")
 
         # 检查缓存
-        cache_key = hashlib.md5(text.encode('utf-8')).hexdigest()
-        current_time = time.time()
-
-        if cache_key in self._embedding_cache:
-            cached_embedding, cached_time = self._embedding_cache[cache_key]
-            if current_time - cached_time < self._embedding_cache_ttl:
-                logger.debug(f"[Embedding缓存] 使用缓存向量，缓存时间: {int(current_time - cached_time)}秒前")
-                return cached_embedding
+        cached_embedding = self._embedding_store.get(self.embedding, text)
+        if cached_embedding is not None:
+            logger.debug(f"[Embedding缓存] 使用缓存向量")
+            return cached_embedding
 
         logger.debug(f"[Embedding] 生成新向量，文本长度: {text_length}字符")
 
         # 🆕 检查是否需要分块处理（超过最大长度）
         if self.enable_embedding_length_check and text_length > self.max_embedding_length:
             logger.warning(f"文本过长({text_length:,}字符 > {self.max_embedding_length:,}字符)，启用自动分块处理")
-            return self._chunk_and_embed(text)
+            embedding = self._chunk_and_embed(text)
+            self._embedding_store.put(self.embedding, text, embedding)
+            return embedding
 
         #  新增：智能截断文本（根据模型限制）
         processed_text, was_truncated = self._smart_text_truncation(text)
@@ -719,8 +734,7 @@ class FinancialSituationMemory:
                     logger.debug(f" DashScope embedding成功，维度: {len(embedding)}")
 
                     # 缓存结果
-                    self._embedding_cache[cache_key] = (embedding, current_time)
-                    logger.debug(f" [Embedding缓存] 缓存向量，TTL: {self._embedding_cache_ttl}秒")
+                    self._embedding_store.put(self.embedding, text, embedding)
 
                     return embedding
                 else:
@@ -742,10 +756,6 @@ class FinancialSituationMemory:
                                 embedding = response.data[0].embedding
                                 logger.info(f" OpenAI降级成功，维度: {len(embedding)}")
 
-                                # 缓存结果
-                                self._embedding_cache[cache_key] = (embedding, current_time)
-                                logger.debug(f" [Embedding缓存] 缓存向量（降级），TTL: {self._embedding_cache_ttl}秒")
-
                                 return embedding
                             except Exception as fallback_error:
                                 logger.error(f" OpenAI降级失败: {str(fallback_error)}")
@@ -776,10 +786,6 @@ class FinancialSituationMemory:
                             embedding = response.data[0].embedding
                             logger.info(f" OpenAI降级成功，维度: {len(embedding)}")
 
-                            # 缓存结果
-                            self._embedding_cache[cache_key] = (embedding, current_time)
-                            logger.debug(f" [Embedding缓存] 缓存向量（降级），TTL: {self._embedding_cache_ttl}秒")
-
                             return embedding
                         except Exception as fallback_error:
                             logger.error(f" OpenAI降级失败: {str(fallback_error)}")
@@ -819,8 +825,7 @@ class FinancialSituationMemory:
                 logger.debug(f" {self.llm_provider} embedding成功，维度: {len(embedding)}")
 
                 # 缓存结果
-                self._embedding_cache[cache_key] = (embedding, current_time)
-                logger.debug(f" [Embedding缓存] 缓存向量，TTL: {self._embedding_cache_ttl}秒")
+                self._embedding_store.put(self.embedding, text, embedding)
 
                 return embedding
 
@@ -855,6 +860,63 @@ class FinancialSituationMemory:
                 logger.warning(f" 记忆功能降级，返回空向量")
                 return [0.0] * 1024
 
+    def get_embeddings(self, texts):
+        """批量获取embedding：先查共享缓存，未命中的文本按 embedding_batch_size 分批请求
+
+        批量请求失败时逐条回退到 get_embedding（沿用其降级逻辑）。
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            与 texts 顺序一致的embedding列表
+
+        Raises:
+            MemoryDisabled: 当Memory功能被禁用时
+            EmbeddingInvalidInput: 当输入文本无效时
+        """
+        if self.client == "DISABLED":
+            logger.error("记忆功能已禁用，无法生成embedding")
+            raise MemoryDisabled()
+
+        for text in texts:
+            if not text or not isinstance(text, str):
+                reason = "文本为None" if not text else f"文本类型错误: {type(text)}"
+                logger.error(f"输入文本无效: {reason}")
+                raise EmbeddingInvalidInput(reason)
+
+        results = self._embedding_store.get_many(self.embedding, texts)
+
+        # 未命中的文本 -> 位置（相同文本只请求一次）
+        pending = {}
+        for i, (text, embedding) in enumerate(zip(texts, results)):
+            if embedding is not None:
+                continue
+            if self.enable_embedding_length_check and len(text) > self.max_embedding_length:
+                # 超长文本走分块处理（分块内部已批量请求）
+                results[i] = self.get_embedding(text)
+            else:
+                pending.setdefault(text, []).append(i)
+
+        unique_texts = list(pending)
+        if unique_texts:
+            logger.debug(f"[Embedding] 批量生成: {len(unique_texts)}条未命中 / 共{len(texts)}条")
+
+        for start in range(0, len(unique_texts), self.embedding_batch_size):
+            batch = unique_texts[start:start + self.embedding_batch_size]
+            try:
+                embeddings = self._request_embeddings([self._smart_text_truncation(t)[0] for t in batch])
+                self._embedding_store.put_many(self.embedding, batch, embeddings)
+            except EmbeddingError as e:
+                logger.warning(f" 批量embedding失败，逐条重试: {e}")
+                embeddings = [self.get_embedding(t) for t in batch]
+
+            for text, embedding in zip(batch, embeddings):
+                for i in pending[text]:
+                    results[i] = embedding
+
+        return results
+
     def get_embedding_config_status(self):
         """获取向量缓存配置状态"""
         return {
@@ -875,7 +937,6 @@ class FinancialSituationMemory:
         situations = []
         advice = []
         ids = []
-        embeddings = []
 
         offset = self.situation_collection.count()
 
@@ -883,7 +944,9 @@ class FinancialSituationMemory:
             situations.append(situation)
             advice.append(recommendation)
             ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+
+        # 批量生成embedding，减少服务调用次数
+        embeddings = self.get_embeddings(situations)
 
         self.situation_collection.add(
             documents=situations,
@@ -958,7 +1021,9 @@ class FinancialSituationMemory:
             'collection_count': self.situation_collection.count(),
             'client_status': 'enabled' if self.client != "DISABLED" else 'disabled',
             'embedding_model': self.embedding,
-            'provider': self.llm_provider
+            'provider': self.llm_provider,
+            'vector_backend': self.vector_backend,
+            'embedding_cache': self._embedding_store.stats()
         }
         
         # 添加最后一次文本处理信息
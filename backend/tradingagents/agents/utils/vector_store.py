@@ -0,0 +1,622 @@
+"""
+嵌入式向量存储
+
+记忆检索的可插拔后端，接口与 ChromaDB collection 的 add/query/get/count 保持一致，
+FinancialSituationMemory 和 EpisodicMemoryBank 无需改动调用方式即可切换：
+
+- chromadb（默认）：原有实现
+- local：float32 向量矩阵按行追加到文件并内存映射，文档和metadata存SQLite，
+  打开时只读取行数；k-NN 默认是一次矩阵乘法的精确检索，安装 hnswlib 且数据量
+  达到阈值后对无过滤条件的查询使用 HNSW 近似检索
+
+metadata过滤支持 ChromaDB where 语法的常用子集：
+{'k': v}、$eq/$ne/$gt/$gte/$lt/$lte/$in/$nin 以及 $and/$or。
+"""
+
+import atexit
+import json
+import operator
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+# 导入统一日志系统
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger("agents.utils.vector_store")
+
+# 单次 SQL 查询中 IN (...) 的最大参数数（低于SQLite默认上限999）
+_SQL_BATCH = 500
+
+_VECTORS_FILE = "vectors.f32"
+_RECORDS_FILE = "records.db"
+_HNSW_FILE = "hnsw.bin"
+
+_COMPARATORS = {
+    '$gt': operator.gt,
+    '$gte': operator.ge,
+    '$lt': operator.lt,
+    '$lte': operator.le,
+}
+
+
+def get_vector_backend() -> str:
+    """当前配置的向量存储后端（环境变量 MEMORY_VECTOR_BACKEND：chromadb / local）"""
+    backend = os.getenv('MEMORY_VECTOR_BACKEND', 'chromadb').lower()
+    if backend not in ('chromadb', 'local'):
+        logger.warning(f" [VectorStore] 未知后端 {backend}，使用chromadb")
+        return 'chromadb'
+    return backend
+
+
+class LocalVectorCollection:
+    """嵌入式向量集合（ChromaDB collection 兼容接口）
+
+    每个集合一个目录：
+    - vectors.f32：行优先的float32矩阵，行号即记录号
+    - records.db：id/文档/metadata 以及维度、距离空间等元信息
+    - hnsw.bin：可选的HNSW索引（与写入代数一致时才加载）
+
+    相同id再次写入时原地覆盖该行（upsert语义）。多个进程可以同时打开同一集合：
+    写入在SQLite写事务（BEGIN IMMEDIATE）内分配行号，读写前比较写入代数，
+    其他进程写入过时重新加载行数、维度和内存映射。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        space: str = 'l2',
+        hnsw_threshold: Optional[int] = None,
+        ef_search: int = 64
+    ):
+        """
+        Args:
+            name: 集合名称
+            path: 集合目录，None时完全在内存中（会话级）
+            space: 距离空间 l2（平方欧氏距离，与ChromaDB默认一致）/ cosine / ip，
+                只在新建集合时生效
+            hnsw_threshold: 记录数达到该值后无过滤查询走HNSW，
+                默认读取 VECTOR_STORE_HNSW_THRESHOLD（10000），0表示禁用
+            ef_search: HNSW查询时的候选列表大小
+        """
+        if space not in ('l2', 'cosine', 'ip'):
+            raise ValueError(f"不支持的距离空间: {space}")
+
+        self.name = name
+        self.path = path
+        if hnsw_threshold is None:
+            hnsw_threshold = int(os.getenv('VECTOR_STORE_HNSW_THRESHOLD', '10000'))
+        self.hnsw_threshold = hnsw_threshold
+        self.ef_search = ef_search
+
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._sq_norms: Optional[np.ndarray] = None
+        self._metadatas: Optional[List[Dict[str, Any]]] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._hnsw = None
+        self._hnsw_dirty = False
+
+        if path:
+            Path(path).mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(path, _RECORDS_FILE), check_same_thread=False, timeout=30
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        else:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS info (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO info (key, value) VALUES ('space', ?)", (space,))
+        self._conn.execute("INSERT OR IGNORE INTO info (key, value) VALUES ('generation', '0')")
+        self._conn.commit()
+
+        self.space = self._conn.execute("SELECT value FROM info WHERE key = 'space'").fetchone()[0]
+        self.dim: Optional[int] = None
+        self._generation = -1
+        self._count = 0
+        self._refresh()
+
+        # 内存模式下向量保存在按倍数扩容的缓冲区里
+        self._buffer: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------ 存储
+
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, _VECTORS_FILE)
+
+    def _get_matrix(self) -> np.ndarray:
+        """当前全部向量（持久化模式为只读内存映射）"""
+        if self._matrix is None:
+            if self.dim is None or self._count == 0:
+                self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+            elif self.path:
+                self._matrix = np.memmap(
+                    self._vectors_path(), dtype=np.float32, mode='r', shape=(self._count, self.dim)
+                )
+            else:
+                self._matrix = self._buffer[:self._count]
+        return self._matrix
+
+    def _write_rows(self, rows: np.ndarray, vectors: np.ndarray):
+        """把向量写到指定行（调用方持锁）"""
+        if not self.path:
+            needed = int(rows.max()) + 1
+            if self._buffer is None or self._buffer.shape[0] < needed:
+                capacity = max(needed, 2 * (self._buffer.shape[0] if self._buffer is not None else 0), 64)
+                buffer = np.empty((capacity, self.dim), dtype=np.float32)
+                if self._buffer is not None:
+                    buffer[:self._count] = self._buffer[:self._count]
+                self._buffer = buffer
+            self._buffer[rows] = vectors
+            return
+
+        # 释放映射后再写文件；行号连续的追加合并为一次写入
+        self._matrix = None
+        row_bytes = self.dim * 4
+        vectors_path = self._vectors_path()
+        with open(vectors_path, 'r+b' if os.path.exists(vectors_path) else 'w+b') as f:
+            order = np.argsort(rows, kind='stable')
+            start = 0
+            while start < len(order):
+                end = start + 1
+                while end < len(order) and rows[order[end]] == rows[order[end - 1]] + 1:
+                    end += 1
+                f.seek(int(rows[order[start]]) * row_bytes)
+                f.write(np.ascontiguousarray(vectors[order[start:end]]).tobytes())
+                start = end
+
+    def _refresh(self):
+        """写入代数变化（其他进程写入过）时重新读取维度和行数并丢弃缓存（调用方持锁）"""
+        info = dict(self._conn.execute(
+            "SELECT key, value FROM info WHERE key IN ('dim', 'generation')"
+        ).fetchall())
+        generation = int(info['generation'])
+        if generation == self._generation:
+            return
+        self.dim = int(info['dim']) if 'dim' in info else None
+        self._count = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM records").fetchone()[0]
+        self._generation = generation
+        self._invalidate()
+        # 已加载的HNSW索引不含其他进程写入的行，按需重建
+        self._hnsw = None
+        self._hnsw_dirty = False
+
+    def _invalidate(self):
+        """写入后失效派生缓存（调用方持锁）"""
+        self._matrix = None
+        self._sq_norms = None
+        self._metadatas = None
+        self._columns = {}
+
+    def _lookup_rows(self, ids: Sequence[str]) -> Dict[str, int]:
+        """id -> 行号"""
+        found: Dict[str, int] = {}
+        unique = list(dict.fromkeys(ids))
+        for start in range(0, len(unique), _SQL_BATCH):
+            chunk = unique[start:start + _SQL_BATCH]
+            found.update(self._conn.execute(
+                f"SELECT id, row FROM records WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+            ).fetchall())
+        return found
+
+    def _fetch_records(self, rows: Iterable[int]) -> Dict[int, tuple]:
+        """行号 -> (id, document, metadata)"""
+        found: Dict[int, tuple] = {}
+        unique = list(dict.fromkeys(int(r) for r in rows))
+        for start in range(0, len(unique), _SQL_BATCH):
+            chunk = unique[start:start + _SQL_BATCH]
+            for row, record_id, document, metadata in self._conn.execute(
+                f"SELECT row, id, document, metadata FROM records WHERE row IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ):
+                found[row] = (record_id, document, json.loads(metadata) if metadata else None)
+        return found
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Optional[Sequence[str]] = None,
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> None:
+        """写入记录（已存在的id原地覆盖）"""
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError(f"embeddings形状{vectors.shape}与ids数量{len(ids)}不匹配")
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+
+        # 同一批内重复的id保留最后一个
+        positions = list({record_id: i for i, record_id in enumerate(ids)}.values())
+        if len(positions) != len(ids):
+            ids = [ids[i] for i in positions]
+            vectors = vectors[positions]
+            documents = [documents[i] for i in positions]
+            metadatas = [metadatas[i] for i in positions]
+
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.commit()
+            # 写事务持有数据库写锁直到提交：行号分配、向量写入和记录提交对其他进程串行
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                if self.dim is None:
+                    self.dim = int(vectors.shape[1])
+                    self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('dim', ?)", (str(self.dim),))
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"向量维度{vectors.shape[1]}与集合维度{self.dim}不一致")
+
+                existing = self._lookup_rows(ids)
+                rows = np.empty(len(ids), dtype=np.int64)
+                next_row = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM records").fetchone()[0]
+                for i, record_id in enumerate(ids):
+                    if record_id in existing:
+                        rows[i] = existing[record_id]
+                    else:
+                        rows[i] = next_row
+                        next_row += 1
+
+                # 先写向量再提交记录：中途失败时多写的向量行不在记录表中，不会被读到
+                self._write_rows(rows, vectors)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (int(row), record_id, document, json.dumps(metadata, ensure_ascii=False) if metadata else None)
+                        for row, record_id, document, metadata in zip(rows, ids, documents, metadatas)
+                    ]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO info (key, value) VALUES ('generation', ?)", (str(self._generation + 1),)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                # 回滚后以数据库为准重新加载
+                self._generation = -1
+                self._refresh()
+                raise
+            self._generation += 1
+            self._count = next_row
+            self._invalidate()
+
+            # 已加载的HNSW索引增量更新（已存在的label会被覆盖）
+            if self._hnsw is not None:
+                if self._hnsw.get_max_elements() < self._count:
+                    self._hnsw.resize_index(max(self._count, 2 * self._hnsw.get_max_elements()))
+                self._hnsw.add_items(vectors, rows)
+                self._hnsw_dirty = True
+
+    upsert = add
+
+    def count(self) -> int:
+        """记录数"""
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    # ------------------------------------------------------------------ 过滤
+
+    def _load_metadatas(self) -> List[Dict[str, Any]]:
+        """按行号排列的全部metadata（调用方持锁）"""
+        if self._metadatas is None:
+            metadatas: List[Dict[str, Any]] = [{} for _ in range(self._count)]
+            for row, metadata in self._conn.execute("SELECT row, metadata FROM records"):
+                if metadata:
+                    metadatas[row] = json.loads(metadata)
+            self._metadatas = metadatas
+        return self._metadatas
+
+    def _column(self, key: str) -> np.ndarray:
+        """metadata某个字段的列视图（缺失为None）"""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(self._count, dtype=object)
+            column[:] = [m.get(key) for m in self._load_metadatas()]
+            self._columns[key] = column
+        return column
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """where条件 -> 行掩码"""
+        mask = np.ones(self._count, dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for sub in condition:
+                    mask &= self._where_mask(sub)
+            elif key == '$or':
+                any_mask = np.zeros(self._count, dtype=bool)
+                for sub in condition:
+                    any_mask |= self._where_mask(sub)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    mask &= self._compare(self._column(key), op, value)
+            else:
+                mask &= self._compare(self._column(key), '$eq', condition)
+        return mask
+
+    @staticmethod
+    def _compare(column: np.ndarray, op: str, value: Any) -> np.ndarray:
+        if op == '$eq':
+            return np.fromiter((x == value for x in column), dtype=bool, count=len(column))
+        if op == '$ne':
+            return np.fromiter((x != value for x in column), dtype=bool, count=len(column))
+        if op in ('$in', '$nin'):
+            values = set(value)
+            hits = np.fromiter((x in values for x in column), dtype=bool, count=len(column))
+            return hits if op == '$in' else ~hits
+        compare = _COMPARATORS.get(op)
+        if compare is None:
+            raise ValueError(f"不支持的过滤操作符: {op}")
+
+        def matches(x):
+            try:
+                return x is not None and compare(x, value)
+            except TypeError:
+                return False
+
+        return np.fromiter((matches(x) for x in column), dtype=bool, count=len(column))
+
+    # ------------------------------------------------------------------ 检索
+
+    def _distances(self, matrix: np.ndarray, sq_norms: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """(候选数, 查询数) 的距离矩阵，定义与ChromaDB/hnswlib一致"""
+        dots = matrix @ queries.T
+        if self.space == 'l2':
+            return sq_norms[:, None] - 2.0 * dots + np.einsum('ij,ij->i', queries, queries)[None, :]
+        if self.space == 'cosine':
+            norms = np.sqrt(sq_norms)[:, None] * np.linalg.norm(queries, axis=1)[None, :]
+            return 1.0 - dots / np.maximum(norms, 1e-12)
+        return 1.0 - dots
+
+    def _get_sq_norms(self) -> np.ndarray:
+        if self._sq_norms is None:
+            matrix = self._get_matrix()
+            self._sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+        return self._sq_norms
+
+    def _use_hnsw(self) -> bool:
+        return HNSWLIB_AVAILABLE and self.hnsw_threshold > 0 and self._count >= self.hnsw_threshold
+
+    def _get_hnsw(self):
+        """加载或构建HNSW索引（调用方持锁）"""
+        if self._hnsw is not None:
+            return self._hnsw
+
+        index = hnswlib.Index(space=self.space, dim=self.dim)
+        index_path = os.path.join(self.path, _HNSW_FILE) if self.path else None
+        saved = self._conn.execute("SELECT value FROM info WHERE key = 'hnsw_generation'").fetchone()
+        if index_path and os.path.exists(index_path) and saved and int(saved[0]) == self._generation:
+            index.load_index(index_path, max_elements=self._count)
+            self._hnsw_dirty = False
+            logger.info(f" [VectorStore] 加载HNSW索引: {self.name} ({self._count}条)")
+        else:
+            index.init_index(max_elements=self._count, ef_construction=200, M=16)
+            index.add_items(self._get_matrix(), np.arange(self._count))
+            self._hnsw_dirty = True
+            logger.info(f" [VectorStore] 构建HNSW索引: {self.name} ({self._count}条)")
+        self._hnsw = index
+        return index
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ('documents', 'metadatas', 'distances')
+    ) -> Dict[str, Optional[List[list]]]:
+        """k-NN检索（返回格式与ChromaDB相同：每个查询一个列表）"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        with self._lock:
+            self._refresh()
+            if self._count and queries.shape[1] != self.dim:
+                raise ValueError(f"查询维度{queries.shape[1]}与集合维度{self.dim}不一致")
+
+            candidates = None
+            if where:
+                candidates = np.flatnonzero(self._where_mask(where))
+            total = self._count if candidates is None else len(candidates)
+            k = min(n_results, total)
+
+            if k <= 0:
+                rows = np.empty((len(queries), 0), dtype=np.int64)
+                distances = np.empty((len(queries), 0), dtype=np.float32)
+            elif candidates is None and self._use_hnsw():
+                # 过滤查询的候选集通常很小，只有无过滤查询走HNSW
+                index = self._get_hnsw()
+                index.set_ef(max(self.ef_search, k))
+                rows, distances = index.knn_query(queries, k=k)
+                rows = rows.astype(np.int64)
+            else:
+                matrix = self._get_matrix()
+                sq_norms = self._get_sq_norms()
+                if candidates is not None:
+                    matrix, sq_norms = matrix[candidates], sq_norms[candidates]
+                all_distances = self._distances(matrix, sq_norms, queries).T
+                if k < total:
+                    top = np.argpartition(all_distances, k - 1, axis=1)[:, :k]
+                else:
+                    top = np.broadcast_to(np.arange(total), (len(queries), total))
+                top_distances = np.take_along_axis(all_distances, top, axis=1)
+                order = np.argsort(top_distances, axis=1, kind='stable')
+                top = np.take_along_axis(top, order, axis=1)
+                distances = np.take_along_axis(top_distances, order, axis=1)
+                rows = top if candidates is None else candidates[top]
+
+            records = self._fetch_records(rows.ravel()) if rows.size else {}
+            matrix = self._get_matrix() if 'embeddings' in include and rows.size else None
+
+        result: Dict[str, Optional[List[list]]] = {
+            'ids': [[records[int(r)][0] for r in q_rows] for q_rows in rows],
+            'documents': None,
+            'metadatas': None,
+            'distances': None,
+            'embeddings': None,
+        }
+        if 'documents' in include:
+            result['documents'] = [[records[int(r)][1] for r in q_rows] for q_rows in rows]
+        if 'metadatas' in include:
+            result['metadatas'] = [[records[int(r)][2] for r in q_rows] for q_rows in rows]
+        if 'distances' in include:
+            result['distances'] = [[float(d) for d in q_distances] for q_distances in distances]
+        if 'embeddings' in include:
+            result['embeddings'] = [
+                [np.array(matrix[int(r)]) for r in q_rows] if matrix is not None else []
+                for q_rows in rows
+            ]
+        return result
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ('documents', 'metadatas')
+    ) -> Dict[str, Optional[list]]:
+        """按id/条件读取记录（不给条件时按写入顺序返回全部）"""
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                found = self._lookup_rows(ids)
+                rows = np.array([found[i] for i in ids if i in found], dtype=np.int64)
+            else:
+                rows = np.arange(self._count, dtype=np.int64)
+            if where:
+                rows = rows[self._where_mask(where)[rows]]
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+
+            records = self._fetch_records(rows) if len(rows) else {}
+            embeddings = None
+            if 'embeddings' in include:
+                embeddings = np.array(self._get_matrix()[rows]) if len(rows) else np.empty((0, self.dim or 0))
+
+        return {
+            'ids': [records[int(r)][0] for r in rows],
+            'documents': [records[int(r)][1] for r in rows] if 'documents' in include else None,
+            'metadatas': [records[int(r)][2] for r in rows] if 'metadatas' in include else None,
+            'embeddings': embeddings,
+        }
+
+    # ------------------------------------------------------------------ 生命周期
+
+    def flush(self) -> None:
+        """保存有未落盘更新的HNSW索引"""
+        with self._lock:
+            if self._hnsw is None or not self._hnsw_dirty or not self.path:
+                return
+            self._hnsw.save_index(os.path.join(self.path, _HNSW_FILE))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO info (key, value) VALUES ('hnsw_generation', ?)", (str(self._generation),)
+            )
+            self._conn.commit()
+            self._hnsw_dirty = False
+            logger.info(f" [VectorStore] HNSW索引已保存: {self.name}")
+
+    def close(self) -> None:
+        """保存索引并关闭连接"""
+        self.flush()
+        with self._lock:
+            self._invalidate()
+            self._hnsw = None
+            self._conn.close()
+
+
+_collections: Dict[tuple, LocalVectorCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def get_local_collection(name: str, persist_directory: Optional[str] = None) -> LocalVectorCollection:
+    """
+    获取嵌入式向量集合（同一目录、同名集合在进程内共享一个实例）
+
+    Args:
+        name: 集合名称
+        persist_directory: 持久化根目录，集合保存在 <persist_directory>/vector_store/<name>；
+            None时为内存集合
+    """
+    key = (os.path.abspath(persist_directory) if persist_directory else None, name)
+    with _collections_lock:
+        collection = _collections.get(key)
+        if collection is None:
+            path = os.path.join(persist_directory, 'vector_store', name) if persist_directory else None
+            collection = LocalVectorCollection(name, path)
+            _collections[key] = collection
+            logger.info(f" [VectorStore] 打开{'持久化' if path else '内存'}集合: {name} "
+                        f"({collection.count()}条)")
+        return collection
+
+
+def _flush_all():
+    for collection in list(_collections.values()):
+        try:
+            collection.flush()
+        except Exception as e:
+            logger.warning(f" [VectorStore] 保存索引失败: {collection.name}: {e}")
+
+
+atexit.register(_flush_all)
+
+
+def migrate_collection(source, target, batch_size: int = 1000) -> int:
+    """
+    在两个collection之间复制全部记录（ChromaDB与嵌入式存储可互为源和目标）
+
+    Args:
+        source: 源collection（需支持 get(limit, offset, include)）
+        target: 目标collection（需支持 add/upsert）
+        batch_size: 每批读取的记录数
+
+    Returns:
+        复制的记录数
+    """
+    total = source.count()
+    copied = 0
+    write = getattr(target, 'upsert', None) or target.add
+    for offset in range(0, total, batch_size):
+        batch = source.get(limit=batch_size, offset=offset, include=['embeddings', 'documents', 'metadatas'])
+        ids = list(batch['ids'])
+        if not ids:
+            break
+        write(
+            ids=ids,
+            embeddings=np.asarray(batch['embeddings'], dtype=np.float32).tolist(),
+            documents=batch.get('documents'),
+            metadatas=batch.get('metadatas'),
+        )
+        copied += len(ids)
+        logger.info(f" [VectorStore] 迁移进度: {copied}/{total}")
+    return copied
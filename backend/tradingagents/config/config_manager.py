@@ -654,8 +654,12 @@ class TokenTracker:
         self.config_manager = config_manager
 
     def track_usage(self, provider: str, model_name: str, input_tokens: int,
-                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis"):
-        """跟踪Token使用"""
+                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis",
+                   duration: Optional[float] = None):
+        """跟踪Token使用
+
+        duration 为本次LLM请求耗时（秒），与token数一起计入监控指标
+        """
         if session_id is None:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
@@ -663,25 +667,38 @@ class TokenTracker:
         settings = self.config_manager.load_settings()
         cost_tracking_enabled = settings.get("enable_cost_tracking", True)
 
-        if not cost_tracking_enabled:
-            return None
+        record = None
+        if cost_tracking_enabled:
+            # 添加使用记录
+            record = self.config_manager.add_usage_record(
+                provider=provider,
+                model_name=model_name,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                session_id=session_id,
+                analysis_type=analysis_type
+            )
 
-        # 添加使用记录
-        record = self.config_manager.add_usage_record(
-            provider=provider,
-            model_name=model_name,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            session_id=session_id,
-            analysis_type=analysis_type
-        )
+            # 检查成本警告
+            if record:
+                self._check_cost_alert(record.cost)
 
-        # 检查成本警告
-        if record:
-            self._check_cost_alert(record.cost)
+        self._record_metrics(provider, input_tokens + output_tokens,
+                             record.cost if record else 0.0, analysis_type, duration)
 
         return record
 
+    @staticmethod
+    def _record_metrics(provider: str, tokens: int, cost: float, agent: str, duration: Optional[float]):
+        """写入监控指标（按提供商/调用类型拆分）"""
+        try:
+            from tradingagents.utils.monitoring_metrics import get_metrics_collector
+            get_metrics_collector().record_llm_usage(
+                tokens=tokens, cost=cost, tier=None, provider=provider, agent=agent, duration=duration
+            )
+        except Exception as e:
+            logger.debug(f"记录LLM监控指标失败: {e}")
+
     def _check_cost_alert(self, current_cost: float):
         """检查成本警告"""
         settings = self.config_manager.load_settings()
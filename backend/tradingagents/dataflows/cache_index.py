@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+缓存元数据索引
+使用SQLite为文件缓存的 *_meta.json 建立索引，避免每次未命中时遍历整个元数据目录
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class CacheMetadataIndex:
+    """缓存元数据索引 - 按 symbol/data_type/market/source/日期范围 建立索引"""
+
+    # 索引中保存的元数据字段
+    COLUMNS = ('cache_key', 'symbol', 'data_type', 'market_type', 'data_source',
+               'start_date', 'end_date', 'file_path', 'file_format', 'cached_at')
+
+    def __init__(self, db_path: Path):
+        """
+        初始化元数据索引
+
+        Args:
+            db_path: 索引数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        """创建索引表"""
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_metadata (
+                    cache_key TEXT PRIMARY KEY,
+                    symbol TEXT,
+                    data_type TEXT,
+                    market_type TEXT,
+                    data_source TEXT,
+                    start_date TEXT,
+                    end_date TEXT,
+                    file_path TEXT,
+                    file_format TEXT,
+                    cached_at TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_lookup "
+                "ON cache_metadata(symbol, data_type, market_type, data_source, cached_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_cached_at ON cache_metadata(cached_at)"
+            )
+            self.conn.commit()
+
+    def _row_values(self, cache_key: str, metadata: Dict[str, Any]) -> tuple:
+        return (cache_key,) + tuple(metadata.get(col) for col in self.COLUMNS[1:])
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]):
+        """插入或更新一条元数据索引"""
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        sql = f"INSERT OR REPLACE INTO cache_metadata ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+        with self._lock:
+            self.conn.execute(sql, self._row_values(cache_key, metadata))
+            self.conn.commit()
+
+    def remove(self, cache_keys: List[str]):
+        """删除元数据索引"""
+        if not cache_keys:
+            return
+        with self._lock:
+            self.conn.executemany("DELETE FROM cache_metadata WHERE cache_key = ?",
+                                  [(key,) for key in cache_keys])
+            self.conn.commit()
+
+    def find(self, symbol: str, data_type: str, market_type: str = None,
+             data_source: str = None, min_cached_at: str = None) -> List[Dict[str, Any]]:
+        """
+        查找候选缓存，按缓存时间从新到旧排序
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型（stock_data/news/fundamentals）
+            market_type: 市场类型，None表示不限
+            data_source: 数据源，None表示不限
+            min_cached_at: 最早缓存时间（ISO格式），用于在查询中直接过滤过期数据
+
+        Returns:
+            匹配的元数据列表
+        """
+        sql = "SELECT * FROM cache_metadata WHERE symbol = ? AND data_type = ?"
+        params: list = [symbol, data_type]
+        if market_type is not None:
+            sql += " AND market_type = ?"
+            params.append(market_type)
+        if data_source is not None:
+            sql += " AND data_source = ?"
+            params.append(data_source)
+        if min_cached_at is not None:
+            sql += " AND cached_at >= ?"
+            params.append(min_cached_at)
+        sql += " ORDER BY cached_at DESC"
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_older_than(self, cutoff: str) -> List[Dict[str, Any]]:
+        """查找缓存时间早于cutoff（ISO格式）的所有条目"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM cache_metadata WHERE cached_at < ?", (cutoff,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        """索引条目数量"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM cache_metadata").fetchone()[0]
+
+    def rebuild(self, metadata_dir: Path) -> int:
+        """
+        从现有的 *_meta.json 文件重建索引（迁移旧缓存目录）
+
+        Args:
+            metadata_dir: 元数据目录
+
+        Returns:
+            写入索引的条目数
+        """
+        rows = []
+        for metadata_file in Path(metadata_dir).glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                cache_key = metadata_file.name[:-len("_meta.json")]
+                rows.append(self._row_values(cache_key, metadata))
+            except Exception as e:
+                logger.warning(f" 跳过无法解析的元数据文件 {metadata_file.name}: {e}")
+
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        sql = f"INSERT OR REPLACE INTO cache_metadata ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+        with self._lock:
+            self.conn.execute("DELETE FROM cache_metadata")
+            self.conn.executemany(sql, rows)
+            self.conn.commit()
+
+        logger.info(f" 缓存元数据索引重建完成: {len(rows)} 条")
+        return len(rows)
+
+    def close(self):
+        """关闭索引数据库连接"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
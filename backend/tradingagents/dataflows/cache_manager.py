@@ -17,16 +17,20 @@ import hashlib
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .cache_index import CacheMetadataIndex
+from .frame_storage import get_frame_reader, get_frame_serializer
+
 
 class StockDataCache:
     """股票数据缓存管理器 - 支持美股和A股数据缓存优化"""
 
-    def __init__(self, cache_dir: str = None):
+    def __init__(self, cache_dir: str = None, frame_format: str = None):
         """
         初始化缓存管理器
 
         Args:
             cache_dir: 缓存目录路径，默认为 tradingagents/dataflows/data_cache
+            frame_format: DataFrame存储格式（feather/parquet/csv），默认读取 CACHE_FRAME_FORMAT
         """
         if cache_dir is None:
             # 获取当前文件所在目录
@@ -45,12 +49,23 @@ class StockDataCache:
         self.china_fundamentals_dir = self.cache_dir / "china_fundamentals"
         self.metadata_dir = self.cache_dir / "metadata"
 
+        # DataFrame序列化器 - 列式存储保留dtype，pyarrow不可用时回退CSV
+        self.frame_serializer = get_frame_serializer(frame_format)
+
         # 创建所有目录
         for dir_path in [self.us_stock_dir, self.china_stock_dir, self.us_news_dir,
                         self.china_news_dir, self.us_fundamentals_dir,
                         self.china_fundamentals_dir, self.metadata_dir]:
             dir_path.mkdir(exist_ok=True)
 
+        # 元数据索引 - 部分匹配查找走索引查询，不再遍历 *_meta.json
+        index_path = self.cache_dir / "metadata_index.db"
+        index_existed = index_path.exists()
+        self.metadata_index = CacheMetadataIndex(index_path)
+        if not index_existed and next(self.metadata_dir.glob("*_meta.json"), None) is not None:
+            # 首次启用索引：从已有的元数据文件迁移
+            self.rebuild_metadata_index()
+
         # 缓存配置 - 针对不同市场设置不同的TTL
         self.cache_config = {
             'us_stock_data': {
@@ -216,7 +231,37 @@ class StockDataCache:
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
-    
+
+        self.metadata_index.upsert(cache_key, metadata)
+
+    def rebuild_metadata_index(self) -> int:
+        """从元数据文件重建元数据索引，返回索引条目数"""
+        return self.metadata_index.rebuild(self.metadata_dir)
+
+    def _find_indexed_cache(self, symbol: str, data_type: str, market_type: str,
+                            data_source: Optional[str], max_age_hours: float,
+                            exclude_key: str = None) -> Optional[str]:
+        """通过元数据索引查找最新的有效缓存键"""
+        min_cached_at = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        candidates = self.metadata_index.find(symbol, data_type, market_type,
+                                              data_source, min_cached_at)
+        stale_keys = []
+        found = None
+        for entry in candidates:
+            cache_key = entry['cache_key']
+            if cache_key == exclude_key:
+                continue
+            if not self._get_metadata_path(cache_key).exists():
+                # 元数据文件已被外部删除，同步清理索引
+                stale_keys.append(cache_key)
+                continue
+            if self.is_cache_valid(cache_key, max_age_hours, symbol, data_type):
+                found = cache_key
+                break
+
+        self.metadata_index.remove(stale_keys)
+        return found
+
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
         metadata_path = self._get_metadata_path(cache_key)
@@ -302,10 +347,10 @@ class StockDataCache:
 
         # 保存数据
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
-            cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            file_format = self._save_frame(data, "stock_data", cache_key, symbol)
+            cache_path = self._get_cache_path("stock_data", cache_key, file_format, symbol)
         else:
+            file_format = 'txt'
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
             with open(cache_path, 'w', encoding='utf-8') as f:
@@ -320,7 +365,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
@@ -331,6 +376,25 @@ class StockDataCache:
         logger.info(f" {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
+    def _save_frame(self, data: pd.DataFrame, data_type: str, cache_key: str, symbol: str) -> str:
+        """按配置的序列化器保存DataFrame，失败时回退CSV，返回实际使用的格式"""
+        serializer = self.frame_serializer
+        cache_path = self._get_cache_path(data_type, cache_key, serializer.file_extension, symbol)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        try:
+            serializer.save(data, cache_path)
+            return serializer.format_name
+        except Exception as e:
+            if serializer.format_name == 'csv':
+                raise
+            logger.warning(f" {serializer.format_name}格式保存失败，回退CSV: {e}")
+            if cache_path.exists():
+                cache_path.unlink()
+
+        csv_serializer = get_frame_serializer('csv')
+        csv_serializer.save(data, self._get_cache_path(data_type, cache_key, 'csv', symbol))
+        return csv_serializer.format_name
+
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从缓存加载股票数据"""
         metadata = self._load_metadata(cache_key)
@@ -342,8 +406,11 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
+            if metadata['file_format'] in ('csv', 'feather', 'parquet'):
+                reader = get_frame_reader(metadata['file_format'])
+                if reader is None:
+                    return None
+                return reader.load(cache_path)
             else:
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     return f.read()
@@ -388,23 +455,13 @@ class StockDataCache:
             return search_key
 
         # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f" 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        cache_key = self._find_indexed_cache(symbol, 'stock_data', market_type,
+                                             data_source, max_age_hours,
+                                             exclude_key=search_key)
+        if cache_key:
+            desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+            logger.info(f" 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+            return cache_key
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f" 未找到有效的{desc}缓存: {symbol}")
@@ -529,24 +586,13 @@ class StockDataCache:
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
         # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f" 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
-        
+        cache_key = self._find_indexed_cache(symbol, 'fundamentals', market_type,
+                                             data_source, max_age_hours)
+        if cache_key:
+            desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+            logger.info(f" 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+            return cache_key
+
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f" 未找到有效的{desc}缓存: {symbol} ({data_source})")
         return None
@@ -556,25 +602,27 @@ class StockDataCache:
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         cleared_count = 0
         
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+        cleared_keys = []
+
+        for entry in self.metadata_index.find_older_than(cutoff_time.isoformat()):
             try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                cached_at = datetime.fromisoformat(metadata['cached_at'])
-                if cached_at < cutoff_time:
-                    # 删除数据文件
-                    data_file = Path(metadata['file_path'])
+                # 删除数据文件
+                if entry.get('file_path'):
+                    data_file = Path(entry['file_path'])
                     if data_file.exists():
                         data_file.unlink()
-                    
-                    # 删除元数据文件
+
+                # 删除元数据文件
+                metadata_file = self._get_metadata_path(entry['cache_key'])
+                if metadata_file.exists():
                     metadata_file.unlink()
                     cleared_count += 1
-                    
+                cleared_keys.append(entry['cache_key'])
+
             except Exception as e:
                 logger.warning(f" 清理缓存时出错: {e}")
-        
+
+        self.metadata_index.remove(cleared_keys)
         logger.info(f" 已清理 {cleared_count} 个过期缓存文件")
     
     def get_cache_stats(self) -> Dict[str, Any]:
@@ -6,6 +6,7 @@
 
 import os
 import time
+from functools import partial
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import warnings
@@ -13,9 +14,11 @@ import pandas as pd
 
 # 导入TTL缓存
 from .ttl_cache import ttl_cache
+from .range_cache import get_ohlcv_range_store
 
 # 🆕 导入超时保护
 from tradingagents.utils.timeout_utils import with_timeout
+from tradingagents.utils.monitoring_metrics import get_metrics_collector
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -28,6 +31,7 @@ class ChinaDataSource(Enum):
     TUSHARE = "tushare"
     AKSHARE = "akshare"
     BAOSTOCK = "baostock"
+    LOCAL = "local"  # data_sync 同步的Tushare本地SQLite镜像
 
 
 
@@ -41,6 +45,8 @@ class DataSourceManager:
         self.default_source = self._get_default_source()
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
+        # 区间缓存：任意子区间从本地返回，只向数据源请求缺失的日期缺口
+        self.range_cache_enabled = os.getenv('ENABLE_RANGE_CACHE', 'true').lower() == 'true'
 
         logger.info(f" 数据源管理器初始化完成")
         logger.info(f"   默认数据源: {self.default_source.value}")
@@ -55,7 +61,8 @@ class DataSourceManager:
         source_mapping = {
             'tushare': ChinaDataSource.TUSHARE,
             'akshare': ChinaDataSource.AKSHARE,
-            'baostock': ChinaDataSource.BAOSTOCK
+            'baostock': ChinaDataSource.BAOSTOCK,
+            'local': ChinaDataSource.LOCAL
         }
 
         return source_mapping.get(env_source, ChinaDataSource.AKSHARE)
@@ -142,6 +149,11 @@ class DataSourceManager:
             str: 基本面分析报告
         """
         try:
+            if self.current_source == ChinaDataSource.LOCAL:
+                fundamentals = self._get_local_fundamentals(symbol)
+                if fundamentals:
+                    return fundamentals
+
             from .tushare_adapter import get_tushare_adapter
 
             logger.debug(f" [Tushare] 获取{symbol}基本面数据...")
@@ -233,7 +245,16 @@ class DataSourceManager:
             logger.info(f" BaoStock数据源可用")
         except ImportError:
             logger.warning(f" BaoStock数据源不可用: 库未安装")
-        
+
+        # 检查本地镜像：数据库已同步过，或显式配置为默认数据源（缺失区间由Tushare补齐）
+        try:
+            from data_sync.sync_engine import DEFAULT_DB_PATH
+            if os.path.exists(DEFAULT_DB_PATH) or self.default_source == ChinaDataSource.LOCAL:
+                available.append(ChinaDataSource.LOCAL)
+                logger.info(f" 本地镜像数据源可用: {DEFAULT_DB_PATH}")
+        except ImportError:
+            logger.warning(f" 本地镜像数据源不可用: data_sync模块导入失败")
+
         return available
     
     def get_current_source(self) -> ChinaDataSource:
@@ -258,9 +279,23 @@ class DataSourceManager:
             return self._get_akshare_adapter()
         elif self.current_source == ChinaDataSource.BAOSTOCK:
             return self._get_baostock_adapter()
+        elif self.current_source == ChinaDataSource.LOCAL:
+            return self._get_local_adapter()
         else:
             raise ValueError(f"不支持的数据源: {self.current_source}")
     
+    def _fetch_daily_frame(self, source: ChinaDataSource, fetcher, symbol: str,
+                           start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """获取日线DataFrame - 启用区间缓存时只对未覆盖的日期缺口调用数据源"""
+        if not self.range_cache_enabled or not start_date or not end_date:
+            return fetcher(symbol, start_date, end_date)
+
+        try:
+            return get_ohlcv_range_store().get_range(source.value, symbol, start_date, end_date, fetcher)
+        except Exception as e:
+            logger.warning(f" [区间缓存] {source.value}/{symbol} 读取失败，直接请求数据源: {e}")
+            return fetcher(symbol, start_date, end_date)
+
     def _get_tushare_adapter(self):
         """获取Tushare适配器"""
         try:
@@ -287,6 +322,15 @@ class DataSourceManager:
         except ImportError as e:
             logger.error(f" BaoStock适配器导入失败: {e}")
             return None
+
+    def _get_local_adapter(self):
+        """获取Tushare本地镜像"""
+        try:
+            from .tushare_local_mirror import get_tushare_local_mirror
+            return get_tushare_local_mirror()
+        except Exception as e:
+            logger.error(f" 本地镜像初始化失败: {e}")
+            return None
     
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> str:
         """
@@ -351,12 +395,8 @@ class DataSourceManager:
             # 根据数据源调用相应的获取方法
             if self.current_source == ChinaDataSource.TUSHARE:
                 logger.info(f" [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}'")
-                result = self._get_tushare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date)
-            else:
+            result = self._fetch_from_source(self.current_source, symbol, start_date, end_date)
+            if result is None:
                 result = f" 不支持的数据源: {self.current_source.value}"
 
             # 🆕 在结果中添加非交易日提示
@@ -480,56 +520,18 @@ class DataSourceManager:
             logger.info(f" [DataSourceManager详细日志] 开始调用tushare_adapter...")
 
             adapter = get_tushare_adapter()
-            data = adapter.get_stock_data(symbol, start_date, end_date)
+            # 区间缓存补缺口时跳过适配器缓存：其按股票部分匹配，可能返回其它日期范围的数据
+            fetcher = adapter.get_stock_data
+            if self.range_cache_enabled:
+                fetcher = partial(adapter.get_stock_data, use_cache=False)
+            data = self._fetch_daily_frame(ChinaDataSource.TUSHARE, fetcher, symbol, start_date, end_date)
 
             if data is not None and not data.empty:
                 # 获取股票基本信息
                 stock_info = adapter.get_stock_info(symbol)
                 stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
 
-                # 计算最新价格和涨跌幅
-                latest_data = data.iloc[-1]
-                latest_price = latest_data.get('close', 0)
-                prev_close = data.iloc[-2].get('close', latest_price) if len(data) > 1 else latest_price
-                change = latest_price - prev_close
-                change_pct = (change / prev_close * 100) if prev_close != 0 else 0
-
-                # 🆕 添加市场上下文信息（交易时间、价格类型、涨跌幅限制）
-                from datetime import datetime
-                from tradingagents.utils.market_context import MarketContext
-
-                current_time = datetime.now()
-                is_trading, time_status = MarketContext.is_trading_time(current_time)
-                price_type = MarketContext.get_price_type(current_time)
-                price_limit_info = MarketContext.get_price_limit(symbol)
-
-                # 格式化数据报告
-                result = f" {stock_name}({symbol}) - Tushare数据\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-
-                # 🆕 添加时间上下文
-                result += f" 当前时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                result += f"⏰ 交易状态: {' ' + time_status if is_trading else ' ' + time_status}\n"
-                result += f" 价格类型: {price_type}\n\n"
-
-                result += f" 最新价格: ¥{latest_price:.2f} ({price_type})\n"
-                result += f" 涨跌额: {change:+.2f} ({change_pct:+.2f}%)\n\n"
-
-                # 🆕 添加涨跌幅限制信息
-                result += f" 涨跌幅限制 ({price_limit_info['board_type']}):\n"
-                result += f"   涨停价: ¥{prev_close * (1 + price_limit_info['up_limit_pct']):.2f} (+{price_limit_info['up_limit_pct'] * 100:.0f}%)\n"
-                result += f"   跌停价: ¥{prev_close * (1 + price_limit_info['down_limit_pct']):.2f} ({price_limit_info['down_limit_pct'] * 100:.0f}%)\n\n"
-
-                # 添加统计信息
-                result += f" 价格统计:\n"
-                result += f"   最高价: ¥{data['high'].max():.2f}\n"
-                result += f"   最低价: ¥{data['low'].min():.2f}\n"
-                result += f"   平均价: ¥{data['close'].mean():.2f}\n"
-                # 防御性获取成交量数据
-                volume_value = self._get_volume_safely(data)
-                result += f"   成交量: {volume_value:,.0f}股\n"
-
+                result = self._format_daily_report(symbol, stock_name, data, start_date, end_date, "Tushare")
                 return result
             else:
                 result = f" 未获取到{symbol}的有效数据"
@@ -552,6 +554,82 @@ class DataSourceManager:
             logger.error(f" [DataSourceManager详细日志] 异常堆栈: {traceback.format_exc()}")
             raise
 
+    def _format_daily_report(self, symbol: str, stock_name: str, data: pd.DataFrame,
+                             start_date: str, end_date: str, source_label: str) -> str:
+        """将标准化后的日线数据格式化为报告（Tushare与本地镜像共用）"""
+        # 计算最新价格和涨跌幅
+        latest_data = data.iloc[-1]
+        latest_price = latest_data.get('close', 0)
+        prev_close = data.iloc[-2].get('close', latest_price) if len(data) > 1 else latest_price
+        change = latest_price - prev_close
+        change_pct = (change / prev_close * 100) if prev_close != 0 else 0
+
+        # 🆕 添加市场上下文信息（交易时间、价格类型、涨跌幅限制）
+        from datetime import datetime
+        from tradingagents.utils.market_context import MarketContext
+
+        current_time = datetime.now()
+        is_trading, time_status = MarketContext.is_trading_time(current_time)
+        price_type = MarketContext.get_price_type(current_time)
+        price_limit_info = MarketContext.get_price_limit(symbol)
+
+        # 格式化数据报告
+        result = f" {stock_name}({symbol}) - {source_label}数据\n"
+        result += f"数据期间: {start_date} 至 {end_date}\n"
+        result += f"数据条数: {len(data)}条\n\n"
+
+        # 🆕 添加时间上下文
+        result += f" 当前时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        result += f"⏰ 交易状态: {' ' + time_status if is_trading else ' ' + time_status}\n"
+        result += f" 价格类型: {price_type}\n\n"
+
+        result += f" 最新价格: ¥{latest_price:.2f} ({price_type})\n"
+        result += f" 涨跌额: {change:+.2f} ({change_pct:+.2f}%)\n\n"
+
+        # 🆕 添加涨跌幅限制信息
+        result += f" 涨跌幅限制 ({price_limit_info['board_type']}):\n"
+        result += f"   涨停价: ¥{prev_close * (1 + price_limit_info['up_limit_pct']):.2f} (+{price_limit_info['up_limit_pct'] * 100:.0f}%)\n"
+        result += f"   跌停价: ¥{prev_close * (1 + price_limit_info['down_limit_pct']):.2f} ({price_limit_info['down_limit_pct'] * 100:.0f}%)\n\n"
+
+        # 添加统计信息
+        result += f" 价格统计:\n"
+        result += f"   最高价: ¥{data['high'].max():.2f}\n"
+        result += f"   最低价: ¥{data['low'].min():.2f}\n"
+        result += f"   平均价: ¥{data['close'].mean():.2f}\n"
+        # 防御性获取成交量数据
+        volume_value = self._get_volume_safely(data)
+        result += f"   成交量: {volume_value:,.0f}股\n"
+
+        return result
+
+    def _get_local_data(self, symbol: str, start_date: str, end_date: str) -> str:
+        """使用Tushare本地镜像获取数据 - 仅对镜像未覆盖的区间请求Tushare"""
+        mirror = self._get_local_adapter()
+        if mirror is None:
+            return f" 本地镜像数据源异常，未获取到{symbol}的数据"
+
+        start_time = time.time()
+        data = mirror.get_stock_data(symbol, start_date, end_date)
+        logger.info(f" [本地镜像] {symbol} {start_date} ~ {end_date}: {len(data)}条, 耗时: {time.time() - start_time:.3f}秒")
+
+        if data is None or data.empty:
+            return f" 未获取到{symbol}的有效数据"
+
+        stock_info = mirror.get_stock_info(symbol)
+        stock_name = stock_info.get('name', f'股票{symbol}')
+        return self._format_daily_report(symbol, stock_name, data, start_date, end_date, "Tushare本地镜像")
+
+    def _get_local_fundamentals(self, symbol: str) -> Optional[str]:
+        """使用Tushare本地镜像生成基本面报告，镜像不可用或无数据时返回None"""
+        mirror = self._get_local_adapter()
+        if mirror is None:
+            return None
+        try:
+            return mirror.get_fundamentals(symbol)
+        except Exception as e:
+            logger.warning(f" [本地镜像] 获取{symbol}基本面数据失败: {e}")
+            return None
+
     @with_timeout(
         timeout_seconds=30,  # 🆕 30秒超时
         fallback_factory=lambda self, symbol, start_date, end_date: (
@@ -571,7 +649,8 @@ class DataSourceManager:
             # 这里需要实现AKShare的统一接口
             from .akshare_utils import get_akshare_provider
             provider = get_akshare_provider()
-            data = provider.get_stock_data(symbol, start_date, end_date)
+            data = self._fetch_daily_frame(ChinaDataSource.AKSHARE, provider.get_stock_data,
+                                           symbol, start_date, end_date)
 
             duration = time.time() - start_time
 
@@ -643,7 +722,8 @@ class DataSourceManager:
         # 这里需要实现BaoStock的统一接口
         from .baostock_utils import get_baostock_provider
         provider = get_baostock_provider()
-        data = provider.get_stock_data(symbol, start_date, end_date)
+        data = self._fetch_daily_frame(ChinaDataSource.BAOSTOCK, provider.get_stock_data,
+                                       symbol, start_date, end_date)
 
         if data is not None and not data.empty:
             # 🆕 添加市场上下文信息（交易时间、价格类型、涨跌幅限制）
@@ -702,12 +782,43 @@ class DataSourceManager:
             logger.error(f" 获取成交量失败: {e}")
             return 0
 
+    def _fetch_from_source(self, source: ChinaDataSource, symbol: str,
+                           start_date: str, end_date: str) -> Optional[str]:
+        """调用指定数据源获取股票数据并记录监控指标（按数据源统计请求数、失败数、耗时）
+
+        Returns:
+            格式化的股票数据；不支持的数据源返回None
+        """
+        fetchers = {
+            ChinaDataSource.TUSHARE: self._get_tushare_data,
+            ChinaDataSource.AKSHARE: self._get_akshare_data,
+            ChinaDataSource.BAOSTOCK: self._get_baostock_data,
+            ChinaDataSource.LOCAL: self._get_local_data,
+        }
+        fetcher = fetchers.get(source)
+        if fetcher is None:
+            return None
+
+        start_time = time.time()
+        success = False
+        try:
+            result = fetcher(symbol, start_date, end_date)
+            success = bool(result) and not any(marker in result for marker in (
+                " 未获取到", " 错误", " [数据获取]", " 数据为空", "获取失败", "数据源异常"
+            ))
+            return result
+        finally:
+            get_metrics_collector().record_data_source_request(
+                source.value, success=success, duration=time.time() - start_time
+            )
+
     def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str) -> str:
         """尝试备用数据源 - 避免递归调用"""
         logger.error(f" {self.current_source.value}失败，尝试备用数据源...")
 
-        # 备用数据源优先级: AKShare > Tushare > BaoStock
+        # 备用数据源优先级: 本地镜像 > AKShare > Tushare > BaoStock
         fallback_order = [
+            ChinaDataSource.LOCAL,
             ChinaDataSource.AKSHARE,
             ChinaDataSource.TUSHARE,
             ChinaDataSource.BAOSTOCK
@@ -719,13 +830,8 @@ class DataSourceManager:
                     logger.info(f" 尝试备用数据源: {source.value}")
 
                     # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date)
-                    else:
+                    result = self._fetch_from_source(source, symbol, start_date, end_date)
+                    if result is None:
                         logger.warning(f" 未知数据源: {source.value}")
                         continue
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+DataFrame缓存序列化层
+支持 Feather(Arrow IPC) / Parquet 列式存储，保留dtype与DatetimeIndex，CSV作为兼容回退
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class FrameSerializer:
+    """DataFrame序列化器基类"""
+
+    format_name = "csv"
+    file_extension = "csv"
+
+    def save(self, data: pd.DataFrame, path: Path):
+        raise NotImplementedError
+
+    def load(self, path: Path) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class CsvFrameSerializer(FrameSerializer):
+    """CSV文本格式 - 兼容旧缓存，不保留dtype"""
+
+    format_name = "csv"
+    file_extension = "csv"
+
+    def save(self, data: pd.DataFrame, path: Path):
+        data.to_csv(path, index=True)
+
+    def load(self, path: Path) -> pd.DataFrame:
+        return pd.read_csv(path, index_col=0)
+
+
+class FeatherFrameSerializer(FrameSerializer):
+    """Arrow IPC(Feather v2)格式 - 不压缩，加载时内存映射"""
+
+    format_name = "feather"
+    file_extension = "feather"
+
+    def save(self, data: pd.DataFrame, path: Path):
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        feather.write_feather(table, str(path), compression="uncompressed")
+
+    def load(self, path: Path) -> pd.DataFrame:
+        return feather.read_table(str(path), memory_map=True).to_pandas()
+
+
+class ParquetFrameSerializer(FrameSerializer):
+    """Parquet格式 - 压缩率高，适合长期保存"""
+
+    format_name = "parquet"
+    file_extension = "parquet"
+
+    def save(self, data: pd.DataFrame, path: Path):
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        pq.write_table(table, str(path))
+
+    def load(self, path: Path) -> pd.DataFrame:
+        return pq.read_table(str(path), memory_map=True).to_pandas()
+
+
+_SERIALIZERS: Dict[str, FrameSerializer] = {
+    "csv": CsvFrameSerializer(),
+    "feather": FeatherFrameSerializer(),
+    "parquet": ParquetFrameSerializer(),
+}
+
+
+def get_frame_serializer(format_name: Optional[str] = None) -> FrameSerializer:
+    """
+    获取写入用的DataFrame序列化器
+
+    Args:
+        format_name: csv/feather/parquet，None时读取环境变量 CACHE_FRAME_FORMAT（默认feather）
+
+    Returns:
+        FrameSerializer: pyarrow不可用时回退为CSV
+    """
+    if format_name is None:
+        format_name = os.getenv("CACHE_FRAME_FORMAT", "feather")
+    format_name = format_name.lower()
+
+    if format_name not in _SERIALIZERS:
+        logger.warning(f" 未知的缓存格式 {format_name}，使用CSV")
+        return _SERIALIZERS["csv"]
+
+    if format_name != "csv" and not PYARROW_AVAILABLE:
+        logger.debug(f" pyarrow未安装，{format_name}缓存格式回退为CSV")
+        return _SERIALIZERS["csv"]
+
+    return _SERIALIZERS[format_name]
+
+
+def get_frame_reader(format_name: str) -> Optional[FrameSerializer]:
+    """
+    获取读取已有缓存文件的序列化器
+
+    与 get_frame_serializer 不同，读取时不能回退为CSV（文件本身是Arrow/Parquet格式）
+
+    Args:
+        format_name: 缓存文件的格式 csv/feather/parquet
+
+    Returns:
+        FrameSerializer: 格式未知或缺少pyarrow时返回None，调用方按缓存未命中处理
+    """
+    format_name = (format_name or "").lower()
+    if format_name not in _SERIALIZERS:
+        return None
+    if format_name != "csv" and not PYARROW_AVAILABLE:
+        logger.warning(f" pyarrow未安装，无法读取{format_name}格式缓存，按未命中处理")
+        return None
+    return _SERIALIZERS[format_name]
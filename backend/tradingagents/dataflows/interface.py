@@ -614,37 +614,49 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
+    # 一次加载行情、整列计算指标后切出窗口（行情表按 (股票, 日期) 记忆化），
+    # 不再逐日调用 get_stockstats_indicator 重复读取CSV和重算指标
     if not online:
         # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
+        window = StockstatsUtils.get_stock_stats_window(
+            symbol,
+            [indicator],
+            end_date,
+            look_back_days,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
+            online=False,
         )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
+        values = window[indicator]
 
         ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+        # only do the trading dates
+        for date_str in reversed(window.index):
+            ind_string += f"{date_str}: {values[date_str]}\n"
     else:
         # online gathering
+        try:
+            window = StockstatsUtils.get_stock_stats_window(
+                symbol,
+                [indicator],
+                end_date,
+                look_back_days,
+                os.path.join(DATA_DIR, "market_data", "price_data"),
+                online=True,
+            )
+            values = window[indicator].to_dict()
+        except Exception as e:
+            logger.error(f"Error getting stockstats indicator data for indicator {indicator}: {e}")
+            values = None
+
         ind_string = ""
         while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
+            date_str = curr_date.strftime("%Y-%m-%d")
+            if values is None:
+                indicator_value = ""
+            else:
+                indicator_value = values.get(date_str, NOT_TRADING_DAY)
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+            ind_string += f"{date_str}: {indicator_value}\n"
 
             curr_date = curr_date - relativedelta(days=1)
 
@@ -1359,7 +1371,7 @@ def get_china_stock_info_unified(
 
 
 def switch_china_data_source(
-    source: Annotated[str, "数据源名称：tushare, akshare, baostock"]
+    source: Annotated[str, "数据源名称：tushare, akshare, baostock, local"]
 ) -> str:
     """
     切换中国股票数据源
@@ -1377,7 +1389,8 @@ def switch_china_data_source(
         source_mapping = {
             'tushare': ChinaDataSource.TUSHARE,
             'akshare': ChinaDataSource.AKSHARE,
-            'baostock': ChinaDataSource.BAOSTOCK
+            'baostock': ChinaDataSource.BAOSTOCK,
+            'local': ChinaDataSource.LOCAL
         }
 
         if source.lower() not in source_mapping:
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+区间感知的日线数据缓存
+按 (数据源, 股票代码) 保存一份合并后的时间序列及已覆盖的日期区间，
+任意子区间直接从本地切片返回，只对未覆盖的日期缺口调用数据源
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .frame_storage import get_frame_reader, get_frame_serializer
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('dataflows.range_cache')
+
+DateRange = Tuple[date, date]
+
+
+def _parse_date(value) -> date:
+    """解析 YYYY-MM-DD / YYYYMMDD / datetime 为 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(str(value)).date()
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """合并重叠或相邻的日期区间"""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: date, end: date, covered: List[DateRange]) -> List[DateRange]:
+    """计算 [start, end] 中未被 covered 覆盖的缺口"""
+    gaps: List[DateRange] = []
+    cursor = start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - timedelta(days=1)))
+        cursor = max(cursor, c_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _local_open_days(start: date, end: date) -> Optional[List[date]]:
+    """从 data_sync 同步的本地交易日历读取 [start, end] 内的开市日，日历未完整覆盖该区间时返回None"""
+    try:
+        from data_sync.sync_engine import DEFAULT_DB_PATH
+    except ImportError:
+        return None
+    if not os.path.exists(DEFAULT_DB_PATH):
+        return None
+
+    try:
+        conn = sqlite3.connect(f"file:{Path(DEFAULT_DB_PATH).resolve().as_posix()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT cal_date, is_open FROM trade_calendar WHERE exchange = 'SSE' AND cal_date BETWEEN ? AND ?",
+                (start.strftime('%Y%m%d'), end.strftime('%Y%m%d'))
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+    if len(rows) < (end - start).days + 1:
+        return None
+    return [_parse_date(cal_date) for cal_date, is_open in rows if is_open]
+
+
+def has_trading_days(start: date, end: date) -> bool:
+    """[start, end] 内是否有A股交易日：优先使用本地交易日历（含节假日），否则只排除周末"""
+    open_days = _local_open_days(start, end)
+    if open_days is not None:
+        return bool(open_days)
+    return any((start + timedelta(days=n)).weekday() < 5 for n in range((end - start).days + 1))
+
+
+class OHLCVRangeStore:
+    """按股票保存的日线时间序列存储 - 合并重叠请求，仅补齐缺失区间"""
+
+    # 数据源返回的日期列（Tushare标准化后为date，AKShare为日期）
+    DATE_COLUMNS = ('date', 'trade_date', '日期')
+
+    def __init__(self, store_dir: str = None, frame_format: str = None,
+                 trading_day_checker: Callable[[date, date], bool] = None):
+        """
+        初始化区间缓存
+
+        Args:
+            store_dir: 存储目录，默认为 tradingagents/dataflows/data_cache/ohlcv_ranges
+            frame_format: DataFrame存储格式，默认读取 CACHE_FRAME_FORMAT
+            trading_day_checker: checker(start, end) 判断区间内是否有交易日，默认 has_trading_days
+        """
+        if store_dir is None:
+            store_dir = Path(__file__).parent / "data_cache" / "ohlcv_ranges"
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.serializer = get_frame_serializer(frame_format)
+        self.has_trading_days = trading_day_checker or has_trading_days
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._provider_calls = 0
+        self._local_hits = 0
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _paths(self, source: str, symbol: str, file_extension: str = None) -> Tuple[Path, Path]:
+        base = self.store_dir / source
+        base.mkdir(parents=True, exist_ok=True)
+        safe_symbol = str(symbol).replace('/', '_')
+        file_extension = file_extension or self.serializer.file_extension
+        return base / f"{safe_symbol}.{file_extension}", base / f"{safe_symbol}.coverage.json"
+
+    def _load(self, source: str, symbol: str) -> Tuple[Optional[pd.DataFrame], List[DateRange], Optional[str], Optional[str]]:
+        """读取数据和覆盖区间，返回 (frame, covered, date_column, data_format)
+
+        data_format 为数据文件的存储格式，None表示尚未写入数据文件（只覆盖了无交易日的区间）。
+        记录的数据文件缺失或无法读取时按无覆盖处理，由 get_range 重新获取。
+        """
+        _, coverage_path = self._paths(source, symbol)
+        if not coverage_path.exists():
+            return None, [], None, None
+        try:
+            with open(coverage_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            covered = [(_parse_date(s), _parse_date(e)) for s, e in meta.get('covered', [])]
+            # 早期的覆盖文件没有 format 字段，数据文件使用当时的默认格式
+            data_format = meta.get('format', self.serializer.format_name)
+            if data_format is None:
+                return None, covered, meta.get('date_column'), None
+
+            reader = get_frame_reader(data_format)
+            if reader is None:
+                return None, [], None, None
+            data_path, _ = self._paths(source, symbol, reader.file_extension)
+            if not data_path.exists():
+                logger.warning(f" 区间缓存数据文件缺失，将重新获取: {data_path}")
+                return None, [], None, None
+            return reader.load(data_path), covered, meta.get('date_column'), reader.format_name
+        except Exception as e:
+            logger.warning(f" 区间缓存读取失败，将重新获取: {source}/{symbol}: {e}")
+            return None, [], None, None
+
+    def _save(self, source: str, symbol: str, frame: Optional[pd.DataFrame],
+              covered: List[DateRange], date_column: Optional[str], data_format: Optional[str]):
+        """保存覆盖区间；frame不为None时按当前格式写入数据文件并替换旧格式的文件"""
+        if frame is not None:
+            data_path, _ = self._paths(source, symbol)
+            self.serializer.save(frame, data_path)
+            if data_format is not None and data_format != self.serializer.format_name:
+                reader = get_frame_reader(data_format)
+                if reader is not None:
+                    self._paths(source, symbol, reader.file_extension)[0].unlink(missing_ok=True)
+            data_format = self.serializer.format_name
+        _, coverage_path = self._paths(source, symbol)
+        meta = {
+            'symbol': symbol,
+            'source': source,
+            'format': data_format,
+            'date_column': date_column,
+            'covered': [[s.isoformat(), e.isoformat()] for s, e in covered],
+            'updated_at': datetime.now().isoformat(),
+        }
+        with open(coverage_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def _detect_date_column(self, frame: pd.DataFrame) -> Optional[str]:
+        for col in self.DATE_COLUMNS:
+            if col in frame.columns:
+                return col
+        return None
+
+    @staticmethod
+    def _date_keys(frame: pd.DataFrame, date_column: Optional[str]) -> pd.Series:
+        values = frame[date_column] if date_column else frame.index.to_series()
+        return pd.Series(pd.to_datetime(values.astype(str), errors='coerce').values, index=frame.index)
+
+    def _merge(self, existing: Optional[pd.DataFrame], new: pd.DataFrame,
+               date_column: Optional[str]) -> pd.DataFrame:
+        frame = new if existing is None or existing.empty else pd.concat([existing, new])
+        keys = self._date_keys(frame, date_column)
+        frame = frame.assign(_range_key=keys.values)
+        frame = frame.drop_duplicates('_range_key', keep='last').sort_values('_range_key')
+        frame = frame.drop(columns='_range_key')
+        if date_column:
+            frame = frame.reset_index(drop=True)
+        return frame
+
+    def missing_ranges(self, source: str, symbol: str, start_date: str, end_date: str) -> List[DateRange]:
+        """返回 [start_date, end_date] 中尚未缓存的日期缺口"""
+        _, covered, _, _ = self._load(source, symbol)
+        return subtract_ranges(_parse_date(start_date), _parse_date(end_date), covered)
+
+    def get_range(self, source: str, symbol: str, start_date: str, end_date: str,
+                  fetcher: Callable[[str, str, str], Optional[pd.DataFrame]]) -> pd.DataFrame:
+        """
+        获取区间数据，仅对缺失区间调用数据源
+
+        Args:
+            source: 数据源名称（tushare/akshare/baostock）
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            fetcher: 数据源获取函数 fetcher(symbol, start_date, end_date) -> DataFrame
+
+        Returns:
+            DataFrame: [start_date, end_date] 内的数据，无数据时为空DataFrame
+        """
+        start, end = _parse_date(start_date), _parse_date(end_date)
+        # 当天及以后的数据可能仍在变化，不记为已覆盖
+        last_final_day = date.today() - timedelta(days=1)
+
+        with self._key_lock(f"{source}/{symbol}"):
+            frame, covered, date_column, data_format = self._load(source, symbol)
+            gaps = subtract_ranges(start, end, covered)
+
+            if not gaps:
+                with self._stats_lock:
+                    self._local_hits += 1
+                logger.debug(f" 区间缓存命中: {source}/{symbol} {start} ~ {end}")
+            else:
+                frame_changed, coverage_changed = False, False
+                for gap_start, gap_end in gaps:
+                    with self._stats_lock:
+                        self._provider_calls += 1
+                    logger.info(f" 区间缓存缺口，请求数据源: {source}/{symbol} {gap_start} ~ {gap_end}")
+                    data = fetcher(symbol, gap_start.strftime('%Y-%m-%d'), gap_end.strftime('%Y-%m-%d'))
+
+                    # 只把数据源实际返回的日期范围（裁剪到缺口内）记为已覆盖
+                    newly_covered: List[DateRange] = []
+                    if isinstance(data, pd.DataFrame) and not data.empty:
+                        if date_column is None:
+                            date_column = self._detect_date_column(data)
+                        keys = self._date_keys(data, date_column)
+                        in_gap = keys.notna() & (keys >= pd.Timestamp(gap_start)) & (keys <= pd.Timestamp(gap_end))
+                        if in_gap.any():
+                            frame = self._merge(frame, data.loc[in_gap.values], date_column)
+                            frame_changed = True
+                            newly_covered.append((keys[in_gap.values].min().date(), keys[in_gap.values].max().date()))
+
+                    # 剩余部分没有交易日（周末/节假日）时空结果是合法的，同样记为已覆盖；
+                    # 有交易日却无数据可能是接口失败，下次重试
+                    for rest_start, rest_end in subtract_ranges(gap_start, gap_end, newly_covered):
+                        if not self.has_trading_days(rest_start, rest_end):
+                            newly_covered.append((rest_start, rest_end))
+
+                    newly_covered = [(s, min(e, last_final_day)) for s, e in newly_covered if s <= last_final_day]
+                    if newly_covered:
+                        covered = merge_ranges(covered + newly_covered)
+                        coverage_changed = True
+
+                if frame_changed or coverage_changed:
+                    self._save(source, symbol, frame if frame_changed else None, covered, date_column, data_format)
+
+            if frame is None or frame.empty:
+                return pd.DataFrame()
+
+            keys = self._date_keys(frame, date_column)
+            mask = (keys >= pd.Timestamp(start)) & (keys <= pd.Timestamp(end))
+            return frame.loc[mask.values].copy()
+
+    def clear(self, source: str = None, symbol: str = None):
+        """清除缓存，source/symbol 为None时清除对应层级的全部数据"""
+        targets = [self.store_dir / source] if source else [p for p in self.store_dir.iterdir() if p.is_dir()]
+        for base in targets:
+            if not base.exists():
+                continue
+            pattern = f"{symbol}.*" if symbol else "*"
+            for path in base.glob(pattern):
+                path.unlink()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self._stats_lock:
+            return {
+                'provider_calls': self._provider_calls,
+                'local_hits': self._local_hits,
+            }
+
+
+# 全局区间缓存实例
+_range_store_instance = None
+
+
+def get_ohlcv_range_store() -> OHLCVRangeStore:
+    """获取全局区间缓存实例"""
+    global _range_store_instance
+    if _range_store_instance is None:
+        _range_store_instance = OHLCVRangeStore()
+    return _range_store_instance
@@ -5,9 +5,14 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
 import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import time
 import os
 from dataclasses import dataclass
@@ -20,6 +25,143 @@ logger = get_logger('agents')
 _news_cache = {}
 _news_cache_ttl = 300  # 缓存5分钟
 
+# 标题SimHash的海明距离不超过该值视为同一条新闻（去掉来源前后缀后的标点/大小写/个别字差异）
+SIMHASH_MAX_DISTANCE = 6
+# 64位指纹切成8段，每段8位：距离<=7的两个指纹至少有一段完全相同
+_SIMHASH_BANDS = 8
+_SIMHASH_BAND_BITS = 64 // _SIMHASH_BANDS
+_TITLE_NOISE = re.compile(r'[\s\W_]+', re.UNICODE)
+# 转载时附加的来源：开头的【财联社】/[Reuters]/(Reuters) -，结尾的 " - Reuters"、" | CNBC"、"(Bloomberg)"
+_LEADING_SOURCE = re.compile(r'^\s*(?:【[^】]{1,20}】|\[[^\]]{1,20}\]|[(（][^()（）]{1,20}[)）]\s*[-–—:：])\s*')
+_TRAILING_SOURCE = re.compile(r'(?:\s+[-–—]\s+|\s*[|｜]\s*)([^-–—|｜]{1,30})$')
+_TRAILING_PAREN = re.compile(r'\s*[(（][^()（）\d]{1,20}[)）]\s*$')
+# 数字（含中文数字）不同的标题是不同的新闻：第一季度/第二季度、降准0.5/0.25个百分点
+_TITLE_NUMBERS = re.compile(r'\d+(?:\.\d+)?|[零一二三四五六七八九十百千万亿两]+')
+
+# 所有聚合器共享的HTTP连接池和抓取线程池
+_http_session: Optional[requests.Session] = None
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """共享的HTTP会话（按主机复用keep-alive连接）"""
+    global _http_session
+    if _http_session is None:
+        with _shared_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    """共享的新闻源抓取线程池"""
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _shared_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('NEWS_FETCH_WORKERS', '8')),
+                    thread_name_prefix='news-fetch'
+                )
+    return _fetch_executor
+
+
+class NewsSourceStats:
+    """各新闻源的调用统计（延迟、命中、超时）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, source: str, latency: Optional[float], items: int = 0, timed_out: bool = False):
+        """记录一次调用；timed_out 表示在全局截止时间前没有返回"""
+        with self._lock:
+            stats = self._stats.setdefault(source, {
+                'calls': 0, 'hits': 0, 'items': 0, 'timeouts': 0,
+                'total_latency': 0.0, 'max_latency': 0.0, 'last_latency': 0.0,
+            })
+            stats['calls'] += 1
+            if timed_out:
+                stats['timeouts'] += 1
+                return
+            stats['items'] += items
+            if items:
+                stats['hits'] += 1
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+            stats['last_latency'] = latency
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """统计快照（含平均延迟和命中率）"""
+        with self._lock:
+            result = {}
+            for source, stats in self._stats.items():
+                completed = stats['calls'] - stats['timeouts']
+                result[source] = dict(
+                    stats,
+                    avg_latency=stats['total_latency'] / completed if completed else 0.0,
+                    hit_rate=stats['hits'] / stats['calls'] if stats['calls'] else 0.0,
+                )
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+news_source_stats = NewsSourceStats()
+
+
+def strip_source_decorations(title: str) -> str:
+    """去掉转载时附加在标题前后的来源（【财联社】xxx、xxx - Reuters、xxx (Bloomberg)）"""
+    previous = None
+    while title != previous:
+        previous = title
+        title = _LEADING_SOURCE.sub('', title)
+        title = _TRAILING_PAREN.sub('', title)
+        match = _TRAILING_SOURCE.search(title)
+        # 来源名较短（不超过4个词且短于标题正文），否则后缀可能就是标题正文
+        source = match.group(1).strip() if match else ''
+        if match and len(source.split()) <= 4 and len(source) < match.start():
+            title = title[:match.start()]
+    return title.strip()
+
+
+def title_numbers(title: str) -> tuple:
+    """标题中的数字序列（去掉来源前后缀后），用于区分只差数字的标题"""
+    return tuple(_TITLE_NUMBERS.findall(strip_source_decorations(title)))
+
+
+def title_simhash(title: str) -> int:
+    """标题的64位SimHash（去掉来源前后缀、空白和标点后按字符3-gram计算）"""
+    text = _TITLE_NOISE.sub('', strip_source_decorations(title).lower())
+    if len(text) <= 3:
+        shingles = [text]
+    else:
+        shingles = [text[i:i + 3] for i in range(len(text) - 2)]
+
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _simhash_bands(fingerprint: int):
+    mask = (1 << _SIMHASH_BAND_BITS) - 1
+    return [(band, (fingerprint >> (band * _SIMHASH_BAND_BITS)) & mask) for band in range(_SIMHASH_BANDS)]
+
 
 
 @dataclass
@@ -46,11 +188,17 @@ class RealtimeNewsAggregator:
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
-        
+
+        # 并发抓取：全局截止时间 + 单个新闻源的HTTP超时
+        self.deadline = float(os.getenv('NEWS_AGGREGATOR_DEADLINE', '15'))
+        self.source_timeout = float(os.getenv('NEWS_SOURCE_TIMEOUT', '8'))
+        self.session = _get_http_session()
+
     def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        各新闻源并发获取，超过全局截止时间仍未返回的新闻源被忽略；
+        去重时按优先级保留：专业API > 新闻API > 中文财经源
         
         Args:
             ticker: 股票代码
@@ -59,63 +207,22 @@ class RealtimeNewsAggregator:
         """
         logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now()
-        all_news = []
-        
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now()
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now() - finnhub_start).total_seconds()
-        
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-            
-        all_news.extend(finnhub_news)
-        
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now()
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now() - av_start).total_seconds()
-        
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-            
-        all_news.extend(av_news)
-        
-        # 3. NewsAPI (如果配置了)
+
+        # 按优先级排列，去重时保留优先级高的来源
+        sources = [('FinnHub', self._get_finnhub_realtime_news),
+                   ('Alpha Vantage', self._get_alpha_vantage_news)]
         if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now()
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now() - newsapi_start).total_seconds()
-            
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-                
-            all_news.extend(newsapi_news)
+            sources.append(('NewsAPI', self._get_newsapi_news))
         else:
             logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-        
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now()
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now() - chinese_start).total_seconds()
-        
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
-            
-        all_news.extend(chinese_news)
-        
+        sources.extend([('Tushare', self._get_tushare_news),
+                        ('财联社', self._fetch_cls_news),
+                        ('华尔街见闻', self._fetch_wallstreet_news)])
+
+        all_news = []
+        for name, news in self._fetch_sources_concurrently(sources, ticker, hours_back):
+            all_news.extend(news)
+
         # 去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
         dedup_start = datetime.now()
@@ -144,6 +251,62 @@ class RealtimeNewsAggregator:
         
         return sorted_news
     
+    def _fetch_sources_concurrently(
+        self,
+        sources: List[tuple],
+        ticker: str,
+        hours_back: int
+    ) -> List[tuple]:
+        """
+        并发调用各新闻源，在全局截止时间内返回已完成的结果
+
+        Args:
+            sources: [(名称, 抓取函数)]，按优先级排列
+            ticker: 股票代码
+            hours_back: 回溯小时数
+
+        Returns:
+            [(名称, 新闻列表)]，顺序与 sources 一致，超时的新闻源不在其中
+        """
+        def timed(name: str, fetch: Callable[[str, int], List[NewsItem]]):
+            fetch_start = time.perf_counter()
+            try:
+                news = fetch(ticker, hours_back) or []
+            except Exception:
+                news_source_stats.record(name, time.perf_counter() - fetch_start)
+                raise
+            latency = time.perf_counter() - fetch_start
+            news_source_stats.record(name, latency, len(news))
+            logger.info(f"[新闻聚合器] {name} 返回 {len(news)} 条新闻，耗时: {latency:.2f}秒")
+            return news
+
+        executor = _get_fetch_executor()
+        futures = [(name, executor.submit(timed, name, fetch)) for name, fetch in sources]
+        _, pending = wait([future for _, future in futures], timeout=self.deadline)
+
+        # 截止时间到：先取消所有仍在共享线程池队列中、尚未开始的请求，避免占用其他调用方的工作线程
+        cancelled = {future for future in pending if future.cancel()}
+
+        results = []
+        for name, future in futures:
+            if future in cancelled:
+                logger.warning(f"[新闻聚合器] {name} 截止时间前未开始执行（线程池繁忙），已取消")
+                continue
+            if not future.done():
+                news_source_stats.record(name, None, timed_out=True)
+                logger.warning(f"[新闻聚合器] {name} 超过截止时间 {self.deadline:.0f}秒，放弃等待")
+                continue
+            try:
+                results.append((name, future.result()))
+            except Exception as e:
+                logger.error(f"[新闻聚合器] {name} 获取失败: {e}")
+        return results
+
+    @staticmethod
+    def get_source_stats() -> Dict[str, Dict[str, float]]:
+        """各新闻源的延迟和命中统计"""
+        return news_source_stats.snapshot()
+
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取FinnHub实时新闻"""
         if not self.finnhub_key:
@@ -163,7 +326,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             news_data = response.json()
@@ -208,7 +371,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -268,7 +431,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -300,144 +463,98 @@ class RealtimeNewsAggregator:
             logger.error(f"NewsAPI新闻获取失败: {e}")
             return []
     
-    def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取中文财经新闻"""
-        # 集成中文财经新闻API：使用Tushare新闻接口
-        logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
-        start_time = datetime.now()
+    def _get_tushare_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """获取Tushare新闻（美股代码跳过）"""
+        news_items = []
 
         try:
-            news_items = []
+            logger.info(f"[中文财经新闻] 尝试导入 Tushare 新闻工具")
+            from .tushare_utils import get_stock_news_tushare
 
-            # 1. 优先使用Tushare获取新闻
-            try:
-                logger.info(f"[中文财经新闻] 尝试导入 Tushare 新闻工具")
-                from .tushare_utils import get_stock_news_tushare
-
-                # 处理股票代码格式
-                # 如果是美股代码，不使用Tushare新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
-                    logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过Tushare新闻获取")
-                else:
-                    # 计算日期范围
-                    end_date = datetime.now().strftime('%Y-%m-%d')
-                    start_date = (datetime.now() - timedelta(hours=hours_back)).strftime('%Y-%m-%d')
-
-                    # 获取Tushare新闻
-                    logger.info(f"[中文财经新闻] 开始从Tushare获取新闻，日期范围: {start_date} 到 {end_date}")
-                    tushare_start_time = datetime.now()
-                    news_df = get_stock_news_tushare(
-                        symbol=ticker,
-                        start_date=start_date,
-                        end_date=end_date,
-                        max_news=10
-                    )
-
-                    if not news_df.empty:
-                        logger.info(f"[中文财经新闻] Tushare返回 {len(news_df)} 条新闻数据，开始处理")
-                        processed_count = 0
-                        skipped_count = 0
-                        error_count = 0
-
-                        # 转换为NewsItem格式
-                        for _, row in news_df.iterrows():
-                            try:
-                                # 解析时间
-                                time_str = row.get('datetime', '')
-                                if time_str:
+            # 处理股票代码格式
+            # 如果是美股代码，不使用Tushare新闻
+            if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
+                logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过Tushare新闻获取")
+            else:
+                # 计算日期范围
+                end_date = datetime.now().strftime('%Y-%m-%d')
+                start_date = (datetime.now() - timedelta(hours=hours_back)).strftime('%Y-%m-%d')
+
+                # 获取Tushare新闻
+                logger.info(f"[中文财经新闻] 开始从Tushare获取新闻，日期范围: {start_date} 到 {end_date}")
+                tushare_start_time = datetime.now()
+                news_df = get_stock_news_tushare(
+                    symbol=ticker,
+                    start_date=start_date,
+                    end_date=end_date,
+                    max_news=10
+                )
+
+                if not news_df.empty:
+                    logger.info(f"[中文财经新闻] Tushare返回 {len(news_df)} 条新闻数据，开始处理")
+                    processed_count = 0
+                    skipped_count = 0
+                    error_count = 0
+
+                    # 转换为NewsItem格式
+                    for _, row in news_df.iterrows():
+                        try:
+                            # 解析时间
+                            time_str = row.get('datetime', '')
+                            if time_str:
+                                try:
+                                    # Tushare返回的时间格式：YYYY-MM-DD HH:MM:SS
+                                    publish_time = datetime.strptime(str(time_str)[:19], '%Y-%m-%d %H:%M:%S')
+                                except:
                                     try:
-                                        # Tushare返回的时间格式：YYYY-MM-DD HH:MM:SS
-                                        publish_time = datetime.strptime(str(time_str)[:19], '%Y-%m-%d %H:%M:%S')
+                                        publish_time = datetime.strptime(str(time_str)[:10], '%Y-%m-%d')
                                     except:
-                                        try:
-                                            publish_time = datetime.strptime(str(time_str)[:10], '%Y-%m-%d')
-                                        except:
-                                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
-                                            publish_time = datetime.now()
-                                else:
-                                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
-                                    publish_time = datetime.now()
-
-                                # 检查时效性
-                                if publish_time < datetime.now() - timedelta(hours=hours_back):
-                                    skipped_count += 1
-                                    continue
-
-                                # 评估紧急程度
-                                title = row.get('title', '')
-                                content = row.get('content', '')
-                                urgency = self._assess_news_urgency(title, content)
-
-                                # 获取新闻来源
-                                source = row.get('source', 'Tushare')
-                                if source == 'eastmoney':
-                                    source = '东方财富'
-                                elif source == 'sina':
-                                    source = '新浪财经'
-                                elif source == '10jqka':
-                                    source = '同花顺'
-
-                                news_items.append(NewsItem(
-                                    title=title,
-                                    content=content,
-                                    source=source,
-                                    publish_time=publish_time,
-                                    url=row.get('channels', ''),
-                                    urgency=urgency,
-                                    relevance_score=self._calculate_relevance(title, ticker)
-                                ))
-                                processed_count += 1
-                            except Exception as item_e:
-                                logger.error(f"[中文财经新闻] 处理Tushare新闻项目失败: {item_e}")
-                                error_count += 1
+                                        logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
+                                        publish_time = datetime.now()
+                            else:
+                                logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
+                                publish_time = datetime.now()
+
+                            # 检查时效性
+                            if publish_time < datetime.now() - timedelta(hours=hours_back):
+                                skipped_count += 1
                                 continue
 
-                        tushare_time = (datetime.now() - tushare_start_time).total_seconds()
-                        logger.info(f"[中文财经新闻] Tushare新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {tushare_time:.2f}秒")
-            except Exception as ts_e:
-                logger.error(f"[中文财经新闻] 获取Tushare新闻失败: {ts_e}")
-
-            # 2. 财联社API新闻 (官方API)
-            logger.info(f"[中文财经新闻] 开始获取财联社API新闻")
-            cls_start_time = datetime.now()
-
-            try:
-                cls_news = self._fetch_cls_news(ticker, hours_back)
-                cls_time = (datetime.now() - cls_start_time).total_seconds()
-
-                if cls_news:
-                    logger.info(f"[中文财经新闻] 成功从财联社获取 {len(cls_news)} 条新闻，耗时: {cls_time:.2f}秒")
-                    news_items.extend(cls_news)
-                else:
-                    logger.info(f"[中文财经新闻] 财联社未返回相关新闻，耗时: {cls_time:.2f}秒")
-            except Exception as cls_e:
-                logger.error(f"[中文财经新闻] 获取财联社新闻失败: {cls_e}")
-
-            # 3. 华尔街见闻实时快讯
-            logger.info(f"[中文财经新闻] 开始获取华尔街见闻新闻")
-            wsj_start_time = datetime.now()
-
-            try:
-                wsj_news = self._fetch_wallstreet_news(ticker, hours_back)
-                wsj_time = (datetime.now() - wsj_start_time).total_seconds()
-
-                if wsj_news:
-                    logger.info(f"[中文财经新闻] 成功从华尔街见闻获取 {len(wsj_news)} 条新闻，耗时: {wsj_time:.2f}秒")
-                    news_items.extend(wsj_news)
-                else:
-                    logger.info(f"[中文财经新闻] 华尔街见闻未返回相关新闻，耗时: {wsj_time:.2f}秒")
-            except Exception as wsj_e:
-                logger.error(f"[中文财经新闻] 获取华尔街见闻新闻失败: {wsj_e}")
-
-            # 记录中文财经新闻获取总结
-            total_time = (datetime.now() - start_time).total_seconds()
-            logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
-
-            return news_items
-
-        except Exception as e:
-            logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
-            return []
+                            # 评估紧急程度
+                            title = row.get('title', '')
+                            content = row.get('content', '')
+                            urgency = self._assess_news_urgency(title, content)
+
+                            # 获取新闻来源
+                            source = row.get('source', 'Tushare')
+                            if source == 'eastmoney':
+                                source = '东方财富'
+                            elif source == 'sina':
+                                source = '新浪财经'
+                            elif source == '10jqka':
+                                source = '同花顺'
+
+                            news_items.append(NewsItem(
+                                title=title,
+                                content=content,
+                                source=source,
+                                publish_time=publish_time,
+                                url=row.get('channels', ''),
+                                urgency=urgency,
+                                relevance_score=self._calculate_relevance(title, ticker)
+                            ))
+                            processed_count += 1
+                        except Exception as item_e:
+                            logger.error(f"[中文财经新闻] 处理Tushare新闻项目失败: {item_e}")
+                            error_count += 1
+                            continue
+
+                    tushare_time = (datetime.now() - tushare_start_time).total_seconds()
+                    logger.info(f"[中文财经新闻] Tushare新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {tushare_time:.2f}秒")
+        except Exception as ts_e:
+            logger.error(f"[中文财经新闻] 获取Tushare新闻失败: {ts_e}")
+
+        return news_items
 
     def _fetch_wallstreet_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """
@@ -481,7 +598,7 @@ class RealtimeNewsAggregator:
             }
 
             logger.info(f"[华尔街见闻] 请求API: {url}")
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.session.get(url, params=params, headers=headers, timeout=self.source_timeout)
 
             if response.status_code != 200:
                 logger.warning(f"[华尔街见闻] API返回非200状态码: {response.status_code}")
@@ -677,7 +794,7 @@ class RealtimeNewsAggregator:
             }
 
             logger.info(f"[财联社] 请求API: {url}")
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.session.get(url, params=params, headers=headers, timeout=self.source_timeout)
 
             if response.status_code != 200:
                 logger.warning(f"[财联社] API返回非200状态码: {response.status_code}")
@@ -943,13 +1060,15 @@ class RealtimeNewsAggregator:
         logger.info(f"[新闻去重] 开始对 {len(news_items)} 条新闻进行去重处理")
         start_time = datetime.now()
         
-        seen_titles = set()
+        # 标题SimHash分段索引：只和至少一段相同的已保留指纹比较海明距离，避免两两比较
+        band_index: Dict[tuple, List[int]] = {}
+        kept_fingerprints: List[int] = []
+        kept_numbers: List[tuple] = []
         unique_news = []
         duplicate_count = 0
         short_title_count = 0
         
         for item in news_items:
-            # 简单的标题去重
             title_key = item.title.lower().strip()
             
             # 检查标题长度
@@ -958,14 +1077,23 @@ class RealtimeNewsAggregator:
                 short_title_count += 1
                 continue
                 
-            # 检查是否重复
-            if title_key in seen_titles:
+            # 检查是否与已保留的新闻近似重复（转载来源前后缀、标点/大小写差异），数字不同的不算重复
+            fingerprint = title_simhash(title_key)
+            numbers = title_numbers(title_key)
+            bands = _simhash_bands(fingerprint)
+            candidates = {i for band in bands for i in band_index.get(band, ())}
+            if any(kept_numbers[i] == numbers
+                   and bin(fingerprint ^ kept_fingerprints[i]).count('1') <= SIMHASH_MAX_DISTANCE
+                   for i in candidates):
                 logger.debug(f"[新闻去重] 检测到重复新闻: '{item.title[:50]}...'，来源: {item.source}")
                 duplicate_count += 1
                 continue
                 
             # 添加到结果集
-            seen_titles.add(title_key)
+            for band in bands:
+                band_index.setdefault(band, []).append(len(kept_fingerprints))
+            kept_fingerprints.append(fingerprint)
+            kept_numbers.append(numbers)
             unique_news.append(item)
         
         # 记录去重结果
@@ -1,21 +1,156 @@
 import pandas as pd
-import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Dict, Hashable, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import threading
 import os
 from .config import get_config
 
+try:
+    import yfinance as yf
+    YF_AVAILABLE = True
+except ImportError:
+    yf = None
+    YF_AVAILABLE = False
+
+# 按 (数据源, 股票, 截止日期) 缓存已加载并计算过指标的行情表，最多保留的条目数
+INDICATOR_FRAME_CACHE_SIZE = int(os.getenv("STOCKSTATS_FRAME_CACHE_SIZE", "32"))
+
+NOT_TRADING_DAY = "N/A: Not a trading day (weekend or holiday)"
+
+
+class _IndicatorFrame:
+    """截至某日的 stockstats 行情表，指标按需计算后保留在表中"""
+
+    def __init__(self, df):
+        self.df = df
+        self.lock = threading.Lock()
+        # 日期(YYYY-mm-dd) -> 首个匹配行位置
+        self.row_of_date: Dict[str, int] = {}
+        for i, date in enumerate(df["Date"].str[:10]):
+            self.row_of_date.setdefault(date, i)
+
+    def ensure(self, indicators: Sequence[str]):
+        """计算尚未计算过的指标（整列一次性计算）"""
+        with self.lock:
+            for indicator in indicators:
+                if indicator not in self.df.columns:
+                    self.df[indicator]  # trigger stockstats to calculate the indicator
+
 
 class StockstatsUtils:
+    _frame_cache: "OrderedDict[Tuple[Hashable, ...], _IndicatorFrame]" = OrderedDict()
+    _frame_cache_lock = threading.Lock()
+    frame_cache_hits = 0
+    frame_cache_misses = 0
+
     @staticmethod
-    def get_stock_stats(
+    def _load_price_data(symbol: str, data_dir: str, online: bool) -> pd.DataFrame:
+        """读取完整行情（离线CSV或在线下载的15年数据），Date 列为字符串"""
+        if not online:
+            try:
+                data = pd.read_csv(
+                    os.path.join(
+                        data_dir,
+                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
+                    )
+                )
+            except FileNotFoundError:
+                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+            data["Date"] = data["Date"].astype(str)
+            return data
+
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
+
+        end_date = today_date
+        start_date = today_date - pd.DateOffset(years=15)
+        start_date = start_date.strftime("%Y-%m-%d")
+        end_date = end_date.strftime("%Y-%m-%d")
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if os.path.exists(data_file):
+            data = pd.read_csv(data_file)
+            data["Date"] = pd.to_datetime(data["Date"])
+        else:
+            if not YF_AVAILABLE:
+                raise Exception("Stockstats fail: yfinance is not installed")
+            data = yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
+            )
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
+
+        data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+        return data
+
+    @classmethod
+    def get_indicator_frame(
+        cls,
+        symbol: str,
+        curr_date: str,
+        data_dir: str,
+        online: bool = False,
+    ) -> _IndicatorFrame:
+        """获取截至 curr_date（含）的行情表，按 (股票, 截止日期) 记忆化
+
+        指标均为因果计算，截断到截止日期不改变该日及之前的指标值。
+        在线模式的数据文件按当天日期命名，因此缓存键中包含当天日期。
+        """
+        source = ("online", pd.Timestamp.today().strftime("%Y-%m-%d")) if online else ("offline", data_dir)
+        key = (source, symbol, curr_date)
+
+        with cls._frame_cache_lock:
+            frame = cls._frame_cache.get(key)
+            if frame is not None:
+                cls._frame_cache.move_to_end(key)
+                cls.frame_cache_hits += 1
+                return frame
+            cls.frame_cache_misses += 1
+
+        data = cls._load_price_data(symbol, data_dir, online)
+        data = data[data["Date"].str[:10] <= curr_date].reset_index(drop=True)
+        frame = _IndicatorFrame(wrap(data))
+
+        with cls._frame_cache_lock:
+            frame = cls._frame_cache.setdefault(key, frame)
+            cls._frame_cache.move_to_end(key)
+            while len(cls._frame_cache) > max(INDICATOR_FRAME_CACHE_SIZE, 1):
+                cls._frame_cache.popitem(last=False)
+        return frame
+
+    @classmethod
+    def clear_cache(cls):
+        """清空行情表缓存"""
+        with cls._frame_cache_lock:
+            cls._frame_cache.clear()
+            cls.frame_cache_hits = 0
+            cls.frame_cache_misses = 0
+
+    @classmethod
+    def get_stock_stats_window(
+        cls,
         symbol: Annotated[str, "ticker symbol for the company"],
-        indicator: Annotated[
-            str, "quantitative indicators based off of the stock data for the company"
+        indicators: Annotated[
+            Sequence[str], "quantitative indicators to compute in one pass"
         ],
         curr_date: Annotated[
             str, "curr date for retrieving stock price data, YYYY-mm-dd"
         ],
+        look_back_days: Annotated[int, "how many calendar days to look back"],
         data_dir: Annotated[
             str,
             "directory where the stock data is stored.",
@@ -24,64 +159,54 @@ class StockstatsUtils:
             bool,
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
-    ):
-        df = None
-        data = None
+    ) -> pd.DataFrame:
+        """一次加载、一次计算多个指标，返回 [curr_date - look_back_days, curr_date] 内的交易日
 
-        if not online:
-            try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
-            except FileNotFoundError:
-                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
-        else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
+        Returns:
+            以日期字符串(YYYY-mm-dd)为索引、各指标为列的 DataFrame，按日期升序
+        """
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        start_date = (pd.to_datetime(curr_date) - pd.DateOffset(days=look_back_days)).strftime("%Y-%m-%d")
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+        indicators = list(dict.fromkeys(indicators))
+        frame = cls.get_indicator_frame(symbol, curr_date, data_dir, online)
+        frame.ensure(indicators)
 
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+        rows: List[int] = sorted(
+            row for date, row in frame.row_of_date.items() if start_date <= date <= curr_date
+        )
+        with frame.lock:
+            window = pd.DataFrame(frame.df[indicators].iloc[rows])
+            window.index = frame.df["Date"].iloc[rows].str[:10].to_numpy()
+        window.index.name = "Date"
+        return window
 
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+    @staticmethod
+    def get_stock_stats(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        curr_date: Annotated[
+            str, "curr date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ):
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        frame = StockstatsUtils.get_indicator_frame(symbol, curr_date, data_dir, online)
+        frame.ensure([indicator])
 
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
+        row: Optional[int] = frame.row_of_date.get(curr_date)
+        if row is not None:
+            with frame.lock:
+                indicator_value = frame.df[indicator].values[row]
             return indicator_value
         else:
-            return "N/A: Not a trading day (weekend or holiday)"
+            return NOT_TRADING_DAY
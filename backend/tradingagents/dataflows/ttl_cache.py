@@ -4,13 +4,18 @@ TTL (Time-To-Live) 缓存模块
 提供带有过期时间的缓存装饰器，避免重复的API请求
 """
 
+import os
+import sys
+import asyncio
 import time
 import pickle
 import hashlib
 import functools
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Optional, Dict, Tuple
+from typing import Any, Callable, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
+import threading
 from threading import Lock
 
 from tradingagents.utils.logging_manager import get_logger
@@ -18,21 +23,165 @@ from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('dataflows.cache')
 
 
+def _estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数（近似值）"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if hasattr(value, 'memory_usage'):
+        # pandas DataFrame / Series
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+        except Exception:
+            pass
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _EvictionTracker:
+    """LRU/LFU淘汰顺序记录器（不加锁，由调用方持锁）"""
+
+    POLICIES = ('lru', 'lfu')
+
+    def __init__(self, policy: str = 'lru'):
+        policy = policy.lower()
+        if policy not in self.POLICIES:
+            raise ValueError(f"不支持的淘汰策略: {policy}，可选: {self.POLICIES}")
+        self.policy = policy
+        # LRU: 按访问顺序排列的键
+        self._order: 'OrderedDict[str, None]' = OrderedDict()
+        # LFU: 访问次数 -> 按访问顺序排列的键
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, 'OrderedDict[str, None]'] = {}
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._freq)
+
+    def frequency(self, key: str) -> int:
+        return self._freq.get(key, 0)
+
+    def add(self, key: str, freq: int = 1):
+        if key in self._freq:
+            self.touch(key)
+            return
+        self._freq[key] = freq
+        if self.policy == 'lru':
+            self._order[key] = None
+        else:
+            self._buckets.setdefault(freq, OrderedDict())[key] = None
+            if len(self._freq) == 1 or freq < self._min_freq:
+                self._min_freq = freq
+
+    def touch(self, key: str):
+        if key not in self._freq:
+            return
+        freq = self._freq[key]
+        self._freq[key] = freq + 1
+        if self.policy == 'lru':
+            self._order.move_to_end(key)
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def remove(self, key: str):
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        if self.policy == 'lru':
+            del self._order[key]
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq and self._buckets:
+                self._min_freq = min(self._buckets)
+
+    def victim(self, exclude: Optional[str] = None) -> Optional[str]:
+        """返回下一个应被淘汰的键（跳过刚写入的 exclude）"""
+        if self.policy == 'lru':
+            for key in self._order:
+                if key != exclude:
+                    return key
+            return None
+        for freq in ([self._min_freq] + sorted(f for f in self._buckets if f != self._min_freq)):
+            for key in self._buckets.get(freq, ()):
+                if key != exclude:
+                    return key
+        return None
+
+    def clear(self):
+        self._order.clear()
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+
 class TTLCache:
-    """带有TTL的内存缓存"""
+    """带有TTL的内存缓存，支持按条目数/字节数上限进行LRU或LFU淘汰"""
 
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(
+        self,
+        default_ttl: int = 3600,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = 'lru',
+        on_evict: Optional[Callable[[str, Any, float], None]] = None
+    ):
         """
         初始化TTL缓存
 
         Args:
             default_ttl: 默认过期时间（秒），默认1小时
+            max_entries: 最大条目数，None表示不限制
+            max_bytes: 最大占用字节数（近似），None表示不限制
+            eviction_policy: 淘汰策略，'lru' 或 'lfu'
+            on_evict: 条目因容量被淘汰时的回调 on_evict(key, value, expire_time)
         """
         self._cache: Dict[str, Tuple[Any, float]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._tracker = _EvictionTracker(eviction_policy)
         self._lock = Lock()
         self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._total_bytes = 0
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _remove_locked(self, key: str):
+        del self._cache[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+        self._tracker.remove(key)
+
+    def _evict_locked(self, protect: Optional[str] = None) -> list:
+        """按容量上限淘汰条目，返回被淘汰的 (key, value, expire_time)"""
+        evicted = []
+        while self._cache and (
+            (self.max_entries is not None and len(self._cache) > self.max_entries) or
+            (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            key = self._tracker.victim(exclude=protect)
+            if key is None:
+                break
+            value, expire_time = self._cache[key]
+            self._remove_locked(key)
+            self._evictions += 1
+            evicted.append((key, value, expire_time))
+        return evicted
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -49,17 +198,32 @@ class TTLCache:
                 value, expire_time = self._cache[key]
                 if time.time() < expire_time:
                     self._hits += 1
+                    self._tracker.touch(key)
                     logger.debug(f"缓存命中: {key[:50]}...")
                     return value
                 else:
                     # 过期了，删除
-                    del self._cache[key]
+                    self._remove_locked(key)
+                    self._expirations += 1
                     logger.debug(f"缓存已过期: {key[:50]}...")
 
             self._misses += 1
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """获取未过期的 (value, expire_time)，不计入命中统计"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() < entry[1]:
+                return entry
+            return None
+
+    def frequency(self, key: str) -> int:
+        """获取条目的访问次数"""
+        with self._lock:
+            return self._tracker.frequency(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, freq: int = 1):
         """
         设置缓存值
 
@@ -67,22 +231,44 @@ class TTLCache:
             key: 缓存键
             value: 缓存值
             ttl: 过期时间（秒），如果为None则使用默认值
+            freq: 新条目的初始访问次数（层间迁移时保留热度）
         """
         if ttl is None:
             ttl = self.default_ttl
 
         expire_time = time.time() + ttl
+        size = _estimate_size(value)
 
         with self._lock:
+            if key in self._cache:
+                self._total_bytes -= self._sizes.get(key, 0)
+                self._tracker.touch(key)
+            else:
+                self._tracker.add(key, freq)
             self._cache[key] = (value, expire_time)
+            self._sizes[key] = size
+            self._total_bytes += size
+            evicted = self._evict_locked(protect=key)
             logger.debug(f"缓存写入: {key[:50]}... (TTL={ttl}秒)")
 
+        if evicted and self.on_evict:
+            for entry in evicted:
+                try:
+                    self.on_evict(*entry)
+                except Exception as e:
+                    logger.warning(f"缓存淘汰回调失败: {e}")
+
     def clear(self):
         """清空所有缓存"""
         with self._lock:
             self._cache.clear()
+            self._sizes.clear()
+            self._tracker.clear()
+            self._total_bytes = 0
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
             logger.info("缓存已清空")
 
     def cleanup_expired(self):
@@ -94,7 +280,8 @@ class TTLCache:
                 if current_time >= expire_time
             ]
             for key in expired_keys:
-                del self._cache[key]
+                self._remove_locked(key)
+            self._expirations += len(expired_keys)
 
             if expired_keys:
                 logger.debug(f"清理了 {len(expired_keys)} 个过期缓存")
@@ -107,6 +294,12 @@ class TTLCache:
 
             return {
                 "cache_size": len(self._cache),
+                "cache_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "eviction_policy": self._tracker.policy,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": f"{hit_rate:.2%}",
@@ -115,67 +308,198 @@ class TTLCache:
 
 
 class DiskCache:
-    """磁盘缓存，用于持久化存储"""
+    """磁盘缓存，用于持久化存储，支持按文件数/总字节数上限进行LRU或LFU淘汰"""
 
-    def __init__(self, cache_dir: str = "./cache", default_ttl: int = 86400):
+    def __init__(
+        self,
+        cache_dir: str = "./cache",
+        default_ttl: int = 86400,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = 'lru',
+        lock_stripes: int = 64
+    ):
         """
         初始化磁盘缓存
 
         Args:
             cache_dir: 缓存目录
             default_ttl: 默认过期时间（秒），默认24小时
+            max_entries: 最大缓存文件数，None表示不限制
+            max_bytes: 最大占用磁盘字节数，None表示不限制
+            eviction_policy: 淘汰策略，'lru' 或 'lfu'
+            lock_stripes: 文件读写锁分段数，不同键的磁盘I/O可并行
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # _lock 只保护内存中的索引与计数器；文件读写使用按键哈希分段的锁
         self._lock = Lock()
+        self._stripes = [Lock() for _ in range(max(1, lock_stripes))]
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        # 文件索引：文件名哈希 -> 文件字节数，按最近访问时间加载已有文件
+        self._sizes: Dict[str, int] = {}
+        self._tracker = _EvictionTracker(eviction_policy)
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self):
+        """扫描缓存目录建立文件索引（仅stat，不反序列化）"""
+        entries = []
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = cache_file.stat()
+                entries.append((stat.st_mtime, cache_file.stem, stat.st_size))
+            except OSError:
+                continue
+        with self._lock:
+            for _, key_hash, size in sorted(entries):
+                self._index_add_locked(key_hash, size)
+            victims = self._evict_locked()
+        self._unlink_evicted(victims)
+        if victims:
+            logger.info(f"磁盘缓存超出容量上限，已淘汰 {len(victims)} 个文件")
+
+    def _index_add_locked(self, key_hash: str, size: int):
+        self._total_bytes += size - self._sizes.get(key_hash, 0)
+        self._sizes[key_hash] = size
+        self._tracker.add(key_hash)
+
+    def _index_remove_locked(self, key_hash: str):
+        self._total_bytes -= self._sizes.pop(key_hash, 0)
+        self._tracker.remove(key_hash)
+
+    def _evict_locked(self, protect: Optional[str] = None) -> List[str]:
+        """按容量上限从索引中移除条目，返回被淘汰的文件哈希（文件由 _unlink_evicted 删除）"""
+        victims = []
+        while self._sizes and (
+            (self.max_entries is not None and len(self._sizes) > self.max_entries) or
+            (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            key_hash = self._tracker.victim(exclude=protect)
+            if key_hash is None:
+                break
+            self._index_remove_locked(key_hash)
+            self._evictions += 1
+            victims.append(key_hash)
+        return victims
+
+    def _unlink_evicted(self, victims: List[str]):
+        """在各自的分段锁内删除被淘汰的文件；调用时不能持有 _lock 或任何分段锁"""
+        for key_hash in victims:
+            with self._stripe(key_hash):
+                with self._lock:
+                    if key_hash in self._sizes:
+                        # 淘汰后已被重新写入
+                        continue
+                try:
+                    (self.cache_dir / f"{key_hash}.pkl").unlink()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"淘汰磁盘缓存文件失败 {key_hash}: {e}")
+
+    def _key_hash(self, key: str) -> str:
+        # 使用哈希避免文件名过长
+        return hashlib.md5(key.encode()).hexdigest()
 
     def _get_cache_path(self, key: str) -> Path:
         """获取缓存文件路径"""
-        # 使用哈希避免文件名过长
-        key_hash = hashlib.md5(key.encode()).hexdigest()
-        return self.cache_dir / f"{key_hash}.pkl"
+        return self.cache_dir / f"{self._key_hash(key)}.pkl"
 
-    def get(self, key: str) -> Optional[Any]:
+    def _stripe(self, key_hash: str) -> Lock:
+        """获取键对应的分段锁"""
+        return self._stripes[int(key_hash[:8], 16) % len(self._stripes)]
+
+    def contains(self, key: str) -> bool:
+        """判断键是否存在于磁盘（不检查是否过期）"""
+        with self._lock:
+            return self._key_hash(key) in self._sizes
+
+    def frequency(self, key: str) -> int:
+        """获取条目的访问次数"""
+        with self._lock:
+            return self._tracker.frequency(self._key_hash(key))
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
         """
-        获取缓存值
+        获取未过期的 (value, expire_time)
 
         Args:
             key: 缓存键
 
         Returns:
-            缓存的值，如果不存在或已过期返回None
+            (缓存值, 过期时间戳)，如果不存在或已过期返回None
         """
-        cache_path = self._get_cache_path(key)
-
-        with self._lock:
-            if not cache_path.exists():
-                self._misses += 1
-                return None
+        key_hash = self._key_hash(key)
+        cache_path = self.cache_dir / f"{key_hash}.pkl"
 
+        with self._stripe(key_hash):
             try:
                 with open(cache_path, 'rb') as f:
                     data = pickle.load(f)
+                file_size = cache_path.stat().st_size
+            except FileNotFoundError:
+                data = None
+            except Exception as e:
+                logger.warning(f"读取磁盘缓存失败: {e}")
+                with self._lock:
+                    self._misses += 1
+                return None
 
-                value, expire_time = data['value'], data['expire_time']
-
-                if time.time() < expire_time:
-                    self._hits += 1
-                    logger.debug(f"磁盘缓存命中: {key[:50]}...")
-                    return value
-                else:
-                    # 过期了，删除文件
+            expired = data is not None and time.time() >= data['expire_time']
+            if expired:
+                # 过期了，删除文件
+                try:
                     cache_path.unlink()
-                    logger.debug(f"磁盘缓存已过期: {key[:50]}...")
+                except FileNotFoundError:
+                    pass
+
+            # 在分段锁内更新索引，避免与淘汰删除文件交错
+            with self._lock:
+                if data is None:
+                    self._index_remove_locked(key_hash)
                     self._misses += 1
                     return None
 
-            except Exception as e:
-                logger.warning(f"读取磁盘缓存失败: {e}")
-                self._misses += 1
-                return None
+                if expired:
+                    self._index_remove_locked(key_hash)
+                    self._expirations += 1
+                    self._misses += 1
+                    logger.debug(f"磁盘缓存已过期: {key[:50]}...")
+                    return None
+
+                self._hits += 1
+                victims = []
+                if key_hash in self._sizes:
+                    self._tracker.touch(key_hash)
+                else:
+                    # 其他进程写入或刚被淘汰的文件，重新登记后按容量淘汰
+                    self._index_add_locked(key_hash, file_size)
+                    victims = self._evict_locked(protect=key_hash)
+
+        self._unlink_evicted(victims)
+        logger.debug(f"磁盘缓存命中: {key[:50]}...")
+        return data['value'], data['expire_time']
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的值，如果不存在或已过期返回None
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """
@@ -190,23 +514,45 @@ class DiskCache:
             ttl = self.default_ttl
 
         expire_time = time.time() + ttl
-        cache_path = self._get_cache_path(key)
-
-        with self._lock:
-            try:
-                data = {
-                    'value': value,
-                    'expire_time': expire_time,
-                    'created_at': time.time()
-                }
+        key_hash = self._key_hash(key)
+        cache_path = self.cache_dir / f"{key_hash}.pkl"
 
-                with open(cache_path, 'wb') as f:
-                    pickle.dump(data, f)
-
-                logger.debug(f"磁盘缓存写入: {key[:50]}... (TTL={ttl}秒)")
+        data = {
+            'value': value,
+            'expire_time': expire_time,
+            'created_at': time.time()
+        }
 
-            except Exception as e:
-                logger.warning(f"写入磁盘缓存失败: {e}")
+        try:
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._stripe(key_hash):
+                # 先写临时文件再原子替换，避免其他进程读到半个文件
+                tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, cache_path)
+
+                # 在分段锁内登记索引，淘汰删除文件前的检查才能看到这次写入
+                with self._lock:
+                    self._index_add_locked(key_hash, len(payload))
+                    victims = self._evict_locked(protect=key_hash)
+        except Exception as e:
+            logger.warning(f"写入磁盘缓存失败: {e}")
+            return
+
+        self._unlink_evicted(victims)
+        logger.debug(f"磁盘缓存写入: {key[:50]}... (TTL={ttl}秒)")
+
+    def delete(self, key: str):
+        """删除缓存条目"""
+        key_hash = self._key_hash(key)
+        with self._stripe(key_hash):
+            try:
+                (self.cache_dir / f"{key_hash}.pkl").unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._index_remove_locked(key_hash)
 
     def clear(self):
         """清空所有缓存"""
@@ -217,8 +563,13 @@ class DiskCache:
                 except Exception as e:
                     logger.warning(f"删除缓存文件失败 {cache_file}: {e}")
 
+            self._sizes.clear()
+            self._tracker.clear()
+            self._total_bytes = 0
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
             logger.info("磁盘缓存已清空")
 
     def cleanup_expired(self):
@@ -234,29 +585,30 @@ class DiskCache:
 
                     if current_time >= data['expire_time']:
                         cache_file.unlink()
+                        self._index_remove_locked(cache_file.stem)
                         cleaned += 1
 
                 except Exception as e:
                     logger.warning(f"清理缓存文件失败 {cache_file}: {e}")
 
+            self._expirations += cleaned
             if cleaned > 0:
                 logger.debug(f"清理了 {cleaned} 个过期的磁盘缓存")
 
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         with self._lock:
-            total_files = len(list(self.cache_dir.glob("*.pkl")))
             total_requests = self._hits + self._misses
             hit_rate = self._hits / total_requests if total_requests > 0 else 0
 
-            # 计算缓存总大小
-            total_size = sum(
-                f.stat().st_size for f in self.cache_dir.glob("*.pkl")
-            )
-
             return {
-                "cache_files": total_files,
-                "cache_size_mb": total_size / (1024 * 1024),
+                "cache_files": len(self._sizes),
+                "cache_size_mb": self._total_bytes / (1024 * 1024),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "eviction_policy": self._tracker.policy,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": f"{hit_rate:.2%}",
@@ -265,13 +617,19 @@ class DiskCache:
 
 
 class HybridCache:
-    """混合缓存：内存缓存 + 磁盘缓存"""
+    """混合缓存：内存缓存 + 磁盘缓存，按访问频率在两层之间提升/降级"""
 
     def __init__(
         self,
         memory_ttl: int = 3600,  # 内存缓存1小时
         disk_ttl: int = 86400,   # 磁盘缓存24小时
-        cache_dir: str = "./cache"
+        cache_dir: str = "./cache",
+        memory_max_entries: Optional[int] = None,
+        memory_max_bytes: Optional[int] = None,
+        disk_max_entries: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        eviction_policy: str = 'lru',
+        promote_threshold: int = 2
     ):
         """
         初始化混合缓存
@@ -280,11 +638,40 @@ class HybridCache:
             memory_ttl: 内存缓存过期时间（秒）
             disk_ttl: 磁盘缓存过期时间（秒）
             cache_dir: 磁盘缓存目录
+            memory_max_entries: 内存缓存最大条目数
+            memory_max_bytes: 内存缓存最大字节数
+            disk_max_entries: 磁盘缓存最大文件数
+            disk_max_bytes: 磁盘缓存最大字节数
+            eviction_policy: 淘汰策略，'lru' 或 'lfu'
+            promote_threshold: 磁盘条目被读取多少次后提升到内存
         """
-        self.memory_cache = TTLCache(default_ttl=memory_ttl)
-        self.disk_cache = DiskCache(cache_dir=cache_dir, default_ttl=disk_ttl)
+        self.memory_cache = TTLCache(
+            default_ttl=memory_ttl,
+            max_entries=memory_max_entries,
+            max_bytes=memory_max_bytes,
+            eviction_policy=eviction_policy,
+            on_evict=self._demote
+        )
+        self.disk_cache = DiskCache(
+            cache_dir=cache_dir,
+            default_ttl=disk_ttl,
+            max_entries=disk_max_entries,
+            max_bytes=disk_max_bytes,
+            eviction_policy=eviction_policy
+        )
         self.memory_ttl = memory_ttl
         self.disk_ttl = disk_ttl
+        self.promote_threshold = promote_threshold
+        self._promotions = 0
+        self._demotions = 0
+
+    def _demote(self, key: str, value: Any, expire_time: float):
+        """内存淘汰的条目降级到磁盘（磁盘已有则跳过）"""
+        remaining = int(expire_time - time.time())
+        if remaining <= 0 or self.disk_cache.contains(key):
+            return
+        self.disk_cache.set(key, value, remaining)
+        self._demotions += 1
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -302,13 +689,19 @@ class HybridCache:
             return value
 
         # 内存没有，查磁盘缓存
-        value = self.disk_cache.get(key)
-        if value is not None:
-            # 从磁盘加载到内存
-            self.memory_cache.set(key, value, self.memory_ttl)
-            return value
+        entry = self.disk_cache.get_entry(key)
+        if entry is None:
+            return None
 
-        return None
+        value, expire_time = entry
+        # 读取足够频繁的条目提升到内存，保留热度供LFU使用（写入本身计1次访问）
+        freq = self.disk_cache.frequency(key)
+        if freq - 1 >= self.promote_threshold:
+            ttl = min(self.memory_ttl, int(expire_time - time.time()))
+            if ttl > 0:
+                self.memory_cache.set(key, value, ttl, freq=freq)
+                self._promotions += 1
+        return value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """
@@ -329,6 +722,8 @@ class HybridCache:
         """清空所有缓存"""
         self.memory_cache.clear()
         self.disk_cache.clear()
+        self._promotions = 0
+        self._demotions = 0
 
     def cleanup_expired(self):
         """清理所有过期的缓存"""
@@ -339,12 +734,25 @@ class HybridCache:
         """获取缓存统计信息"""
         return {
             "memory": self.memory_cache.get_stats(),
-            "disk": self.disk_cache.get_stats()
+            "disk": self.disk_cache.get_stats(),
+            "promotions": self._promotions,
+            "demotions": self._demotions
         }
 
 
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
 # 全局缓存实例
-_global_cache = HybridCache()
+_global_cache = HybridCache(
+    memory_max_entries=_env_int('TTL_CACHE_MEMORY_MAX_ENTRIES') or 10000,
+    memory_max_bytes=_env_int('TTL_CACHE_MEMORY_MAX_BYTES') or 256 * 1024 * 1024,
+    disk_max_entries=_env_int('TTL_CACHE_DISK_MAX_ENTRIES'),
+    disk_max_bytes=_env_int('TTL_CACHE_DISK_MAX_BYTES') or 1024 * 1024 * 1024,
+    eviction_policy=os.getenv('TTL_CACHE_EVICTION_POLICY', 'lru')
+)
 
 
 def get_cache() -> HybridCache:
@@ -352,18 +760,117 @@ def get_cache() -> HybridCache:
     return _global_cache
 
 
+class _SingleFlight:
+    """同步单飞：同一键同一时刻只执行一次，其余调用者等待并共享结果"""
+
+    class _Call:
+        __slots__ = ('event', 'result', 'error')
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls: Dict[str, '_SingleFlight._Call'] = {}
+        self._lock = Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = self._Call()
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class _AsyncSingleFlight:
+    """异步单飞：同一事件循环内同一键只执行一个协程，其余调用者await同一结果"""
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, coro_fn: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        while True:
+            future = self._inflight.get(flight_key)
+            if future is None:
+                break
+            try:
+                result, error = await asyncio.shield(future), None
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # 执行者被取消，由当前调用者重新执行
+                    continue
+                raise
+            except BaseException as e:
+                result, error = None, e
+
+            # 只在拿到共享结果时计数一次（重试后自己执行的不算）
+            self.coalesced += 1
+            if error is not None:
+                raise error
+            return result
+
+        future = loop.create_future()
+        self._inflight[flight_key] = future
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 标记异常已被读取，避免无人等待时的告警
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(flight_key, None)
+
+
+_single_flight = _SingleFlight()
+_async_single_flight = _AsyncSingleFlight()
+
+
 def ttl_cache(
     ttl: Optional[int] = None,
     cache_key_func: Optional[Callable] = None,
-    use_disk: bool = True
+    use_disk: bool = True,
+    single_flight: bool = True
 ):
     """
-    TTL 缓存装饰器
+    TTL 缓存装饰器，支持同步函数与asyncio协程
 
     Args:
         ttl: 过期时间（秒），None表示使用默认值
         cache_key_func: 自定义缓存键生成函数
         use_disk: 是否使用磁盘缓存
+        single_flight: 并发的相同请求是否合并为一次上游调用
 
     Example:
         @ttl_cache(ttl=3600)  # 缓存1小时
@@ -372,34 +879,76 @@ def ttl_cache(
             return data
     """
     def decorator(func: Callable) -> Callable:
+        def make_key(args, kwargs) -> str:
+            if cache_key_func:
+                return cache_key_func(*args, **kwargs)
+            # 默认缓存键：函数名 + 参数
+            return f"{func.__module__}.{func.__name__}:{args}:{sorted(kwargs.items())}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+
+                cached_value = _global_cache.get(cache_key)
+                if cached_value is not None:
+                    return cached_value
+
+                async def compute():
+                    # 等待期间其他执行者可能已写入缓存
+                    entry = _global_cache.memory_cache.get_entry(cache_key)
+                    if entry is not None:
+                        return entry[0]
+                    result = await func(*args, **kwargs)
+                    if result is not None:  # 只缓存非None结果
+                        _global_cache.set(cache_key, result, ttl)
+                    return result
+
+                if single_flight:
+                    return await _async_single_flight.do(cache_key, compute)
+                return await compute()
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # 生成缓存键
-            if cache_key_func:
-                cache_key = cache_key_func(*args, **kwargs)
-            else:
-                # 默认缓存键：函数名 + 参数
-                cache_key = f"{func.__module__}.{func.__name__}:{args}:{sorted(kwargs.items())}"
+            cache_key = make_key(args, kwargs)
 
             # 尝试从缓存获取
             cached_value = _global_cache.get(cache_key)
             if cached_value is not None:
                 return cached_value
 
-            # 缓存未命中，执行函数
-            result = func(*args, **kwargs)
-
-            # 写入缓存
-            if result is not None:  # 只缓存非None结果
-                _global_cache.set(cache_key, result, ttl)
-
-            return result
+            def compute():
+                # 等待期间其他执行者可能已写入缓存
+                entry = _global_cache.memory_cache.get_entry(cache_key)
+                if entry is not None:
+                    return entry[0]
+                # 缓存未命中，执行函数
+                result = func(*args, **kwargs)
+                # 写入缓存
+                if result is not None:  # 只缓存非None结果
+                    _global_cache.set(cache_key, result, ttl)
+                return result
+
+            if single_flight:
+                return _single_flight.do(cache_key, compute)
+            return compute()
 
         return wrapper
 
     return decorator
 
 
+def single_flight_stats() -> Dict[str, int]:
+    """获取请求合并统计（被合并到进行中请求的调用次数）"""
+    return {
+        "sync_coalesced": _single_flight.coalesced,
+        "async_coalesced": _async_single_flight.coalesced
+    }
+
+
 def cache_stats():
     """打印缓存统计信息"""
     stats = _global_cache.get_stats()
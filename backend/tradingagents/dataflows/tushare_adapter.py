@@ -69,7 +69,7 @@ class TushareDataAdapter:
             logger.error(" Tushare不可用")
     
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, 
-                      data_type: str = "daily") -> pd.DataFrame:
+                      data_type: str = "daily", use_cache: bool = True) -> pd.DataFrame:
         """
         获取股票数据
         
@@ -78,6 +78,7 @@ class TushareDataAdapter:
             start_date: 开始日期
             end_date: 结束日期
             data_type: 数据类型 ("daily", "realtime")
+            use_cache: 是否查找适配器缓存（区间缓存补缺口时需关闭，缓存按股票部分匹配，不保证日期范围）
             
         Returns:
             DataFrame: 股票数据
@@ -96,7 +97,7 @@ class TushareDataAdapter:
 
             if data_type == "daily":
                 logger.info(f" [股票代码追踪] 调用 _get_daily_data，传入参数: symbol='{symbol}'")
-                return self._get_daily_data(symbol, start_date, end_date)
+                return self._get_daily_data(symbol, start_date, end_date, use_cache=use_cache)
             elif data_type == "realtime":
                 return self._get_realtime_data(symbol)
             else:
@@ -107,7 +108,8 @@ class TushareDataAdapter:
             logger.error(f" 获取{symbol}数据失败: {e}")
             return pd.DataFrame()
     
-    def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None,
+                        use_cache: bool = True) -> pd.DataFrame:
         """获取日线数据"""
 
         # 记录详细的调用信息
@@ -116,7 +118,7 @@ class TushareDataAdapter:
         logger.info(f" [TushareAdapter详细日志] 缓存启用状态: {self.enable_cache}")
 
         # 1. 尝试从缓存获取
-        if self.enable_cache:
+        if self.enable_cache and use_cache:
             try:
                 logger.info(f" [TushareAdapter详细日志] 开始查找缓存数据...")
                 cache_key = self.cache_manager.find_cached_stock_data(
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Tushare本地镜像数据源
+从 data_sync 同步的本地SQLite数据库读取日线（按复权因子前复权）与财务指标，
+只对镜像中未覆盖的日期区间请求Tushare并写回镜像（读穿），离线时完全从本地返回
+"""
+
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .range_cache import DateRange, _parse_date, subtract_ranges
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('dataflows.tushare_local_mirror')
+
+
+class TushareLocalMirror:
+    """Tushare本地镜像读取器"""
+
+    # 标准化后的列名与 TushareDataAdapter 一致
+    COLUMN_MAPPING = {
+        'trade_date': 'date',
+        'ts_code': 'code',
+        'vol': 'volume',
+        'pct_chg': 'pct_change',
+    }
+
+    def __init__(self, db_path: str = None, network_fill: bool = None, sync=None,
+                 today_ttl: float = None):
+        """
+        初始化本地镜像
+
+        Args:
+            db_path: 数据库路径，默认读取 TUSHARE_LOCAL_DB_PATH
+            network_fill: 缺失区间是否请求Tushare补齐，默认读取 TUSHARE_LOCAL_NETWORK_FILL
+            sync: TushareDataSync 实例（测试注入用）
+            today_ttl: 当天数据尚未发布时，补齐后多少秒内不再为当天请求Tushare，
+                默认读取 TUSHARE_LOCAL_TODAY_TTL（300秒）
+        """
+        if sync is None:
+            from data_sync.sync_engine import TushareDataSync
+            sync = TushareDataSync(db_path)
+        self.sync = sync
+        self.db = sync.db
+        if network_fill is None:
+            network_fill = os.getenv('TUSHARE_LOCAL_NETWORK_FILL', 'true').lower() == 'true'
+        self.network_fill = network_fill
+        if today_ttl is None:
+            today_ttl = float(os.getenv('TUSHARE_LOCAL_TODAY_TTL', '300'))
+        self.today_ttl = today_ttl
+
+        self._lock = threading.RLock()
+        # ts_code -> (日期, 最近一次为当天补齐的时间)；当天未发布的数据不会记为已覆盖
+        self._today_fills: Dict[str, tuple] = {}
+        self._local_hits = 0
+        self._network_fills = 0
+
+    @staticmethod
+    def _to_ts_date(value: date) -> str:
+        return value.strftime('%Y%m%d')
+
+    @staticmethod
+    def _forward_adjust(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        以区间最后一个交易日为基准计算前复权价格，与 TushareProvider 的前复权结果一致
+
+        优先使用镜像中的复权因子（价格 × 当日因子 / 基准日因子）；区间内缺少复权因子时
+        按 pct_chg 由基准日收盘价向前推算收盘价，开高低按同一比例调整。
+        原始价格保留在 *_raw 列中。
+        """
+        data = data.copy()
+        for column in ('close', 'open', 'high', 'low'):
+            data[f'{column}_raw'] = data[column]
+
+        factors = data.pop('adj_factor').astype(float)
+        if factors.notna().all() and factors.iloc[-1] > 0:
+            ratio = factors / factors.iloc[-1]
+        else:
+            # 前一天的前复权收盘价 = 今天的前复权收盘价 / (1 + 今天的涨跌幅)
+            growth = 1 + data['pct_chg'].astype(float).fillna(0.0) / 100.0
+            later_growth = growth[::-1].cumprod()[::-1].shift(-1, fill_value=1.0)
+            adjusted_close = float(data['close_raw'].iloc[-1]) / later_growth
+            ratio = (adjusted_close / data['close_raw']).where(data['close_raw'] != 0, 1.0)
+
+        for column in ('close', 'open', 'high', 'low'):
+            data[column] = data[f'{column}_raw'] * ratio
+        data['price_type'] = 'forward_adjusted'
+        return data
+
+    def missing_ranges(self, symbol: str, start_date: str, end_date: str) -> List[DateRange]:
+        """返回 [start_date, end_date] 中镜像尚未覆盖的日期缺口"""
+        from data_sync.sync_engine import normalize_ts_code
+
+        covered = [(_parse_date(s), _parse_date(e))
+                   for s, e in self.db.get_coverage('daily_quotes', normalize_ts_code(symbol))]
+        return subtract_ranges(_parse_date(start_date), _parse_date(end_date), covered)
+
+    def _drop_fresh_today(self, ts_code: str, gaps: List[DateRange]) -> List[DateRange]:
+        """当天在 today_ttl 内已补齐过时，去掉只包含当天（及以后）的缺口（调用方持锁）"""
+        today = date.today()
+        filled = self._today_fills.get(ts_code)
+        if filled is None or filled[0] != today or time.monotonic() - filled[1] >= self.today_ttl:
+            return gaps
+        return [(start, end) for start, end in gaps if start < today]
+
+    def get_stock_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取前复权日线数据，列名与 TushareDataAdapter 标准化结果一致
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            DataFrame: 日线数据，无数据时为空DataFrame
+        """
+        from data_sync.sync_engine import normalize_ts_code
+
+        ts_code = normalize_ts_code(symbol)
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        start_date = start_date or (pd.Timestamp(end_date) - pd.Timedelta(days=365)).strftime('%Y-%m-%d')
+
+        with self._lock:
+            gaps = self._drop_fresh_today(ts_code, self.missing_ranges(ts_code, start_date, end_date))
+            if not gaps:
+                self._local_hits += 1
+            elif self.network_fill and self.sync.api is not None:
+                for gap_start, gap_end in gaps:
+                    self._network_fills += 1
+                    logger.info(f" [本地镜像] 缺失区间，请求Tushare补齐: {ts_code} {gap_start} ~ {gap_end}")
+                    try:
+                        self.sync.sync_daily_range(ts_code, self._to_ts_date(gap_start), self._to_ts_date(gap_end))
+                    except Exception as e:
+                        logger.warning(f" [本地镜像] 补齐 {ts_code} 失败，仅返回本地数据: {e}")
+                        break
+                    if gap_end >= date.today():
+                        self._today_fills[ts_code] = (date.today(), time.monotonic())
+            else:
+                logger.info(f" [本地镜像] {ts_code} 有 {len(gaps)} 个未同步区间，离线模式仅返回本地数据")
+
+            rows = self.db.get_daily_quotes(ts_code, self._to_ts_date(_parse_date(start_date)),
+                                            self._to_ts_date(_parse_date(end_date)))
+
+        if not rows:
+            return pd.DataFrame()
+
+        data = self._forward_adjust(pd.DataFrame(rows)).rename(columns=self.COLUMN_MAPPING)
+        data['date'] = pd.to_datetime(data['date'])
+        return data
+
+    def get_stock_info(self, symbol: str) -> dict:
+        """从 stock_basic 读取股票基本信息"""
+        from data_sync.sync_engine import normalize_ts_code
+
+        with self._lock:
+            rows = self.db.query("SELECT * FROM stock_basic WHERE ts_code = ?", (normalize_ts_code(symbol),))
+        if not rows:
+            return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'local'}
+        info = dict(rows[0])
+        info['source'] = 'local'
+        return info
+
+    def get_fundamentals(self, symbol: str) -> Optional[str]:
+        """
+        基于镜像中的财务指标生成基本面报告，镜像中没有时按需同步该股票
+
+        Returns:
+            str: 基本面报告，无数据时返回None
+        """
+        from data_sync.sync_engine import normalize_ts_code
+
+        ts_code = normalize_ts_code(symbol)
+        sql = "SELECT * FROM financial_indicators WHERE ts_code = ? ORDER BY end_date DESC LIMIT 4"
+
+        with self._lock:
+            rows = self.db.query(sql, (ts_code,))
+            if not rows and self.network_fill and self.sync.api is not None:
+                self._network_fills += 1
+                try:
+                    self.sync.sync_financial_indicators([ts_code])
+                    rows = self.db.query(sql, (ts_code,))
+                except Exception as e:
+                    logger.warning(f" [本地镜像] 同步 {ts_code} 财务指标失败: {e}")
+
+        if not rows:
+            return None
+
+        stock_info = self.get_stock_info(symbol)
+        latest = rows[0]
+
+        def fmt(value, suffix=''):
+            return 'N/A' if value is None else f"{value:.2f}{suffix}"
+
+        report = f" {symbol} 基本面分析报告 (本地镜像数据源)\n"
+        report += "=" * 50 + "\n\n"
+        report += " 基本信息\n"
+        report += f"股票代码: {symbol}\n"
+        report += f"股票名称: {stock_info.get('name', '未知')}\n"
+        report += f"所属地区: {stock_info.get('area', '未知')}\n"
+        report += f"所属行业: {stock_info.get('industry', '未知')}\n"
+        report += f"上市市场: {stock_info.get('market', '未知')}\n"
+        report += f"上市日期: {stock_info.get('list_date', '未知')}\n\n"
+
+        report += f" 财务指标 (报告期: {latest['end_date']}, 公告日: {latest.get('ann_date') or '未知'})\n"
+        report += f"每股收益: {fmt(latest.get('eps'))}\n"
+        report += f"每股净资产: {fmt(latest.get('bps'))}\n"
+        report += f"每股经营现金流: {fmt(latest.get('ocfps'))}\n"
+        report += f"净资产收益率: {fmt(latest.get('roe'), '%')}\n"
+        report += f"总资产收益率: {fmt(latest.get('roa'), '%')}\n"
+        report += f"销售毛利率: {fmt(latest.get('grossprofit_margin'), '%')}\n"
+        report += f"销售净利率: {fmt(latest.get('netprofit_margin'), '%')}\n"
+        report += f"资产负债率: {fmt(latest.get('debt_to_assets'), '%')}\n"
+        report += f"流动比率: {fmt(latest.get('current_ratio'))}\n"
+        report += f"速动比率: {fmt(latest.get('quick_ratio'))}\n"
+        report += f"营业收入同比: {fmt(latest.get('or_yoy'), '%')}\n"
+        report += f"净利润同比: {fmt(latest.get('netprofit_yoy'), '%')}\n"
+
+        if len(rows) > 1:
+            report += "\n 近期报告期\n"
+            for row in rows:
+                report += (f"{row['end_date']}: 每股收益 {fmt(row.get('eps'))}, "
+                           f"ROE {fmt(row.get('roe'), '%')}, 净利润同比 {fmt(row.get('netprofit_yoy'), '%')}\n")
+
+        report += f"\n 报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        report += f" 数据来源: Tushare本地镜像\n"
+        return report
+
+    def get_stats(self) -> dict:
+        """获取统计信息"""
+        return {
+            'local_hits': self._local_hits,
+            'network_fills': self._network_fills,
+        }
+
+
+# 全局本地镜像实例
+_local_mirror_instance = None
+_local_mirror_lock = threading.Lock()
+
+
+def get_tushare_local_mirror() -> TushareLocalMirror:
+    """获取全局Tushare本地镜像实例"""
+    global _local_mirror_instance
+    if _local_mirror_instance is None:
+        with _local_mirror_lock:
+            if _local_mirror_instance is None:
+                _local_mirror_instance = TushareLocalMirror()
+    return _local_mirror_instance
@@ -1,5 +1,6 @@
 # TradingAgents/graph/setup.py
 
+import time
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph, START
@@ -15,6 +16,14 @@ from .conditional_logic import ConditionalLogic
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
+# 各分析师写入的报告字段
+ANALYST_REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
 
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
@@ -59,6 +68,9 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+
+        配置 parallel_analysts=True 时，各分析师在独立的消息上下文中并发运行，
+        全部完成后再进入Bull/Bear辩论；否则按顺序串联。
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
@@ -159,8 +171,18 @@ class GraphSetup:
         # Create workflow
         workflow = StateGraph(AgentState)
 
+        parallel_analysts = self.config.get("parallel_analysts", False)
+
         # Add analyst nodes to the graph
         for analyst_type, node in analyst_nodes.items():
+            if parallel_analysts:
+                workflow.add_node(
+                    f"{analyst_type.capitalize()} Analyst",
+                    self._create_isolated_analyst_node(
+                        analyst_type, node, delete_nodes[analyst_type], tool_nodes[analyst_type]
+                    ),
+                )
+                continue
             workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
             workflow.add_node(
                 f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
@@ -178,30 +200,38 @@ class GraphSetup:
         workflow.add_node("Risk Judge", risk_manager_node)
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
-
-        # Connect analysts in sequence
-        for i, analyst_type in enumerate(selected_analysts):
-            current_analyst = f"{analyst_type.capitalize()} Analyst"
-            current_tools = f"tools_{analyst_type}"
-            current_clear = f"Msg Clear {analyst_type.capitalize()}"
-
-            # Add conditional edges for current analyst
-            workflow.add_conditional_edges(
-                current_analyst,
-                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
-                [current_tools, current_clear],
-            )
-            workflow.add_edge(current_tools, current_analyst)
-
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
-            if i < len(selected_analysts) - 1:
-                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
-                workflow.add_edge(current_clear, next_analyst)
-            else:
-                workflow.add_edge(current_clear, "Bull Researcher")
+        if parallel_analysts:
+            # Fan out to all analysts, join before the debate
+            analyst_names = [f"{analyst_type.capitalize()} Analyst" for analyst_type in selected_analysts]
+            for analyst_name in analyst_names:
+                workflow.add_edge(START, analyst_name)
+            workflow.add_edge(analyst_names, "Bull Researcher")
+            logger.info(f" [GraphSetup] 分析师并行模式: {', '.join(selected_analysts)}")
+        else:
+            # Start with the first analyst
+            first_analyst = selected_analysts[0]
+            workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+
+            # Connect analysts in sequence
+            for i, analyst_type in enumerate(selected_analysts):
+                current_analyst = f"{analyst_type.capitalize()} Analyst"
+                current_tools = f"tools_{analyst_type}"
+                current_clear = f"Msg Clear {analyst_type.capitalize()}"
+
+                # Add conditional edges for current analyst
+                workflow.add_conditional_edges(
+                    current_analyst,
+                    getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+                    [current_tools, current_clear],
+                )
+                workflow.add_edge(current_tools, current_analyst)
+
+                # Connect to next analyst or to Bull Researcher if this is the last analyst
+                if i < len(selected_analysts) - 1:
+                    next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
+                    workflow.add_edge(current_clear, next_analyst)
+                else:
+                    workflow.add_edge(current_clear, "Bull Researcher")
 
         # Add remaining edges
         workflow.add_conditional_edges(
@@ -251,3 +281,39 @@ class GraphSetup:
 
         # Compile and return
         return workflow.compile()
+
+    def _create_isolated_analyst_node(self, analyst_type, analyst_node, delete_node, tool_node):
+        """Wrap an analyst's tool-call loop into a single node for parallel mode.
+
+        分析师在自己的子图里完成 LLM/工具调用循环，消息不写回主图，
+        只返回报告字段，因此多个分析师可以在同一步并发执行。
+        """
+        name = analyst_type.capitalize()
+        analyst_name = f"{name} Analyst"
+        tools_name = f"tools_{analyst_type}"
+        clear_name = f"Msg Clear {name}"
+
+        subgraph = StateGraph(AgentState)
+        subgraph.add_node(analyst_name, analyst_node)
+        subgraph.add_node(tools_name, tool_node)
+        subgraph.add_node(clear_name, delete_node)
+        subgraph.add_edge(START, analyst_name)
+        subgraph.add_conditional_edges(
+            analyst_name,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            [tools_name, clear_name],
+        )
+        subgraph.add_edge(tools_name, analyst_name)
+        subgraph.add_edge(clear_name, END)
+        compiled = subgraph.compile()
+
+        report_key = ANALYST_REPORT_KEYS[analyst_type]
+        run_config = {"recursion_limit": self.config.get("max_recur_limit", 100)}
+
+        def run_analyst(state):
+            start = time.perf_counter()
+            result = compiled.invoke(dict(state), run_config)
+            logger.info(f" [GraphSetup] {analyst_name} 完成，耗时 {time.perf_counter() - start:.1f}s")
+            return {report_key: result.get(report_key, "")}
+
+        return run_analyst
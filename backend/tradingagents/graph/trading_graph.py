@@ -1,6 +1,7 @@
 # TradingAgents/graph/trading_graph.py
 
 import os
+import threading
 from pathlib import Path
 import json
 from datetime import date
@@ -34,6 +35,7 @@ from tradingagents.dataflows.interface import set_config
 # 导入 Rate Limiting 和 Retry 工具
 from tradingagents.utils.rate_limiter import get_rate_limiter
 from tradingagents.utils.retry_wrapper import create_retryable_llm_wrapper
+from tradingagents.utils.llm_optimization import install_langchain_llm_cache, llm_cache_scope
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
@@ -310,6 +312,18 @@ class TradingAgentsGraph:
             self.invest_judge_memory = None
             self.risk_manager_memory = None
 
+        # 持久化LLM结果缓存：同一天重复分析同一股票时直接复用模型输出
+        # LLM_CACHE_SEMANTIC_ENABLED 时复用记忆模块的embedding做近似prompt匹配
+        if os.getenv("LLM_RESULT_CACHE_ENABLED", "false").lower() == "true":
+            embed_fn = None
+            if os.getenv("LLM_CACHE_SEMANTIC_ENABLED", "false").lower() == "true" and self.bull_memory is not None:
+                embed_fn = self.bull_memory.get_embedding
+            install_langchain_llm_cache(
+                db_path=os.path.join(self.config["project_dir"], "dataflows/data_cache", "llm_result_cache.db"),
+                ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+                embed_fn=embed_fn,
+            )
+
         # Create tool nodes
         self.tool_nodes = self._create_tool_nodes()
 
@@ -337,7 +351,8 @@ class TradingAgentsGraph:
         # State tracking
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        self.log_states_dict = {}  # ticker to {date: full state dict}
+        self._log_lock = threading.Lock()
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
@@ -414,26 +429,28 @@ class TradingAgentsGraph:
         logger.debug(f" [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
         args = self.propagator.get_graph_args()
 
-        if progress_callback is not None:
-            final_state = self._run_with_progress_updates(
-                init_agent_state,
-                args,
-                progress_callback
-            )
-        elif self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
-                    pass
-                else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
-
-            final_state = trace[-1]
-        else:
-            # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+        # LLM结果缓存按 股票|日期|分析师 限定范围
+        with llm_cache_scope(company_name, trade_date):
+            if progress_callback is not None:
+                final_state = self._run_with_progress_updates(
+                    init_agent_state,
+                    args,
+                    progress_callback
+                )
+            elif self.debug:
+                # Debug mode with tracing
+                trace = []
+                for chunk in self.graph.stream(init_agent_state, **args):
+                    if len(chunk["messages"]) == 0:
+                        pass
+                    else:
+                        chunk["messages"][-1].pretty_print()
+                        trace.append(chunk)
+
+                final_state = trace[-1]
+            else:
+                # Standard mode without tracing
+                final_state = self.graph.invoke(init_agent_state, **args)
 
         # Store current state for reflection
         self.curr_state = final_state
@@ -477,9 +494,14 @@ class TradingAgentsGraph:
 
         return current_state
 
+    def share_state_log(self, log_states_dict: Dict[str, Dict[str, Any]], lock: threading.Lock):
+        """Share one state log and write lock across graphs that analyze the same tickers concurrently"""
+        self.log_states_dict = log_states_dict
+        self._log_lock = lock
+
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        entry = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -509,15 +531,19 @@ class TradingAgentsGraph:
             "final_trade_decision": final_state["final_trade_decision"],
         }
 
-        # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
-        directory.mkdir(parents=True, exist_ok=True)
+        # Save to file (under the lock: pooled graphs may share this log)
+        with self._log_lock:
+            states = self.log_states_dict.setdefault(self.ticker, {})
+            states[str(trade_date)] = entry
+
+            directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+            directory.mkdir(parents=True, exist_ok=True)
 
-        with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
-            "w",
-        ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+            with open(
+                f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
+                "w",
+            ) as f:
+                json.dump(dict(sorted(states.items())), f, indent=4)
 
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
@@ -4,6 +4,7 @@
 """
 
 import os
+import time
 import json
 from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator, Sequence
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -124,7 +125,9 @@ class ChatDashScope(BaseChatModel):
         
         try:
             # 调用 DashScope API
+            start_time = time.time()
             response = Generation.call(**request_params)
+            duration = time.time() - start_time
             
             if response.status_code == 200:
                 # 解析响应
@@ -165,7 +168,8 @@ class ChatDashScope(BaseChatModel):
                             input_tokens=input_tokens,
                             output_tokens=output_tokens,
                             session_id=session_id,
-                            analysis_type=analysis_type
+                            analysis_type=analysis_type,
+                            duration=duration
                         )
                     except Exception as track_error:
                         # 记录失败不应该影响主要功能
@@ -5,6 +5,7 @@
 """
 
 import os
+import time
 from typing import Any, Dict, List, Optional, Union, Sequence
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import BaseTool
@@ -54,7 +55,9 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         """重写生成方法，添加 token 使用量追踪"""
         
         # 调用父类的生成方法
+        start_time = time.time()
         result = super()._generate(*args, **kwargs)
+        duration = time.time() - start_time
         
         # 追踪 token 使用量
         try:
@@ -77,7 +80,8 @@ class ChatDashScopeOpenAI(ChatOpenAI):
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
                         session_id=session_id,
-                        analysis_type=analysis_type
+                        analysis_type=analysis_type,
+                        duration=duration
                     )
                     
         except Exception as track_error:
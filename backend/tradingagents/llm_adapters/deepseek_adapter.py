@@ -131,7 +131,8 @@ class ChatDeepSeek(ChatOpenAI):
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
                         session_id=session_id,
-                        analysis_type=analysis_type
+                        analysis_type=analysis_type,
+                        duration=time.time() - start_time
                     )
 
                     if usage_record:
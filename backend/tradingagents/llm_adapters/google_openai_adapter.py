@@ -8,6 +8,7 @@ Google AI OpenAI兼容适配器
 """
 
 import os
+import time
 from typing import Any, Dict, List, Optional, Union, Sequence
 
 try:
@@ -74,6 +75,7 @@ else:
     def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs) -> LLMResult:
         """重写生成方法，优化工具调用处理和内容格式"""
         
+        start_time = time.time()
         try:
             # 调用父类的生成方法
             result = super()._generate(messages, stop, **kwargs)
@@ -86,7 +88,7 @@ else:
                         self._optimize_message_content(generation.message)
             
             # 追踪 token 使用量
-            self._track_token_usage(result, kwargs)
+            self._track_token_usage(result, kwargs, duration=time.time() - start_time)
             
             return result
             
@@ -155,7 +157,7 @@ else:
         
         return enhanced_content
     
-    def _track_token_usage(self, result: LLMResult, kwargs: Dict[str, Any]):
+    def _track_token_usage(self, result: LLMResult, kwargs: Dict[str, Any], duration: Optional[float] = None):
         """追踪 token 使用量"""
         
         try:
@@ -178,7 +180,8 @@ else:
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
                         session_id=session_id,
-                        analysis_type=analysis_type
+                        analysis_type=analysis_type,
+                        duration=duration
                     )
                     
                     logger.debug(f" [Google适配器] Token使用量: 输入={input_tokens}, 输出={output_tokens}")
@@ -3,10 +3,12 @@ RL模块
 
 包含强化学习相关的组件：
 - LLMEnhancedTradingEnv: LLM增强的交易环境
+- LLMSignalStore / LLMSignalPrecomputer: LLM信号离线预计算与查询
 - 奖励函数
 - 数据准备工具
 """
 
 from .llm_enhanced_env import LLMEnhancedTradingEnv
+from .signal_store import LLMSignalStore, LLMSignalPrecomputer, SignalMissingError
 
-__all__ = ['LLMEnhancedTradingEnv']
+__all__ = ['LLMEnhancedTradingEnv', 'LLMSignalStore', 'LLMSignalPrecomputer', 'SignalMissingError']
@@ -22,11 +22,32 @@ from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.dataflows.interface import get_stock_data_by_market
 from tradingagents.utils.logging_init import get_logger
 
-# 导入Memory系统
-from memory import MemoryManager, MemoryMode
+from tradingagents.rl.signal_store import (
+    LLMSignalStore,
+    SignalMissingError,
+    DEFAULT_LLM_SIGNALS,
+    DEFAULT_MEMORY_SIGNALS,
+    calculate_agent_agreement,
+    extract_llm_signals,
+    normalize_date,
+    summarize_memory_episodes,
+)
+
+# 导入Memory系统（离线信号模式下不需要）
+try:
+    from memory import MemoryManager, MemoryMode
+    MEMORY_AVAILABLE = True
+except ImportError:
+    MemoryManager = None
+    MEMORY_AVAILABLE = False
 
 logger = get_logger("rl_env")
 
+# 信号来源：live=每步调用TradingAgents/Memory，offline=查询预计算信号表
+SIGNAL_MODES = ('live', 'offline')
+# 离线信号缺失处理：default=中性默认值，live=回退实时计算，raise=抛出SignalMissingError
+MISSING_SIGNAL_POLICIES = ('default', 'live', 'raise')
+
 
 class LLMEnhancedTradingEnv(gym.Env):
     """LLM增强的交易环境
@@ -52,8 +73,8 @@ class LLMEnhancedTradingEnv(gym.Env):
     def __init__(
         self,
         df: pd.DataFrame,
-        trading_graph: TradingAgentsGraph,
-        memory_manager: MemoryManager,
+        trading_graph: Optional[TradingAgentsGraph],
+        memory_manager: Optional['MemoryManager'],
         initial_cash: float = 100000.0,
         buy_cost_pct: float = 0.001,
         sell_cost_pct: float = 0.001,
@@ -61,6 +82,9 @@ class LLMEnhancedTradingEnv(gym.Env):
         reward_scaling: float = 1.0,
         cvar_alpha: float = 0.95,
         risk_penalty_coef: float = 0.1,
+        signal_mode: str = 'live',
+        signal_store: Optional[LLMSignalStore] = None,
+        missing_signal_policy: str = 'default',
         **kwargs
     ):
         """初始化环境
@@ -76,6 +100,9 @@ class LLMEnhancedTradingEnv(gym.Env):
             reward_scaling: 奖励缩放系数
             cvar_alpha: CVaR阈值
             risk_penalty_coef: 风险惩罚系数
+            signal_mode: 信号来源，live=每步调用TradingAgents/Memory，offline=查询预计算信号表
+            signal_store: 离线信号表（signal_mode='offline'时必需）
+            missing_signal_policy: 离线信号缺失时的处理，default/live/raise
         """
         super().__init__()
 
@@ -94,6 +121,25 @@ class LLMEnhancedTradingEnv(gym.Env):
         self.cvar_alpha = cvar_alpha
         self.risk_penalty_coef = risk_penalty_coef
 
+        # 信号来源
+        if signal_mode not in SIGNAL_MODES:
+            raise ValueError(f"signal_mode must be one of {SIGNAL_MODES}, got {signal_mode!r}")
+        if missing_signal_policy not in MISSING_SIGNAL_POLICIES:
+            raise ValueError(f"missing_signal_policy must be one of {MISSING_SIGNAL_POLICIES}, got {missing_signal_policy!r}")
+        self.signal_mode = signal_mode
+        self.missing_signal_policy = missing_signal_policy
+        self.symbol = self.df.iloc[0].get('tic', 'UNKNOWN')
+        self.signal_misses = 0
+        self.missing_signal_dates: List[str] = []
+        self._offline_signals: Dict[str, np.ndarray] = {}
+        if signal_mode == 'offline':
+            if signal_store is None:
+                raise ValueError("signal_store is required when signal_mode='offline'")
+            # 一次性加载该股票全部信号，每步为字典查询
+            self._offline_signals = signal_store.load_symbol(self.symbol)
+            covered = sum(1 for d in self.df['date'] if normalize_date(d) in self._offline_signals) if 'date' in self.df else 0
+            logger.info(f"   离线信号: {len(self._offline_signals)} 条，覆盖 {covered}/{len(self.df)} 天")
+
         # 环境状态
         self.day = 0
         self.data = self.df.loc[self.day, :]
@@ -156,6 +202,8 @@ class LLMEnhancedTradingEnv(gym.Env):
         self.rewards_memory = []
         self.actions_memory = []
         self.date_memory = [self._get_date()]
+        self.signal_misses = 0
+        self.missing_signal_dates = []
 
         observation = self._get_observation()
         info = {'day': self.day}
@@ -195,7 +243,8 @@ class LLMEnhancedTradingEnv(gym.Env):
                 {
                     'final_asset': final_asset,
                     'return': return_pct,
-                    'trades': len(self.actions_memory)
+                    'trades': len(self.actions_memory),
+                    'signal_misses': self.signal_misses
                 }
             )
 
@@ -237,11 +286,12 @@ class LLMEnhancedTradingEnv(gym.Env):
         # 1. 市场基础特征
         market_features = self._get_market_features()
 
-        # 2. TradingAgents LLM信号
-        llm_signals = self._get_llm_signals()
-
-        # 3. Memory历史信号
-        memory_signals = self._get_memory_signals()
+        # 2. TradingAgents LLM信号 / 3. Memory历史信号
+        if self.signal_mode == 'offline':
+            llm_signals, memory_signals = self._get_offline_signals()
+        else:
+            llm_signals = self._get_llm_signals()
+            memory_signals = self._get_memory_signals()
 
         # 4. 账户状态
         account_features = self._get_account_features()
@@ -315,37 +365,12 @@ class LLMEnhancedTradingEnv(gym.Env):
                 current_date
             )
 
-            # 提取LLM分析结果
-            llm_analysis = final_state.get('llm_analysis', {})
-
-            # 编码方向
-            direction_map = {'long': 1.0, 'hold': 0.0, 'short': -1.0}
-            direction = direction_map.get(
-                llm_analysis.get('recommended_direction', 'hold'),
-                0.0
-            )
-
-            # 提取其他信号
-            confidence = llm_analysis.get('confidence', 0.5)
-            risk_score = llm_analysis.get('risk_score', 0.5)
-
-            # 计算Agent一致性
-            agent_results = final_state.get('agent_results', {})
-            agreement = self._calculate_agent_agreement(agent_results)
-
-            signals = np.array([
-                direction,
-                confidence,
-                risk_score,
-                agreement
-            ], dtype=np.float32)
-
-            return signals
+            return extract_llm_signals(final_state)
 
         except Exception as e:
             logger.warning(f" 获取LLM信号失败: {e}")
             # 返回默认值
-            return np.array([0.0, 0.5, 0.5, 0.5], dtype=np.float32)
+            return DEFAULT_LLM_SIGNALS.copy()
 
     def _get_memory_signals(self) -> np.ndarray:
         """从Memory系统获取历史信号
@@ -370,28 +395,36 @@ class LLMEnhancedTradingEnv(gym.Env):
                 top_k=5
             )
 
-            if len(similar_episodes) == 0:
-                return np.array([0.0, 0.5], dtype=np.float32)
-
-            # 统计相似案例的平均收益和成功率
-            returns = []
-            successes = []
-
-            for episode in similar_episodes:
-                if episode.outcome and episode.outcome.percentage_return is not None:
-                    returns.append(episode.outcome.percentage_return)
-                    successes.append(1 if episode.success else 0)
+            return summarize_memory_episodes(similar_episodes)
 
-            avg_return = np.mean(returns) if len(returns) > 0 else 0.0
-            success_rate = np.mean(successes) if len(successes) > 0 else 0.5
+        except Exception as e:
+            logger.warning(f" 获取记忆信号失败: {e}")
+            return DEFAULT_MEMORY_SIGNALS.copy()
 
-            signals = np.array([avg_return, success_rate], dtype=np.float32)
+    def _get_offline_signals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """从预计算信号表查询当前日期的信号（O(1)）
 
-            return signals
+        Returns:
+            (LLM信号向量, 记忆信号向量)
 
-        except Exception as e:
-            logger.warning(f" 获取记忆信号失败: {e}")
-            return np.array([0.0, 0.5], dtype=np.float32)
+        Raises:
+            SignalMissingError: missing_signal_policy='raise' 且信号缺失
+        """
+        current_date = normalize_date(self._get_date())
+        signals = self._offline_signals.get(current_date)
+        if signals is not None:
+            return signals[:4], signals[4:]
+
+        self.signal_misses += 1
+        self.missing_signal_dates.append(current_date)
+        if self.missing_signal_policy == 'raise':
+            raise SignalMissingError(f"No precomputed signals for {self.symbol} on {current_date}")
+        if self.missing_signal_policy == 'live':
+            return self._get_llm_signals(), self._get_memory_signals()
+
+        if self.signal_misses == 1 or self.signal_misses % 100 == 0:
+            logger.warning(f" 离线信号缺失 {self.symbol} {current_date}，使用默认值（累计{self.signal_misses}次）")
+        return DEFAULT_LLM_SIGNALS.copy(), DEFAULT_MEMORY_SIGNALS.copy()
 
     def _get_account_features(self) -> np.ndarray:
         """获取账户状态特征
@@ -569,24 +602,7 @@ class LLMEnhancedTradingEnv(gym.Env):
         Returns:
             一致性得分 (0-1)
         """
-        if len(agent_results) == 0:
-            return 0.5
-
-        directions = []
-        for result in agent_results.values():
-            if isinstance(result, dict) and 'direction' in result:
-                directions.append(result['direction'])
-
-        if len(directions) == 0:
-            return 0.5
-
-        # 统计最多的方向
-        from collections import Counter
-        counter = Counter(directions)
-        most_common_count = counter.most_common(1)[0][1]
-
-        agreement = most_common_count / len(directions)
-        return agreement
+        return calculate_agent_agreement(agent_results)
 
     def _get_date(self) -> str:
         """获取当前日期
@@ -0,0 +1,313 @@
+"""
+LLM信号离线存储
+
+将 TradingAgents 多Agent分析与 Memory 历史案例统计预先批量计算，持久化为
+(symbol, date) -> [direction, confidence, risk_score, agreement, avg_return, success_rate]
+的信号表。RL训练时环境直接查表，不再每步调用 trading_graph.propagate。
+
+- LLMSignalStore: SQLite信号表（WAL），支持按股票整体加载到内存做O(1)查询
+- LLMSignalPrecomputer: 批量预计算，支持断点续跑和多线程并行
+"""
+
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.utils.logging_init import get_logger
+
+logger = get_logger("rl_signal_store")
+
+# 信号字段顺序（与环境观察中的顺序一致）
+LLM_SIGNAL_FIELDS = ('direction', 'confidence', 'risk_score', 'agreement')
+MEMORY_SIGNAL_FIELDS = ('avg_return', 'success_rate')
+SIGNAL_FIELDS = LLM_SIGNAL_FIELDS + MEMORY_SIGNAL_FIELDS
+
+# 信号缺失/计算失败时的中性默认值
+DEFAULT_LLM_SIGNALS = np.array([0.0, 0.5, 0.5, 0.5], dtype=np.float32)
+DEFAULT_MEMORY_SIGNALS = np.array([0.0, 0.5], dtype=np.float32)
+DEFAULT_SIGNALS = np.concatenate([DEFAULT_LLM_SIGNALS, DEFAULT_MEMORY_SIGNALS])
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+
+class SignalMissingError(KeyError):
+    """离线信号表中不存在 (symbol, date) 的信号"""
+
+
+def normalize_date(value: Any) -> str:
+    """统一日期格式为 YYYY-MM-DD"""
+    return pd.Timestamp(str(value)).strftime('%Y-%m-%d')
+
+
+def calculate_agent_agreement(agent_results: Dict[str, Any]) -> float:
+    """计算Agent之间的一致性 (0-1)"""
+    if len(agent_results) == 0:
+        return 0.5
+
+    directions = []
+    for result in agent_results.values():
+        if isinstance(result, dict) and 'direction' in result:
+            directions.append(result['direction'])
+
+    if len(directions) == 0:
+        return 0.5
+
+    most_common_count = Counter(directions).most_common(1)[0][1]
+    return most_common_count / len(directions)
+
+
+def extract_llm_signals(final_state: Dict[str, Any]) -> np.ndarray:
+    """从 trading_graph.propagate 的最终状态提取 [direction, confidence, risk_score, agreement]"""
+    llm_analysis = final_state.get('llm_analysis', {})
+
+    direction_map = {'long': 1.0, 'hold': 0.0, 'short': -1.0}
+    direction = direction_map.get(llm_analysis.get('recommended_direction', 'hold'), 0.0)
+    confidence = llm_analysis.get('confidence', 0.5)
+    risk_score = llm_analysis.get('risk_score', 0.5)
+    agreement = calculate_agent_agreement(final_state.get('agent_results', {}))
+
+    return np.array([direction, confidence, risk_score, agreement], dtype=np.float32)
+
+
+def summarize_memory_episodes(episodes: Sequence[Any]) -> np.ndarray:
+    """统计相似案例的 [avg_return, success_rate]"""
+    if len(episodes) == 0:
+        return DEFAULT_MEMORY_SIGNALS.copy()
+
+    returns = []
+    successes = []
+    for episode in episodes:
+        # 检索结果句柄（EpisodeHandle）直接提供收益率，无需解析完整episode
+        percentage_return = getattr(episode, 'percentage_return', None)
+        if percentage_return is None:
+            outcome = getattr(episode, 'outcome', None)
+            percentage_return = outcome.percentage_return if outcome else None
+        if percentage_return is not None:
+            returns.append(percentage_return)
+            successes.append(1 if episode.success else 0)
+
+    avg_return = np.mean(returns) if len(returns) > 0 else 0.0
+    success_rate = np.mean(successes) if len(successes) > 0 else 0.5
+    return np.array([avg_return, success_rate], dtype=np.float32)
+
+
+class LLMSignalStore:
+    """LLM信号表 - (symbol, date) 主键的SQLite存储"""
+
+    def __init__(self, db_path: str):
+        """
+        初始化信号表
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        columns = ', '.join(f"{name} REAL" for name in SIGNAL_FIELDS)
+        with self._lock:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS llm_signals (
+                    symbol TEXT NOT NULL,
+                    trade_date TEXT NOT NULL,
+                    {columns},
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    elapsed_seconds REAL,
+                    created_at TEXT,
+                    PRIMARY KEY (symbol, trade_date)
+                )
+            """)
+            self.conn.commit()
+
+    def put(
+        self,
+        symbol: str,
+        trade_date: Any,
+        signals: Optional[Sequence[float]],
+        status: str = STATUS_OK,
+        error: Optional[str] = None,
+        elapsed_seconds: Optional[float] = None
+    ):
+        """写入一条信号（已存在则覆盖）"""
+        values = list(signals) if signals is not None else DEFAULT_SIGNALS.tolist()
+        if len(values) != len(SIGNAL_FIELDS):
+            raise ValueError(f"Expected {len(SIGNAL_FIELDS)} signal values, got {len(values)}")
+
+        fields = ('symbol', 'trade_date') + SIGNAL_FIELDS + ('status', 'error', 'elapsed_seconds', 'created_at')
+        row = [symbol, normalize_date(trade_date)] + [float(v) for v in values] + [
+            status, error, elapsed_seconds, datetime.now().isoformat()
+        ]
+        sql = f"INSERT OR REPLACE INTO llm_signals ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})"
+        with self._lock:
+            self.conn.execute(sql, row)
+            self.conn.commit()
+
+    def get(self, symbol: str, trade_date: Any) -> Optional[np.ndarray]:
+        """查询单条成功计算的信号，不存在时返回None"""
+        sql = f"SELECT {', '.join(SIGNAL_FIELDS)} FROM llm_signals WHERE symbol = ? AND trade_date = ? AND status = ?"
+        with self._lock:
+            row = self.conn.execute(sql, (symbol, normalize_date(trade_date), STATUS_OK)).fetchone()
+        return np.array(row, dtype=np.float32) if row else None
+
+    def load_symbol(self, symbol: str) -> Dict[str, np.ndarray]:
+        """加载一只股票全部成功计算的信号 {YYYY-MM-DD: 信号向量}"""
+        sql = f"SELECT trade_date, {', '.join(SIGNAL_FIELDS)} FROM llm_signals WHERE symbol = ? AND status = ?"
+        with self._lock:
+            rows = self.conn.execute(sql, (symbol, STATUS_OK)).fetchall()
+        return {row[0]: np.array(row[1:], dtype=np.float32) for row in rows}
+
+    def completed_keys(self, symbols: Optional[Iterable[str]] = None, include_failed: bool = False) -> Set[Tuple[str, str]]:
+        """已计算完成的 (symbol, date) 集合，用于断点续跑"""
+        sql = "SELECT symbol, trade_date FROM llm_signals"
+        params: List[Any] = []
+        conditions = []
+        if not include_failed:
+            conditions.append("status = ?")
+            params.append(STATUS_OK)
+        if symbols is not None:
+            symbols = list(symbols)
+            conditions.append(f"symbol IN ({', '.join('?' for _ in symbols)})")
+            params.extend(symbols)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return {(row[0], row[1]) for row in self.conn.execute(sql, params)}
+
+    def count(self, status: Optional[str] = None) -> int:
+        """信号条数"""
+        with self._lock:
+            if status is None:
+                return self.conn.execute("SELECT COUNT(*) FROM llm_signals").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM llm_signals WHERE status = ?", (status,)).fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
+
+
+class LLMSignalPrecomputer:
+    """LLM信号批量预计算
+
+    每个工作线程持有独立的 TradingAgentsGraph（由 graph_factory 创建），
+    结果在主线程逐条写入信号表，中断后重新运行会跳过已完成的 (symbol, date)。
+    """
+
+    def __init__(
+        self,
+        store: LLMSignalStore,
+        graph_factory: Callable[[], Any],
+        memory_manager: Optional[Any] = None,
+        max_workers: int = 4,
+        memory_top_k: int = 5
+    ):
+        """
+        Args:
+            store: 信号表
+            graph_factory: 创建 TradingAgentsGraph 的工厂函数（每个工作线程调用一次）
+            memory_manager: 记忆管理器，None时记忆信号使用默认值
+            max_workers: 并行线程数（LLM调用以网络I/O为主）
+            memory_top_k: 检索相似案例数量
+        """
+        self.store = store
+        self.graph_factory = graph_factory
+        self.memory_manager = memory_manager
+        self.max_workers = max(1, max_workers)
+        self.memory_top_k = memory_top_k
+        self._local = threading.local()
+
+    def _graph(self):
+        graph = getattr(self._local, 'graph', None)
+        if graph is None:
+            graph = self._local.graph = self.graph_factory()
+        return graph
+
+    def compute_one(self, symbol: str, trade_date: str, price: Optional[float] = None) -> np.ndarray:
+        """计算单个 (symbol, date) 的完整信号向量"""
+        final_state, _ = self._graph().propagate(symbol, trade_date)
+        llm_signals = extract_llm_signals(final_state)
+
+        memory_signals = DEFAULT_MEMORY_SIGNALS.copy()
+        if self.memory_manager is not None:
+            episodes = self.memory_manager.retrieve_episodes(
+                query_context={'symbol': symbol, 'date': trade_date, 'price': price or 0},
+                top_k=self.memory_top_k
+            )
+            memory_signals = summarize_memory_episodes(episodes)
+
+        return np.concatenate([llm_signals, memory_signals])
+
+    def _task(self, symbol: str, trade_date: str, price: Optional[float]) -> Tuple[Optional[np.ndarray], Optional[str], float]:
+        start = time.perf_counter()
+        try:
+            return self.compute_one(symbol, trade_date, price), None, time.perf_counter() - start
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+    def run(
+        self,
+        tasks: Iterable[Tuple[str, Any, Optional[float]]],
+        resume: bool = True,
+        retry_failed: bool = True
+    ) -> Dict[str, int]:
+        """
+        批量预计算
+
+        Args:
+            tasks: (symbol, date, price) 列表，price 可为None
+            resume: 跳过信号表中已存在的 (symbol, date)
+            retry_failed: 续跑时是否重新计算之前失败的条目
+
+        Returns:
+            统计 {'total', 'skipped', 'computed', 'failed'}
+        """
+        tasks = [(symbol, normalize_date(d), price) for symbol, d, price in tasks]
+        stats = {'total': len(tasks), 'skipped': 0, 'computed': 0, 'failed': 0}
+
+        if resume:
+            done = self.store.completed_keys({t[0] for t in tasks}, include_failed=not retry_failed)
+            pending = [t for t in tasks if (t[0], t[1]) not in done]
+            stats['skipped'] = len(tasks) - len(pending)
+        else:
+            pending = tasks
+
+        logger.info(f" LLM信号预计算: 共{stats['total']}条，跳过{stats['skipped']}条，待计算{len(pending)}条，线程数{self.max_workers}")
+        if not pending:
+            return stats
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-signal") as executor:
+            futures = {executor.submit(self._task, *task): task for task in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                symbol, trade_date, _ = futures[future]
+                signals, error, elapsed = future.result()
+                if error is None:
+                    self.store.put(symbol, trade_date, signals, elapsed_seconds=elapsed)
+                    stats['computed'] += 1
+                else:
+                    self.store.put(symbol, trade_date, None, status=STATUS_ERROR, error=error, elapsed_seconds=elapsed)
+                    stats['failed'] += 1
+                    logger.warning(f" 信号计算失败 {symbol} {trade_date}: {error}")
+
+                if i % 50 == 0 or i == len(pending):
+                    rate = i / max(time.perf_counter() - started, 1e-9)
+                    logger.info(f"   进度 {i}/{len(pending)}，{rate:.2f} 条/秒")
+
+        return stats
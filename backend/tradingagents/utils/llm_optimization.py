@@ -3,7 +3,7 @@ LLM Optimization Utilities
 
 提供LLM调用优化功能：
 1. 上下文裁剪（Context Pruning）- 智能截断过长输入
-2. 结果缓存（Result Caching）- 缓存重复查询结果
+2. 结果缓存（Result Caching）- 缓存重复查询结果（进程内LRU + SQLite持久层 + 可选语义匹配）
 3. 批处理（Batching）- 批量处理请求降低延迟
 
 预期效果：
@@ -13,16 +13,49 @@ LLM Optimization Utilities
 """
 
 import hashlib
+import json
+import os
+import re
+import sqlite3
 import time
-from typing import Dict, List, Any, Optional, Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Sequence
 from functools import wraps
 from collections import OrderedDict
 from threading import Lock
 
+import numpy as np
+
 from tradingagents.utils.logging_init import get_logger
 
 logger = get_logger("llm_optimization")
 
+try:
+    from langchain_core.caches import BaseCache
+    from langchain_core.globals import set_llm_cache
+    from langchain_core.load import dumps as lc_dumps, loads as lc_loads
+    from langchain_core.runnables.config import var_child_runnable_config
+    LANGCHAIN_CACHE_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_CACHE_AVAILABLE = False
+
+# 当前分析的 (股票, 日期)，由 llm_cache_scope 设置；LangGraph 会把上下文带到节点线程中
+_cache_scope: ContextVar[Optional[tuple]] = ContextVar("llm_cache_scope", default=None)
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    估算token数量
+
+    简化计算：中文约1字=1token，英文约4字符=1token
+    """
+    chinese_chars = len([c for c in text if '\u4e00' <= c <= '\u9fff'])
+    other_chars = len(text) - chinese_chars
+
+    return chinese_chars + (other_chars // 4)
+
 
 class ContextPruner:
     """上下文裁剪器 - 智能截断过长输入"""
@@ -49,15 +82,8 @@ class ContextPruner:
         self.truncate_strategy = truncate_strategy
 
     def _estimate_tokens(self, text: str) -> int:
-        """
-        估算token数量
-
-        简化计算：中文约1字=1token，英文约4字符=1token
-        """
-        chinese_chars = len([c for c in text if '\u4e00' <= c <= '\u9fff'])
-        other_chars = len(text) - chinese_chars
-
-        return chinese_chars + (other_chars // 4)
+        """估算token数量"""
+        return _estimate_tokens(text)
 
     def truncate(self, text: str) -> tuple[str, bool]:
         """
@@ -120,65 +146,161 @@ class ContextPruner:
         return truncated, True
 
 
+# 归一化时替换的时间戳（保留日期，只去掉时分秒，日期不同的分析不会互相命中）
+_TIME_OF_DAY_PATTERN = re.compile(r"(?<=\d{4}-\d{2}-\d{2})[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+_CLOCK_PATTERN = re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    归一化prompt用于生成缓存key
+
+    - 去掉日期后的时分秒和独立的 HH:MM:SS 时间戳
+    - 连续空白压缩为单个空格，去掉首尾空白
+    """
+    prompt = _TIME_OF_DAY_PATTERN.sub("", prompt)
+    prompt = _CLOCK_PATTERN.sub("<TIME>", prompt)
+    return _WHITESPACE_PATTERN.sub(" ", prompt).strip()
+
+
 class LLMResultCache:
-    """LLM结果缓存 - 缓存重复查询结果"""
+    """LLM结果缓存 - 缓存重复查询结果
+
+    两级缓存:
+    1. 精确匹配: 归一化prompt的哈希。进程内LRU在前，可选SQLite持久层（WAL）在后，
+       多个工作进程共享同一个数据库文件，重启后仍然有效
+    2. 语义匹配（可选，需提供 embed_fn）: 同一模型、同一 scope（如 股票|日期|分析师）
+       下余弦相似度不低于阈值的prompt复用已有结果
+    """
 
     def __init__(
         self,
         max_size: int = 1000,
-        ttl_seconds: int = 3600
+        ttl_seconds: int = 3600,
+        db_path: Optional[str] = None,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+        similarity_threshold: float = 0.97,
+        max_disk_entries: int = 50000
     ):
         """
         初始化结果缓存
 
         Args:
-            max_size: 最大缓存条目数
+            max_size: 进程内缓存最大条目数
             ttl_seconds: 缓存过期时间（秒）
+            db_path: SQLite持久化文件路径，None表示只使用进程内缓存
+            embed_fn: 文本向量化函数，提供时启用语义匹配
+            similarity_threshold: 语义匹配的最低余弦相似度
+            max_disk_entries: 持久层最多保留的条目数
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_disk_entries = max_disk_entries
         self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self._lock = Lock()
 
+        # (model, scope) -> (keys, 归一化向量矩阵)，从持久层懒加载
+        self._vectors: Dict[tuple, tuple] = {}
+
         self.hits = 0
         self.misses = 0
-
-    def _generate_key(self, prompt: str, model: str) -> str:
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.semantic_hits = 0
+        self.tokens_saved = 0
+        self.cost_saved = 0.0
+        self._sets_since_prune = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_tables()
+
+    def _create_tables(self):
+        """创建持久层表"""
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT,
+                    scope TEXT,
+                    result TEXT,
+                    tokens INTEGER,
+                    cost REAL,
+                    created_at REAL,
+                    embedding BLOB
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_result_cache(model, scope)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_result_cache(created_at)"
+            )
+            self._conn.commit()
+
+    def _generate_key(self, prompt: str, model: str, scope: Optional[str] = None) -> str:
         """
         生成缓存key
 
         Args:
             prompt: 输入prompt
             model: 模型名称
+            scope: 缓存范围，不同 scope 的相同prompt互不命中
 
         Returns:
-            缓存key（MD5哈希）
+            缓存key（归一化prompt的SHA-256）
         """
-        content = f"{model}:{prompt}"
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
-
-    def get(self, prompt: str, model: str) -> Optional[str]:
+        content = f"{model}:{normalize_prompt(prompt)}"
+        if scope is not None:
+            content = f"{scope}:{content}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _record_hit(self, item: Dict[str, Any]):
+        self.hits += 1
+        self.tokens_saved += item.get('tokens') or 0
+        self.cost_saved += item.get('cost') or 0.0
+
+    def _remember(self, key: str, item: Dict[str, Any]):
+        """放入进程内LRU（调用方持锁）"""
+        self._cache[key] = item
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def get(self, prompt: str, model: str, scope: Optional[str] = None, semantic: bool = True) -> Optional[str]:
         """
         获取缓存结果
 
         Args:
             prompt: 输入prompt
             model: 模型名称
+            scope: 缓存范围（如 "000001|2024-05-10|market"），精确匹配和语义匹配都只在
+                同一 scope 内命中；None时不限范围且只做精确匹配
+            semantic: 是否允许语义匹配（False时只做精确匹配）
 
         Returns:
             缓存的结果，如果不存在则返回None
         """
-        key = self._generate_key(prompt, model)
+        key = self._generate_key(prompt, model, scope)
+        now = time.time()
 
         with self._lock:
-            if key in self._cache:
-                cached_item = self._cache[key]
-
+            cached_item = self._cache.get(key)
+            if cached_item is not None:
                 # 检查是否过期
-                if time.time() - cached_item['timestamp'] < self.ttl_seconds:
+                if now - cached_item['timestamp'] < self.ttl_seconds:
                     # 命中，移到末尾（LRU）
                     self._cache.move_to_end(key)
-                    self.hits += 1
+                    self.memory_hits += 1
+                    self._record_hit(cached_item)
 
                     logger.debug(f"Cache hit: {key[:8]}... (hit_rate={self.hit_rate:.2%})")
                     return cached_item['result']
@@ -186,10 +308,111 @@ class LLMResultCache:
                     # 过期，删除
                     del self._cache[key]
 
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, tokens, cost, created_at FROM llm_result_cache "
+                    "WHERE cache_key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    item = {'result': row[0], 'tokens': row[1], 'cost': row[2], 'timestamp': row[3]}
+                    self._remember(key, item)
+                    self.disk_hits += 1
+                    self._record_hit(item)
+                    logger.debug(f"Cache hit (disk): {key[:8]}...")
+                    return item['result']
+
+        if semantic and scope is not None and self.embed_fn is not None:
+            result = self._semantic_get(prompt, model, scope, now)
+            if result is not None:
+                return result
+
+        with self._lock:
             self.misses += 1
+        return None
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """向量化并归一化，失败时返回None（语义层不可用不影响精确缓存）"""
+        try:
+            vector = np.asarray(self.embed_fn(normalize_prompt(prompt)), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Cache embedding failed, semantic tier skipped: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _load_vectors(self, model: str, scope: str) -> tuple:
+        """加载某个 (model, scope) 下的全部向量（调用方持锁）"""
+        index = self._vectors.get((model, scope))
+        if index is not None:
+            return index
+
+        keys: List[str] = []
+        vectors: List[np.ndarray] = []
+        if self._conn is not None:
+            rows = self._conn.execute(
+                "SELECT cache_key, embedding FROM llm_result_cache "
+                "WHERE model = ? AND scope = ? AND embedding IS NOT NULL",
+                (model, scope)
+            ).fetchall()
+            for cache_key, blob in rows:
+                keys.append(cache_key)
+                vectors.append(np.frombuffer(blob, dtype=np.float32))
+        index = (keys, np.vstack(vectors) if vectors else None)
+        self._vectors[(model, scope)] = index
+        return index
+
+    def _semantic_get(self, prompt: str, model: str, scope: str, now: float) -> Optional[str]:
+        """在同一 (model, scope) 下按余弦相似度查找"""
+        vector = self._embed(prompt)
+        if vector is None:
             return None
 
-    def set(self, prompt: str, model: str, result: str):
+        with self._lock:
+            keys, matrix = self._load_vectors(model, scope)
+            if matrix is None or matrix.shape[1] != vector.shape[0]:
+                return None
+            scores = matrix @ vector
+            # 从最相似的开始，跳过已过期/已淘汰的条目
+            for i in np.argsort(-scores):
+                if scores[i] < self.similarity_threshold:
+                    break
+                item = self._lookup_key(keys[i], now)
+                if item is not None:
+                    self.semantic_hits += 1
+                    self._record_hit(item)
+                    logger.debug(f"Cache hit (semantic): {keys[i][:8]}... similarity={scores[i]:.4f}")
+                    return item['result']
+        return None
+
+    def _lookup_key(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """按key从两级缓存取未过期条目（调用方持锁）"""
+        item = self._cache.get(key)
+        if item is not None and now - item['timestamp'] < self.ttl_seconds:
+            return item
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT result, tokens, cost, created_at FROM llm_result_cache "
+            "WHERE cache_key = ? AND created_at >= ?",
+            (key, now - self.ttl_seconds)
+        ).fetchone()
+        if row is None:
+            return None
+        item = {'result': row[0], 'tokens': row[1], 'cost': row[2], 'timestamp': row[3]}
+        self._remember(key, item)
+        return item
+
+    def set(
+        self,
+        prompt: str,
+        model: str,
+        result: str,
+        tokens: Optional[int] = None,
+        cost: float = 0.0,
+        scope: Optional[str] = None,
+        semantic: bool = True
+    ):
         """
         设置缓存结果
 
@@ -197,21 +420,61 @@ class LLMResultCache:
             prompt: 输入prompt
             model: 模型名称
             result: LLM输出结果
+            tokens: 本次调用消耗的token数，None时按文本长度估算（用于统计节省量）
+            cost: 本次调用的成本（元）
+            scope: 缓存范围，None时不写入向量
+            semantic: 是否写入向量供语义匹配（False时只能精确命中）
         """
-        key = self._generate_key(prompt, model)
+        key = self._generate_key(prompt, model, scope)
+        if tokens is None:
+            tokens = _estimate_tokens(prompt) + _estimate_tokens(result)
+
+        vector = None
+        if semantic and scope is not None and self.embed_fn is not None:
+            vector = self._embed(prompt)
+
+        item = {'result': result, 'tokens': tokens, 'cost': cost, 'timestamp': time.time()}
 
         with self._lock:
             # LRU淘汰
-            if len(self._cache) >= self.max_size:
-                self._cache.popitem(last=False)
-
-            self._cache[key] = {
-                'result': result,
-                'timestamp': time.time()
-            }
+            self._remember(key, item)
+
+            if vector is not None:
+                keys, matrix = self._load_vectors(model, scope)
+                if key not in keys and (matrix is None or matrix.shape[1] == vector.shape[0]):
+                    matrix = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+                    self._vectors[(model, scope)] = (keys + [key], matrix)
+
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_result_cache "
+                    "(cache_key, model, scope, result, tokens, cost, created_at, embedding) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, scope, result, tokens, cost, item['timestamp'],
+                     vector.tobytes() if vector is not None else None)
+                )
+                self._conn.commit()
+                self._sets_since_prune += 1
+                if self._sets_since_prune >= 500:
+                    self._prune_disk()
 
             logger.debug(f"Cache set: {key[:8]}... (size={len(self._cache)})")
 
+    def _prune_disk(self):
+        """删除持久层中过期和超出上限的条目（调用方持锁）"""
+        self._sets_since_prune = 0
+        self._conn.execute(
+            "DELETE FROM llm_result_cache WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            "DELETE FROM llm_result_cache WHERE cache_key IN ("
+            "SELECT cache_key FROM llm_result_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._conn.commit()
+        self._vectors.clear()
+
     @property
     def hit_rate(self) -> float:
         """缓存命中率"""
@@ -219,28 +482,152 @@ class LLMResultCache:
         return self.hits / total if total > 0 else 0.0
 
     def clear(self):
-        """清空缓存"""
+        """清空缓存（包括持久层）"""
         with self._lock:
             self._cache.clear()
+            self._vectors.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_result_cache")
+                self._conn.commit()
             self.hits = 0
             self.misses = 0
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.semantic_hits = 0
+            self.tokens_saved = 0
+            self.cost_saved = 0.0
             logger.info("Cache cleared")
 
+    def close(self):
+        """关闭持久层连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def stats(self) -> Dict[str, Any]:
         """获取缓存统计"""
-        return {
-            "size": len(self._cache),
-            "max_size": self.max_size,
-            "hits": self.hits,
-            "misses": self.misses,
-            "hit_rate": self.hit_rate,
-            "ttl_seconds": self.ttl_seconds
-        }
+        with self._lock:
+            disk_size = None
+            if self._conn is not None:
+                disk_size = self._conn.execute("SELECT COUNT(*) FROM llm_result_cache").fetchone()[0]
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "disk_size": disk_size,
+                "db_path": self.db_path,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+                "tokens_saved": self.tokens_saved,
+                "cost_saved": round(self.cost_saved, 6),
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+@contextmanager
+def llm_cache_scope(symbol: str, trade_date: str):
+    """
+    在上下文内把LLM缓存限定到某只股票的某个交易日
+
+    用法:
+        with llm_cache_scope("000001", "2024-05-10"):
+            graph.invoke(state)
+    """
+    token = _cache_scope.set((str(symbol), str(trade_date)))
+    try:
+        yield
+    finally:
+        _cache_scope.reset(token)
+
+
+def current_cache_scope() -> Optional[str]:
+    """
+    当前调用的缓存范围 "股票|日期|分析师"
+
+    股票和日期来自 llm_cache_scope，分析师取 LangGraph 当前节点名；
+    未设置 llm_cache_scope 时返回None（不限范围，只做精确匹配）
+    """
+    scope = _cache_scope.get()
+    if scope is None:
+        return None
+    node = ""
+    if LANGCHAIN_CACHE_AVAILABLE:
+        config = var_child_runnable_config.get() or {}
+        node = (config.get("metadata") or {}).get("langgraph_node", "")
+    return f"{scope[0]}|{scope[1]}|{node}"
+
+
+_TOOL_MESSAGE_TYPES = ("ToolMessage", "ToolMessageChunk", "FunctionMessage", "FunctionMessageChunk")
+
+
+def _has_tool_messages(prompt: str) -> bool:
+    """LangChain序列化的消息中是否含工具结果或工具调用
+
+    同一分析师工具循环的相邻几步prompt只相差一条工具消息，语义上几乎相同，
+    但应得到不同的回复，这类prompt只能精确匹配。
+    """
+    try:
+        messages = json.loads(prompt)
+    except (TypeError, ValueError):
+        return False
+    if not isinstance(messages, list):
+        return False
+    for message in messages:
+        if not isinstance(message, dict):
+            continue
+        if (message.get("id") or [""])[-1] in _TOOL_MESSAGE_TYPES:
+            return True
+        kwargs = message.get("kwargs") or {}
+        if kwargs.get("tool_calls") or (kwargs.get("additional_kwargs") or {}).get("tool_calls"):
+            return True
+    return False
+
+
+if LANGCHAIN_CACHE_AVAILABLE:
+    class LangChainResultCache(BaseCache):
+        """将 LLMResultCache 接入 LangChain 全局缓存（set_llm_cache）
+
+        LangChain 传入的 prompt 为序列化后的消息，llm_string 包含模型名和调用参数，
+        两者一起作为精确匹配的key，并按 current_cache_scope() 限定到 股票|日期|分析师。
+        含工具结果或工具调用的prompt不参与语义匹配。
+        Generation 列表序列化为JSON后存储。
+        """
+
+        def __init__(self, cache: LLMResultCache):
+            self.cache = cache
+
+        def lookup(self, prompt: str, llm_string: str):
+            cached = self.cache.get(prompt, llm_string, scope=current_cache_scope(),
+                                    semantic=not _has_tool_messages(prompt))
+            if cached is None:
+                return None
+            try:
+                return lc_loads(cached)
+            except Exception as e:
+                logger.warning(f"Failed to deserialize cached generations: {e}")
+                return None
+
+        def update(self, prompt: str, llm_string: str, return_val):
+            tokens = None
+            for generation in return_val:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+                if usage:
+                    tokens = (tokens or 0) + usage.get('total_tokens', 0)
+            self.cache.set(prompt, llm_string, lc_dumps(return_val), tokens=tokens,
+                           scope=current_cache_scope(), semantic=not _has_tool_messages(prompt))
+
+        def clear(self, **kwargs):
+            self.cache.clear()
 
 
 # 全局实例
 _global_pruner: Optional[ContextPruner] = None
 _global_cache: Optional[LLMResultCache] = None
+_global_cache_lock = Lock()
 
 
 def get_context_pruner(
@@ -270,29 +657,100 @@ def get_context_pruner(
 
 
 def get_llm_cache(
-    max_size: int = 1000,
-    ttl_seconds: int = 3600
+    max_size: Optional[int] = None,
+    ttl_seconds: Optional[int] = None,
+    db_path: Optional[str] = None,
+    embed_fn: Optional[Callable[[str], Sequence[float]]] = None
 ) -> LLMResultCache:
     """
     获取全局LLM缓存（单例）
 
+    未传入的参数沿用现有实例的设置；传入的参数与现有实例不同时重建单例
+    （已安装的 LangChain 缓存需重新调用 install_langchain_llm_cache）。
+
     Args:
-        max_size: 最大缓存条目数
-        ttl_seconds: 缓存过期时间（秒）
+        max_size: 最大缓存条目数，默认1000
+        ttl_seconds: 缓存过期时间（秒），默认3600，可被环境变量 LLM_CACHE_TTL_SECONDS 覆盖
+        db_path: 持久化文件路径，默认读取环境变量 LLM_CACHE_DB_PATH（未设置时只用进程内缓存）
+        embed_fn: 文本向量化函数，提供时启用语义匹配
 
     Returns:
         LLMResultCache实例
     """
     global _global_cache
 
-    if _global_cache is None:
+    requested: Dict[str, Any] = {}
+    if max_size is not None:
+        requested['max_size'] = max_size
+    if ttl_seconds is not None:
+        requested['ttl_seconds'] = int(os.getenv("LLM_CACHE_TTL_SECONDS", ttl_seconds))
+    if db_path is not None:
+        requested['db_path'] = db_path
+    if embed_fn is not None:
+        requested['embed_fn'] = embed_fn
+
+    with _global_cache_lock:
+        if _global_cache is not None:
+            changed = [name for name, value in requested.items() if getattr(_global_cache, name) != value]
+            if not changed:
+                return _global_cache
+            settings = {
+                'max_size': _global_cache.max_size,
+                'ttl_seconds': _global_cache.ttl_seconds,
+                'db_path': _global_cache.db_path,
+                'embed_fn': _global_cache.embed_fn,
+            }
+            logger.info(f"💾 LLM Cache settings changed ({', '.join(changed)}), rebuilding")
+        else:
+            settings = {
+                'max_size': 1000,
+                'ttl_seconds': int(os.getenv("LLM_CACHE_TTL_SECONDS", 3600)),
+                'db_path': os.getenv("LLM_CACHE_DB_PATH") or None,
+                'embed_fn': None,
+            }
+        settings.update(requested)
+
         _global_cache = LLMResultCache(
-            max_size=max_size,
-            ttl_seconds=ttl_seconds
+            similarity_threshold=float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.97")),
+            **settings
         )
-        logger.info(f"💾 LLM Cache initialized: max_size={max_size}, ttl={ttl_seconds}s")
+        logger.info(
+            f"💾 LLM Cache initialized: max_size={settings['max_size']}, ttl={settings['ttl_seconds']}s, "
+            f"db={settings['db_path'] or 'memory'}, semantic={settings['embed_fn'] is not None}"
+        )
+        return _global_cache
 
-    return _global_cache
+
+def install_langchain_llm_cache(
+    db_path: Optional[str] = None,
+    ttl_seconds: int = 86400,
+    embed_fn: Optional[Callable[[str], Sequence[float]]] = None
+) -> bool:
+    """
+    将全局LLM缓存安装为LangChain全局缓存，同一天重复分析时直接复用模型输出
+
+    缓存按 股票|日期|分析师 限定范围（见 llm_cache_scope），仅在该范围内命中。
+
+    Args:
+        db_path: 持久化文件路径（环境变量 LLM_CACHE_DB_PATH 优先）
+        ttl_seconds: 缓存过期时间（秒）
+        embed_fn: 文本向量化函数，提供时启用语义匹配
+
+    Returns:
+        是否安装成功
+    """
+    if not LANGCHAIN_CACHE_AVAILABLE:
+        logger.warning("langchain_core not available, LLM result cache not installed")
+        return False
+
+    cache = get_llm_cache(
+        ttl_seconds=ttl_seconds,
+        db_path=os.getenv("LLM_CACHE_DB_PATH") or db_path,
+        embed_fn=embed_fn
+    )
+    set_llm_cache(LangChainResultCache(cache))
+    logger.info(f"💾 LangChain LLM cache installed: db={cache.db_path or 'memory'}")
+    return True
 
 
 def optimize_llm_call(
@@ -312,6 +770,9 @@ def optimize_llm_call(
             # ... LLM调用逻辑 ...
             return result
 
+        # cache_scope 不会传给被装饰函数，用于语义缓存匹配范围
+        call_llm(prompt, model="qwen-plus", cache_scope="000001|2024-05-10|market")
+
     Args:
         enable_pruning: 是否启用上下文裁剪
         enable_caching: 是否启用结果缓存
@@ -331,6 +792,7 @@ def optimize_llm_call(
 
             # 假设model在kwargs中
             model = kwargs.get('model', 'unknown')
+            scope = kwargs.pop('cache_scope', None)
 
             # 应用上下文裁剪
             if enable_pruning and prompt:
@@ -345,7 +807,7 @@ def optimize_llm_call(
             # 尝试从缓存获取结果
             if enable_caching and prompt:
                 cache = get_llm_cache()
-                cached_result = cache.get(prompt, model)
+                cached_result = cache.get(prompt, model, scope=scope)
 
                 if cached_result is not None:
                     logger.info(f"💾 Cache hit for model: {model}")
@@ -361,7 +823,7 @@ def optimize_llm_call(
             # 缓存结果
             if enable_caching and prompt and result:
                 cache = get_llm_cache()
-                cache.set(prompt, model, result)
+                cache.set(prompt, model, result, scope=scope)
 
             return result
 
@@ -9,18 +9,35 @@ Monitoring Metrics Module
 - API调用统计（成功/失败次数、平均耗时）
 - LLM使用统计（token消耗、成本）
 - 任务进度（Time Travel训练进度）
+
+直方图只保存桶计数和分位数草图，内存固定；带标签的指标族（按数据源、
+智能体、接口拆分）统一通过 MetricFamily.labels() 获取子指标。
 """
 
+import math
+import os
 import time
-from typing import Dict, List, Any, Optional
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-from collections import defaultdict
 from threading import Lock
 
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("monitoring")
 
+# 每个指标族最多保留的标签组合数，超出后归入 "other"，防止标签基数失控
+MAX_LABEL_SETS = int(os.getenv("METRICS_MAX_LABEL_SETS", "1000"))
+
+# 直方图默认桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# LLM 请求耗时的桶（秒）
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# 摘要中输出的分位数
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
 
 @dataclass
 class Counter:
@@ -59,32 +76,245 @@ class Gauge:
         """减少值"""
         self.value -= amount
 
+    def reset(self):
+        """重置值"""
+        self.value = 0.0
+
+
+class QuantileSketch:
+    """流式分位数估计（对数分桶，DDSketch 思路）
+
+    正值 v 落入第 ceil(log_gamma(v)) 个桶，桶内取中点作为估计值，
+    相对误差不超过 relative_accuracy。桶数超过 max_bins 时合并最小的桶
+    （只损失低分位数的精度），内存与观测次数无关。
+    """
+
+    # 小于此值的观测计入零桶
+    MIN_VALUE = 1e-9
+
+    __slots__ = ("relative_accuracy", "max_bins", "_gamma", "_log_gamma", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max(2, max_bins)
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        """记录一个观测值（NaN/Inf 忽略）"""
+        if not math.isfinite(value):
+            return
+        self.count += 1
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        bins = self.bins
+        bins[key] = bins.get(key, 0) + 1
+        if len(bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        """将最小的两个桶合并为一个"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q: float) -> float:
+        """估计分位数（q 取 0~1），无观测时返回 0"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+    def reset(self):
+        """清空所有观测"""
+        self.bins.clear()
+        self.zero_count = 0
+        self.count = 0
+
 
 @dataclass
 class Histogram:
-    """简单直方图（用于记录延迟）"""
+    """直方图（用于记录延迟）
+
+    只保存各桶计数、总和、极值和分位数草图，内存固定，
+    observe 为 O(log 桶数)，与观测次数无关。
+    """
     name: str
     help: str
-    buckets: List[float] = field(default_factory=lambda: [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0])
-    values: List[float] = field(default_factory=list)
+    buckets: Sequence[float] = DEFAULT_BUCKETS
     labels: Dict[str, str] = field(default_factory=dict)
+    count: int = field(default=0, init=False)
+    sum: float = field(default=0.0, init=False)
+    min: float = field(default=math.inf, init=False)
+    max: float = field(default=-math.inf, init=False)
+    bucket_counts: List[int] = field(default_factory=list, init=False, repr=False)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch, init=False, repr=False)
+    # 被丢弃的 NaN/Inf 观测数（不计入 count/sum/桶）
+    dropped: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self.buckets = tuple(sorted(b for b in self.buckets if b != math.inf))
+        # 最后一个位置对应 +Inf 桶
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
 
     def observe(self, value: float):
-        """记录观测值"""
-        self.values.append(value)
+        """记录观测值；NaN/Inf 不改变任何统计，只计入 dropped"""
+        if not math.isfinite(value):
+            self.dropped += 1
+            return
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """Prometheus 累计桶: [(上界, 小于等于上界的观测数)]，最后一项上界为 +Inf"""
+        result = []
+        total = 0
+        for bound, n in zip(self.buckets + (math.inf,), self.bucket_counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """估计分位数（结果限制在观测到的最小/最大值之间）"""
+        if self.count == 0:
+            return 0.0
+        return min(max(self.sketch.quantile(q), self.min), self.max)
 
     def get_summary(self) -> Dict[str, float]:
         """获取统计摘要"""
-        if not self.values:
-            return {"count": 0, "sum": 0, "min": 0, "max": 0, "avg": 0}
-
-        return {
-            "count": len(self.values),
-            "sum": sum(self.values),
-            "min": min(self.values),
-            "max": max(self.values),
-            "avg": sum(self.values) / len(self.values)
+        if self.count == 0:
+            summary = {"count": 0, "sum": 0, "min": 0, "max": 0, "avg": 0}
+            summary.update({f"p{round(q * 100)}": 0 for q in SUMMARY_QUANTILES})
+            return summary
+
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.sum / self.count
         }
+        for q in SUMMARY_QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+    def reset(self):
+        """清空所有观测"""
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.dropped = 0
+        self.sketch.reset()
+
+
+class MetricFamily:
+    """带标签的指标族：同名指标按标签值拆分为多个子指标
+
+    用法: family.labels(provider="tushare").inc()
+    """
+
+    OVERFLOW_LABEL = "other"
+
+    def __init__(
+        self,
+        metric_type: type,
+        name: str,
+        help: str,
+        label_names: Sequence[str],
+        max_label_sets: Optional[int] = None,
+        **metric_kwargs
+    ):
+        """
+        Args:
+            metric_type: 子指标类型（Counter / Gauge / Histogram）
+            name: 指标名
+            help: 指标说明
+            label_names: 标签名
+            max_label_sets: 最多保留的标签组合数，默认 METRICS_MAX_LABEL_SETS
+            **metric_kwargs: 创建子指标时的额外参数（如直方图的 buckets）
+        """
+        self.metric_type = metric_type
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.max_label_sets = max_label_sets if max_label_sets is not None else MAX_LABEL_SETS
+        self._metric_kwargs = metric_kwargs
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = Lock()
+
+    def labels(self, *values: str, **labels: str):
+        """获取（必要时创建）某组标签值对应的子指标"""
+        if labels:
+            values = tuple(labels.get(name, "") for name in self.label_names)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+
+        child = self._children.get(key)
+        if child is not None:
+            return child
+
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                if len(self._children) >= self.max_label_sets:
+                    key = (self.OVERFLOW_LABEL,) * len(self.label_names)
+                    child = self._children.get(key)
+                if child is None:
+                    child = self.metric_type(
+                        name=self.name,
+                        help=self.help,
+                        labels=dict(zip(self.label_names, key)),
+                        **self._metric_kwargs
+                    )
+                    self._children[key] = child
+            return child
+
+    def items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        """所有 (标签值, 子指标)"""
+        with self._lock:
+            return list(self._children.items())
+
+    def clear(self):
+        """删除所有子指标"""
+        with self._lock:
+            self._children.clear()
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    """格式化 Prometheus 标签 {k="v",...}，无标签时返回空字符串"""
+    if extra:
+        labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
 
 
 class MetricsCollector:
@@ -147,6 +377,13 @@ class MetricsCollector:
             help="API request duration in seconds"
         )
 
+        self.api_endpoint_duration = MetricFamily(
+            Histogram,
+            name="api_endpoint_request_duration_seconds",
+            help="API request duration by endpoint and status",
+            label_names=("endpoint", "status")
+        )
+
         # ===== LLM使用统计 =====
         self.llm_tokens_total = Counter(
             name="llm_tokens_total",
@@ -158,10 +395,34 @@ class MetricsCollector:
             help="Total LLM cost in CNY"
         )
 
-        self.llm_requests_by_tier = defaultdict(lambda: Counter(
+        self.llm_requests_by_tier = MetricFamily(
+            Counter,
             name="llm_requests_by_tier_total",
-            help="LLM requests by tier (small/medium/large)"
-        ))
+            help="LLM requests by tier (small/medium/large)",
+            label_names=("tier",)
+        )
+
+        self.llm_requests = MetricFamily(
+            Counter,
+            name="llm_requests_total",
+            help="LLM requests by provider and agent",
+            label_names=("provider", "agent")
+        )
+
+        self.llm_tokens = MetricFamily(
+            Counter,
+            name="llm_tokens_by_agent_total",
+            help="LLM tokens consumed by provider and agent",
+            label_names=("provider", "agent")
+        )
+
+        self.llm_request_duration = MetricFamily(
+            Histogram,
+            name="llm_request_duration_seconds",
+            help="LLM request duration in seconds by provider",
+            label_names=("provider",),
+            buckets=LLM_BUCKETS
+        )
 
         # ===== 任务进度指标 =====
         self.task_progress = Gauge(
@@ -175,15 +436,26 @@ class MetricsCollector:
         )
 
         # ===== 数据源统计 =====
-        self.data_source_requests = defaultdict(lambda: Counter(
+        self.data_source_requests = MetricFamily(
+            Counter,
             name="data_source_requests_total",
-            help="Data source requests by provider"
-        ))
+            help="Data source requests by provider",
+            label_names=("provider",)
+        )
 
-        self.data_source_failures = defaultdict(lambda: Counter(
+        self.data_source_failures = MetricFamily(
+            Counter,
             name="data_source_failures_total",
-            help="Data source failures by provider"
-        ))
+            help="Data source failures by provider",
+            label_names=("provider",)
+        )
+
+        self.data_source_duration = MetricFamily(
+            Histogram,
+            name="data_source_request_duration_seconds",
+            help="Data source request duration in seconds by provider",
+            label_names=("provider",)
+        )
 
         logger.info("📊 Metrics Collector initialized")
 
@@ -221,8 +493,14 @@ class MetricsCollector:
             hit_rate = self.cache_hits.value / total
             self.cache_hit_rate.set(hit_rate)
 
-    def record_api_request(self, success: bool, duration: float):
-        """记录API请求"""
+    def record_api_request(self, success: bool, duration: float, endpoint: Optional[str] = None):
+        """记录API请求
+
+        Args:
+            success: 是否成功
+            duration: 耗时（秒）
+            endpoint: 接口路径，提供时同时按接口统计耗时
+        """
         with self._lock:
             self.api_requests_total.inc()
             if success:
@@ -230,25 +508,59 @@ class MetricsCollector:
             else:
                 self.api_requests_failure.inc()
             self.api_request_duration.observe(duration)
-
-    def record_llm_usage(self, tokens: int, cost: float, tier: str = "medium"):
-        """记录LLM使用"""
+            if endpoint is not None:
+                status = "success" if success else "failure"
+                self.api_endpoint_duration.labels(endpoint, status).observe(duration)
+
+    def record_llm_usage(
+        self,
+        tokens: int,
+        cost: float,
+        tier: Optional[str] = "medium",
+        provider: Optional[str] = None,
+        agent: Optional[str] = None,
+        duration: Optional[float] = None
+    ):
+        """记录LLM使用
+
+        Args:
+            tokens: 消耗的token数
+            cost: 成本（元）
+            tier: 模型档位，None 时不按档位统计（调用方不知道档位时）
+            provider: 模型提供商，提供时按提供商/智能体统计
+            agent: 发起调用的智能体
+            duration: 请求耗时（秒）
+        """
         with self._lock:
             self.llm_tokens_total.inc(tokens)
             self.llm_cost_total.inc(cost)
-            self.llm_requests_by_tier[tier].inc()
+            if tier is not None:
+                self.llm_requests_by_tier.labels(tier).inc()
+            if provider is not None or agent is not None:
+                self.llm_requests.labels(provider or "", agent or "").inc()
+                self.llm_tokens.labels(provider or "", agent or "").inc(tokens)
+            if duration is not None:
+                self.llm_request_duration.labels(provider or "").observe(duration)
 
     def record_task_progress(self, progress: float, completed_steps: int):
         """记录任务进度"""
         self.task_progress.set(progress)
         self.task_completed_steps.value = completed_steps
 
-    def record_data_source_request(self, provider: str, success: bool):
-        """记录数据源请求"""
+    def record_data_source_request(self, provider: str, success: bool, duration: Optional[float] = None):
+        """记录数据源请求
+
+        Args:
+            provider: 数据源名称
+            success: 是否成功
+            duration: 请求耗时（秒）
+        """
         with self._lock:
-            self.data_source_requests[provider].inc()
+            self.data_source_requests.labels(provider).inc()
             if not success:
-                self.data_source_failures[provider].inc()
+                self.data_source_failures.labels(provider).inc()
+            if duration is not None:
+                self.data_source_duration.labels(provider).observe(duration)
 
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -266,6 +578,12 @@ class MetricsCollector:
             api_total = self.api_requests_total.value
             api_success_rate = (self.api_requests_success.value / api_total) if api_total > 0 else 0.0
 
+            # 只遍历已有的子指标，不通过 labels() 创建空序列
+            llm_tokens = {key: counter.value for key, counter in self.llm_tokens.items()}
+            source_failures = {key: counter.value for key, counter in self.data_source_failures.items()}
+            source_durations = {key: histogram.get_summary() for key, histogram in self.data_source_duration.items()}
+            empty_duration = Histogram(name=self.data_source_duration.name, help=self.data_source_duration.help)
+
             return {
                 "timestamp": datetime.now().isoformat(),
                 "system_health": {
@@ -285,13 +603,30 @@ class MetricsCollector:
                     "failed_requests": self.api_requests_failure.value,
                     "success_rate": api_success_rate,
                     "duration_stats": self.api_request_duration.get_summary(),
+                    "by_endpoint": {
+                        f"{endpoint} ({status})": histogram.get_summary()
+                        for (endpoint, status), histogram in self.api_endpoint_duration.items()
+                    },
                 },
                 "llm_usage": {
                     "total_tokens": self.llm_tokens_total.value,
                     "total_cost_yuan": self.llm_cost_total.value,
                     "requests_by_tier": {
                         tier: counter.value
-                        for tier, counter in self.llm_requests_by_tier.items()
+                        for (tier,), counter in self.llm_requests_by_tier.items()
+                    },
+                    "by_agent": [
+                        {
+                            "provider": provider,
+                            "agent": agent,
+                            "requests": counter.value,
+                            "tokens": llm_tokens.get((provider, agent), 0),
+                        }
+                        for (provider, agent), counter in self.llm_requests.items()
+                    ],
+                    "duration_by_provider": {
+                        provider: histogram.get_summary()
+                        for (provider,), histogram in self.llm_request_duration.items()
                     },
                 },
                 "task_progress": {
@@ -300,10 +635,11 @@ class MetricsCollector:
                 },
                 "data_sources": {
                     provider: {
-                        "total_requests": self.data_source_requests[provider].value,
-                        "failed_requests": self.data_source_failures[provider].value,
+                        "total_requests": counter.value,
+                        "failed_requests": source_failures.get((provider,), 0),
+                        "duration_stats": source_durations.get((provider,)) or empty_duration.get_summary(),
                     }
-                    for provider in self.data_source_requests.keys()
+                    for (provider,), counter in self.data_source_requests.items()
                 },
             }
 
@@ -316,63 +652,70 @@ class MetricsCollector:
         """
         lines = []
 
+        def add_header(metric_type: str, name: str, help: str):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        def add_sample(metric):
+            if isinstance(metric, Histogram):
+                for bound, count in metric.cumulative_buckets():
+                    labels = _format_labels(metric.labels, {"le": _format_bound(bound)})
+                    lines.append(f"{metric.name}_bucket{labels} {count}")
+                labels = _format_labels(metric.labels)
+                lines.append(f"{metric.name}_sum{labels} {metric.sum}")
+                lines.append(f"{metric.name}_count{labels} {metric.count}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(metric.labels)} {metric.value}")
+
         # Helper function to add metric
         def add_metric(metric_type: str, metric):
-            lines.append(f"# HELP {metric.name} {metric.help}")
-            lines.append(f"# TYPE {metric.name} {metric_type}")
-            if hasattr(metric, 'value'):
-                lines.append(f"{metric.name} {metric.value}")
-            lines.append("")
-
-        # System health
-        add_metric("gauge", self.heartbeat_status)
-        add_metric("counter", self.restart_count)
-        add_metric("gauge", self.health_status)
-
-        # Cache performance
-        add_metric("counter", self.cache_hits)
-        add_metric("counter", self.cache_misses)
-        add_metric("gauge", self.cache_hit_rate)
-
-        # API statistics
-        add_metric("counter", self.api_requests_total)
-        add_metric("counter", self.api_requests_success)
-        add_metric("counter", self.api_requests_failure)
-
-        # Histogram for API duration
-        summary = self.api_request_duration.get_summary()
-        lines.append(f"# HELP {self.api_request_duration.name} {self.api_request_duration.help}")
-        lines.append(f"# TYPE {self.api_request_duration.name} histogram")
-        lines.append(f"{self.api_request_duration.name}_count {summary['count']}")
-        lines.append(f"{self.api_request_duration.name}_sum {summary['sum']}")
-        lines.append("")
-
-        # LLM usage
-        add_metric("counter", self.llm_tokens_total)
-        add_metric("gauge", self.llm_cost_total)
-
-        for tier, counter in self.llm_requests_by_tier.items():
-            lines.append(f"# HELP {counter.name} {counter.help}")
-            lines.append(f"# TYPE {counter.name} counter")
-            lines.append(f'{counter.name}{{tier="{tier}"}} {counter.value}')
+            add_header(metric_type, metric.name, metric.help)
+            add_sample(metric)
             lines.append("")
 
-        # Task progress
-        add_metric("gauge", self.task_progress)
-        add_metric("counter", self.task_completed_steps)
-
-        # Data sources
-        for provider, counter in self.data_source_requests.items():
-            lines.append(f"# HELP {counter.name} {counter.help}")
-            lines.append(f"# TYPE {counter.name} counter")
-            lines.append(f'{counter.name}{{provider="{provider}"}} {counter.value}')
+        def add_family(metric_type: str, family: MetricFamily):
+            children = family.items()
+            if not children:
+                return
+            add_header(metric_type, family.name, family.help)
+            for _, metric in children:
+                add_sample(metric)
             lines.append("")
 
-        for provider, counter in self.data_source_failures.items():
-            lines.append(f"# HELP {counter.name} {counter.help}")
-            lines.append(f"# TYPE {counter.name} counter")
-            lines.append(f'{counter.name}{{provider="{provider}"}} {counter.value}')
-            lines.append("")
+        with self._lock:
+            # System health
+            add_metric("gauge", self.heartbeat_status)
+            add_metric("counter", self.restart_count)
+            add_metric("gauge", self.health_status)
+
+            # Cache performance
+            add_metric("counter", self.cache_hits)
+            add_metric("counter", self.cache_misses)
+            add_metric("gauge", self.cache_hit_rate)
+
+            # API statistics
+            add_metric("counter", self.api_requests_total)
+            add_metric("counter", self.api_requests_success)
+            add_metric("counter", self.api_requests_failure)
+            add_metric("histogram", self.api_request_duration)
+            add_family("histogram", self.api_endpoint_duration)
+
+            # LLM usage
+            add_metric("counter", self.llm_tokens_total)
+            add_metric("gauge", self.llm_cost_total)
+            add_family("counter", self.llm_requests_by_tier)
+            add_family("counter", self.llm_requests)
+            add_family("counter", self.llm_tokens)
+            add_family("histogram", self.llm_request_duration)
+
+            # Task progress
+            add_metric("gauge", self.task_progress)
+            add_metric("counter", self.task_completed_steps)
+
+            # Data sources
+            add_family("counter", self.data_source_requests)
+            add_family("counter", self.data_source_failures)
+            add_family("histogram", self.data_source_duration)
 
         return "\n".join(lines)
 
@@ -387,9 +730,19 @@ class MetricsCollector:
             self.llm_tokens_total.reset()
             self.restart_count.reset()
             self.task_completed_steps.reset()
-            self.llm_requests_by_tier.clear()
-            self.data_source_requests.clear()
-            self.data_source_failures.clear()
+            self.llm_cost_total.reset()
+            self.api_request_duration.reset()
+            for family in (
+                self.api_endpoint_duration,
+                self.llm_requests_by_tier,
+                self.llm_requests,
+                self.llm_tokens,
+                self.llm_request_duration,
+                self.data_source_requests,
+                self.data_source_failures,
+                self.data_source_duration,
+            ):
+                family.clear()
             logger.info("📊 All metrics reset")
 
 
@@ -7,7 +7,7 @@
 import json
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from threading import Lock
@@ -31,6 +31,7 @@ class TaskCheckpoint:
     last_update_time: str = None
     metadata: Dict[str, Any] = None
     error: Optional[str] = None
+    completed_shards: List[str] = None  # 分片任务中已完成的分片ID（按完成顺序）
 
     def __post_init__(self):
         if self.start_time is None:
@@ -39,6 +40,8 @@ class TaskCheckpoint:
             self.last_update_time = datetime.now().isoformat()
         if self.metadata is None:
             self.metadata = {}
+        if self.completed_shards is None:
+            self.completed_shards = []
 
 
 class TaskMonitor:
@@ -163,6 +166,59 @@ class TaskMonitor:
                 f"({checkpoint.progress:.1%})"
             )
 
+    def mark_shards_completed(
+        self,
+        task_id: str,
+        shard_ids: List[str],
+        current_step: Optional[str] = None,
+        metadata_update: Optional[Dict[str, Any]] = None
+    ):
+        """
+        标记一批分片已完成（并行任务按分片断点恢复）
+
+        completed_steps 同步为已完成分片数，进度按 total_steps 计算；
+        一批分片只写一次检查点文件
+
+        Args:
+            task_id: 任务ID
+            shard_ids: 本批完成的分片ID
+            current_step: 当前步骤描述
+            metadata_update: 要更新的元数据
+        """
+        with self._lock:
+            if task_id not in self._tasks:
+                logger.warning(f"任务不存在: {task_id}")
+                return
+
+            checkpoint = self._tasks[task_id]
+            done = set(checkpoint.completed_shards)
+            for shard_id in shard_ids:
+                if shard_id not in done:
+                    done.add(shard_id)
+                    checkpoint.completed_shards.append(shard_id)
+
+            checkpoint.completed_steps = len(checkpoint.completed_shards)
+            if checkpoint.total_steps and checkpoint.total_steps > 0:
+                checkpoint.progress = checkpoint.completed_steps / checkpoint.total_steps
+            if current_step is not None:
+                checkpoint.current_step = current_step
+            checkpoint.last_update_time = datetime.now().isoformat()
+
+            if metadata_update:
+                checkpoint.metadata.update(metadata_update)
+
+            self._save_checkpoint(checkpoint)
+
+            logger.debug(
+                f"分片完成: {task_id} - {len(shard_ids)}个 "
+                f"({checkpoint.completed_steps}/{checkpoint.total_steps})"
+            )
+
+    def get_completed_shards(self, task_id: str) -> Set[str]:
+        """获取任务已完成的分片ID"""
+        checkpoint = self._tasks.get(task_id)
+        return set(checkpoint.completed_shards) if checkpoint else set()
+
     def complete_task(self, task_id: str, final_metadata: Optional[Dict[str, Any]] = None):
         """
         标记任务完成